@@ -4,25 +4,57 @@ doc4llm - Web URL扫描和信息安全收集工具
 A comprehensive web security testing tool for URL scanning,
 asset discovery, and reconnaissance.
 """
-from .crawler import DocContentCrawler, DocUrlCrawler
-from .extractor import WebContentExtractor
-from .link_processor import LinkProcessor
-from .scanner import (
-    BloomFilter,
-    DebugMixin,
-    OutputHandler,
-    OutputLogger,
-    SensitiveDetector,
-    ScannerConfig,
-    URLConcatenator,
-    URLMatcher,
-    UltimateURLScanner,
-    domain_matches,
-    handle_exceptions,
-    output_lock,
-)
-from .tool import MarkdownDocExtractor
-from .llm import invoke, LLM_Config, AnthropicClient
+from typing import TYPE_CHECKING
+
+from doc4llm._lazy import lazy_exports
+
+# crawler / scanner 依赖 requests、bs4 等，llm 依赖 anthropic；doc4llm.doc_rag
+# 等子包被导入时也会先执行这里，因此全部在首次访问时才导入（PEP 562）
+_EXPORTS = {
+    "DocContentCrawler": ".crawler",
+    "DocUrlCrawler": ".crawler",
+    "WebContentExtractor": ".extractor",
+    "LinkProcessor": ".link_processor",
+    "BloomFilter": ".scanner",
+    "DebugMixin": ".scanner",
+    "OutputHandler": ".scanner",
+    "OutputLogger": ".scanner",
+    "SensitiveDetector": ".scanner",
+    "ScannerConfig": ".scanner",
+    "URLConcatenator": ".scanner",
+    "URLMatcher": ".scanner",
+    "UltimateURLScanner": ".scanner",
+    "domain_matches": ".scanner",
+    "handle_exceptions": ".scanner",
+    "output_lock": ".scanner",
+    "MarkdownDocExtractor": ".tool",
+    "invoke": ".llm",
+    "LLM_Config": ".llm",
+    "AnthropicClient": ".llm",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .crawler import DocContentCrawler, DocUrlCrawler
+    from .extractor import WebContentExtractor
+    from .link_processor import LinkProcessor
+    from .scanner import (
+        BloomFilter,
+        DebugMixin,
+        OutputHandler,
+        OutputLogger,
+        SensitiveDetector,
+        ScannerConfig,
+        URLConcatenator,
+        URLMatcher,
+        UltimateURLScanner,
+        domain_matches,
+        handle_exceptions,
+        output_lock,
+    )
+    from .tool import MarkdownDocExtractor
+    from .llm import invoke, LLM_Config, AnthropicClient
 
 __version__ = '2.0.0'
 __all__ = [
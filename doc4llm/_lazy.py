@@ -0,0 +1,61 @@
+"""
+PEP 562 lazy attributes for package ``__init__`` modules.
+
+包的 ``__init__`` 原先直接导入所有子模块，``import doc4llm.doc_rag.cli`` 也会
+连带导入 anthropic、sentence-transformers、torch 等依赖。这里把包级别的
+re-export 改成首次访问时才导入对应子模块，``from package import Name`` 的
+写法保持不变。
+
+Example:
+    >>> # in package/__init__.py
+    >>> from doc4llm._lazy import lazy_exports
+    >>> _EXPORTS = {"Orchestrator": ".orchestrator", "Alias": (".module", "Name")}
+    >>> __getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple, Union
+
+Export = Union[str, Tuple[str, str]]
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, Export]
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """Build the module ``__getattr__`` / ``__dir__`` of a package.
+
+    Args:
+        package: ``__name__`` of the package
+        exports: ``{name: ".module"}`` or ``{name: (".module", "attribute")}``
+            for names exported under another name
+
+    Returns:
+        ``(__getattr__, __dir__)`` to assign in the package ``__init__``
+    """
+    module = sys.modules[package]
+
+    def __getattr__(name: str) -> object:
+        target = exports.get(name)
+        if target is None:
+            # ``package.submodule`` without importing it first
+            try:
+                return importlib.import_module(f".{name}", package)
+            except ModuleNotFoundError as e:
+                if e.name != f"{package}.{name}":
+                    raise
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        module_name, attribute = target if isinstance(target, tuple) else (target, name)
+        value = getattr(importlib.import_module(module_name, package), attribute)
+        # 缓存到模块字典，之后的访问不再经过 __getattr__
+        setattr(module, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(module)) | set(exports))
+
+    return __getattr__, __dir__
+
+
+__all__ = ["lazy_exports"]
@@ -0,0 +1,71 @@
+"""
+Run step generators synchronously or on an event loop.
+
+同一段流程（重试循环、整个 Doc-RAG pipeline）需要同步与异步两个版本时，把
+流程写成生成器：每个阻塞操作（LLM 请求、文件读取、检索）``yield`` 一个步骤
+描述，由驱动函数执行后把结果 ``send`` 回生成器，异常则 ``throw`` 回生成器，
+生成器内的 try/except 照常生效。``run_steps`` 直接调用，``arun_steps`` 在
+事件循环中 ``await``，流程本身只写一次。
+
+Example:
+    >>> def _requests(query):
+    ...     message = yield {"messages": [{"role": "user", "content": query}]}
+    ...     return parse(message)
+    >>> run_steps(_requests(query), lambda request: invoke(**request))
+    >>> await arun_steps(_requests(query), lambda request: ainvoke(**request))
+"""
+
+from typing import Any, Awaitable, Callable, Generator, TypeVar
+
+T = TypeVar("T")
+
+Steps = Generator[Any, Any, T]
+
+
+def run_steps(steps: Steps[T], run: Callable[[Any], Any]) -> T:
+    """Drive a step generator, running each step synchronously.
+
+    Args:
+        steps: Generator yielding steps and returning the final value
+        run: Executes one step and returns the value sent back
+
+    Returns:
+        The generator's return value
+    """
+    try:
+        step = next(steps)
+        while True:
+            try:
+                result = run(step)
+            except Exception as e:
+                step = steps.throw(e)
+            else:
+                step = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun_steps(steps: Steps[T], arun: Callable[[Any], Awaitable[Any]]) -> T:
+    """Drive a step generator, awaiting each step.
+
+    Args:
+        steps: Generator yielding steps and returning the final value
+        arun: Coroutine function executing one step
+
+    Returns:
+        The generator's return value
+    """
+    try:
+        step = next(steps)
+        while True:
+            try:
+                result = await arun(step)
+            except Exception as e:
+                step = steps.throw(e)
+            else:
+                step = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+__all__ = ["Steps", "arun_steps", "run_steps"]
@@ -7,14 +7,34 @@ Modules:
     - orchestrator: Complete RAG pipeline orchestrator
     - query_optimizer: LLM-based query optimization and expansion
     - query_router: LLM-based query classification and routing
+    - query_planner: Single-call query optimization and routing (Phase 0a + 0b)
     - params_parser: Phase transition parameter parsing
     - searcher: BM25-based document search
     - llm_reranker: LLM-based semantic re-ranking
     - scene_output: Scene-based output formatting
 """
 
-from .orchestrator import DocRAGConfig, DocRAGResult, DocRAGOrchestrator, retrieve
-from .query_router.query_router import QueryRouter, QueryRouterConfig, RoutingResult
+from typing import TYPE_CHECKING
+
+from doc4llm._lazy import lazy_exports
+
+# 子模块在首次访问时才导入（PEP 562）：docrag CLI 与守护进程客户端不必加载
+# anthropic / numpy / sentence-transformers
+_EXPORTS = {
+    "DocRAGConfig": ".orchestrator",
+    "DocRAGResult": ".orchestrator",
+    "DocRAGOrchestrator": ".orchestrator",
+    "retrieve": ".orchestrator",
+    "QueryRouter": ".query_router.query_router",
+    "QueryRouterConfig": ".query_router.query_router",
+    "RoutingResult": ".query_router.query_router",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .orchestrator import DocRAGConfig, DocRAGResult, DocRAGOrchestrator, retrieve
+    from .query_router.query_router import QueryRouter, QueryRouterConfig, RoutingResult
 
 __version__ = "1.0.0"
 
@@ -0,0 +1,322 @@
+"""
+docrag command-line entry point.
+
+The pipeline is forwarded to a running ``docrag-daemon`` (see daemon.py)
+when possible and run in-process otherwise; either way the output is
+written to ``$DOC4LLM_RESULT_FILE`` for hook injection. Only the standard
+library is imported until the in-process fallback is needed.
+
+Example:
+    $ docrag "如何创建 ray cluster?" --kb ~/md_docs
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from doc4llm.doc_rag.daemon import forward_retrieve
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the ``docrag`` argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Doc-RAG Orchestrator - Documentation Retrieval for LLM",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Basic query
+    docrag "如何创建 ray cluster?"
+
+    # With JSON output
+    docrag "how to use api" --json
+
+    # Skip LLM re-ranking
+    docrag "documentation" --skip-reranker
+
+    # Save output to file
+    docrag "tutorial" --output result.md
+
+    # Keep the pipeline warm between queries (see docrag-daemon)
+    docrag-daemon start --kb ~/md_docs
+        """,
+    )
+
+    parser.add_argument(
+        "query",
+        nargs="?",
+        help="User query (positional argument)",
+    )
+
+    parser.add_argument(
+        "-k",
+        "--kb",
+        "--knowledge-base",
+        dest="knowledge_base",
+        help="Path to knowledge_base",
+    )
+
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=int,
+        default=2100,
+        help="Line count threshold for requires_processing flag (default: 2100)",
+    )
+
+    parser.add_argument(
+        "--query-planner",
+        dest="query_planner",
+        action="store_true",
+        help="Run Phase 0a/0b as one combined LLM call (falls back to two calls on parse errors)",
+    )
+
+    parser.add_argument(
+        "--speculative-search",
+        dest="speculative_search",
+        action="store_true",
+        help="Start BM25 recall of the raw query while Phase 0a/0b run and merge it into Phase 1",
+    )
+
+    parser.add_argument(
+        "--llm-reranker",
+        dest="llm_reranker",
+        action="store_true",
+        help="Enable Phase 1.5 LLM re-ranking",
+    )
+
+    parser.add_argument(
+        "--compact-rerank",
+        dest="llm_reranker_compact",
+        action="store_true",
+        help="Send Phase 1.5 candidates to the LLM reranker as numbered lines (fewer tokens)",
+    )
+
+    parser.add_argument(
+        "--rerank-shard-tokens",
+        dest="llm_reranker_shard_tokens",
+        type=int,
+        default=0,
+        help="Split Phase 1.5 LLM reranking into concurrent shards of about N tokens (default: off)",
+    )
+
+    parser.add_argument(
+        "--embedding-reranker",
+        dest="embedding_reranker",
+        action="store_true",
+        help="Enable Phase 1.5 transformer embedding re-ranking",
+    )
+
+    parser.add_argument(
+        "--searcher-reranker",
+        dest="searcher_reranker",
+        action="store_true",
+        help="Enable Phase 1 transformer re-ranking in DocSearcherAPI",
+    )
+
+    parser.add_argument(
+        "--reranker-threshold",
+        dest="reranker_threshold",
+        type=float,
+        default=0.6,
+        help="Threshold for transformer embedding reranker (default: 0.6)",
+    )
+
+    parser.add_argument(
+        "--skip-keywords",
+        dest="skip_keywords",
+        help="Custom path for skiped_keywords.txt file",
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output_file",
+        help="Save output to file",
+    )
+
+    parser.add_argument(
+        "--stop-at",
+        dest="stop_at_phase",
+        choices=["0a", "0b", "1", "1.5", "2", "4"],
+        help="Stop pipeline at specified phase (0a, 0b, 1, 1.5, 2, or 4)",
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output result in JSON format",
+    )
+
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug mode",
+    )
+
+    parser.add_argument(
+        "--reader-config",
+        dest="reader_config",
+        help='JSON config dict for DocReaderAPI (Python dict format, e.g., \'{"search_mode": "fuzzy"}\')',
+    )
+
+    parser.add_argument(
+        "--searcher-config",
+        dest="searcher_config",
+        help="JSON config dict for DocSearcherAPI (Python dict format, e.g., '{\"bm25_k1\": 1.5}')",
+    )
+
+    parser.add_argument(
+        "--silent",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="Enable silent mode, suppress all output (0=off, 1=on, default: 1)",
+    )
+
+    parser.add_argument(
+        "--no-llm-cache",
+        dest="no_llm_cache",
+        action="store_true",
+        help="Always call the LLM, ignoring cached responses ($DOC4LLM_LLM_CACHE_DIR)",
+    )
+
+    parser.add_argument(
+        "--semantic-cache",
+        dest="semantic_cache",
+        action="store_true",
+        help="Reuse Phase 0a/0b results of similar earlier queries (local embedding model)",
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        dest="no_daemon",
+        action="store_true",
+        help="Always run in-process, even if a docrag daemon is running",
+    )
+
+    parser.add_argument(
+        "--socket",
+        dest="socket_path",
+        help="docrag daemon socket (default: $DOC4LLM_DAEMON_SOCKET or $XDG_RUNTIME_DIR/doc4llm)",
+    )
+
+    return parser
+
+
+def _expand_path(path: Optional[str]) -> Optional[str]:
+    """Absolute path, so the daemon resolves it like the caller's cwd would."""
+    return os.path.abspath(os.path.expanduser(path)) if path else path
+
+
+def retrieve_kwargs(args: argparse.Namespace, silent: bool) -> Dict[str, Any]:
+    """Keyword arguments of ``orchestrator.retrieve`` for parsed CLI arguments.
+
+    Raises:
+        ValueError: If --reader-config / --searcher-config is not valid JSON
+    """
+    return {
+        "query": args.query,
+        "base_dir": _expand_path(args.knowledge_base),
+        "threshold": args.threshold,
+        "llm_reranker": args.llm_reranker,
+        "embedding_reranker": args.embedding_reranker,
+        "searcher_reranker": args.searcher_reranker,
+        "reranker_threshold": args.reranker_threshold,
+        "debug": args.debug,
+        "skiped_keywords_path": _expand_path(args.skip_keywords),
+        "stop_at_phase": args.stop_at_phase,
+        "reader_config": json.loads(args.reader_config) if args.reader_config else None,
+        "searcher_config": json.loads(args.searcher_config) if args.searcher_config else None,
+        "silent": silent,
+        "llm_cache": not args.no_llm_cache,
+        "semantic_cache": args.semantic_cache,
+        "query_planner": args.query_planner,
+        "speculative_search": args.speculative_search,
+        "llm_reranker_compact": args.llm_reranker_compact,
+        "llm_reranker_shard_tokens": args.llm_reranker_shard_tokens,
+    }
+
+
+def _retrieve_in_process(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    import dataclasses
+
+    from doc4llm.doc_rag.orchestrator import retrieve
+
+    return dataclasses.asdict(retrieve(**kwargs))
+
+
+def main(argv: Optional[List[str]] = None, use_daemon: bool = True) -> int:
+    """Main entry point for CLI.
+
+    Args:
+        argv: Arguments (default: ``sys.argv[1:]``)
+        use_daemon: Forward to a running daemon when possible. Non-silent
+            and debug runs always stay in-process, since their output
+            belongs to this terminal and working directory.
+
+    Returns:
+        Exit code
+    """
+    start_cli = time.perf_counter()
+    args = build_parser().parse_args(argv)
+    silent = bool(getattr(args, "silent", 1))  # CLI int (0/1) -> bool for API
+
+    if not silent:
+        cli_parse_time = (time.perf_counter() - start_cli) * 1000
+        print(f"▶ [CLI] 参数解析 耗时: {cli_parse_time:.2f}ms")
+
+    if not args.query:
+        if not silent:
+            print("Error: Query is required", file=sys.stderr)
+            print(
+                "Usage: docrag 'your query'",
+                file=sys.stderr,
+            )
+        return 1
+
+    try:
+        kwargs = retrieve_kwargs(args, silent)
+
+        result = None
+        if use_daemon and not args.no_daemon and silent and not args.debug:
+            result = forward_retrieve(kwargs, args.socket_path)
+        if result is None:
+            # Use silent mode for hook injection (Claude reads from /tmp/doc4llm_result.txt only)
+            result = _retrieve_in_process(kwargs)
+
+        # Write to temp file for hook injection (Claude context only, user invisible)
+        result_file = os.environ.get("DOC4LLM_RESULT_FILE", "/tmp/doc4llm_result.txt")
+        with open(result_file, "w", encoding="utf-8") as f:
+            f.write(result["output"])
+
+        # Save to file if specified (only show message in non-silent mode)
+        if args.output_file:
+            with open(args.output_file, "w", encoding="utf-8") as f:
+                f.write(result["output"])
+            if not silent:
+                print(f"\n[Output saved to: {args.output_file}]", file=sys.stderr)
+
+        # Print result output to console in non-silent mode
+        # if not silent:
+        print(result["output"])
+
+        return 0 if result["success"] else 1
+
+    except Exception as e:
+        if not silent:
+            print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+__all__ = [
+    "build_parser",
+    "main",
+    "retrieve_kwargs",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
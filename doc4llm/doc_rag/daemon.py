@@ -0,0 +1,497 @@
+"""
+Doc-RAG daemon: keep the pipeline warm behind a Unix domain socket.
+
+``docrag`` 由编辑器 hook 按查询调用，每次都要付出 Python 启动、anthropic /
+numpy / sentence-transformers / transformers 的导入以及索引、模型的重建开销。
+守护进程常驻内存：进程级的 BM25 / dense / content 索引、嵌入缓存、本地模型
+与 HTTP 客户端在请求之间保持加载状态。``docrag`` 只把参数转发过来，守护进程
+未运行时回退到进程内执行。
+
+安全：socket 放在 ``$XDG_RUNTIME_DIR/doc4llm/``（未设置时为临时目录下的
+``doc4llm-<uid>/``），目录权限 0700。``docrag`` 连接前检查 socket 文件属于
+当前用户，连接后（Linux）用 SO_PEERCRED 确认对端进程的 uid；检查不通过时
+不发送请求，回退到进程内执行。
+
+环境：守护进程按 *自己* 的环境与工作目录解析 API key 与 ``doc4llm/.env``，
+不会使用调用方的。``docrag`` 在请求中附带调用方这些设置的指纹
+（``environment_fingerprint``，只含哈希，不发送密钥本身），与守护进程不一致
+时守护进程拒绝执行，``docrag`` 回退到进程内执行；修改 API key 或 ``.env``
+后需要重启守护进程。
+
+Protocol: one JSON object per line in each direction::
+
+    -> {"op": "retrieve", "kwargs": {...orchestrator.retrieve kwargs...}, "env": "<fingerprint>"}
+    <- {"ok": true, "result": {...DocRAGResult fields...}}
+    <- {"ok": false, "error": "..."}
+    <- {"ok": false, "error": "...", "in_process": true}   # 调用方应在进程内执行
+
+    -> {"op": "ping"}        <- {"ok": true, "pid": ..., "uptime": ..., "requests": ...}
+    -> {"op": "shutdown"}    <- {"ok": true}
+
+This module only imports the standard library at import time, so the
+client side adds nothing to ``docrag`` startup.
+
+Usage::
+
+    $ docrag-daemon start --kb ~/md_docs     # background, returns once ready
+    $ docrag-daemon status
+    $ docrag "how to configure hooks" --kb ~/md_docs   # forwarded to the daemon
+    $ docrag-daemon stop
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DAEMON_SOCKET_ENV = "DOC4LLM_DAEMON_SOCKET"
+DAEMON_LOG_ENV = "DOC4LLM_DAEMON_LOG"
+
+PROTOCOL_VERSION = 2
+
+# 连接守护进程的超时；请求本身可能包含多次 LLM 调用，不设超时
+CONNECT_TIMEOUT = 2.0
+
+# pipeline 从环境变量 / doc4llm/.env 读取、会影响检索结果的设置
+ENVIRONMENT_VARS = (
+    "ANTHROPIC_API_KEY",
+    "ANTHROPIC_BASE_URL",
+    "HF_KEY",
+    "HF_PROXY",
+    "MODELSCOPE_KEY",
+    "DOC4LLM_LLM_CACHE_DIR",
+    "DOC4LLM_QUERY_CACHE_DIR",
+    "DOC4LLM_EMBEDDING_CACHE_DIR",
+    "DOC4LLM_ONNX_CACHE_DIR",
+)
+
+
+def _current_uid() -> Optional[int]:
+    return os.getuid() if hasattr(os, "getuid") else None
+
+
+def default_socket_path() -> str:
+    """Socket path: ``$DOC4LLM_DAEMON_SOCKET``, else ``docrag.sock`` in a private
+    per-user directory (``$XDG_RUNTIME_DIR/doc4llm`` or ``<tmp>/doc4llm-<uid>``)."""
+    path = os.environ.get(DAEMON_SOCKET_ENV)
+    if path:
+        return os.path.expanduser(path)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        directory = os.path.join(runtime_dir, "doc4llm")
+    else:
+        directory = os.path.join(tempfile.gettempdir(), f"doc4llm-{_current_uid() or 0}")
+    return os.path.join(directory, "docrag.sock")
+
+
+def environment_fingerprint() -> str:
+    """Hash of the settings the pipeline resolves from this process's environment.
+
+    Covers ``ENVIRONMENT_VARS`` as read from ``os.environ`` or, when unset there,
+    from ``doc4llm/.env`` in the working directory (the file ``doc4llm.llm``
+    loads). Only the hash is sent to the daemon, never the values.
+    """
+    env_file = Path("doc4llm") / ".env"
+    file_values: Dict[str, Optional[str]] = {}
+    if env_file.is_file():
+        from dotenv import dotenv_values
+
+        file_values = dotenv_values(env_file)
+    values = {name: os.environ.get(name, file_values.get(name)) for name in ENVIRONMENT_VARS}
+    data = json.dumps(values, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening on the socket."""
+
+
+class UntrustedDaemon(DaemonUnavailable):
+    """The socket or the process behind it belongs to another user."""
+
+
+def _check_socket_owner(socket_path: str) -> None:
+    """Refuse a socket file that is not a socket owned by the current user."""
+    try:
+        st = os.lstat(socket_path)
+    except FileNotFoundError as e:
+        raise DaemonUnavailable(f"No daemon on {socket_path}: {e}") from e
+    if not stat.S_ISSOCK(st.st_mode):
+        raise UntrustedDaemon(f"{socket_path} is not a socket")
+    uid = _current_uid()
+    if uid is not None and st.st_uid != uid:
+        raise UntrustedDaemon(f"{socket_path} is owned by uid {st.st_uid}, not {uid}")
+
+
+def _check_peer(sock: socket.socket, socket_path: str) -> None:
+    """Refuse a daemon process running as another user (Linux SO_PEERCRED)."""
+    uid = _current_uid()
+    if uid is None or not hasattr(socket, "SO_PEERCRED"):
+        return
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, peer_uid, _ = struct.unpack("3i", creds)
+    if peer_uid != uid:
+        raise UntrustedDaemon(f"Daemon on {socket_path} runs as uid {peer_uid}, not {uid}")
+
+
+def _ensure_private_dir(directory: str) -> None:
+    """Create the socket directory (0700) and refuse one that others could modify.
+
+    Raises:
+        RuntimeError: If the directory belongs to another user or is group /
+            world writable
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    uid = _current_uid()
+    if uid is None:
+        return
+    if st.st_uid != uid or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise RuntimeError(
+            f"Refusing to use socket directory {directory}: it must be owned by uid {uid} "
+            "and not writable by other users"
+        )
+
+
+def request(
+    payload: Dict[str, Any],
+    socket_path: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Send one request to the daemon and wait for the response.
+
+    Args:
+        payload: Request object (see module docstring)
+        socket_path: Daemon socket (default: ``default_socket_path()``)
+        timeout: Response timeout in seconds (default None: wait)
+
+    Returns:
+        Response object
+
+    Raises:
+        DaemonUnavailable: If nothing listens on the socket
+        UntrustedDaemon: If the socket or the daemon process belongs to another user
+        ConnectionError: If the daemon closes the connection without answering
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix domain sockets are not supported on this platform")
+    socket_path = socket_path or default_socket_path()
+    _check_socket_owner(socket_path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout) as e:
+            raise DaemonUnavailable(f"No daemon on {socket_path}: {e}") from e
+        # 请求中含查询内容，结果会写入 hook 读取的文件：只信任同一用户的守护进程
+        _check_peer(sock, socket_path)
+        sock.settimeout(timeout)
+
+        data = dict(payload, version=PROTOCOL_VERSION)
+        sock.sendall(json.dumps(data, ensure_ascii=False).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    finally:
+        sock.close()
+
+    if not line:
+        raise ConnectionError(f"Daemon on {socket_path} closed the connection")
+    return json.loads(line.decode("utf-8"))
+
+
+def forward_retrieve(
+    kwargs: Dict[str, Any], socket_path: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Run ``orchestrator.retrieve(**kwargs)`` in the daemon, if one is running.
+
+    Args:
+        kwargs: Keyword arguments of ``orchestrator.retrieve`` (JSON-serializable)
+        socket_path: Daemon socket (default: ``default_socket_path()``)
+
+    Returns:
+        DocRAGResult fields as a dict, or None when the request should run
+        in-process (no daemon, an untrusted socket, or a daemon whose
+        environment differs from ours)
+
+    Raises:
+        RuntimeError: If the pipeline failed inside the daemon
+    """
+    payload = {"op": "retrieve", "kwargs": kwargs, "env": environment_fingerprint()}
+    try:
+        response = request(payload, socket_path)
+    except UntrustedDaemon as e:
+        print(f"[docrag] ignoring daemon: {e}", file=sys.stderr)
+        return None
+    except DaemonUnavailable:
+        return None
+    if not response.get("ok"):
+        if response.get("in_process"):
+            return None
+        raise RuntimeError(response.get("error") or "docrag daemon request failed")
+    return response["result"]
+
+
+def _default_retrieve(**kwargs: Any) -> Dict[str, Any]:
+    from doc4llm.doc_rag.orchestrator import retrieve
+
+    return dataclasses.asdict(retrieve(**kwargs))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serve one request per connection."""
+
+    server: "DocRAGDaemon"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            payload = json.loads(line.decode("utf-8"))
+            response = self.server.dispatch(payload)
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class DocRAGDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server running Doc-RAG requests in a warm process.
+
+    Attributes:
+        socket_path: Path of the listening socket
+        started_at: Start time (``time.time()``)
+        requests_served: Number of retrieve requests handled
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        retrieve_fn: Callable[..., Dict[str, Any]] = _default_retrieve,
+    ):
+        """Bind the socket (replacing a stale one left by a dead daemon).
+
+        Args:
+            socket_path: Socket path (default: ``default_socket_path()``)
+            retrieve_fn: Runs one retrieval and returns DocRAGResult fields
+
+        Raises:
+            RuntimeError: If another daemon already listens on the socket
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.retrieve_fn = retrieve_fn
+        self.started_at = time.time()
+        self.requests_served = 0
+        self._counter_lock = threading.Lock()
+
+        _ensure_private_dir(os.path.dirname(os.path.abspath(self.socket_path)))
+        if os.path.lexists(self.socket_path):
+            try:
+                request({"op": "ping"}, self.socket_path, timeout=CONNECT_TIMEOUT)
+            except (DaemonUnavailable, ConnectionError, OSError, ValueError):
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"A docrag daemon is already running on {self.socket_path}")
+
+        # 只允许当前用户连接
+        old_umask = os.umask(0o077)
+        try:
+            super().__init__(self.socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def dispatch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle one decoded request."""
+        if payload.get("version") != PROTOCOL_VERSION:
+            return {
+                "ok": False,
+                "error": f"Unsupported protocol version: {payload.get('version')}",
+                "in_process": True,
+            }
+
+        op = payload.get("op")
+        if op == "retrieve":
+            if payload.get("env") != environment_fingerprint():
+                # API key / .env 与调用方不同：不能代替调用方执行
+                return {
+                    "ok": False,
+                    "error": "Daemon environment differs from the caller's, restart it",
+                    "in_process": True,
+                }
+            result = self.retrieve_fn(**payload.get("kwargs", {}))
+            with self._counter_lock:
+                self.requests_served += 1
+            return {"ok": True, "result": result}
+        if op == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime": time.time() - self.started_at,
+                "requests": self.requests_served,
+                "socket": self.socket_path,
+            }
+        if op == "shutdown":
+            # shutdown() 会等待 serve_forever 退出，不能在处理线程里直接调用
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+def warm_up(knowledge_bases: List[str]) -> None:
+    """Import the pipeline and load the BM25 indexes of the knowledge bases.
+
+    Args:
+        knowledge_bases: Knowledge base directories whose doc-sets to index
+    """
+    import doc4llm.doc_rag.orchestrator  # noqa: F401  预先导入整个 pipeline
+    from doc4llm.doc_rag.searcher.bm25_index import get_index_store
+
+    for kb in knowledge_bases:
+        base_dir = Path(kb).expanduser()
+        if not base_dir.is_dir():
+            continue
+        store = get_index_store(str(base_dir))
+        for doc_set in sorted(p.name for p in base_dir.iterdir() if p.is_dir() and "@" in p.name):
+            store.get(doc_set)
+
+
+def serve(socket_path: Optional[str] = None, knowledge_bases: Optional[List[str]] = None) -> int:
+    """Run the daemon in the foreground until it is stopped."""
+    warm_up(knowledge_bases or [])
+    server = DocRAGDaemon(socket_path)
+    print(f"[docrag-daemon] pid {os.getpid()} listening on {server.socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def start(
+    socket_path: Optional[str] = None,
+    knowledge_bases: Optional[List[str]] = None,
+    wait: float = 120.0,
+) -> int:
+    """Start the daemon in the background and wait until it answers."""
+    socket_path = socket_path or default_socket_path()
+    try:
+        info = request({"op": "ping"}, socket_path, timeout=CONNECT_TIMEOUT)
+        print(f"docrag daemon already running (pid {info.get('pid')})")
+        return 0
+    except (DaemonUnavailable, ConnectionError, OSError, ValueError):
+        pass
+
+    # 日志默认写在 socket 目录中，需先创建私有目录
+    _ensure_private_dir(os.path.dirname(os.path.abspath(socket_path)))
+    command = [sys.executable, "-m", "doc4llm.doc_rag.daemon", "serve", "--socket", socket_path]
+    for kb in knowledge_bases or []:
+        command += ["--kb", kb]
+    log_path = os.environ.get(DAEMON_LOG_ENV) or f"{socket_path}.log"
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            print(
+                f"docrag daemon exited with code {process.returncode}, see {log_path}",
+                file=sys.stderr,
+            )
+            return 1
+        try:
+            info = request({"op": "ping"}, socket_path, timeout=CONNECT_TIMEOUT)
+            print(f"docrag daemon started (pid {info.get('pid')}) on {socket_path}")
+            return 0
+        except (DaemonUnavailable, ConnectionError, OSError, ValueError):
+            time.sleep(0.2)
+    print(f"docrag daemon did not answer within {wait:.0f}s, see {log_path}", file=sys.stderr)
+    return 1
+
+
+def daemon_main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of ``docrag-daemon``."""
+    parser = argparse.ArgumentParser(
+        description="Keep the Doc-RAG pipeline warm for docrag (Unix domain socket daemon)"
+    )
+    parser.add_argument(
+        "command", choices=["serve", "start", "stop", "status"],
+        help="serve: run in the foreground; start: run in the background",
+    )
+    parser.add_argument(
+        "--socket", default=None,
+        help=f"Socket path (default: ${DAEMON_SOCKET_ENV} or $XDG_RUNTIME_DIR/doc4llm)",
+    )
+    parser.add_argument(
+        "-k", "--kb", action="append", default=[],
+        help="Knowledge base whose BM25 indexes are loaded at startup (repeatable)",
+    )
+    args = parser.parse_args(argv)
+    socket_path = args.socket or default_socket_path()
+
+    if args.command == "serve":
+        return serve(socket_path, args.kb)
+    if args.command == "start":
+        return start(socket_path, args.kb)
+
+    op = "shutdown" if args.command == "stop" else "ping"
+    try:
+        info = request({"op": op}, socket_path, timeout=CONNECT_TIMEOUT)
+    except (DaemonUnavailable, ConnectionError) as e:
+        print(f"docrag daemon not running ({e})")
+        return 1
+    if args.command == "stop":
+        print("docrag daemon stopped")
+    else:
+        print(
+            f"docrag daemon running: pid {info['pid']}, up {info['uptime']:.0f}s, "
+            f"{info['requests']} requests, socket {info['socket']}"
+        )
+    return 0
+
+
+__all__ = [
+    "DAEMON_SOCKET_ENV",
+    "DaemonUnavailable",
+    "DocRAGDaemon",
+    "UntrustedDaemon",
+    "daemon_main",
+    "default_socket_path",
+    "environment_fingerprint",
+    "forward_retrieve",
+    "request",
+    "serve",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(daemon_main())
@@ -9,16 +9,29 @@ Features:
     - 过滤低评分结果 (rerank_sim < 0.5)
     - 支持同步/异步调用
     - 保留 thinking 推理过程
+    - 可选紧凑输入编码（compact_input）
+    - 可选分片并发重排序（shard_max_tokens）
 """
 
+from doc4llm.doc_rag.llm_reranker.compact_input import (
+    apply_compact_scores,
+    encode_compact_input,
+    parse_compact_scores,
+)
 from doc4llm.doc_rag.llm_reranker.llm_reranker import (
     LLMReranker,
     LLMRerankerConfig,
     RerankerResult,
 )
+from doc4llm.doc_rag.llm_reranker.sharding import merge_shard_scores, shard_pages
 
 __all__ = [
     "LLMReranker",
     "LLMRerankerConfig",
     "RerankerResult",
+    "apply_compact_scores",
+    "encode_compact_input",
+    "merge_shard_scores",
+    "parse_compact_scores",
+    "shard_pages",
 ]
@@ -0,0 +1,185 @@
+"""
+Compact LLM reranker input - 紧凑的 Phase 1.5 输入编码
+
+默认的 LLM reranker 输入是 ``json.dumps(search_result, indent=2)``：每个 page /
+heading 都重复字段名、缩进、空的 ``rerank_sim`` 和 ``toc_path``，prompt 长度（以及
+首 token 延迟）随候选数量线性增长，输出还要原样回写整个 JSON 结构。
+
+紧凑编码只保留模型打分需要的内容，按 doc-set 分组、为 page / heading 编号::
+
+    queries:
+    - hook configuration
+    candidates:
+    # Docs@latest
+    [1] Hooks Guide
+      [1.1] Hook Configuration | hooks are configured in settings.json
+      [1.2] Hook Events
+
+模型只返回 0.3 分以上的编号到分数的映射（``{"scores": {"1": 0.9, "1.1": 0.85}}``），由
+``apply_compact_scores`` 映射回原始 SearchResult 条目，并按模板中的过滤规则在本地
+完成过滤，输出与 JSON 输入模式相同的结构。
+
+Example:
+    >>> prompt, ids = encode_compact_input(data)
+    >>> scores = parse_compact_scores(extract_json_from_codeblock(response_text))
+    >>> reranked = apply_compact_scores(data, scores, ids, threshold=0.5)
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+# 编号 -> (page 下标, heading 下标)；page 本身的 heading 下标为 None
+CompactIds = Dict[str, Tuple[int, Optional[int]]]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _squash(text: Any) -> str:
+    """Collapse whitespace so that every candidate stays on one line."""
+    return _WHITESPACE_RE.sub(" ", str(text)).strip()
+
+
+def encode_compact_input(data: Dict[str, Any]) -> Tuple[str, CompactIds]:
+    """
+    将检索结果编码为紧凑的编号行格式
+
+    Args:
+        data: LLM reranker 输入数据（query, results, 可选 retrieval_scene /
+            reranker_threshold）
+
+    Returns:
+        (编码后的文本, 编号 -> (page 下标, heading 下标) 映射)
+    """
+    queries = data.get("query") or []
+    if isinstance(queries, str):
+        queries = [queries]
+
+    lines = ["queries:"]
+    lines.extend(f"- {_squash(query)}" for query in queries)
+    lines.append("candidates:")
+
+    ids: CompactIds = {}
+    doc_set = None
+    for i, page in enumerate(data.get("results", []), 1):
+        if page.get("doc_set") != doc_set:
+            doc_set = page.get("doc_set")
+            lines.append(f"# {doc_set}")
+        ids[str(i)] = (i - 1, None)
+        lines.append(f"[{i}] {_squash(page.get('page_title', ''))}")
+        for j, heading in enumerate(page.get("headings", []), 1):
+            ids[f"{i}.{j}"] = (i - 1, j - 1)
+            line = f"  [{i}.{j}] {_squash(heading.get('text', ''))}"
+            context = heading.get("related_context")
+            if context:
+                line += f" | {_squash(context)}"
+            lines.append(line)
+
+    return "\n".join(lines), ids
+
+
+def parse_compact_scores(parsed: Any) -> Optional[Dict[str, float]]:
+    """
+    解析模型返回的编号 -> 分数映射
+
+    Args:
+        parsed: 从响应中提取的 JSON（``{"scores": {...}}`` 或直接的映射）
+
+    Returns:
+        编号 -> 分数（0.0-1.0），无法解析的条目被忽略；响应不是映射时返回 None
+    """
+    if not isinstance(parsed, dict):
+        return None
+    raw = parsed.get("scores", parsed)
+    if not isinstance(raw, dict):
+        return None
+
+    scores: Dict[str, float] = {}
+    for key, value in raw.items():
+        try:
+            score = float(value)
+        except (TypeError, ValueError):
+            continue
+        scores[str(key).strip("[] ")] = min(1.0, max(0.0, score))
+    return scores
+
+
+def apply_compact_scores(
+    data: Dict[str, Any],
+    scores: Dict[str, float],
+    ids: CompactIds,
+    threshold: float,
+) -> Dict[str, Any]:
+    """
+    将编号分数映射回原始条目，并按模板的过滤规则过滤
+
+    过滤规则（与 JSON 输入模式的 prompt 相同）：
+
+    1. 保留 ``rerank_sim >= threshold`` 的 heading；
+    2. 保留仍有 heading 或 page ``rerank_sim >= threshold`` 的 page；
+    3. 全部被过滤时，补回分数最高（且大于 0）的 heading 所在 page（仅含该 heading）。
+
+    未被打分的 page / heading 视为 0 分。
+
+    Args:
+        data: LLM reranker 输入数据
+        scores: 编号 -> 分数
+        ids: encode_compact_input 返回的编号映射
+        threshold: 过滤阈值
+
+    Returns:
+        与 JSON 输入模式输出相同结构的数据（query, doc_sets_found, results）
+    """
+    pages = data.get("results", [])
+    page_scores = [0.0] * len(pages)
+    heading_scores = [[0.0] * len(page.get("headings", [])) for page in pages]
+    for key, (page_index, heading_index) in ids.items():
+        if key not in scores:
+            continue
+        if heading_index is None:
+            page_scores[page_index] = scores[key]
+        else:
+            heading_scores[page_index][heading_index] = scores[key]
+
+    def scored_page(index: int, heading_indexes) -> Dict[str, Any]:
+        page = {k: v for k, v in pages[index].items() if k != "headings"}
+        page["rerank_sim"] = page_scores[index]
+        page["headings"] = []
+        for h in heading_indexes:
+            heading = {
+                k: v for k, v in pages[index]["headings"][h].items() if k != "related_context"
+            }
+            heading["rerank_sim"] = heading_scores[index][h]
+            page["headings"].append(heading)
+        return page
+
+    results = []
+    for index in range(len(pages)):
+        kept = [h for h, score in enumerate(heading_scores[index]) if score >= threshold]
+        if kept or page_scores[index] >= threshold:
+            results.append(scored_page(index, kept))
+
+    if not results:
+        best = max(
+            (
+                (score, index, h)
+                for index, row in enumerate(heading_scores)
+                for h, score in enumerate(row)
+            ),
+            default=None,
+        )
+        if best is not None and best[0] > 0:
+            results.append(scored_page(best[1], [best[2]]))
+
+    return {
+        "query": data.get("query", []),
+        "doc_sets_found": data.get("doc_sets_found", []),
+        "results": results,
+    }
+
+
+__all__ = [
+    "CompactIds",
+    "apply_compact_scores",
+    "encode_compact_input",
+    "parse_compact_scores",
+]
@@ -7,6 +7,8 @@ Features:
     - 过滤低评分结果 (rerank_sim < 0.5)
     - 支持同步/异步调用
     - 保留 thinking 推理过程
+    - 可选紧凑输入编码（编号行格式，响应只返回编号 -> 分数）
+    - 可选分片模式：大候选集切分为均衡分片并发打分，按锚点校准后全局排序
     - 参照 query_router.py 的面向对象设计模式
 
 Example:
@@ -15,13 +17,31 @@ Example:
     >>> print(result.success)
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 import json
 from pathlib import Path
-from typing import Optional, Union
-
+import sys
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from doc4llm._steps import Steps, arun_steps, run_steps
+from doc4llm.doc_rag.llm_reranker.compact_input import (
+    CompactIds,
+    apply_compact_scores,
+    encode_compact_input,
+    parse_compact_scores,
+)
+from doc4llm.doc_rag.llm_reranker.sharding import (
+    MAX_ANCHOR_OFFSET,
+    ScoreKey,
+    merge_shard_scores,
+    order_by_score,
+    shard_pages,
+)
 from doc4llm.doc_rag.params_parser.output_parser import extract_json_from_codeblock
-from doc4llm.llm.anthropic import invoke
+from doc4llm.llm.anthropic import ainvoke, invoke
+from doc4llm.llm.response_cache import LLMResponseCache
 
 
 # 获取当前文件所在目录
@@ -40,6 +60,17 @@ class LLMRerankerConfig:
         prompt_template_path: prompt 模板文件路径
         filter_threshold: 重排序阈值 (default: 0.5)
         silent: 静默模式，不打印流式输出 (default: False)
+        response_cache: LLM 响应缓存，为 None 时不缓存 (default: None)
+        compact_input: 使用紧凑输入编码，模型只返回编号 -> 分数，过滤在本地完成
+            (default: False)
+        compact_prompt_template_path: 紧凑输入模式的 prompt 模板文件路径
+        shard_max_tokens: 分片模式每个分片的 token 预算（估算值），候选超出预算时
+            切分为多个分片并发打分；0 表示不分片 (default: 0)
+        shard_by: 分片方式，"tokens" 按 page 均衡，"doc_set" 尽量不拆分 doc-set
+            (default: "tokens")
+        shard_max_concurrency: 同时进行的分片请求数 (default: 4)
+        shard_anchor_pages: 出现在每个分片中用于分数校准的锚点 page 数 (default: 2)
+        shard_max_offset: 锚点校准对单个分片分数的最大平移量 (default: 0.15)
     """
     model: str = "MiniMax-M2.1"
     # coding plan 暂时不支持
@@ -49,6 +80,16 @@ class LLMRerankerConfig:
     prompt_template_path: str = str(_LLM_RERANKER_DIR / "prompt_template" / "llm_reranker_template.md")
     filter_threshold: float = 0.5
     silent: bool = False
+    response_cache: Optional[LLMResponseCache] = None
+    compact_input: bool = False
+    compact_prompt_template_path: str = str(
+        _LLM_RERANKER_DIR / "prompt_template" / "llm_reranker_compact_template.md"
+    )
+    shard_max_tokens: int = 0
+    shard_by: str = "tokens"
+    shard_max_concurrency: int = 4
+    shard_anchor_pages: int = 2
+    shard_max_offset: float = MAX_ANCHOR_OFFSET
 
 
 @dataclass
@@ -64,6 +105,7 @@ class RerankerResult:
         total_headings_after: 过滤后 heading 数量
         thinking: LLM 推理过程 (如有)
         raw_response: 原始响应文本 (如有)
+        unreranked: 未经重排序原样返回的 page（所在分片失败）
     """
     data: dict
     success: bool
@@ -72,6 +114,7 @@ class RerankerResult:
     total_headings_after: int = 0
     thinking: Optional[str] = field(default=None, repr=False)
     raw_response: Optional[str] = field(default=None, repr=False)
+    unreranked: List[dict] = field(default_factory=list, repr=False)
 
 
 class LLMReranker:
@@ -109,6 +152,8 @@ class LLMReranker:
         """
         self.config = config or LLMRerankerConfig()
         self._prompt_template: Optional[str] = None
+        # 分片模式始终使用紧凑编码，首次分片时加载
+        self._compact_prompt_template: Optional[str] = None
         self.last_result = None
         self._load_prompt_template()
 
@@ -119,7 +164,11 @@ class LLMReranker:
         Raises:
             FileNotFoundError: 模板文件不存在
         """
-        path = Path(self.config.prompt_template_path)
+        path = Path(
+            self.config.compact_prompt_template_path
+            if self.config.compact_input
+            else self.config.prompt_template_path
+        )
         if path.exists():
             self._prompt_template = path.read_text(encoding="utf-8")
         else:
@@ -175,6 +224,20 @@ class LLMReranker:
             LLM_RERANKER_THRESHOLD=reranker_threshold
         )
 
+    def _build_compact_prompt(self, data: dict) -> Tuple[str, CompactIds]:
+        """
+        构建紧凑输入模式的用户消息（prompt 模板作为 system，不含逐次变化的内容）
+
+        Args:
+            data: 输入数据字典
+
+        Returns:
+            (用户消息, 编号 -> (page 下标, heading 下标) 映射)
+        """
+        candidates, ids = encode_compact_input(data)
+        retrieval_scene = data.get("retrieval_scene", "how_to")
+        return f"scene: {retrieval_scene}\n{candidates}", ids
+
     def _parse_response(self, message, data: dict = None) -> RerankerResult:
         """
         解析 LLM 响应
@@ -232,6 +295,211 @@ class LLMReranker:
             raw_response=raw_response,
         )
 
+    def _parse_compact_response(self, message, data: dict, ids: CompactIds) -> RerankerResult:
+        """
+        解析紧凑输入模式的 LLM 响应，将编号分数映射回原始条目
+
+        Args:
+            message: LLM 返回的消息对象
+            data: 原始输入数据字典
+            ids: 编号 -> (page 下标, heading 下标) 映射
+
+        Returns:
+            RerankerResult: 与 JSON 输入模式相同结构的重排序结果
+        """
+        thinking, raw_response = self._message_parts(message)
+        scores = parse_compact_scores(
+            extract_json_from_codeblock(raw_response) if raw_response else None
+        )
+        if scores is None:
+            return RerankerResult(
+                data={
+                    "success": False,
+                    "reason": "Failed to parse LLM response",
+                    "query": data.get("query", []),
+                    "doc_sets_found": data.get("doc_sets_found", []),
+                    "results": []
+                },
+                success=False,
+                reason="Failed to parse LLM response",
+                thinking=thinking,
+                raw_response=raw_response,
+            )
+
+        threshold = data.get("reranker_threshold", self.config.filter_threshold)
+        reranked = apply_compact_scores(data, scores, ids, threshold)
+        return RerankerResult(
+            data=reranked,
+            success=True,
+            total_headings_before=self._count_headings(data),
+            total_headings_after=self._count_headings(reranked),
+            thinking=thinking,
+            raw_response=raw_response,
+        )
+
+    @staticmethod
+    def _message_parts(message) -> Tuple[Optional[str], Optional[str]]:
+        """提取消息中的 (thinking, text)"""
+        thinking: Optional[str] = None
+        raw_response: Optional[str] = None
+        for block in message.content:
+            if block.type == "thinking":
+                thinking = block.thinking
+            elif block.type == "text":
+                raw_response = block.text
+        return thinking, raw_response
+
+    def _is_valid_message(self, message) -> bool:
+        """JSON 输入模式：响应包含可解析的 JSON 时才允许写入 LLM 响应缓存"""
+        _, raw_response = self._message_parts(message)
+        return bool(raw_response and extract_json_from_codeblock(raw_response))
+
+    def _is_valid_compact_message(self, message) -> bool:
+        """紧凑输入模式：响应包含可解析的编号分数时才允许写入 LLM 响应缓存"""
+        _, raw_response = self._message_parts(message)
+        data = extract_json_from_codeblock(raw_response) if raw_response else None
+        return parse_compact_scores(data) is not None
+
+    def _request(
+        self, system: str, prompt: str, silent: bool, compact: bool
+    ) -> Dict[str, Any]:
+        """一次 LLM 请求的参数"""
+        return dict(
+            model=self.config.model,
+            max_tokens=self.config.max_tokens,
+            temperature=self.config.temperature,
+            system=system,
+            messages=[{"role": "user", "content": prompt}],
+            silent=silent,
+            cache=self.config.response_cache,
+            cache_validator=(
+                self._is_valid_compact_message if compact else self._is_valid_message
+            ),
+        )
+
+    def _shard(self, data: dict) -> Tuple[List[List[int]], List[int]]:
+        """按配置切分候选 page；不需要分片时返回单个分片"""
+        if self.config.shard_max_tokens <= 0:
+            return [list(range(len(data.get("results", []))))], []
+        return shard_pages(
+            data.get("results", []),
+            self.config.shard_max_tokens,
+            by=self.config.shard_by,
+            anchors=self.config.shard_anchor_pages,
+        )
+
+    def _sharded_rerank_steps(
+        self, data: dict, shards: List[List[int]], anchor_pages: List[int]
+    ) -> Steps[RerankerResult]:
+        """
+        分片重排序：一次 yield 所有分片的请求，合并各分片的分数
+
+        分片的分数按锚点 page 校准后合并，在全部候选上按阈值过滤，结果按校准后的
+        分数全局排序。部分分片失败时，其中的 page（锚点除外）不经重排序原样放入
+        ``RerankerResult.unreranked``；全部分片失败时重排序失败。
+        """
+        if self._compact_prompt_template is None:
+            path = Path(self.config.compact_prompt_template_path)
+            if not path.exists():
+                raise FileNotFoundError(f"Prompt template not found: {path}")
+            self._compact_prompt_template = path.read_text(encoding="utf-8")
+
+        pages = data.get("results", [])
+        requests = []
+        shard_ids: List[Dict[str, ScoreKey]] = []
+        for shard in shards:
+            prompt, ids = self._build_compact_prompt({**data, "results": [pages[i] for i in shard]})
+            # 并发分片的流式输出会交错，分片请求不打印
+            requests.append(
+                self._request(self._compact_prompt_template, prompt, silent=True, compact=True)
+            )
+            shard_ids.append({key: (shard[p], h) for key, (p, h) in ids.items()})
+
+        responses = yield requests
+
+        shard_scores: List[Dict[ScoreKey, float]] = []
+        thinking: List[str] = []
+        raw_responses: List[str] = []
+        failed_pages: Set[int] = set()
+        for n, (response, ids) in enumerate(zip(responses, shard_ids)):
+            scores = None
+            if not isinstance(response, Exception):
+                shard_thinking, raw_response = self._message_parts(response)
+                scores = parse_compact_scores(
+                    extract_json_from_codeblock(raw_response) if raw_response else None
+                )
+            if scores is None:
+                if not self.config.silent:
+                    error = response if isinstance(response, Exception) else "unparseable response"
+                    print(
+                        f"[LLMReranker] shard {n + 1}/{len(shards)} failed ({error}); "
+                        f"passing its pages through unreranked",
+                        file=sys.stderr,
+                    )
+                failed_pages.update(i for i in shards[n] if i not in anchor_pages)
+                continue
+            shard_scores.append({ids[key]: score for key, score in scores.items() if key in ids})
+            if shard_thinking:
+                thinking.append(shard_thinking)
+            raw_responses.append(raw_response)
+
+        failed = len(shards) - len(shard_scores)
+        reason = f"{failed} of {len(shards)} shards failed" if failed else None
+        if not shard_scores:
+            return RerankerResult(
+                data={
+                    "success": False,
+                    "reason": reason,
+                    "query": data.get("query", []),
+                    "doc_sets_found": data.get("doc_sets_found", []),
+                    "results": []
+                },
+                success=False,
+                reason=reason,
+            )
+
+        merged = merge_shard_scores(shard_scores, anchor_pages, self.config.shard_max_offset)
+        # 失败分片的 page 不参与过滤，单独原样返回
+        kept = [i for i in range(len(pages)) if i not in failed_pages]
+        position = {i: n for n, i in enumerate(kept)}
+        scored = {**data, "results": [pages[i] for i in kept]}
+        ids = {str(n): (position[p], h) for n, (p, h) in enumerate(merged)}
+        scores = {str(n): merged[key] for n, key in enumerate(merged)}
+        threshold = data.get("reranker_threshold", self.config.filter_threshold)
+        reranked = apply_compact_scores(scored, scores, ids, threshold)
+        reranked["results"] = order_by_score(reranked["results"])
+        return RerankerResult(
+            data=reranked,
+            success=True,
+            reason=reason,
+            total_headings_before=self._count_headings(data),
+            total_headings_after=self._count_headings(reranked),
+            thinking="\n\n".join(thinking) or None,
+            raw_response="\n".join(raw_responses),
+            unreranked=[pages[i] for i in sorted(failed_pages)],
+        )
+
+    def _invoke(self, request: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Any:
+        """执行一次请求；分片请求列表在线程池中并发执行，失败的分片返回异常对象"""
+        if isinstance(request, dict):
+            return invoke(**request)
+        workers = max(1, min(self.config.shard_max_concurrency, len(request)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-reranker") as pool:
+            futures = [pool.submit(invoke, **r) for r in request]
+            return [future.exception() or future.result() for future in futures]
+
+    async def _ainvoke(self, request: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Any:
+        """异步执行一次请求；分片请求并发数受 shard_max_concurrency 限制"""
+        if isinstance(request, dict):
+            return await ainvoke(**request)
+        slots = asyncio.Semaphore(max(1, self.config.shard_max_concurrency))
+
+        async def run(r: Dict[str, Any]) -> Any:
+            async with slots:
+                return await ainvoke(**r)
+
+        return await asyncio.gather(*(run(r) for r in request), return_exceptions=True)
+
     def _count_headings(self, data: dict) -> int:
         """
         统计结果中的 heading 数量
@@ -269,29 +537,11 @@ class LLMReranker:
             >>> result = reranker.rerank(input_data)
             >>> print(result.success)
         """
-        self._validate_input(data)
-
-        if not self._prompt_template:
-            self._load_prompt_template()
-
-        prompt = self._build_prompt(data)
-        message = invoke(
-            model=self.config.model,
-            max_tokens=self.config.max_tokens,
-            temperature=self.config.temperature,
-            system=self._prompt_template,
-            messages=[{"role": "user", "content": prompt}],
-            silent=self.config.silent,
-        )
-        # NOTE: 调试分析原始输出
-        # print(message)
-
-        self.last_result = self._parse_response(message, data)
-        return self.last_result
+        return run_steps(self._rerank_steps(data), self._invoke)
 
     async def rerank_async(self, data: dict) -> RerankerResult:
         """
-        执行重排序（异步）
+        执行重排序（异步，使用 AsyncAnthropic 客户端，不占用线程）
 
         Args:
             data: 输入数据字典
@@ -299,7 +549,36 @@ class LLMReranker:
         Returns:
             RerankerResult: 包含重排序结果和统计信息的 RerankerResult
         """
-        return self.rerank(data)
+        return await arun_steps(self._rerank_steps(data), self._ainvoke)
+
+    def _rerank_steps(self, data: dict) -> Steps[RerankerResult]:
+        """重排序流程：yield LLM 请求参数（分片模式为请求列表），接收响应消息"""
+        self._validate_input(data)
+
+        shards, anchor_pages = self._shard(data)
+        if len(shards) > 1:
+            self.last_result = yield from self._sharded_rerank_steps(data, shards, anchor_pages)
+            return self.last_result
+
+        if not self._prompt_template:
+            self._load_prompt_template()
+
+        ids: Optional[CompactIds] = None
+        if self.config.compact_input:
+            prompt, ids = self._build_compact_prompt(data)
+        else:
+            prompt = self._build_prompt(data)
+        message = yield self._request(
+            self._prompt_template, prompt, silent=self.config.silent, compact=ids is not None
+        )
+        # NOTE: 调试分析原始输出
+        # print(message)
+
+        if ids is not None:
+            self.last_result = self._parse_compact_response(message, data, ids)
+        else:
+            self.last_result = self._parse_response(message, data)
+        return self.last_result
 
     def __call__(self, data: dict) -> RerankerResult:
         """
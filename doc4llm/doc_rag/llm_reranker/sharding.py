@@ -0,0 +1,196 @@
+"""
+Sharded LLM reranking - 大候选集的分片重排序
+
+Phase 1 返回大量 page / heading 时，单个 reranker prompt 很长：输出越长延迟越高，
+还可能超出上下文限制。分片模式把候选切分为 token 数大致均衡的分片（按 token
+预算，或以 doc-set 为单位），各分片并发打分，再合并为全局排序。
+
+各分片由模型独立打分，分数尺度可能不一致（全是弱候选的分片倾向于给出偏高的
+分数）。为此，Phase 1 排名最前的若干 page 作为锚点（anchor）出现在每个分片中，
+锚点 page 及其 heading 都是校准条目：每个条目的全局分数取各分片分数的中位数，
+每个分片按「全局分数 - 分片分数」在所有校准条目上的中位数整体平移，且平移量
+不超过 ``max_offset``。单个条目上的分歧（模型对某个锚点的偶然高估或低估）因此
+不会把整个分片推向一端。
+
+Example:
+    >>> shards, anchor_pages = shard_pages(data["results"], max_tokens=2000, anchors=1)
+    >>> # ... 每个分片用 encode_compact_input 编码并由 LLM 打分 ...
+    >>> scores = merge_shard_scores(shard_scores, anchor_pages)
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# (page 下标, heading 下标)；page 本身的 heading 下标为 None
+ScoreKey = Tuple[int, Optional[int]]
+
+# 锚点校准对单个分片的最大平移量
+MAX_ANCHOR_OFFSET = 0.15
+
+SHARD_BY = ("tokens", "doc_set")
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Offline token estimate: one token per word, number or symbol."""
+    return len(_TOKEN_RE.findall(text))
+
+
+def page_tokens(page: Dict[str, Any]) -> int:
+    """Estimated tokens of a page in the compact encoding."""
+    parts = [str(page.get("page_title", ""))]
+    for heading in page.get("headings", []):
+        parts.append(str(heading.get("text", "")))
+        parts.append(str(heading.get("related_context") or ""))
+    # 每行的编号 / 缩进约 4 个 token
+    return estimate_tokens(" ".join(parts)) + 4 * (1 + len(page.get("headings", [])))
+
+
+def shard_pages(
+    pages: Sequence[Dict[str, Any]],
+    max_tokens: int,
+    by: str = "tokens",
+    anchors: int = 1,
+) -> Tuple[List[List[int]], List[int]]:
+    """
+    将候选 page 切分为 token 数均衡的分片
+
+    分片数为满足 token 预算所需的最小值；page（``by="doc_set"`` 时为同一 doc-set
+    的 page 组，超出预算的组再按预算拆开）按 token 数从大到小放入当前最轻的分片。
+    分片内保持 Phase 1 的原始顺序。
+
+    Args:
+        pages: 候选 page 列表（Phase 1 排名顺序）
+        max_tokens: 每个分片的 token 预算（估算值，含锚点）
+        by: "tokens" 按 page 均衡，"doc_set" 尽量不拆分 doc-set
+        anchors: 出现在每个分片中的锚点 page 数（取排名最前的 page）
+
+    Returns:
+        (分片列表（每个分片为 page 下标列表）, 锚点 page 下标)；
+        不需要分片时返回单个分片且无锚点
+    """
+    if by not in SHARD_BY:
+        raise ValueError(f"Invalid shard_by {by!r}, expected one of {SHARD_BY}")
+
+    everything = list(range(len(pages)))
+    costs = [page_tokens(page) for page in pages]
+    if max_tokens <= 0 or sum(costs) <= max_tokens:
+        return [everything], []
+
+    anchor_pages = everything[: max(0, anchors)]
+    rest = everything[len(anchor_pages):]
+    budget = max(1, max_tokens - sum(costs[i] for i in anchor_pages))
+
+    if by == "doc_set":
+        by_doc_set: Dict[Any, List[int]] = {}
+        for i in rest:
+            by_doc_set.setdefault(pages[i].get("doc_set"), []).append(i)
+        groups: List[List[int]] = []
+        for members in by_doc_set.values():
+            chunk: List[int] = []
+            chunk_cost = 0
+            for i in members:
+                if chunk and chunk_cost + costs[i] > budget:
+                    groups.append(chunk)
+                    chunk, chunk_cost = [], 0
+                chunk.append(i)
+                chunk_cost += costs[i]
+            groups.append(chunk)
+    else:
+        groups = [[i] for i in rest]
+
+    group_costs = [sum(costs[i] for i in group) for group in groups]
+    count = max(1, math.ceil(sum(group_costs) / budget))
+    bins: List[List[int]] = [[] for _ in range(count)]
+    loads = [0] * count
+    for g in sorted(range(len(groups)), key=lambda g: -group_costs[g]):
+        lightest = min(range(len(bins)), key=loads.__getitem__)
+        if loads[lightest] and loads[lightest] + group_costs[g] > budget:
+            bins.append([])
+            loads.append(0)
+            lightest = len(bins) - 1
+        bins[lightest].extend(groups[g])
+        loads[lightest] += group_costs[g]
+
+    bins = [b for b in bins if b]
+    if len(bins) <= 1:
+        return [everything], []
+    return [sorted(anchor_pages + b) for b in bins], anchor_pages
+
+
+def _median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def merge_shard_scores(
+    shard_scores: Sequence[Dict[ScoreKey, float]],
+    anchor_pages: Sequence[int] = (),
+    max_offset: float = MAX_ANCHOR_OFFSET,
+) -> Dict[ScoreKey, float]:
+    """
+    合并各分片的分数，按锚点校准到同一尺度
+
+    Args:
+        shard_scores: 每个分片的 (page 下标, heading 下标) -> 分数；未列出的条目视为 0
+        anchor_pages: 出现在每个分片中的锚点 page 下标
+        max_offset: 单个分片的最大平移量
+
+    Returns:
+        全局 (page 下标, heading 下标) -> 校准后的分数（0.0-1.0）
+    """
+    anchors = set(anchor_pages)
+    # 任一分片中出现过的锚点条目；未列出视为 0 分（低于模型的列出下限）
+    anchor_keys = sorted(
+        {key for scores in shard_scores for key in scores if key[0] in anchors},
+        key=lambda key: (key[0], -1 if key[1] is None else key[1]),
+    )
+
+    reference = {
+        key: _median([scores.get(key, 0.0) for scores in shard_scores]) for key in anchor_keys
+    }
+
+    offsets = [0.0] * len(shard_scores)
+    if anchor_keys:
+        offsets = [
+            min(max_offset, max(-max_offset, _median(
+                [reference[key] - scores.get(key, 0.0) for key in anchor_keys]
+            )))
+            for scores in shard_scores
+        ]
+
+    merged: Dict[ScoreKey, float] = {}
+    for scores, offset in zip(shard_scores, offsets):
+        for key, score in scores.items():
+            if key[0] not in anchors:
+                merged[key] = min(1.0, max(0.0, score + offset))
+    merged.update(reference)
+    return merged
+
+
+def order_by_score(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort reranked pages by their best page or heading score (stable)."""
+
+    def best(page: Dict[str, Any]) -> float:
+        scores = [page.get("rerank_sim") or 0.0]
+        scores.extend(h.get("rerank_sim") or 0.0 for h in page.get("headings", []))
+        return max(scores)
+
+    return sorted(results, key=best, reverse=True)
+
+
+__all__ = [
+    "MAX_ANCHOR_OFFSET",
+    "SHARD_BY",
+    "ScoreKey",
+    "estimate_tokens",
+    "merge_shard_scores",
+    "order_by_score",
+    "page_tokens",
+    "shard_pages",
+]
@@ -21,6 +21,8 @@ Workflow:
 
 Features:
     - Python API: retrieve(query, config) -> DocRAGResult
+    - Async API: async with DocRAGOrchestrator(config) as rag: await rag.aretrieve(query)
+    - Batch API: DocRAGOrchestrator(config).retrieve_many(queries) -> List[DocRAGResult]
     - CLI Interface: docrag "query"
     - Conditional Phase 1.5 invocation based on missing rerank_sim
     - Comprehensive error handling with fallbacks
@@ -31,19 +33,31 @@ Example:
     >>> print(result.output)
 """
 
-import argparse
+import asyncio
 import io
 import json
 import os
 import sys
+import threading
 import time
 import traceback
 from copy import deepcopy
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+)
 
+from doc4llm._steps import Steps, arun_steps, run_steps
 from doc4llm.doc_rag.llm_reranker.llm_reranker import (
     LLMReranker,
     LLMRerankerConfig,
@@ -76,13 +90,31 @@ from doc4llm.doc_rag.query_optimizer.query_optimizer import (
     QueryOptimizer,
     QueryOptimizerConfig,
 )
+from doc4llm.doc_rag.query_planner.query_planner import (
+    QueryPlan,
+    QueryPlanner,
+    QueryPlannerConfig,
+)
 from doc4llm.doc_rag.query_router.query_router import (
     QueryRouter,
     QueryRouterConfig,
     RoutingResult,
 )
-from doc4llm.doc_rag.scene_output.scene_output import SceneOutput, SceneOutputResult
+from doc4llm.doc_rag.scene_output.scene_output import (
+    SceneOutput,
+    SceneOutputConfig,
+    SceneOutputResult,
+)
 from doc4llm.doc_rag.searcher.doc_searcher_api import DocSearcherAPI
+from doc4llm.doc_rag.semantic_cache import (
+    DEFAULT_MAX_ENTRIES as SEMANTIC_CACHE_MAX_ENTRIES,
+    DEFAULT_SIMILARITY_THRESHOLD,
+    DEFAULT_TTL_SECONDS as SEMANTIC_CACHE_TTL_SECONDS,
+    SemanticCacheHit,
+    SemanticQueryCache,
+    get_semantic_query_cache,
+)
+from doc4llm.doc_rag.speculative_search import SpeculativeSearch, get_speculation_stats
 from doc4llm.doc_rag.reader.doc_reader_api import DocReaderAPI
 from doc4llm.doc_rag.utils.reranker_utils import (
     adjust_threshold,
@@ -93,6 +125,17 @@ from doc4llm.doc_rag.utils.doc_meta_utils import (
     build_doc_metas_from_sections,
     build_sources_section,
 )
+from doc4llm.llm.response_cache import (
+    DEFAULT_MAX_ENTRIES,
+    DEFAULT_TTL_SECONDS,
+    LLMResponseCache,
+    get_response_cache,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from doc4llm.tool.md_doc_retrieval.transformer_matcher import TransformerMatcher
 
 # Type alias for stop_at_phase parameter
 StopPhase = Literal["0a", "0b", "1", "1.5", "2", "4"]
@@ -110,8 +153,21 @@ class DocRAGConfig:
     Attributes:
         base_dir: Path to knowledge_base
         default_threshold: Line count threshold for requires_processing flag
+        query_planner: Run Phase 0a and 0b as one combined LLM call, falling back to the
+            two separate calls if its output cannot be parsed (default False)
+        speculative_search: Run BM25 recall of the raw query on all doc-sets while Phase 0
+            is in flight and merge the routed doc-sets' pages into Phase 1 (default False)
         llm_reranker: Enable Phase 1.5 LLM re-ranking
         embedding_reranker: Enable Phase 1.5 transformer embedding re-ranking
+        llm_reranker_compact: Send Phase 1.5 candidates to the LLM as numbered lines and
+            let it return only id -> score (default False)
+        llm_reranker_shard_tokens: Estimated token budget per LLM reranker shard; larger
+            candidate sets are split into balanced shards reranked concurrently
+            (default 0: one request)
+        llm_reranker_shard_by: Shard by "tokens" (balanced pages) or "doc_set" (keep
+            doc-sets together where possible, default "tokens")
+        llm_reranker_max_concurrency: LLM reranker shard requests in flight at once
+            (default 4)
         reranker_threshold: Threshold for transformer embedding reranker (default 0.6)
         reranker_threshold_adjustment: Threshold adjustment for LLM reranker input (default 0.1)
         debug: Enable debug mode
@@ -119,12 +175,42 @@ class DocRAGConfig:
         reader_config: Configuration dict for DocReaderAPI
         searcher_config: Configuration dict for DocSearcherAPI
         silent: Silent mode, suppress all output (used by CLI for hook injection)
+        llm_cache: Cache LLM responses on disk (master switch, default True)
+        llm_cache_query_optimizer: Cache Phase 0a responses (default True)
+        llm_cache_query_router: Cache Phase 0b responses (default True)
+        llm_cache_query_planner: Cache combined Phase 0a/0b responses (default True)
+        llm_cache_llm_reranker: Cache Phase 1.5 responses (default True)
+        llm_cache_scene_output: Cache Phase 4 responses (default True)
+        llm_cache_ttl: Time to live of cached responses in seconds (default 1 day)
+        llm_cache_max_entries: Maximum number of cached responses (LRU, default 2000)
+        llm_cache_dir: Cache directory (default: $DOC4LLM_LLM_CACHE_DIR or ~/.cache/doc4llm/llm)
+        semantic_cache: Reuse Phase 0a/0b results of similar earlier queries (default False,
+            loads a local embedding model)
+        semantic_cache_threshold: Minimum cosine similarity for a hit (default 0.95)
+        semantic_cache_ttl: Maximum age of reused results in seconds (default 1 day)
+        semantic_cache_max_entries: Maximum number of cached queries (LRU, default 1000)
+        semantic_cache_dir: Cache directory (default: $DOC4LLM_QUERY_CACHE_DIR or
+            ~/.cache/doc4llm/queries)
+        semantic_cache_backend: Local embedding runtime, "torch" or "onnx" (default "torch")
+        async_max_workers: Threads for blocking work (search, file reads, embeddings)
+            shared by all aretrieve() calls of an orchestrator (default 8)
+        batch_max_concurrency: LLM steps in flight at once in retrieve_many(), i.e.
+            the rate-limit budget of a batch; the concurrent Phase 0a/0b calls
+            of one query count as one step, and so does a sharded Phase 1.5
+            rerank, which itself sends up to ``llm_reranker_max_concurrency``
+            requests at once (default 8)
     """
 
     base_dir: str
     default_threshold: int = 2100
+    query_planner: bool = False
+    speculative_search: bool = False
     llm_reranker: bool = True
     embedding_reranker: bool = False
+    llm_reranker_compact: bool = False
+    llm_reranker_shard_tokens: int = 0
+    llm_reranker_shard_by: str = "tokens"
+    llm_reranker_max_concurrency: int = 4
     searcher_reranker: bool = True
     reranker_threshold: float = 0.6
     reranker_threshold_adjustment: float = 0.1
@@ -134,6 +220,23 @@ class DocRAGConfig:
     reader_config: Optional[Dict[str, Any]] = None
     searcher_config: Optional[Dict[str, Any]] = None
     silent: bool = True  # 静默模式，不打印任何输出
+    llm_cache: bool = True
+    llm_cache_query_optimizer: bool = True
+    llm_cache_query_router: bool = True
+    llm_cache_query_planner: bool = True
+    llm_cache_llm_reranker: bool = True
+    llm_cache_scene_output: bool = True
+    llm_cache_ttl: float = DEFAULT_TTL_SECONDS
+    llm_cache_max_entries: int = DEFAULT_MAX_ENTRIES
+    llm_cache_dir: Optional[str] = None
+    semantic_cache: bool = False
+    semantic_cache_threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+    semantic_cache_ttl: float = SEMANTIC_CACHE_TTL_SECONDS
+    semantic_cache_max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES
+    semantic_cache_dir: Optional[str] = None
+    semantic_cache_backend: str = "torch"
+    async_max_workers: int = 8
+    batch_max_concurrency: int = 8
 
 
 @dataclass
@@ -165,6 +268,122 @@ class DocRAGResult:
     timing: Dict[str, float] = field(default_factory=dict)
 
 
+@dataclass
+class _Step:
+    """One blocking operation of the retrieval pipeline.
+
+    retrieve() calls ``run``; aretrieve() awaits ``arun`` when given and
+    otherwise runs ``run`` on the orchestrator's bounded thread pool.
+    retrieve_many() bounds the ``arun`` steps that call an LLM (``llm``).
+    """
+
+    run: Callable[[], Any]
+    arun: Optional[Callable[[], Awaitable[Any]]] = None
+    llm: bool = True
+
+
+class _BatchState:
+    """Objects shared by the queries of one retrieve_many() batch.
+
+    Searchers and the reader are built once per distinct constructor
+    arguments, and Phase 1 / Phase 2 results are computed once per distinct
+    input (different user queries often optimize to the same search query).
+    Each consumer gets its own deep copy of a shared result.
+    """
+
+    def __init__(self, queries: int = 0) -> None:
+        self._lock = threading.Lock()
+        self._searchers: Dict[str, DocSearcherAPI] = {}
+        self._reader: Optional[DocReaderAPI] = None
+        self._results: Dict[str, Future] = {}
+        self.stats: Dict[str, int] = {"computed": 0, "shared": 0}
+        # Phase 1 查询的批量编码：等待批次内每个查询登记或提前结束
+        self._unregistered = queries
+        self._registered: set = set()
+        self._search_queries: List[Tuple[DocSearcherAPI, List[str]]] = []
+        self._search_queries_encoded = asyncio.Event()
+
+    def searcher(self, **kwargs: Any) -> DocSearcherAPI:
+        """DocSearcherAPI for the given constructor arguments, built once."""
+        key = json.dumps(kwargs, ensure_ascii=False, sort_keys=True, default=str)
+        # 在锁内构造：并发的相同配置查询不会各自构造一个 searcher
+        with self._lock:
+            searcher = self._searchers.get(key)
+            if searcher is None:
+                searcher = self._searchers[key] = DocSearcherAPI(**kwargs)
+            return searcher
+
+    def reader(self, base_dir: str, config: Optional[Dict[str, Any]]) -> DocReaderAPI:
+        """The batch's DocReaderAPI (every query uses the same config)."""
+        with self._lock:
+            if self._reader is None:
+                self._reader = DocReaderAPI(base_dir=base_dir, config=config)
+            return self._reader
+
+    async def register_search_queries(
+        self,
+        query: str,
+        searcher: DocSearcherAPI,
+        search_queries: List[str],
+        encode: Callable[[List[Tuple[DocSearcherAPI, List[str]]]], Awaitable[None]],
+    ) -> None:
+        """Register a query's Phase 1 search queries and wait for the batch encode.
+
+        Once every query of the batch has registered (or finished without
+        reaching Phase 1), the last one encodes all registered search queries
+        at once; the others wait for it.
+
+        Args:
+            query: The batch query registering (each registers at most once)
+            searcher: Its Phase 1 searcher
+            search_queries: The queries its searcher reranks with
+            encode: Embeds ``[(searcher, search_queries), ...]``
+        """
+        self._registered.add(query)
+        self._search_queries.append((searcher, search_queries))
+        await self._arrive(encode)
+        await self._search_queries_encoded.wait()
+
+    async def finish(
+        self,
+        query: str,
+        encode: Callable[[List[Tuple[DocSearcherAPI, List[str]]]], Awaitable[None]],
+    ) -> None:
+        """Mark a query as done; one that never registered stops being waited for."""
+        if query not in self._registered:
+            self._registered.add(query)
+            await self._arrive(encode)
+
+    async def _arrive(
+        self, encode: Callable[[List[Tuple[DocSearcherAPI, List[str]]]], Awaitable[None]]
+    ) -> None:
+        self._unregistered -= 1
+        if self._unregistered == 0:
+            try:
+                if self._search_queries:
+                    await encode(self._search_queries)
+            finally:
+                self._search_queries_encoded.set()
+
+    def shared(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Compute a result once per key; concurrent callers wait for the first."""
+        key = json.dumps(key, ensure_ascii=False, sort_keys=True, default=str)
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+                self.stats["computed"] += 1
+            else:
+                self.stats["shared"] += 1
+        if owner:
+            try:
+                future.set_result(compute())
+            except BaseException as e:
+                future.set_exception(e)
+        return deepcopy(future.result())
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -373,6 +592,182 @@ class DocRAGOrchestrator:
         """
         self.config = config or DocRAGConfig()
         self.last_result = None
+        self._query_matcher: Optional["TransformerMatcher"] = None
+        # 本地 embedding 模型加载失败后不再为每个查询重试
+        self._semantic_cache_disabled = False
+        # aretrieve() 的阻塞操作线程池，首次使用时创建
+        self._blocking_executor: Optional[ThreadPoolExecutor] = None
+
+    async def _run_blocking(self, fn: Callable[[], Any]) -> Any:
+        """Run blocking work on the shared bounded thread pool."""
+        if self._blocking_executor is None:
+            self._blocking_executor = ThreadPoolExecutor(
+                max_workers=self.config.async_max_workers,
+                thread_name_prefix="doc-rag-blocking",
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._blocking_executor, fn)
+
+    def close(self) -> None:
+        """Shut down the thread pool of the async API.
+
+        Work already running finishes in the background; the orchestrator can
+        still be used afterwards and creates a new pool when needed.
+        """
+        if self._blocking_executor is not None:
+            self._blocking_executor.shutdown(wait=False)
+            self._blocking_executor = None
+
+    def __enter__(self) -> "DocRAGOrchestrator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "DocRAGOrchestrator":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _llm_cache(self, phase_enabled: bool) -> Optional[LLMResponseCache]:
+        """Shared LLM response cache for a phase, or None when caching is off for it."""
+        if not (self.config.llm_cache and phase_enabled):
+            return None
+        return get_response_cache(
+            self.config.llm_cache_dir,
+            self.config.llm_cache_ttl,
+            self.config.llm_cache_max_entries,
+        )
+
+    def _semantic_query_cache(self) -> Optional[SemanticQueryCache]:
+        """Shared Phase 0a/0b semantic cache, or None when it is off."""
+        if not self.config.semantic_cache or self._semantic_cache_disabled:
+            return None
+        return get_semantic_query_cache(
+            self.config.semantic_cache_dir,
+            self.config.semantic_cache_threshold,
+            self.config.semantic_cache_ttl,
+            self.config.semantic_cache_max_entries,
+        )
+
+    @staticmethod
+    def _semantic_cache_scope() -> str:
+        """Scope of cached Phase 0a/0b results: the doc-set list and the models."""
+        return json.dumps(
+            {
+                "doc_sets": QueryOptimizer().doc_sets,
+                "models": [QueryOptimizerConfig().model, QueryRouterConfig().model],
+            },
+            ensure_ascii=False,
+        )
+
+    def _get_query_matcher(self) -> "TransformerMatcher":
+        """Local embedding matcher of the semantic cache, created on first use."""
+        if self._query_matcher is None:
+            from doc4llm.tool.md_doc_retrieval.transformer_matcher import (
+                TransformerConfig,
+                TransformerMatcher,
+            )
+
+            self._query_matcher = TransformerMatcher(
+                TransformerConfig(use_local=True, local_backend=self.config.semantic_cache_backend)
+            )
+        return self._query_matcher
+
+    def _encode_query(self, query: str) -> Tuple[str, "np.ndarray"]:
+        """Embed a raw query with the local matcher for the semantic cache."""
+        matcher = self._get_query_matcher()
+        model_id = matcher.model_id_for([query])
+        return model_id, matcher.encode([query], model_id)[0]
+
+    def _encode_queries(self, queries: List[str]) -> None:
+        """Embed a batch of raw queries with one encode call per model.
+
+        The vectors land in the embedding cache, so the per-query semantic
+        cache lookups of retrieve_many() do not run the model again.
+        """
+        if self._semantic_query_cache() is None:
+            return
+        try:
+            matcher = self._get_query_matcher()
+            by_model: Dict[str, List[str]] = {}
+            for query in queries:
+                by_model.setdefault(matcher.model_id_for([query]), []).append(query)
+            for model_id, texts in by_model.items():
+                matcher.encode(texts, model_id)
+        except Exception:
+            # 失败由随后的逐条查找处理（并禁用语义缓存）
+            pass
+
+    async def _aencode_search_queries(
+        self, searches: List[Tuple[DocSearcherAPI, List[str]]]
+    ) -> None:
+        """Embed the Phase 1 rerank queries of a retrieve_many() batch.
+
+        Searchers with the same reranker settings share one ``encode_queries``
+        call (one encode call per model); the vectors land in the embedding
+        cache, so the per-query reranks do not run the model again.
+        """
+        by_reranker: Dict[str, Tuple[DocSearcherAPI, List[List[str]]]] = {}
+        for searcher, queries in searches:
+            key = searcher.reranker_key
+            if key is not None:
+                by_reranker.setdefault(key, (searcher, []))[1].append(queries)
+
+        def encode() -> None:
+            for searcher, query_lists in by_reranker.values():
+                try:
+                    searcher.encode_queries(query_lists)
+                except Exception:
+                    # 失败由随后各查询的 rerank 自行处理
+                    pass
+
+        if by_reranker:
+            await self._run_blocking(encode)
+
+    def _lookup_semantic_cache(
+        self, cache: SemanticQueryCache, scope: str, query: str, timing: Dict[str, float]
+    ) -> Optional[SemanticCacheHit]:
+        start = time.perf_counter()
+        try:
+            hit = cache.lookup(query, scope, self._encode_query)
+        except Exception as e:
+            # 本地 embedding 模型不可用（未下载、离线等）：不使用语义缓存
+            self._semantic_cache_disabled = True
+            if not self.config.silent:
+                print(f"▶ [Phase 0a/0b] 语义缓存不可用，已关闭: {e}")
+            return None
+        finally:
+            timing["semantic_cache"] = (time.perf_counter() - start) * 1000
+        if hit is not None and not self.config.silent:
+            print(
+                f"▶ [Phase 0a/0b] 语义缓存命中 (similarity={hit.similarity:.3f}, "
+                f"hit rate={cache.hit_rate:.0%}): {hit.query}"
+            )
+        return hit
+
+    def _query_planner_steps(
+        self, query: str, timing: Dict[str, float]
+    ) -> Steps[Optional[QueryPlan]]:
+        """Phase 0a + 0b in one LLM call; None if its output is unusable."""
+        start = time.perf_counter()
+        try:
+            planner = QueryPlanner(
+                QueryPlannerConfig(
+                    silent=self.config.silent,
+                    response_cache=self._llm_cache(self.config.llm_cache_query_planner),
+                )
+            )
+            return (
+                yield _Step(lambda: planner.plan(query), lambda: planner.plan_async(query))
+            )
+        except Exception as e:
+            # 合并输出无法解析时回退到 QueryOptimizer + QueryRouter 两次调用
+            if not self.config.silent:
+                print(f"▶ [Phase 0a+0b] 合并调用失败，回退到两次调用: {e}")
+            return None
+        finally:
+            timing["query_planner"] = (time.perf_counter() - start) * 1000
 
     def _save_reranker_input(self, data: Dict[str, Any]) -> None:
         """保存 Phase 1.5 LLM Re-ranker 输入数据到 JSON 文件。
@@ -409,6 +804,144 @@ class DocRAGOrchestrator:
         Returns:
             DocRAGResult with formatted output and metadata
         """
+        return run_steps(self._retrieve_steps(query), lambda step: step.run())
+
+    async def aretrieve(self, query: str) -> DocRAGResult:
+        """Execute the Doc-RAG retrieval workflow on the running event loop.
+
+        Same pipeline and result as ``retrieve``. LLM calls (Phase 0a/0b, the
+        query planner, Phase 1.5, Phase 4) use the async Anthropic client and
+        run concurrently via ``asyncio.gather``; search, file reads and
+        embedding work run on a thread pool bounded by
+        ``config.async_max_workers`` that is shared by all in-flight queries.
+
+        Args:
+            query: User query text
+
+        Returns:
+            DocRAGResult with formatted output and metadata
+        """
+
+        async def arun(step: _Step) -> Any:
+            if step.arun is not None:
+                return await step.arun()
+            return await self._run_blocking(step.run)
+
+        return await arun_steps(self._retrieve_steps(query), arun)
+
+    def retrieve_many(
+        self, queries: List[str], max_concurrency: Optional[int] = None
+    ) -> List[DocRAGResult]:
+        """Execute the Doc-RAG retrieval workflow for a batch of queries.
+
+        Runs ``aretrieve_many`` on a new event loop; see there for details.
+
+        Args:
+            queries: User query texts
+            max_concurrency: LLM steps in flight at once (default
+                ``config.batch_max_concurrency``)
+
+        Returns:
+            One DocRAGResult per query, in input order
+        """
+        return asyncio.run(self.aretrieve_many(queries, max_concurrency))
+
+    async def aretrieve_many(
+        self, queries: List[str], max_concurrency: Optional[int] = None
+    ) -> List[DocRAGResult]:
+        """Execute the Doc-RAG retrieval workflow for a batch of queries.
+
+        * Identical queries (after stripping whitespace) run once.
+        * Only when the semantic cache is on are the raw queries embedded up
+          front, in one batch (one encode call per model).
+        * With the searcher reranker on, every query waits after Phase 0 until
+          the whole batch has reached Phase 1; the optimized queries of all of
+          them are then embedded together (one encode call per model), so the
+          per-query Phase 1 reranks find their query vectors in the embedding
+          cache.
+        * Searchers and the reader are built once, and queries that reach the
+          same Phase 1 search or Phase 2 extraction share its result (BM25
+          indexes are shared process-wide anyway).
+        * LLM steps of all queries go through one semaphore of
+          ``max_concurrency`` slots; other blocking work runs on the thread
+          pool bounded by ``config.async_max_workers``. A slot covers a whole
+          step: a sharded LLM rerank (``llm_reranker_shard_tokens``) holds one
+          slot while sending up to ``config.llm_reranker_max_concurrency``
+          shard requests, so a batch can have up to ``max_concurrency *
+          llm_reranker_max_concurrency`` LLM requests in flight. Lower either
+          setting to stay within a provider rate limit.
+
+        A failing query does not abort the batch: its result has
+        ``success=False`` and the error as output. Each result's timing
+        additionally holds ``llm_wait`` (time spent waiting for an LLM slot)
+        and ``total``.
+
+        Args:
+            queries: User query texts
+            max_concurrency: LLM steps in flight at once (default
+                ``config.batch_max_concurrency``)
+
+        Returns:
+            One DocRAGResult per query, in input order
+        """
+        unique = list(dict.fromkeys(query.strip() for query in queries))
+        if not unique:
+            return []
+
+        batch = _BatchState(len(unique))
+        llm_slots = asyncio.Semaphore(max_concurrency or self.config.batch_max_concurrency)
+        if self._semantic_query_cache() is not None:
+            await self._run_blocking(lambda: self._encode_queries(unique))
+
+        async def run_one(query: str) -> DocRAGResult:
+            llm_wait = 0.0
+
+            async def arun(step: _Step) -> Any:
+                nonlocal llm_wait
+                if step.arun is None:
+                    return await self._run_blocking(step.run)
+                if not step.llm:
+                    return await step.arun()
+                start = time.perf_counter()
+                async with llm_slots:
+                    llm_wait += time.perf_counter() - start
+                    return await step.arun()
+
+            start = time.perf_counter()
+            try:
+                result = await arun_steps(self._retrieve_steps(query, batch), arun)
+            except Exception as e:
+                result = DocRAGResult(
+                    success=False,
+                    output=str(e),
+                    scene="",
+                    documents_extracted=0,
+                    total_lines=0,
+                    requires_processing=False,
+                )
+            finally:
+                await batch.finish(query, self._aencode_search_queries)
+            result.timing["llm_wait"] = llm_wait * 1000
+            result.timing["total"] = (time.perf_counter() - start) * 1000
+            return result
+
+        results = dict(zip(unique, await asyncio.gather(*(run_one(q) for q in unique))))
+        # 重复查询得到各自的结果对象，调用方修改其一不影响其它
+        return [
+            replace(results[query.strip()], timing=dict(results[query.strip()].timing))
+            for query in queries
+        ]
+
+    def _retrieve_steps(
+        self, query: str, batch: Optional[_BatchState] = None
+    ) -> Steps[DocRAGResult]:
+        """The retrieval pipeline; every blocking operation is yielded as a _Step.
+
+        Args:
+            query: User query text
+            batch: Searchers, reader and Phase 1/2 results shared with the other
+                queries of a retrieve_many() batch
+        """
         original_query = query
         timing: Dict[str, float] = {}
 
@@ -420,9 +953,16 @@ class DocRAGOrchestrator:
         # -------------------------------------------------------------------------
         # Only execute Phase 0a
         if self.config.stop_at_phase == "0a":
-            optimizer = QueryOptimizer(QueryOptimizerConfig(silent=self.config.silent))
+            optimizer = QueryOptimizer(
+                QueryOptimizerConfig(
+                    silent=self.config.silent,
+                    response_cache=self._llm_cache(self.config.llm_cache_query_optimizer),
+                )
+            )
             start = time.perf_counter()
-            opt_result = optimizer.optimize(query)
+            opt_result = yield _Step(
+                lambda: optimizer.optimize(query), lambda: optimizer.optimize_async(query)
+            )
             timing["phase_0a"] = (time.perf_counter() - start) * 1000
             if not self.config.silent:
                 print(
@@ -466,9 +1006,16 @@ class DocRAGOrchestrator:
 
         # Only execute Phase 0b
         if self.config.stop_at_phase == "0b":
-            router = QueryRouter(QueryRouterConfig(silent=self.config.silent))
+            router = QueryRouter(
+                QueryRouterConfig(
+                    silent=self.config.silent,
+                    response_cache=self._llm_cache(self.config.llm_cache_query_router),
+                )
+            )
             start = time.perf_counter()
-            router_result = router.route(query)
+            router_result = yield _Step(
+                lambda: router.route(query), lambda: router.route_async(query)
+            )
             timing["phase_0b"] = (time.perf_counter() - start) * 1000
             if not self.config.silent:
                 print(f"▶ [Phase 0b] Scene Routing 耗时: {timing['phase_0b']:.2f}ms")
@@ -515,19 +1062,27 @@ class DocRAGOrchestrator:
         # -------------------------------------------------------------------------
         # Phase 0a: Query Optimization & Phase 0b: Scene Routing (Concurrent)
         # -------------------------------------------------------------------------
-        def _run_phase_0a(query: str, silent: bool) -> OptimizationResult:
-            optimizer = QueryOptimizer(QueryOptimizerConfig(silent=silent))
-            return optimizer.optimize(query)
+        def _optimizer() -> QueryOptimizer:
+            return QueryOptimizer(
+                QueryOptimizerConfig(
+                    silent=self.config.silent,
+                    response_cache=self._llm_cache(self.config.llm_cache_query_optimizer),
+                )
+            )
 
-        def _run_phase_0b(query: str, silent: bool) -> RoutingResult:
-            router = QueryRouter(QueryRouterConfig(silent=silent))
-            return router.route(query)
+        def _router() -> QueryRouter:
+            return QueryRouter(
+                QueryRouterConfig(
+                    silent=self.config.silent,
+                    response_cache=self._llm_cache(self.config.llm_cache_query_router),
+                )
+            )
 
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            future_0a = executor.submit(_run_phase_0a, query, self.config.silent)
-            future_0b = executor.submit(_run_phase_0b, query, self.config.silent)
+        def _run_phase_0() -> Tuple[OptimizationResult, RoutingResult]:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                future_0a = executor.submit(lambda: _optimizer().optimize(query))
+                future_0b = executor.submit(lambda: _router().route(query))
 
-            try:
                 start_0a = time.perf_counter()
                 opt_result = future_0a.result()
                 timing["phase_0a"] = (time.perf_counter() - start_0a) * 1000
@@ -535,10 +1090,78 @@ class DocRAGOrchestrator:
                 start_0b = time.perf_counter()
                 router_result = future_0b.result()
                 timing["phase_0b"] = (time.perf_counter() - start_0b) * 1000
-            except Exception as e:
-                traceback.print_exc()
-                raise Exception(
-                    f"▶ [Phase 0a/0b] Query Optimization/Routing 流程出现异常: {e}，请重试或改为在线搜索"
+            return opt_result, router_result
+
+        async def _arun_phase_0() -> Tuple[OptimizationResult, RoutingResult]:
+            # 与同步版本相同的计时口径：0a 为其完成耗时，0b 为 0a 完成后的额外等待
+            start = time.perf_counter()
+            done: Dict[str, float] = {}
+
+            async def timed(name: str, coro: Awaitable[Any]) -> Any:
+                try:
+                    return await coro
+                finally:
+                    done[name] = time.perf_counter()
+
+            opt_result, router_result = await asyncio.gather(
+                timed("0a", _optimizer().optimize_async(query)),
+                timed("0b", _router().route_async(query)),
+            )
+            timing["phase_0a"] = (done["0a"] - start) * 1000
+            timing["phase_0b"] = max(0.0, done["0b"] - done["0a"]) * 1000
+            return opt_result, router_result
+
+        # Phase 1 推测执行：LLM 调用期间先用原始查询做 BM25 召回与 heading 打分
+        speculation = (
+            SpeculativeSearch.start(self.config.base_dir, query, self.config.searcher_config)
+            if self.config.speculative_search and self.config.base_dir
+            else None
+        )
+
+        semantic_cache = self._semantic_query_cache()
+        semantic_scope = self._semantic_cache_scope() if semantic_cache is not None else ""
+        cache_hit = None
+        if semantic_cache is not None:
+            cache_hit = yield _Step(
+                lambda: self._lookup_semantic_cache(semantic_cache, semantic_scope, query, timing)
+            )
+
+        if cache_hit is not None:
+            opt_result = cache_hit.optimization
+            router_result = cache_hit.routing
+            timing["phase_0a"] = 0.0
+            timing["phase_0b"] = 0.0
+        else:
+            plan = None
+            if self.config.query_planner:
+                plan = yield from self._query_planner_steps(query, timing)
+            if plan is not None:
+                opt_result = plan.optimization
+                router_result = plan.routing
+                # 同一次调用同时给出 0a 与 0b 的结果
+                timing["phase_0a"] = timing["query_planner"]
+                timing["phase_0b"] = 0.0
+            else:
+                try:
+                    opt_result, router_result = yield _Step(_run_phase_0, _arun_phase_0)
+                except Exception as e:
+                    traceback.print_exc()
+                    if speculation is not None:
+                        speculation.cancel()
+                    raise Exception(
+                        f"▶ [Phase 0a/0b] Query Optimization/Routing 流程出现异常: {e}，请重试或改为在线搜索"
+                    )
+
+            # 空的优化结果不缓存，避免相似查询反复复用一次失败的解析
+            if (
+                semantic_cache is not None
+                and not self._semantic_cache_disabled
+                and opt_result.optimized_queries
+            ):
+                yield _Step(
+                    lambda: semantic_cache.store(
+                        query, semantic_scope, self._encode_query, opt_result, router_result
+                    )
                 )
 
         if not self.config.silent:
@@ -645,6 +1268,8 @@ class DocRAGOrchestrator:
 
         if searcher_config_response.status != "success":
             traceback.print_exc()
+            if speculation is not None:
+                speculation.cancel()
             raise Exception(
                 f"▶ [Phase 0a+0b -> Phase 1] Params Parser 流程出现异常: 参数解析失败，请重试或改为在线搜索"
             )
@@ -698,22 +1323,67 @@ class DocRAGOrchestrator:
             **(self.config.searcher_config or {}),
         }
 
-        try:
-            searcher = DocSearcherAPI(
-                base_dir=base_dir,
-                config=merged_searcher_config,
-                debug=False,
-                reranker_enabled=self.config.searcher_reranker,
-                reranker_threshold=self.config.reranker_threshold,
-                skiped_keywords_path=self.config.skiped_keywords_path,
-                domain_nouns=domain_nouns,
+        speculative_pages = None
+        searcher_kwargs = dict(
+            base_dir=base_dir,
+            config=merged_searcher_config,
+            debug=False,
+            reranker_enabled=self.config.searcher_reranker,
+            reranker_threshold=self.config.reranker_threshold,
+            skiped_keywords_path=self.config.skiped_keywords_path,
+            domain_nouns=domain_nouns,
+        )
+
+        if batch is not None and self.config.searcher_reranker:
+            # 批量检索：等批次内所有查询完成 Phase 0，再一次编码全部 Phase 1 rerank 查询
+            try:
+                batch_searcher = yield _Step(lambda: batch.searcher(**searcher_kwargs))
+            except Exception as e:
+                traceback.print_exc()
+                raise Exception(
+                    f"▶ [Phase 1] DocSearcher 流程出现异常: {e}，请重试或改为在线搜索"
+                )
+            search_queries = [search_query] if isinstance(search_query, str) else search_query
+            yield _Step(
+                lambda: None,
+                lambda: batch.register_search_queries(
+                    query, batch_searcher, search_queries, self._aencode_search_queries
+                ),
+                llm=False,
             )
-            start_phase_1 = time.perf_counter()
-            search_result = searcher.search(
-                query=search_query,
-                target_doc_sets=target_doc_sets if target_doc_sets else None,
+
+        def _run_phase_1() -> Tuple[DocSearcherAPI, Dict[str, Any]]:
+            nonlocal speculative_pages
+            searcher = (
+                batch.searcher(**searcher_kwargs)
+                if batch is not None
+                else DocSearcherAPI(**searcher_kwargs)
             )
+            start_phase_1 = time.perf_counter()
+            if speculation is not None:
+                # 未路由到的 doc-set 上的推测任务被取消；BM25 参数不一致时全部丢弃
+                speculative_pages = speculation.collect(target_doc_sets, searcher)
+                timing["phase_1_speculative"] = speculation.elapsed_ms
+
+            def _search() -> Dict[str, Any]:
+                return searcher.search(
+                    query=search_query,
+                    target_doc_sets=target_doc_sets if target_doc_sets else None,
+                    speculative_pages=speculative_pages,
+                )
+
+            # 批量检索中相同的 search query 只检索一次（推测结果因查询而异，不共享）
+            if batch is not None and speculation is None:
+                search_result = batch.shared(
+                    ["phase_1", search_query, target_doc_sets, searcher_kwargs], _search
+                )
+            else:
+                search_result = _search()
             timing["phase_1"] = (time.perf_counter() - start_phase_1) * 1000
+            return searcher, search_result
+
+        try:
+            searcher, search_result = yield _Step(_run_phase_1)
         except Exception as e:
             traceback.print_exc()
             raise Exception(
@@ -722,6 +1392,12 @@ class DocRAGOrchestrator:
 
         if not self.config.silent:
             print(f"▶ [Phase 1] Document Discovery 耗时: {timing['phase_1']:.2f}ms")
+        if speculation is not None and not self.config.silent:
+            stats = get_speculation_stats()
+            print(
+                f"▶ [Phase 1] 推测召回: {sum(len(p) for p in speculative_pages.values())} pages "
+                f"({timing['phase_1_speculative']:.2f}ms, reuse rate={stats.reuse_rate:.0%})"
+            )
 
         if not search_result.get("success", False):
             return DocRAGResult(
@@ -826,6 +1502,8 @@ class DocRAGOrchestrator:
 
         llm_result = None
         embedding_result = None
+        # 截留记录 + reranker 输出（局部变量：并发的 aretrieve() 共享同一个实例）
+        merged_results_for_parser: Optional[List[Dict[str, Any]]] = None
 
         if self.config.embedding_reranker and self.config.llm_reranker:
             # 计算调整后的阈值（输入到 LLM reranker 时减 0.1）
@@ -877,32 +1555,43 @@ class DocRAGOrchestrator:
             if self.config.debug:
                 self._save_reranker_input(search_result_with_scene)
 
-            with ThreadPoolExecutor(max_workers=2) as executor:
+            reranker = LLMReranker(
+                LLMRerankerConfig(
+                    silent=self.config.silent,
+                    response_cache=self._llm_cache(self.config.llm_cache_llm_reranker),
+                    compact_input=self.config.llm_reranker_compact,
+                    shard_max_tokens=self.config.llm_reranker_shard_tokens,
+                    shard_by=self.config.llm_reranker_shard_by,
+                    shard_max_concurrency=self.config.llm_reranker_max_concurrency,
+                )
+            )
 
-                def run_llm_rerank(
-                    input_data: Dict[str, Any], silent: bool
-                ) -> RerankerResult:
-                    reranker = LLMReranker(LLMRerankerConfig(silent=silent))
-                    return reranker.rerank(input_data)
+            def run_embedding_rerank():
+                return searcher.rerank(
+                    search_result_for_rerank.get("results", []), optimized_queries
+                )
 
-                def run_embedding_rerank():
-                    return searcher.rerank(
-                        search_result_for_rerank.get("results", []), optimized_queries
-                    )
+            def run_both_rerankers() -> Tuple[RerankerResult, Dict[str, Any]]:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    future_llm = executor.submit(reranker.rerank, search_result_with_scene)
+                    future_embedding = executor.submit(run_embedding_rerank)
+                    return future_llm.result(), future_embedding.result()
 
-                future_llm = executor.submit(
-                    run_llm_rerank, search_result_with_scene, self.config.silent
+            async def arun_both_rerankers() -> Tuple[RerankerResult, Dict[str, Any]]:
+                return await asyncio.gather(
+                    reranker.rerank_async(search_result_with_scene),
+                    self._run_blocking(run_embedding_rerank),
                 )
-                future_embedding = executor.submit(run_embedding_rerank)
 
-                try:
-                    llm_result = future_llm.result()
-                    embedding_result = future_embedding.result()
-                except Exception as e:
-                    traceback.print_exc()
-                    raise Exception(
-                        f"▶ [Phase 1.5] Reranker (LLM + Embedding 并发) 流程出现异常: {e}，请重试或改为在线搜索"
-                    )
+            try:
+                llm_result, embedding_result = yield _Step(
+                    run_both_rerankers, arun_both_rerankers
+                )
+            except Exception as e:
+                traceback.print_exc()
+                raise Exception(
+                    f"▶ [Phase 1.5] Reranker (LLM + Embedding 并发) 流程出现异常: {e}，请重试或改为在线搜索"
+                )
 
             if llm_result.success and llm_result.data.get("results"):
                 current_results = llm_result.data
@@ -917,18 +1606,18 @@ class DocRAGOrchestrator:
                 )
                 # 先对 LLM 输出结果回溯 toc_path
                 current_results_with_toc = _restore_toc_paths(current_results, toc_path_map)
-                # 合并：截留记录 + 过滤后 LLM 输出记录 → 形成完整 results
+                # 合并：截留记录 + 过滤后 LLM 输出记录 + 失败分片原样返回的记录 → 形成完整 results
                 reranker_output_results = current_results_with_toc.get("results", [])
-                self._merged_results_for_parser = (
-                    skipped_pages + reranker_output_results
+                merged_results_for_parser = (
+                    skipped_pages + reranker_output_results + llm_result.unreranked
                 )
-                # DEBUG: 打印 _merged_results_for_parser 内容
+                # DEBUG: 打印 merged_results_for_parser 内容
                 if self.config.debug and not self.config.silent:
-                    print(f"[DEBUG] _merged_results_for_parser 设置完成:")
+                    print(f"[DEBUG] merged_results_for_parser 设置完成:")
                     print(f"  - skipped_pages 数量: {len(skipped_pages)}")
                     print(f"  - reranker_output_results 数量: {len(reranker_output_results)}")
-                    print(f"  - 总数量: {len(self._merged_results_for_parser)}")
-                    for i, page in enumerate(self._merged_results_for_parser):
+                    print(f"  - 总数量: {len(merged_results_for_parser)}")
+                    for i, page in enumerate(merged_results_for_parser):
                         print(f"    [{i}] {page.get('page_title', 'Unknown')}")
             elif embedding_result and embedding_result.get("results"):
                 current_results = embedding_result
@@ -947,7 +1636,7 @@ class DocRAGOrchestrator:
                 )
                 pages_after = len(embedding_pages)
                 # 合并：截留记录 + Embedding 输出记录 → 形成完整 results
-                self._merged_results_for_parser = skipped_pages + embedding_pages
+                merged_results_for_parser = skipped_pages + embedding_pages
             else:
                 traceback.print_exc()
                 llm_empty = not (llm_result and llm_result.data.get("results"))
@@ -969,8 +1658,10 @@ class DocRAGOrchestrator:
 
         elif self.config.embedding_reranker:
             try:
-                embedding_result = searcher.rerank(
-                    search_result_for_rerank.get("results", []), optimized_queries
+                embedding_result = yield _Step(
+                    lambda: searcher.rerank(
+                        search_result_for_rerank.get("results", []), optimized_queries
+                    )
                 )
             except Exception as e:
                 traceback.print_exc()
@@ -1054,8 +1745,20 @@ class DocRAGOrchestrator:
                 if self.config.debug:
                     self._save_reranker_input(search_result_with_scene)
 
-                reranker = LLMReranker(LLMRerankerConfig(silent=self.config.silent))
-                rerank_result = reranker.rerank(search_result_with_scene)
+                reranker = LLMReranker(
+                    LLMRerankerConfig(
+                        silent=self.config.silent,
+                        response_cache=self._llm_cache(self.config.llm_cache_llm_reranker),
+                        compact_input=self.config.llm_reranker_compact,
+                        shard_max_tokens=self.config.llm_reranker_shard_tokens,
+                        shard_by=self.config.llm_reranker_shard_by,
+                        shard_max_concurrency=self.config.llm_reranker_max_concurrency,
+                    )
+                )
+                rerank_result = yield _Step(
+                    lambda: reranker.rerank(search_result_with_scene),
+                    lambda: reranker.rerank_async(search_result_with_scene),
+                )
                 rerank_thinking = rerank_result.thinking
 
                 if rerank_result.success:
@@ -1071,10 +1774,10 @@ class DocRAGOrchestrator:
                     )
                     # 先对 LLM 输出结果回溯 toc_path
                     current_results_with_toc = _restore_toc_paths(current_results, toc_path_map)
-                    # 合并：截留记录 + 过滤后 LLM 输出记录 → 形成完整 results
+                    # 合并：截留记录 + 过滤后 LLM 输出记录 + 失败分片原样返回的记录 → 形成完整 results
                     reranker_output_results = current_results_with_toc.get("results", [])
-                    self._merged_results_for_parser = (
-                        skipped_pages + reranker_output_results
+                    merged_results_for_parser = (
+                        skipped_pages + reranker_output_results + rerank_result.unreranked
                     )
                 else:
                     traceback.print_exc()
@@ -1226,18 +1929,13 @@ class DocRAGOrchestrator:
         # 如果有合并后的 results（截留记录 + LLM 输出），使用合并结果
         # 否则使用 params parser 从 reranker 结果解析
 
-        if (
-            hasattr(self, "_merged_results_for_parser")
-            and self._merged_results_for_parser
-        ):
+        if merged_results_for_parser:
             # 使用合并后的 results 构造 parser 输入
-            merged_results = self._merged_results_for_parser
             parser_input = {
                 "query": current_results.get("query", []),
                 "doc_sets_found": current_results.get("doc_sets_found", []),
-                "results": merged_results,
+                "results": merged_results_for_parser,
             }
-            # 注意：不要在这里删除 _merged_results_for_parser，后面构建 doc_metas 还需要使用
         else:
             parser_input = current_results
 
@@ -1275,17 +1973,32 @@ class DocRAGOrchestrator:
         # -------------------------------------------------------------------------
         # Phase 2: Content Extraction
         # -------------------------------------------------------------------------
-        try:
-            reader_api = DocReaderAPI(
-                base_dir=self.config.base_dir, config=self.config.reader_config
-            )
-            # API format: sections is a key in reader_config
-            sections = reader_config.get("sections", [])
+        # API format: sections is a key in reader_config
+        sections = reader_config.get("sections", [])
+
+        def _run_phase_2() -> Any:
+            if batch is not None:
+                reader_api = batch.reader(self.config.base_dir, self.config.reader_config)
+            else:
+                reader_api = DocReaderAPI(
+                    base_dir=self.config.base_dir, config=self.config.reader_config
+                )
             start_phase_2 = time.perf_counter()
-            extraction_result = reader_api.extract_multi_by_headings(
-                sections=sections, threshold=self.config.default_threshold
-            )
+
+            def _extract() -> Any:
+                return reader_api.extract_multi_by_headings(
+                    sections=sections, threshold=self.config.default_threshold
+                )
+
+            if batch is not None:
+                extraction_result = batch.shared(["phase_2", sections], _extract)
+            else:
+                extraction_result = _extract()
             timing["phase_2"] = (time.perf_counter() - start_phase_2) * 1000
+            return extraction_result
+
+        try:
+            extraction_result = yield _Step(_run_phase_2)
         except Exception as e:
             traceback.print_exc()
             raise Exception(
@@ -1375,7 +2088,11 @@ class DocRAGOrchestrator:
         # Phase 4: Scene-Based Output
         # -------------------------------------------------------------------------
         try:
-            outputter = SceneOutput()
+            outputter = SceneOutput(
+                SceneOutputConfig(
+                    response_cache=self._llm_cache(self.config.llm_cache_scene_output),
+                )
+            )
 
             # 使用 sections 构建 doc_metas（新方式）
             doc_metas = build_doc_metas_from_sections(sections, self.config.base_dir)
@@ -1396,7 +2113,10 @@ class DocRAGOrchestrator:
             }
 
             start_phase_4 = time.perf_counter()
-            output_result = outputter.compose(output_input)
+            output_result = yield _Step(
+                lambda: outputter.compose(output_input),
+                lambda: outputter.compose_async(output_input),
+            )
             timing["phase_4"] = (time.perf_counter() - start_phase_4) * 1000
         except Exception as e:
             traceback.print_exc()
@@ -1496,6 +2216,12 @@ def retrieve(
     reader_config: Optional[Dict[str, Any]] = None,
     searcher_config: Optional[Dict[str, Any]] = None,
     silent: bool = True,
+    llm_cache: bool = True,
+    semantic_cache: bool = False,
+    query_planner: bool = False,
+    speculative_search: bool = False,
+    llm_reranker_compact: bool = False,
+    llm_reranker_shard_tokens: int = 0,
 ) -> DocRAGResult:
     """Execute complete Doc-RAG retrieval workflow.
 
@@ -1513,6 +2239,12 @@ def retrieve(
         reader_config: Configuration dict for DocReaderAPI (e.g., {"search_mode": "fuzzy"})
         searcher_config: Configuration dict for DocSearcherAPI (e.g., {"bm25_k1": 1.5})
         silent: Silent mode, suppress all output (used by CLI for hook injection)
+        llm_cache: Reuse cached LLM responses for identical prompts (default True)
+        semantic_cache: Reuse Phase 0a/0b results of similar earlier queries (default False)
+        query_planner: Run Phase 0a and 0b as one combined LLM call (default False)
+        speculative_search: Start BM25 recall of the raw query while Phase 0 runs (default False)
+        llm_reranker_compact: Use the compact Phase 1.5 LLM input encoding (default False)
+        llm_reranker_shard_tokens: Token budget per concurrent LLM reranker shard (default 0: off)
 
     Returns:
         DocRAGResult with formatted output and metadata
@@ -1535,10 +2267,16 @@ def retrieve(
         reader_config=reader_config,
         searcher_config=searcher_config,
         silent=silent,
+        llm_cache=llm_cache,
+        semantic_cache=semantic_cache,
+        query_planner=query_planner,
+        speculative_search=speculative_search,
+        llm_reranker_compact=llm_reranker_compact,
+        llm_reranker_shard_tokens=llm_reranker_shard_tokens,
     )
 
-    orchestrator = DocRAGOrchestrator(config)
-    return orchestrator.retrieve(query)
+    with DocRAGOrchestrator(config) as orchestrator:
+        return orchestrator.retrieve(query)
 
 
 # =============================================================================
@@ -1546,200 +2284,11 @@ def retrieve(
 # =============================================================================
 
 
-def _parse_args() -> argparse.Namespace:
-    """Parse CLI arguments."""
-    parser = argparse.ArgumentParser(
-        description="Doc-RAG Orchestrator - Documentation Retrieval for LLM",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-    # Basic query
-    docrag "如何创建 ray cluster?"
-
-    # With JSON output
-    docrag "how to use api" --json
-
-    # Skip LLM re-ranking
-    docrag "documentation" --skip-reranker
-
-    # Save output to file
-    docrag "tutorial" --output result.md
-        """,
-    )
-
-    parser.add_argument(
-        "query",
-        nargs="?",
-        help="User query (positional argument)",
-    )
-
-    parser.add_argument(
-        "-k",
-        "--kb",
-        "--knowledge-base",
-        dest="knowledge_base",
-        help="Path to knowledge_base",
-    )
-
-    parser.add_argument(
-        "-t",
-        "--threshold",
-        type=int,
-        default=2100,
-        help="Line count threshold for requires_processing flag (default: 2100)",
-    )
-
-    parser.add_argument(
-        "--llm-reranker",
-        dest="llm_reranker",
-        action="store_true",
-        help="Enable Phase 1.5 LLM re-ranking",
-    )
-
-    parser.add_argument(
-        "--embedding-reranker",
-        dest="embedding_reranker",
-        action="store_true",
-        help="Enable Phase 1.5 transformer embedding re-ranking",
-    )
-
-    parser.add_argument(
-        "--searcher-reranker",
-        dest="searcher_reranker",
-        action="store_true",
-        help="Enable Phase 1 transformer re-ranking in DocSearcherAPI",
-    )
-
-    parser.add_argument(
-        "--reranker-threshold",
-        dest="reranker_threshold",
-        type=float,
-        default=0.6,
-        help="Threshold for transformer embedding reranker (default: 0.6)",
-    )
-
-    parser.add_argument(
-        "--skip-keywords",
-        dest="skip_keywords",
-        help="Custom path for skiped_keywords.txt file",
-    )
-
-    parser.add_argument(
-        "-o",
-        "--output",
-        dest="output_file",
-        help="Save output to file",
-    )
-
-    parser.add_argument(
-        "--stop-at",
-        dest="stop_at_phase",
-        choices=["0a", "0b", "1", "1.5", "2", "4"],
-        help="Stop pipeline at specified phase (0a, 0b, 1, 1.5, 2, or 4)",
-    )
-
-    parser.add_argument(
-        "--json",
-        action="store_true",
-        help="Output result in JSON format",
-    )
-
-    parser.add_argument(
-        "--debug",
-        action="store_true",
-        help="Enable debug mode",
-    )
-
-    parser.add_argument(
-        "--reader-config",
-        dest="reader_config",
-        help='JSON config dict for DocReaderAPI (Python dict format, e.g., \'{"search_mode": "fuzzy"}\')',
-    )
-
-    parser.add_argument(
-        "--searcher-config",
-        dest="searcher_config",
-        help="JSON config dict for DocSearcherAPI (Python dict format, e.g., '{\"bm25_k1\": 1.5}')",
-    )
-
-    parser.add_argument(
-        "--silent",
-        type=int,
-        choices=[0, 1],
-        default=1,
-        help="Enable silent mode, suppress all output (0=off, 1=on, default: 1)",
-    )
-
-    return parser.parse_args()
-
-
 def _main() -> int:
-    """Main entry point for CLI."""
-    start_cli = time.perf_counter()
-    args = _parse_args()
-    silent = bool(getattr(args, "silent", 1))  # CLI int (0/1) -> bool for API
-
-    if not silent:
-        cli_parse_time = (time.perf_counter() - start_cli) * 1000
-        print(f"▶ [CLI] 参数解析 耗时: {cli_parse_time:.2f}ms")
-
-    if not args.query:
-        if not silent:
-            print("Error: Query is required", file=sys.stderr)
-            print(
-                "Usage: docrag 'your query'",
-                file=sys.stderr,
-            )
-        return 1
-
-    try:
-        # Parse JSON config arguments
-        reader_config = None
-        searcher_config = None
-        if args.reader_config:
-            reader_config = json.loads(args.reader_config)
-        if args.searcher_config:
-            searcher_config = json.loads(args.searcher_config)
-
-        # Use silent mode for hook injection (Claude reads from /tmp/doc4llm_result.txt only)
-        result = retrieve(
-            query=args.query,
-            base_dir=args.knowledge_base,
-            threshold=args.threshold,
-            llm_reranker=args.llm_reranker,
-            embedding_reranker=args.embedding_reranker,
-            searcher_reranker=args.searcher_reranker,
-            reranker_threshold=args.reranker_threshold,
-            debug=args.debug,
-            skiped_keywords_path=args.skip_keywords,
-            stop_at_phase=args.stop_at_phase,
-            reader_config=reader_config,
-            searcher_config=searcher_config,
-            silent=silent,  # CLI 模式静默输出，结果写入文件供 hook 读取
-        )
-
-        # Write to temp file for hook injection (Claude context only, user invisible)
-        result_file = os.environ.get("DOC4LLM_RESULT_FILE", "/tmp/doc4llm_result.txt")
-        with open(result_file, "w", encoding="utf-8") as f:
-            f.write(result.output)
-
-        # Save to file if specified (only show message in non-silent mode)
-        if args.output_file:
-            with open(args.output_file, "w", encoding="utf-8") as f:
-                f.write(result.output)
-            if not silent:
-                print(f"\n[Output saved to: {args.output_file}]", file=sys.stderr)
-
-        # Print result output to console in non-silent mode
-        # if not silent:
-        print(result.output)
-
-        return 0 if result.success else 1
+    """Main entry point for CLI (always in-process; ``docrag`` is doc_rag.cli:main)."""
+    from doc4llm.doc_rag.cli import main
 
-    except Exception as e:
-        if not silent:
-            print(f"Error: {e}", file=sys.stderr)
-        return 1
+    return main(use_daemon=False)
 
 
 # =============================================================================
@@ -0,0 +1,32 @@
+"""
+Query Planner Package
+
+一次 LLM 调用同时完成查询优化（Phase 0a）与场景路由（Phase 0b）。
+
+Classes:
+    QueryPlanner: 查询规划器主类
+    QueryPlannerConfig: 配置数据类
+    QueryPlan: 合并结果数据类（OptimizationResult + RoutingResult）
+
+Example:
+    >>> from doc4llm.doc_rag.query_planner import QueryPlanner
+    >>> planner = QueryPlanner()
+    >>> plan = planner("如何创建 ray cluster?")
+    >>> print(plan.routing.scene)
+"""
+
+from .query_planner import (
+    QueryPlan,
+    QueryPlanner,
+    QueryPlannerConfig,
+    QueryPlannerValidationError,
+    parse_query_plan,
+)
+
+__all__ = [
+    "QueryPlan",
+    "QueryPlanner",
+    "QueryPlannerConfig",
+    "QueryPlannerValidationError",
+    "parse_query_plan",
+]
@@ -0,0 +1,300 @@
+"""
+Query Planner - Single-Call Query Optimization and Routing
+
+用一次 LLM 调用同时完成 Phase 0a（查询优化）与 Phase 0b（场景路由）。
+
+QueryOptimizer 与 QueryRouter 各自发送一个带大段 prompt 模板的请求；两个模板
+都要重复用户查询，总输入约是单个合并 prompt 的两倍，并且每个查询占用两次
+限流配额。QueryPlanner 使用一个精简的合并 prompt，输出同时包含优化结果与
+路由结果的 JSON，由 ``parse_query_plan`` 分别填充 OptimizationResult 与
+RoutingResult。解析或校验失败时抛出 QueryPlannerValidationError，调用方
+（DocRAGOrchestrator）回退到两次调用的路径。
+
+Example:
+    >>> planner = QueryPlanner()
+    >>> plan = planner.plan("如何创建 ray cluster?")
+    >>> print(plan.routing.scene, plan.optimization.optimized_queries)
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from doc4llm._steps import Steps, arun_steps, run_steps
+from doc4llm.doc_rag.params_parser.output_parser import extract_json_from_codeblock
+from doc4llm.doc_rag.query_optimizer.query_optimizer import (
+    OptimizationResult,
+    QueryOptimizerConfig,
+)
+from doc4llm.doc_rag.query_router.query_router import QueryRouter, RoutingResult
+from doc4llm.llm.anthropic import ainvoke, invoke
+from doc4llm.llm.response_cache import LLMResponseCache
+
+
+# 获取当前文件所在目录
+_QUERY_PLANNER_DIR = Path(__file__).parent
+
+
+class QueryPlannerValidationError(Exception):
+    """合并输出解析或校验失败异常（调用方应回退到两次调用）"""
+    pass
+
+
+@dataclass
+class QueryPlannerConfig:
+    """
+    QueryPlanner 配置类
+
+    Attributes:
+        model: LLM 模型名称 (default: "MiniMax-M2.1")
+        max_tokens: 最大输出 token 数 (default: 20000)
+        temperature: 生成温度 0.0-1.0 (default: 0.1)
+        prompt_template_path: prompt 模板文件路径
+        doc_sets_base_path: 文档集基础路径 (default: 与 QueryOptimizerConfig 相同)
+        silent: 静默模式，不打印流式输出 (default: False)
+        response_cache: LLM 响应缓存，为 None 时不缓存 (default: None)
+    """
+    model: str = "MiniMax-M2.1"
+    max_tokens: int = 20000
+    temperature: float = 0.1
+    prompt_template_path: str = str(_QUERY_PLANNER_DIR / "prompt_template" / "query_planner_prompt.md")
+    doc_sets_base_path: str = QueryOptimizerConfig.doc_sets_base_path
+    silent: bool = False
+    response_cache: Optional[LLMResponseCache] = None
+
+
+@dataclass
+class QueryPlan:
+    """
+    合并的 Phase 0a / 0b 结果
+
+    Attributes:
+        optimization: Phase 0a 查询优化结果
+        routing: Phase 0b 场景路由结果
+        thinking: LLM 推理过程 (如有)
+        raw_response: 原始响应文本
+    """
+    optimization: OptimizationResult
+    routing: RoutingResult
+    thinking: Optional[str] = field(default=None, repr=False)
+    raw_response: Optional[str] = field(default=None, repr=False)
+
+
+def _validate_routing(routing: dict) -> list:
+    """返回路由字段中缺失或越界的字段（规则同 QueryRouter._validate_response_data）"""
+    invalid_fields = []
+    if routing.get("scene") not in QueryRouter.VALID_SCENES:
+        invalid_fields.append("routing.scene")
+    for name in ("confidence", "ambiguity", "coverage_need", "reranker_threshold"):
+        value = routing.get(name)
+        low, high = (0.30, 0.80) if name == "reranker_threshold" else (0.0, 1.0)
+        if not isinstance(value, (int, float)) or not (low <= value <= high):
+            invalid_fields.append(f"routing.{name}")
+    return invalid_fields
+
+
+def parse_query_plan(
+    raw_response: Optional[str], thinking: Optional[str] = None
+) -> QueryPlan:
+    """
+    解析合并 prompt 的输出
+
+    Args:
+        raw_response: LLM 返回的文本
+        thinking: LLM 推理过程 (如有)
+
+    Returns:
+        QueryPlan: 填充好的 OptimizationResult 与 RoutingResult
+
+    Raises:
+        QueryPlannerValidationError: 无法解析 JSON，或关键字段为空/无效
+    """
+    data = extract_json_from_codeblock(raw_response) if raw_response else None
+    if not isinstance(data, dict):
+        raise QueryPlannerValidationError("Failed to parse query plan JSON")
+
+    query_analysis = data.get("query_analysis") or {}
+    optimized_queries = data.get("optimized_queries") or []
+    routing = data.get("routing") or {}
+
+    # 必填字段同 QueryOptimizer / QueryRouter 的校验（predicate_verbs 允许为空）
+    invalid_fields = []
+    if not isinstance(query_analysis, dict) or not query_analysis.get("original"):
+        invalid_fields.append("query_analysis.original")
+    elif not query_analysis.get("domain_nouns"):
+        invalid_fields.append("query_analysis.domain_nouns")
+    if not isinstance(optimized_queries, list) or not optimized_queries:
+        invalid_fields.append("optimized_queries")
+    if not isinstance(routing, dict):
+        routing = {}
+    invalid_fields.extend(_validate_routing(routing))
+    if invalid_fields:
+        raise QueryPlannerValidationError(f"Invalid query plan fields: {invalid_fields}")
+
+    return QueryPlan(
+        optimization=OptimizationResult(
+            query_analysis=query_analysis,
+            optimized_queries=optimized_queries,
+            search_recommendation=data.get("search_recommendation") or {},
+            thinking=thinking,
+            raw_response=raw_response,
+        ),
+        routing=RoutingResult(
+            scene=routing["scene"],
+            confidence=routing["confidence"],
+            ambiguity=routing["ambiguity"],
+            coverage_need=routing["coverage_need"],
+            reranker_threshold=routing["reranker_threshold"],
+            thinking=thinking,
+            raw_response=raw_response,
+        ),
+        thinking=thinking,
+        raw_response=raw_response,
+    )
+
+
+class QueryPlanner:
+    """
+    查询规划器 - 一次 LLM 调用完成查询优化与场景路由
+
+    Attributes:
+        config: 当前使用的配置
+        last_result: 最近一次规划结果
+
+    Example:
+        >>> planner = QueryPlanner()
+        >>> plan = planner("opencode 如何创建 skills?")
+        >>> print(plan.routing.scene)
+        how_to
+    """
+
+    config: QueryPlannerConfig
+    last_result: Optional[QueryPlan]
+
+    def __init__(self, config: Optional[QueryPlannerConfig] = None) -> None:
+        """
+        初始化 QueryPlanner
+
+        Args:
+            config: QueryPlannerConfig 实例，为 None 时使用默认配置
+
+        Raises:
+            FileNotFoundError: prompt 模板文件不存在
+        """
+        self.config = config or QueryPlannerConfig()
+        self._prompt_template: Optional[str] = None
+        self._doc_sets_list: list = []
+        self.last_result = None
+        self._load_prompt_template()
+        self._load_doc_sets()
+
+    def _load_prompt_template(self) -> None:
+        """
+        加载 prompt 模板文件
+
+        Raises:
+            FileNotFoundError: 模板文件不存在
+        """
+        path = Path(self.config.prompt_template_path)
+        if path.exists():
+            self._prompt_template = path.read_text(encoding="utf-8")
+        else:
+            raise FileNotFoundError(f"Prompt template not found: {path}")
+
+    def _load_doc_sets(self) -> None:
+        """加载本地文档集列表"""
+        base_path = Path(self.config.doc_sets_base_path)
+        if base_path.exists():
+            self._doc_sets_list = sorted(d.name for d in base_path.iterdir() if d.is_dir())
+
+    def plan(self, query: str) -> QueryPlan:
+        """
+        执行查询优化与路由（同步，单次 LLM 调用）
+
+        Args:
+            query: 用户查询文本
+
+        Returns:
+            QueryPlan: 优化结果与路由结果
+
+        Raises:
+            QueryPlannerValidationError: 输出无法解析或关键字段无效
+        """
+        return run_steps(self._plan_steps(query), lambda request: invoke(**request))
+
+    async def plan_async(self, query: str) -> QueryPlan:
+        """
+        执行查询优化与路由（异步，单次 LLM 调用）
+
+        Args:
+            query: 用户查询文本
+
+        Returns:
+            QueryPlan: 优化结果与路由结果
+
+        Raises:
+            QueryPlannerValidationError: 输出无法解析或关键字段无效
+        """
+        return await arun_steps(self._plan_steps(query), lambda request: ainvoke(**request))
+
+    def _plan_steps(self, query: str) -> Steps[QueryPlan]:
+        """规划流程：yield LLM 请求参数，接收响应消息"""
+        system_prompt = self._prompt_template.format(LOCAL_DOC_SETS_LIST=self._doc_sets_list)
+        message = yield dict(
+            model=self.config.model,
+            max_tokens=self.config.max_tokens,
+            temperature=self.config.temperature,
+            system=system_prompt,
+            messages=[{"role": "user", "content": query}],
+            silent=self.config.silent,
+            cache=self.config.response_cache,
+            cache_validator=self._is_valid_message,
+        )
+
+        self.last_result = self._parse_message(message)
+        return self.last_result
+
+    @staticmethod
+    def _parse_message(message) -> QueryPlan:
+        """解析 LLM 响应消息（无法解析时抛出 QueryPlannerValidationError）"""
+        thinking: Optional[str] = None
+        texts = []
+        for block in message.content:
+            if block.type == "thinking":
+                thinking = block.thinking
+            elif block.type == "text":
+                texts.append(block.text)
+        raw_response = "\n".join(texts) if texts else None
+        return parse_query_plan(raw_response, thinking)
+
+    def _is_valid_message(self, message) -> bool:
+        """响应可解析为有效规划时才允许写入 LLM 响应缓存"""
+        try:
+            self._parse_message(message)
+        except QueryPlannerValidationError:
+            return False
+        return True
+
+    def __call__(self, query: str) -> QueryPlan:
+        """
+        使实例可调用，等同于 plan() 方法
+
+        Args:
+            query: 用户查询文本
+
+        Returns:
+            QueryPlan: 规划结果
+        """
+        return self.plan(query)
+
+    def __repr__(self) -> str:
+        return f"QueryPlanner(model={self.config.model!r}, max_tokens={self.config.max_tokens})"
+
+
+__all__ = [
+    "QueryPlan",
+    "QueryPlanner",
+    "QueryPlannerConfig",
+    "QueryPlannerValidationError",
+    "parse_query_plan",
+]
@@ -21,8 +21,10 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional, Union
 
+from doc4llm._steps import Steps, arun_steps, run_steps
 from doc4llm.doc_rag.params_parser.output_parser import extract_json_from_codeblock
-from doc4llm.llm.anthropic import invoke
+from doc4llm.llm.anthropic import ainvoke, invoke
+from doc4llm.llm.response_cache import LLMResponseCache
 
 
 # 获取当前文件所在目录
@@ -47,6 +49,7 @@ class QueryRouterConfig:
         max_retries: 最大重试次数（不包含首次调用）(default: 2)
         retry_on_empty_fields: 是否启用重试机制 (default: True)
         silent: 静默模式，不打印流式输出 (default: False)
+        response_cache: LLM 响应缓存，为 None 时不缓存 (default: None)
     """
     model: str = "MiniMax-M2.1"
     max_tokens: int = 20000
@@ -55,6 +58,7 @@ class QueryRouterConfig:
     max_retries: int = 2
     retry_on_empty_fields: bool = True
     silent: bool = False
+    response_cache: Optional[LLMResponseCache] = None
 
 
 @dataclass
@@ -225,6 +229,23 @@ class QueryRouter:
             "reranker_threshold": result.reranker_threshold,
         }
 
+    def _is_valid_message(self, message) -> bool:
+        """
+        响应可解析且关键字段有效时才允许写入 LLM 响应缓存
+
+        Args:
+            message: LLM 返回的消息对象
+
+        Returns:
+            bool: 是否可以缓存
+        """
+        try:
+            result = self._parse_response(message)
+        except Exception:
+            return False
+        is_valid, _ = self._validate_response_data(self._extract_data_from_result(result))
+        return is_valid
+
     def set_prompt_template(self, path: Union[str, Path]) -> None:
         """
         设置自定义 prompt 模板
@@ -262,17 +283,38 @@ class QueryRouter:
             >>> print(result.scene)
             exploration
         """
+        return run_steps(self._route_steps(query), lambda request: invoke(**request))
+
+    async def route_async(self, query: str) -> RoutingResult:
+        """
+        执行查询路由（异步，使用 AsyncAnthropic 客户端，不占用线程）
+
+        Args:
+            query: 用户查询文本
+
+        Returns:
+            RoutingResult: 包含分类结果和参数的路由结果
+
+        Raises:
+            QueryRouterValidationError: 重试用尽后仍无法获取有效响应
+        """
+        return await arun_steps(self._route_steps(query), lambda request: ainvoke(**request))
+
+    def _route_steps(self, query: str) -> Steps[RoutingResult]:
+        """查询路由流程：每次 LLM 调用 yield 请求参数，接收响应消息"""
         if not self._prompt_template:
             self._load_prompt_template()
 
         # 首次调用
-        message = invoke(
+        message = yield dict(
             model=self.config.model,
             max_tokens=self.config.max_tokens,
             temperature=self.config.temperature,
             system=self._prompt_template,
             messages=[{"role": "user", "content": query}],
             silent=self.config.silent,
+            cache=self.config.response_cache,
+            cache_validator=self._is_valid_message,
         )
 
         # 首次尝试解析
@@ -308,13 +350,15 @@ class QueryRouter:
 
             # 重新调用 LLM（略微提高 temperature）
             retry_temp = min(self.config.temperature + 0.1, 0.2)
-            retry_message = invoke(
+            retry_message = yield dict(
                 model=self.config.model,
                 max_tokens=self.config.max_tokens,
                 temperature=retry_temp,
                 system=self._prompt_template,
                 messages=[{"role": "user", "content": retry_content}],
                 silent=self.config.silent,
+                # 重试的 prompt 可能与首次调用相同，不读写缓存，避免取回同一个无效响应
+                cache=None,
             )
 
             # 尝试解析，失败则继续重试
@@ -343,18 +387,6 @@ class QueryRouter:
         self.last_result = result
         return self.last_result
 
-    async def route_async(self, query: str) -> RoutingResult:
-        """
-        执行查询路由（异步）
-
-        Args:
-            query: 用户查询文本
-
-        Returns:
-            RoutingResult: 包含分类结果和参数的路由结果
-        """
-        return self.route(query)
-
     def _parse_response(self, message) -> RoutingResult:
         """
         解析 LLM 响应
@@ -26,7 +26,9 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, Optional, Union
 
-from doc4llm.llm.anthropic import invoke
+from doc4llm._steps import Steps, arun_steps, run_steps
+from doc4llm.llm.anthropic import ainvoke, invoke
+from doc4llm.llm.response_cache import LLMResponseCache
 
 
 # 获取当前文件所在目录
@@ -43,11 +45,13 @@ class SceneOutputConfig:
         max_tokens: 最大输出 token 数 (default: 20000)
         temperature: 生成温度 0.0-1.0 (default: 0.3)
         prompt_template_path: prompt 模板文件路径
+        response_cache: LLM 响应缓存，为 None 时不缓存 (default: None)
     """
     model: str = "MiniMax-M2.1"
     max_tokens: int = 20000
     temperature: float = 0.3
     prompt_template_path: str = str(_SCENE_OUTPUT_DIR / "prompt_template" / "scene_output_template.md")
+    response_cache: Optional[LLMResponseCache] = None
 
 
 @dataclass
@@ -238,6 +242,24 @@ class SceneOutput:
             ...     "compression_meta": {...}
             ... })
         """
+        return run_steps(self._compose_steps(input_data), lambda request: invoke(**request))
+
+    async def compose_async(self, input_data: Dict) -> SceneOutputResult:
+        """
+        执行场景化输出合成（异步，使用 AsyncAnthropic 客户端，不占用线程）
+
+        Args:
+            input_data: 输入数据字典
+
+        Returns:
+            SceneOutputResult: 包含格式化输出的结果
+        """
+        return await arun_steps(
+            self._compose_steps(input_data), lambda request: ainvoke(**request)
+        )
+
+    def _compose_steps(self, input_data: Dict) -> Steps[SceneOutputResult]:
+        """场景化输出流程：yield LLM 请求参数，接收响应消息"""
         if not self._prompt_template:
             self._load_prompt_template()
 
@@ -246,28 +268,22 @@ class SceneOutput:
         # 序列化输入数据
         user_message = self._serialize_input_data(input_data)
 
-        message = invoke(
+        message = yield dict(
             model=self.config.model,
             max_tokens=self.config.max_tokens,
             temperature=self.config.temperature,
             system=rendered_system,
             messages=[{"role": "user", "content": user_message}],
+            cache=self.config.response_cache,
+            cache_validator=self._is_valid_message,
         )
 
         self.last_result = self._parse_response(message)
         return self.last_result
 
-    async def compose_async(self, input_data: Dict) -> SceneOutputResult:
-        """
-        执行场景化输出合成（异步）
-
-        Args:
-            input_data: 输入数据字典
-
-        Returns:
-            SceneOutputResult: 包含格式化输出的结果
-        """
-        return self.compose(input_data)
+    def _is_valid_message(self, message) -> bool:
+        """响应包含非空输出文本时才允许写入 LLM 响应缓存"""
+        return bool(self._parse_response(message).output.strip())
 
     def _parse_response(self, message) -> SceneOutputResult:
         """
@@ -27,39 +27,112 @@ CLI:
     $ python doc_searcher_cli.py --base-dir /path/to/md_docs --query "api" --json
 """
 
-from .bm25_recall import BM25Recall, BM25Config
-from .content_searcher import ContentSearcher
-from .doc_searcher_api import DocSearcherAPI
-from .doc_searcher_cli import main
-from .anchor_searcher import AnchorSearcher, AnchorSearcherConfig
-from .text_preprocessor import TextPreprocessor, LanguageDetector
-from .fallback_merger import FallbackMerger
-from .search_utils import debug_print
-from .common_utils import (
-    extract_heading_level,
-    filter_query_keywords,
-    remove_url_from_heading,
-    extract_page_title_from_path,
-    count_words,
-    clean_context_from_urls,
-)
-from .config import (
-    BM25Config,
-    ThresholdConfig,
-    RerankerConfig,
-    FallbackConfig,
-    AnchorSearcherConfig,
-    ContentSearcherConfig,
-    SearchConfig,
-)
-from .config_manager import ConfigManager
-from .interfaces import BaseSearcher, SearchResult
-from .searcher_registry import SearcherRegistry, get_registry, reset_registry
+from typing import TYPE_CHECKING
+
+from doc4llm._lazy import lazy_exports
+
+# doc_searcher_api 依赖 numpy 与嵌入 matcher，doc_searcher_cli 会解析命令行；
+# 都在首次访问时才导入（PEP 562）
+_EXPORTS = {
+    "BM25Recall": ".bm25_recall",
+    "BM25IndexStore": ".bm25_index",
+    "DocSetIndex": ".bm25_index",
+    "get_index_store": ".bm25_index",
+    "ContentIndex": ".content_index",
+    "ContentIndexStore": ".content_index",
+    "get_content_index_store": ".content_index",
+    "KeywordMatcher": ".keyword_matcher",
+    "get_keyword_matcher": ".keyword_matcher",
+    "DenseIndex": ".dense_index",
+    "DenseIndexStore": ".dense_index",
+    "get_dense_index_store": ".dense_index",
+    "DenseSearcher": ".dense_searcher",
+    "DenseSearcherConfig": ".dense_searcher",
+    "register_dense_searcher": ".dense_searcher",
+    "ContentSearcher": ".content_searcher",
+    "DocSearcherAPI": ".doc_searcher_api",
+    "main": ".doc_searcher_cli",
+    "AnchorSearcher": ".anchor_searcher",
+    "TextPreprocessor": ".text_preprocessor",
+    "LanguageDetector": ".text_preprocessor",
+    "FallbackMerger": ".fallback_merger",
+    "debug_print": ".search_utils",
+    "extract_heading_level": ".common_utils",
+    "filter_query_keywords": ".common_utils",
+    "remove_url_from_heading": ".common_utils",
+    "extract_page_title_from_path": ".common_utils",
+    "count_words": ".common_utils",
+    "clean_context_from_urls": ".common_utils",
+    "BM25Config": ".config",
+    "ThresholdConfig": ".config",
+    "RerankerConfig": ".config",
+    "FallbackConfig": ".config",
+    "AnchorSearcherConfig": ".config",
+    "ContentSearcherConfig": ".config",
+    "SearchConfig": ".config",
+    "ConfigManager": ".config_manager",
+    "BaseSearcher": ".interfaces",
+    "SearchResult": ".interfaces",
+    "SearcherRegistry": ".searcher_registry",
+    "get_registry": ".searcher_registry",
+    "reset_registry": ".searcher_registry",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .bm25_recall import BM25Recall, BM25Config
+    from .bm25_index import BM25IndexStore, DocSetIndex, get_index_store
+    from .content_index import ContentIndex, ContentIndexStore, get_content_index_store
+    from .keyword_matcher import KeywordMatcher, get_keyword_matcher
+    from .dense_index import DenseIndex, DenseIndexStore, get_dense_index_store
+    from .dense_searcher import DenseSearcher, DenseSearcherConfig, register_dense_searcher
+    from .content_searcher import ContentSearcher
+    from .doc_searcher_api import DocSearcherAPI
+    from .doc_searcher_cli import main
+    from .anchor_searcher import AnchorSearcher, AnchorSearcherConfig
+    from .text_preprocessor import TextPreprocessor, LanguageDetector
+    from .fallback_merger import FallbackMerger
+    from .search_utils import debug_print
+    from .common_utils import (
+        extract_heading_level,
+        filter_query_keywords,
+        remove_url_from_heading,
+        extract_page_title_from_path,
+        count_words,
+        clean_context_from_urls,
+    )
+    from .config import (
+        BM25Config,
+        ThresholdConfig,
+        RerankerConfig,
+        FallbackConfig,
+        AnchorSearcherConfig,
+        ContentSearcherConfig,
+        SearchConfig,
+    )
+    from .config_manager import ConfigManager
+    from .interfaces import BaseSearcher, SearchResult
+    from .searcher_registry import SearcherRegistry, get_registry, reset_registry
 
 __all__ = [
     # Core classes
     "BM25Recall",
     "BM25Config",
+    "BM25IndexStore",
+    "DocSetIndex",
+    "get_index_store",
+    "ContentIndex",
+    "ContentIndexStore",
+    "get_content_index_store",
+    "KeywordMatcher",
+    "get_keyword_matcher",
+    "DenseIndex",
+    "DenseIndexStore",
+    "get_dense_index_store",
+    "DenseSearcher",
+    "DenseSearcherConfig",
+    "register_dense_searcher",
     "ContentSearcher",
     "DocSearcherAPI",
     "AnchorSearcher",
@@ -2,7 +2,8 @@
 FALLBACK_1: Anchor/TOC Search Strategy (Pure Python Implementation).
 
 This module provides a pure Python implementation of the FALLBACK_1 search strategy
-for searching docTOC.md files. Uses pathlib + re instead of grep command.
+for searching docTOC.md files. Uses pathlib + a shared Aho-Corasick keyword
+matcher instead of grep command.
 
 This module is extracted from doc_searcher_api.py for better modularity.
 """
@@ -14,6 +15,7 @@ from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
 from .common_utils import remove_url_from_heading, extract_heading_level
 from .interfaces import BaseSearcher
+from .keyword_matcher import KeywordMatcher, get_keyword_matcher
 
 
 @dataclass
@@ -28,9 +30,9 @@ class AnchorSearcherConfig:
 class AnchorSearcher(BaseSearcher):
     """FALLBACK_1: Grep/TOC Search Strategy (Pure Python Implementation).
 
-    Uses pathlib + re to search docTOC.md files for keywords, supporting
-    regular expression matching. This is a cross-platform implementation
-    that doesn't depend on the system grep command.
+    Uses pathlib + a multi-keyword matcher to search docTOC.md files for
+    keywords (case-insensitive substring matching). This is a cross-platform
+    implementation that doesn't depend on the system grep command.
 
     Attributes:
         base_dir: Knowledge base root directory
@@ -62,13 +64,13 @@ class AnchorSearcher(BaseSearcher):
             print(f"[DEBUG] {message}")
 
     def _search_files(
-        self, doc_sets: List[str], pattern: re.Pattern
+        self, doc_sets: List[str], matcher: KeywordMatcher
     ) -> Generator[Tuple[Path, str], None, None]:
-        """Search for pattern in docTOC.md files (pure Python implementation).
+        """Search for keywords in docTOC.md files (pure Python implementation).
 
         Args:
             doc_sets: List of doc-set names to search
-            pattern: Compiled regex pattern to search for
+            matcher: Compiled keyword matcher
 
         Yields:
             Tuples of (toc_file_path, matched_line)
@@ -82,7 +84,7 @@ class AnchorSearcher(BaseSearcher):
                 try:
                     with open(toc_file, "r", encoding="utf-8") as f:
                         for line in f:
-                            if pattern.search(line):
+                            if matcher.contains_any(line):
                                 yield toc_file, line  # noqa: F841
                 except Exception as e:
                     self._debug_print(f"Error reading {toc_file}: {e}")
@@ -128,45 +130,36 @@ class AnchorSearcher(BaseSearcher):
             self._debug_print("No keywords extracted from queries")
             return []
 
-        # Build regex pattern (OR logic for multiple keywords)
-        pattern = "|".join(re.escape(kw) for kw in keywords)
-        compiled_pattern = re.compile(pattern, re.IGNORECASE)
+        # Keyword matcher (OR logic for multiple keywords), cached per keyword set
+        matcher = get_keyword_matcher(keywords)
 
         results = []
-        for toc_file, line in self._search_files(doc_sets, compiled_pattern):
-            if not line.strip():
+        for toc_file, line in self._search_files(doc_sets, matcher):
+            if not line.strip() or "#" not in line:
                 continue
 
-            # Parse grep-style output: path:matched_content
-            if ":" in line:
-                parts = line.split(":", 1)
-                toc_path = parts[0].strip()
-                match_content = parts[1] if len(parts) > 1 else ""
-
-                page_title = extract_page_title_from_path(toc_path)
-
-                heading_text = ""
-                if "#" in match_content:
-                    heading_match = re.search(r"(#{1,6}\s+[^\n]+)", match_content)
-                    if heading_match:
-                        # Preserve original # format heading text
-                        heading_text = remove_url_from_heading(
-                            heading_match.group(1), preserve_hash=True
-                        )
-
-                if heading_text:
-                    results.append(
-                        {
-                            "doc_set": Path(toc_path).parent.parent.name,
-                            "page_title": page_title,
-                            "heading": heading_text,
-                            "toc_path": toc_path,
-                            "bm25_sim": 0.0,
-                            "is_basic": True,
-                            "is_precision": False,
-                            "source": "FALLBACK_1",
-                        }
-                    )
+            heading_match = re.search(r"(#{1,6}\s+[^\n]+)", line)
+            if not heading_match:
+                continue
+            # Preserve original # format heading text
+            heading_text = remove_url_from_heading(
+                heading_match.group(1), preserve_hash=True
+            )
+
+            if heading_text:
+                toc_path = str(toc_file)
+                results.append(
+                    {
+                        "doc_set": toc_file.parent.parent.name,
+                        "page_title": extract_page_title_from_path(toc_path),
+                        "heading": heading_text,
+                        "toc_path": toc_path,
+                        "bm25_sim": 0.0,
+                        "is_basic": True,
+                        "is_precision": False,
+                        "source": "FALLBACK_1",
+                    }
+                )
 
         return results
 
@@ -0,0 +1,803 @@
+"""
+Persistent BM25 index for doc-set page recall.
+
+每个 doc-set 的 docTOC.md 语料只在首次使用（或文件变更）时分词、建索引，
+并以紧凑的 numpy 数组形式落盘，后续查询通过 ``np.load(mmap_mode="r")``
+懒加载，避免每次查询都重新读取/分词整个 doc-set。
+
+On-disk layout (one directory per doc-set)::
+
+    <index_dir>/<doc_set>/
+        meta.json                       # manifest + vocabulary + page table
+        <build_id>.idf.npy              # float64[V]   per-term IDF
+        <build_id>.doc_lengths.npy      # int32[N]     tokens per page
+        <build_id>.postings_offsets.npy # int64[V+1]   CSR offsets per term
+        <build_id>.postings_docs.npy    # int32[P]     page ids
+        <build_id>.postings_tfs.npy     # int32[P]     term frequencies
+
+Headings parsed from the same TOCs get their own inverted index (postings
+over heading ids, heading lengths, heading-corpus IDF), built in the same
+pass, so heading scoring uses real corpus statistics instead of a
+one-document BM25 index per heading::
+
+        <build_id>.heading_offsets.npy          # int64[N+1]  page -> heading ids
+        <build_id>.heading_lengths.npy          # int32[H]
+        <build_id>.heading_idf.npy              # float64[V]
+        <build_id>.heading_postings_offsets.npy # int64[V+1]
+        <build_id>.heading_postings_docs.npy    # int32[Ph]   heading ids
+        <build_id>.heading_postings_tfs.npy     # int32[Ph]
+
+The manifest records the mtime/size of every docTOC.md. A changed, added
+or removed TOC invalidates only the index of its own doc-set.
+
+Example:
+    >>> from doc4llm.doc_rag.searcher.bm25_index import get_index_store
+    >>> store = get_index_store("/path/to/md_docs")
+    >>> index = store.get("Claude_Code_Docs@latest")
+    >>> tokens = store.tokenize("hooks configuration")
+    >>> for page_idx, score in index.search(tokens, k1=1.2, b=0.75, top_k=5):
+    ...     print(index.page_titles[page_idx], score)
+"""
+
+import json
+import math
+import os
+import shutil
+import threading
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from doc4llm.tool.md_doc_retrieval.bm25_sparse import SparseBM25Scorer, top_k_scores
+
+from .bm25_recall import STOP_WORDS, BM25Config, BM25Matcher, SimpleStemmer, parse_headings
+
+# 索引格式版本，格式变化时递增以触发重建
+INDEX_FORMAT_VERSION = 2
+
+# 默认索引目录名（位于 base_dir 下，不含 "@"，不会被识别为 doc-set）
+DEFAULT_INDEX_DIRNAME = ".doc4llm_index"
+
+_ARRAY_NAMES = (
+    "idf",
+    "doc_lengths",
+    "postings_offsets",
+    "postings_docs",
+    "postings_tfs",
+    "heading_offsets",
+    "heading_lengths",
+    "heading_idf",
+    "heading_postings_offsets",
+    "heading_postings_docs",
+    "heading_postings_tfs",
+)
+
+
+@dataclass
+class DocSetIndex:
+    """In-memory (or memory-mapped) BM25 index of one doc-set.
+
+    Page ids are positions in ``page_titles`` (sorted by TOC path, the same
+    order ``BM25Recall`` has always indexed pages in). Postings are stored
+    term-major in CSR form: the pages containing term ``t`` are
+    ``postings_docs[postings_offsets[t]:postings_offsets[t + 1]]``.
+
+    Attributes:
+        doc_set: Document set name
+        page_titles: Page title for each page id
+        headings: Parsed TOC headings for each page id (see ``parse_headings``)
+        vocab: Term -> term id mapping
+        idf: Per-term IDF, same formula as ``BM25Matcher._compute_idf``
+        doc_lengths: Token count per page
+        postings_offsets: CSR offsets into the postings arrays
+        postings_docs: Page ids of the postings
+        postings_tfs: Term frequencies of the postings
+        avg_doc_length: Average page length in tokens
+        heading_offsets: Headings of page ``p`` have global heading ids
+            ``heading_offsets[p]:heading_offsets[p + 1]`` (same order as ``headings[p]``)
+        heading_lengths: Token count per heading
+        heading_idf: Per-term IDF over the heading corpus (0 for terms in no heading)
+        heading_postings_offsets: CSR offsets into the heading postings arrays
+        heading_postings_docs: Heading ids of the heading postings
+        heading_postings_tfs: Term frequencies of the heading postings
+        avg_heading_length: Average heading length in tokens
+        manifest: ``{page_dir_name: [mtime_ns, size]}`` of the indexed TOCs
+    """
+
+    doc_set: str
+    page_titles: List[str]
+    headings: List[List[Dict[str, Any]]]
+    vocab: Dict[str, int]
+    idf: np.ndarray
+    doc_lengths: np.ndarray
+    postings_offsets: np.ndarray
+    postings_docs: np.ndarray
+    postings_tfs: np.ndarray
+    avg_doc_length: float
+    heading_offsets: np.ndarray
+    heading_lengths: np.ndarray
+    heading_idf: np.ndarray
+    heading_postings_offsets: np.ndarray
+    heading_postings_docs: np.ndarray
+    heading_postings_tfs: np.ndarray
+    avg_heading_length: float
+    manifest: Dict[str, List[int]] = field(default_factory=dict)
+    _scorers: Dict[Tuple[float, float], SparseBM25Scorer] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _stemmed_heading_idf: Optional[Dict[str, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def total_docs(self) -> int:
+        """Number of indexed pages."""
+        return len(self.page_titles)
+
+    def scorer(self, k1: float, b: float) -> SparseBM25Scorer:
+        """CSR BM25 weight matrix of the pages for the given parameters (cached).
+
+        Args:
+            k1: BM25 k1 parameter
+            b: BM25 b parameter
+
+        Returns:
+            SparseBM25Scorer sharing this index's postings
+        """
+        scorer = self._scorers.get((k1, b))
+        if scorer is None:
+            scorer = self._scorers[(k1, b)] = SparseBM25Scorer(
+                vocab=self.vocab,
+                indptr=self.postings_offsets,
+                indices=self.postings_docs,
+                tfs=self.postings_tfs,
+                doc_lengths=self.doc_lengths,
+                idf=self.idf,
+                avg_doc_length=self.avg_doc_length,
+                k1=k1,
+                b=b,
+            )
+        return scorer
+
+    def score(self, query_tokens: List[str], k1: float, b: float) -> np.ndarray:
+        """Score every page of the doc-set against one tokenized query.
+
+        The scores are identical to ``BM25Matcher`` built from the same TOCs.
+
+        Args:
+            query_tokens: Query tokens (repeated tokens are counted repeatedly)
+            k1: BM25 k1 parameter
+            b: BM25 b parameter
+
+        Returns:
+            float64 array of shape (total_docs,)
+        """
+        return self.scorer(k1, b).score(query_tokens)
+
+    def search(
+        self,
+        query_tokens: List[str],
+        k1: float,
+        b: float,
+        top_k: int = 10,
+        method: str = "exhaustive",
+    ) -> List[Tuple[int, float]]:
+        """Rank pages for one tokenized query.
+
+        Same semantics as ``BM25Matcher.search(min_score=0.0)``: every page is
+        a candidate, ties keep index order.
+
+        Args:
+            query_tokens: Query tokens
+            k1: BM25 k1 parameter
+            b: BM25 b parameter
+            top_k: Number of results to return
+            method: "exhaustive" or "maxscore" (see ``search_batch``)
+
+        Returns:
+            List of (page_id, score) tuples sorted by score descending
+        """
+        return self.search_batch([query_tokens], k1, b, top_k=top_k, method=method)[0]
+
+    def search_batch(
+        self,
+        queries_tokens: List[List[str]],
+        k1: float,
+        b: float,
+        top_k: int = 10,
+        method: str = "exhaustive",
+    ) -> List[List[Tuple[int, float]]]:
+        """Rank pages for several tokenized queries.
+
+        Args:
+            queries_tokens: Tokenized queries
+            k1: BM25 k1 parameter
+            b: BM25 b parameter
+            top_k: Number of results per query
+            method: "exhaustive" scores all queries with one sparse mat-mul;
+                "maxscore" uses per-query MaxScore/block-max pruning, which
+                skips most postings on doc-sets with tens of thousands of
+                pages (same results)
+
+        Returns:
+            One list of (page_id, score) tuples per query
+        """
+        if self.total_docs == 0:
+            return [[] for _ in queries_tokens]
+        if method != "exhaustive":
+            scorer = self.scorer(k1, b)
+            return [
+                scorer.search(tokens, top_k, min_score=0.0, method=method) if tokens else []
+                for tokens in queries_tokens
+            ]
+        scores = self.scorer(k1, b).score_batch(queries_tokens)
+        return [
+            top_k_scores(scores[i], top_k, min_score=0.0) if tokens else []
+            for i, tokens in enumerate(queries_tokens)
+        ]
+
+    def page_heading_ids(self, page_ids: List[int]) -> np.ndarray:
+        """Global heading ids of the given pages, concatenated in page order.
+
+        Args:
+            page_ids: Page ids
+
+        Returns:
+            int64 array of heading ids
+        """
+        if not page_ids:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(
+            [
+                np.arange(self.heading_offsets[p], self.heading_offsets[p + 1], dtype=np.int64)
+                for p in page_ids
+            ]
+        )
+
+    def score_headings(
+        self,
+        queries_tokens: List[List[str]],
+        heading_ids: np.ndarray,
+        k1: float,
+        b: float,
+    ) -> np.ndarray:
+        """Score indexed headings against all queries in one vectorized pass.
+
+        Args:
+            queries_tokens: Tokenized queries
+            heading_ids: Global heading ids to score
+            k1: BM25 k1 parameter
+            b: BM25 b parameter
+
+        Returns:
+            float64 array of shape (len(queries_tokens), len(heading_ids)),
+            see ``_normalized_heading_scores`` for the scale
+        """
+        heading_ids = np.asarray(heading_ids, dtype=np.int64)
+        terms = self._query_terms(queries_tokens)
+        tf = np.zeros((len(terms), len(heading_ids)), dtype=np.float64)
+        if len(heading_ids) and terms:
+            # 全局 heading id -> 候选列位置
+            position = np.full(len(self.heading_lengths), -1, dtype=np.int64)
+            position[heading_ids] = np.arange(len(heading_ids))
+            for row, term in enumerate(terms):
+                term_id = self.vocab[term]
+                start = self.heading_postings_offsets[term_id]
+                end = self.heading_postings_offsets[term_id + 1]
+                cols = position[self.heading_postings_docs[start:end]]
+                hit = cols >= 0
+                tf[row, cols[hit]] = self.heading_postings_tfs[start:end][hit]
+        lengths = self.heading_lengths[heading_ids].astype(np.float64)
+        idf = np.array([self.heading_idf[self.vocab[t]] for t in terms], dtype=np.float64)
+        return self._normalized_heading_scores(queries_tokens, terms, idf, tf, lengths, k1, b)
+
+    def score_heading_texts(
+        self,
+        queries_tokens: List[List[str]],
+        texts_tokens: List[List[str]],
+        k1: float,
+        b: float,
+        stemming: bool = False,
+    ) -> np.ndarray:
+        """Score arbitrary heading texts with this doc-set's heading statistics.
+
+        Used for headings found outside the index (e.g. FALLBACK_1 matches);
+        a text tokenizing like an indexed heading gets the same score.
+
+        Args:
+            queries_tokens: Tokenized queries
+            texts_tokens: Tokenized heading texts
+            k1: BM25 k1 parameter
+            b: BM25 b parameter
+            stemming: Stem query and heading tokens before matching, so
+                inflected forms ("hooks" / "hook") match. A stem takes the
+                highest heading IDF of the indexed terms with that stem.
+
+        Returns:
+            float64 array of shape (len(queries_tokens), len(texts_tokens))
+        """
+        if stemming:
+            stem = SimpleStemmer().stem
+            stemmed_idf = self._stemmed_idf()
+            queries_tokens = [[stem(t) for t in tokens] for tokens in queries_tokens]
+            texts_tokens = [[stem(t) for t in tokens] for tokens in texts_tokens]
+            terms = list(dict.fromkeys(
+                t for tokens in queries_tokens for t in tokens if t in stemmed_idf
+            ))
+            idf = np.array([stemmed_idf[t] for t in terms], dtype=np.float64)
+        else:
+            terms = self._query_terms(queries_tokens)
+            idf = np.array([self.heading_idf[self.vocab[t]] for t in terms], dtype=np.float64)
+        tf = np.zeros((len(terms), len(texts_tokens)), dtype=np.float64)
+        rows = {term: row for row, term in enumerate(terms)}
+        for col, tokens in enumerate(texts_tokens):
+            for token, count in Counter(tokens).items():
+                row = rows.get(token)
+                if row is not None:
+                    tf[row, col] = count
+        lengths = np.array([len(t) for t in texts_tokens], dtype=np.float64)
+        return self._normalized_heading_scores(queries_tokens, terms, idf, tf, lengths, k1, b)
+
+    def _stemmed_idf(self) -> Dict[str, float]:
+        """Stem -> highest heading IDF of the indexed terms with that stem (cached)."""
+        if self._stemmed_heading_idf is None:
+            stem = SimpleStemmer().stem
+            stemmed: Dict[str, float] = {}
+            for term, term_id in self.vocab.items():
+                idf = float(self.heading_idf[term_id])
+                if idf > 0:
+                    key = stem(term)
+                    stemmed[key] = max(stemmed.get(key, 0.0), idf)
+            self._stemmed_heading_idf = stemmed
+        return self._stemmed_heading_idf
+
+    def _query_terms(self, queries_tokens: List[List[str]]) -> List[str]:
+        """Distinct query terms that occur in at least one heading."""
+        terms = []
+        for tokens in queries_tokens:
+            for token in tokens:
+                term_id = self.vocab.get(token)
+                if term_id is not None and self.heading_idf[term_id] > 0 and token not in terms:
+                    terms.append(token)
+        return terms
+
+    def _normalized_heading_scores(
+        self,
+        queries_tokens: List[List[str]],
+        terms: List[str],
+        idf: np.ndarray,
+        tf: np.ndarray,
+        lengths: np.ndarray,
+        k1: float,
+        b: float,
+    ) -> np.ndarray:
+        """Normalized BM25 of headings: ``[Q, T] @ [T, H]`` then divide by the ideal score.
+
+        The ideal score of a query is the BM25 of a heading of average length
+        containing every query term once, i.e. the sum of the IDF of all its
+        terms. Terms that occur in no heading still count, with the IDF of an
+        unseen term (stop words excepted), so a heading matching one term of
+        a longer query cannot reach full score. Scores are clipped to 1 and
+        read as the matched share of the query: ``threshold_headings`` (0.25)
+        asks for about a quarter of it, ``threshold_precision`` (0.7) for
+        most of it.
+        """
+        scores = np.zeros((len(queries_tokens), tf.shape[1]), dtype=np.float64)
+        if not terms or tf.shape[1] == 0:
+            return scores
+
+        avg_length = self.avg_heading_length or 1.0
+        norm = k1 * (1 - b + b * (lengths / avg_length))
+        weights = idf[:, None] * (tf * (k1 + 1)) / (tf + norm[None, :])
+
+        # 查询词频矩阵（重复的查询词重复计分，与 BM25Matcher 一致）
+        rows = {term: row for row, term in enumerate(terms)}
+        counts = np.zeros((len(queries_tokens), len(terms)), dtype=np.float64)
+        for q, tokens in enumerate(queries_tokens):
+            for token in tokens:
+                row = rows.get(token)
+                if row is not None:
+                    counts[q, row] += 1
+
+        # 不出现在任何 heading 中的查询词按未出现词的 IDF 计入理想分
+        unseen_idf = math.log((len(self.heading_lengths) + 0.5) / 0.5 + 1.0)
+        unmatched = np.array(
+            [
+                sum(1 for t in tokens if t not in rows and t not in STOP_WORDS)
+                for tokens in queries_tokens
+            ],
+            dtype=np.float64,
+        )
+        ideal = counts @ idf + unmatched * unseen_idf
+        np.divide(counts @ weights, ideal[:, None], out=scores, where=ideal[:, None] > 0)
+        return np.minimum(scores, 1.0, out=scores)
+
+
+def scan_doc_set(doc_set_dir: Path, filename: str = "docTOC.md") -> Dict[str, List[int]]:
+    """Collect the ``{page_dir_name: [mtime_ns, size]}`` manifest of a doc-set.
+
+    Args:
+        doc_set_dir: Doc-set directory
+        filename: Per-page file to stat (default "docTOC.md")
+
+    Returns:
+        Manifest dict, empty if the directory does not exist
+    """
+    manifest: Dict[str, List[int]] = {}
+    try:
+        entries = list(os.scandir(doc_set_dir))
+    except OSError:
+        return manifest
+    for entry in entries:
+        if not entry.is_dir():
+            continue
+        try:
+            stat = os.stat(os.path.join(entry.path, filename))
+        except OSError:
+            continue
+        manifest[entry.name] = [stat.st_mtime_ns, stat.st_size]
+    return manifest
+
+
+def build_doc_set_index(
+    doc_set_dir: Path,
+    doc_set: str,
+    tokenize: Callable[[str], List[str]],
+    manifest: Optional[Dict[str, List[int]]] = None,
+) -> DocSetIndex:
+    """Tokenize all TOCs of a doc-set and build its BM25 index.
+
+    Args:
+        doc_set_dir: Doc-set directory
+        doc_set: Document set name
+        tokenize: Tokenizer used for both documents and queries
+        manifest: Pre-computed manifest (scanned if not given)
+
+    Returns:
+        Freshly built DocSetIndex
+    """
+    if manifest is None:
+        manifest = scan_doc_set(doc_set_dir)
+
+    # 与 BM25Recall._find_toc_files 保持一致：按完整路径排序
+    page_titles = sorted(
+        manifest, key=lambda name: str(doc_set_dir / name / "docTOC.md")
+    )
+
+    headings: List[List[Dict[str, Any]]] = []
+    doc_vectors: List[Counter] = []
+    doc_lengths: List[int] = []
+    for page_title in page_titles:
+        try:
+            content = (doc_set_dir / page_title / "docTOC.md").read_text(encoding="utf-8")
+        except Exception:
+            content = ""
+        tokens = tokenize(content)
+        doc_vectors.append(Counter(tokens))
+        doc_lengths.append(len(tokens))
+        headings.append(parse_headings(content))
+
+    heading_vectors: List[Counter] = []
+    heading_offsets = np.zeros(len(page_titles) + 1, dtype=np.int64)
+    for page_id, page_headings in enumerate(headings):
+        for heading in page_headings:
+            heading_vectors.append(Counter(tokenize(heading["text"])))
+        heading_offsets[page_id + 1] = len(heading_vectors)
+
+    # 页面与 heading 共用词表，按首次出现顺序编号
+    vocab: Dict[str, int] = {}
+    postings: List[List[Tuple[int, int]]] = []
+    heading_postings: List[List[Tuple[int, int]]] = []
+
+    def add_postings(vectors: List[Counter], target: List[List[Tuple[int, int]]]):
+        for doc_id, doc_vector in enumerate(vectors):
+            for term, tf in doc_vector.items():
+                term_id = vocab.get(term)
+                if term_id is None:
+                    term_id = vocab[term] = len(postings)
+                    postings.append([])
+                    heading_postings.append([])
+                target[term_id].append((doc_id, tf))
+
+    add_postings(doc_vectors, postings)
+    add_postings(heading_vectors, heading_postings)
+
+    total_docs = len(page_titles)
+    total_length = sum(doc_lengths)
+    avg_doc_length = total_length / total_docs if total_docs > 0 else 0
+
+    idf, offsets, postings_docs, postings_tfs = _pack_postings(postings, total_docs)
+    heading_idf, h_offsets, h_docs, h_tfs = _pack_postings(
+        heading_postings, len(heading_vectors)
+    )
+    # 不出现在任何 heading 中的词不参与 heading 打分
+    heading_idf[h_offsets[1:] == h_offsets[:-1]] = 0.0
+    heading_lengths = [sum(v.values()) for v in heading_vectors]
+
+    return DocSetIndex(
+        doc_set=doc_set,
+        page_titles=page_titles,
+        headings=headings,
+        vocab=vocab,
+        idf=idf,
+        doc_lengths=np.array(doc_lengths, dtype=np.int32),
+        postings_offsets=offsets,
+        postings_docs=postings_docs,
+        postings_tfs=postings_tfs,
+        avg_doc_length=avg_doc_length,
+        heading_offsets=heading_offsets,
+        heading_lengths=np.array(heading_lengths, dtype=np.int32),
+        heading_idf=heading_idf,
+        heading_postings_offsets=h_offsets,
+        heading_postings_docs=h_docs,
+        heading_postings_tfs=h_tfs,
+        avg_heading_length=(
+            sum(heading_lengths) / len(heading_lengths) if heading_lengths else 0
+        ),
+        manifest=manifest,
+    )
+
+
+def _pack_postings(
+    postings: List[List[Tuple[int, int]]], total_docs: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pack per-term posting lists into (idf, offsets, docs, tfs) CSR arrays."""
+    idf = np.empty(len(postings), dtype=np.float64)
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    for term_id, plist in enumerate(postings):
+        df = len(plist)
+        idf[term_id] = math.log((total_docs - df + 0.5) / (df + 0.5) + 1.0)
+        offsets[term_id + 1] = offsets[term_id] + df
+
+    flat = [pair for plist in postings for pair in plist]
+    docs = np.array([d for d, _ in flat], dtype=np.int32)
+    tfs = np.array([tf for _, tf in flat], dtype=np.int32)
+    return idf, offsets, docs, tfs
+
+
+class BM25IndexStore:
+    """Lazily builds, persists and loads per doc-set BM25 indexes.
+
+    Indexes are cached in memory after the first load; every ``get`` call
+    re-stats the doc-set's TOC files (cheap compared to reading them) and
+    rebuilds only that doc-set when its manifest no longer matches.
+
+    If the index directory is not writable the index is kept in memory only.
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        index_dir: Optional[str] = None,
+        config: Optional[BM25Config] = None,
+        debug: bool = False,
+    ):
+        """Initialize the index store.
+
+        Args:
+            base_dir: Knowledge base root directory
+            index_dir: Where to persist indexes (default: ``<base_dir>/.doc4llm_index``)
+            config: Tokenizer configuration (default: ``BM25Config(stemming=False)``,
+                same as BM25Recall page recall). k1/b are applied at query time.
+            debug: Enable debug mode (default False)
+        """
+        self.base_dir = Path(base_dir)
+        self.index_dir = Path(index_dir) if index_dir else self.base_dir / DEFAULT_INDEX_DIRNAME
+        self.debug = debug
+        self._matcher = BM25Matcher(config or BM25Config(stemming=False))
+        self._indexes: Dict[str, DocSetIndex] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _debug_print(self, message: str):
+        """Print debug message."""
+        if self.debug:
+            print(f"[DEBUG] {message}")
+
+    @property
+    def tokenizer_signature(self) -> Dict[str, Any]:
+        """Tokenizer settings baked into the index; a mismatch forces a rebuild."""
+        config = self._matcher.config
+        return {
+            "lowercase": config.lowercase,
+            "stemming": config.stemming,
+            "min_token_length": config.min_token_length,
+            "max_token_length": config.max_token_length,
+            "stop_words": sorted(config.stop_words or []),
+        }
+
+    def tokenize(self, text: str) -> List[str]:
+        """Tokenize text exactly like the indexed documents.
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of tokens
+        """
+        return self._matcher._tokenize(text)
+
+    def _lock_for(self, doc_set: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(doc_set)
+            if lock is None:
+                lock = self._locks[doc_set] = threading.Lock()
+            return lock
+
+    def get(self, doc_set: str) -> DocSetIndex:
+        """Get the up-to-date index of a doc-set, building it if necessary.
+
+        Args:
+            doc_set: Document set name
+
+        Returns:
+            DocSetIndex (possibly with zero pages)
+        """
+        doc_set_dir = self.base_dir / doc_set
+        manifest = scan_doc_set(doc_set_dir)
+
+        with self._lock_for(doc_set):
+            index = self._indexes.get(doc_set)
+            if index is not None and index.manifest == manifest:
+                return index
+
+            index = self._load(doc_set, manifest)
+            if index is None:
+                self._debug_print(f"Building BM25 index for doc-set: {doc_set}")
+                index = build_doc_set_index(
+                    doc_set_dir, doc_set, self.tokenize, manifest=manifest
+                )
+                self._save(index)
+            self._indexes[doc_set] = index
+            return index
+
+    def build(self, doc_set: str) -> DocSetIndex:
+        """Force a rebuild of one doc-set's index.
+
+        Args:
+            doc_set: Document set name
+
+        Returns:
+            Freshly built DocSetIndex
+        """
+        with self._lock_for(doc_set):
+            index = build_doc_set_index(self.base_dir / doc_set, doc_set, self.tokenize)
+            self._save(index)
+            self._indexes[doc_set] = index
+            return index
+
+    def invalidate(self, doc_set: Optional[str] = None) -> None:
+        """Drop in-memory indexes (the on-disk copy is kept).
+
+        Args:
+            doc_set: Doc-set to drop, or None for all
+        """
+        if doc_set is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(doc_set, None)
+
+    def _load(
+        self, doc_set: str, manifest: Dict[str, List[int]]
+    ) -> Optional[DocSetIndex]:
+        """Load a persisted index if it matches the current manifest."""
+        index_path = self.index_dir / doc_set
+        try:
+            with open(index_path / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            meta.get("version") != INDEX_FORMAT_VERSION
+            or meta.get("tokenizer") != self.tokenizer_signature
+            or meta.get("manifest") != manifest
+        ):
+            self._debug_print(f"BM25 index for {doc_set} is stale")
+            return None
+
+        build_id = meta["build_id"]
+        try:
+            arrays = {
+                name: np.load(index_path / f"{build_id}.{name}.npy", mmap_mode="r")
+                for name in _ARRAY_NAMES
+            }
+        except (OSError, ValueError):
+            return None
+
+        self._debug_print(f"Loaded BM25 index for doc-set: {doc_set}")
+        return DocSetIndex(
+            doc_set=doc_set,
+            page_titles=meta["page_titles"],
+            headings=meta["headings"],
+            vocab={term: i for i, term in enumerate(meta["vocab"])},
+            avg_doc_length=meta["avg_doc_length"],
+            avg_heading_length=meta["avg_heading_length"],
+            manifest=meta["manifest"],
+            **arrays,
+        )
+
+    def _save(self, index: DocSetIndex) -> None:
+        """Persist an index; arrays first, then meta.json via atomic replace."""
+        index_path = self.index_dir / index.doc_set
+        build_id = uuid.uuid4().hex[:12]
+        vocab = [""] * len(index.vocab)
+        for term, term_id in index.vocab.items():
+            vocab[term_id] = term
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "build_id": build_id,
+            "doc_set": index.doc_set,
+            "tokenizer": self.tokenizer_signature,
+            "manifest": index.manifest,
+            "avg_doc_length": index.avg_doc_length,
+            "avg_heading_length": index.avg_heading_length,
+            "page_titles": index.page_titles,
+            "headings": index.headings,
+            "vocab": vocab,
+        }
+        try:
+            index_path.mkdir(parents=True, exist_ok=True)
+            for name in _ARRAY_NAMES:
+                np.save(index_path / f"{build_id}.{name}.npy", getattr(index, name))
+            tmp_meta = index_path / f"meta.json.{build_id}.tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_meta, index_path / "meta.json")
+        except OSError as e:
+            self._debug_print(f"Cannot persist BM25 index for {index.doc_set}: {e}")
+            return
+
+        # 清理旧版本的数组文件（已 mmap 的旧数组在 POSIX 上仍可读）
+        for path in index_path.iterdir():
+            if path.suffix in (".npy", ".tmp") and not path.name.startswith(build_id):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def clear(self) -> None:
+        """Remove all persisted indexes and in-memory caches."""
+        self._indexes.clear()
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+
+
+# 进程级 store 缓存，同一知识库的多个 BM25Recall 实例共享已加载的索引
+_stores: Dict[Tuple[str, Optional[str]], BM25IndexStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_index_store(
+    base_dir: str, index_dir: Optional[str] = None, debug: bool = False
+) -> BM25IndexStore:
+    """Get the process-wide index store for a knowledge base.
+
+    Args:
+        base_dir: Knowledge base root directory
+        index_dir: Optional custom index directory
+        debug: Enable debug mode on newly created stores
+
+    Returns:
+        Shared BM25IndexStore instance
+    """
+    key = (str(Path(base_dir).resolve()), str(Path(index_dir).resolve()) if index_dir else None)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = BM25IndexStore(base_dir, index_dir=index_dir, debug=debug)
+        return store
+
+
+__all__ = [
+    "INDEX_FORMAT_VERSION",
+    "DEFAULT_INDEX_DIRNAME",
+    "DocSetIndex",
+    "BM25IndexStore",
+    "build_doc_set_index",
+    "scan_doc_set",
+    "get_index_store",
+]
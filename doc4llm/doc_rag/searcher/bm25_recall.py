@@ -20,6 +20,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
+
+from doc4llm.tool.md_doc_retrieval.bm25_sparse import SparseBM25Scorer, top_k_scores
+
 from .interfaces import BaseSearcher
 
 
@@ -216,6 +220,8 @@ class BM25Config:
     lowercase: bool = True
     stemming: bool = True  # Enable word stemming for better matching
     stop_words: Optional[set] = None
+    backend: str = "python"  # "python" loop or "sparse" CSR mat-mul (same results)
+    top_k_method: str = "exhaustive"  # "sparse" only: "exhaustive" or "maxscore" pruning
 
 
 class BM25Matcher:
@@ -263,6 +269,7 @@ class BM25Matcher:
         self._avg_doc_length: float = 0.0
         self._total_docs: int = 0
         self._stemmer = SimpleStemmer() if self.config.stemming else None
+        self._sparse_scorer: Optional[SparseBM25Scorer] = None
 
     def _tokenize(self, text: str) -> List[str]:
         tokens = re.findall(r"\b\w+\b", text)
@@ -289,6 +296,7 @@ class BM25Matcher:
         self._doc_lengths = []
         self._doc_vectors = []
         self._idf_cache = {}
+        self._sparse_scorer = None
         total_length = 0
 
         for doc_id, content in documents.items():
@@ -318,6 +326,18 @@ class BM25Matcher:
                 (self._total_docs - df + 0.5) / (df + 0.5) + 1.0
             )
 
+    def _get_sparse_scorer(self) -> SparseBM25Scorer:
+        if self._sparse_scorer is None:
+            self._sparse_scorer = SparseBM25Scorer.from_doc_vectors(
+                self._doc_vectors,
+                self._doc_lengths,
+                self._idf_cache,
+                self._avg_doc_length,
+                k1=self.config.k1,
+                b=self.config.b,
+            )
+        return self._sparse_scorer
+
     def _get_idf(self, term: str) -> float:
         if self.config.lowercase:
             term = term.lower()
@@ -347,6 +367,13 @@ class BM25Matcher:
         query_tokens = self._tokenize(query)
         if not query_tokens:
             return []
+        if self.config.backend == "sparse":
+            return [
+                (self._doc_ids[doc_idx], score)
+                for doc_idx, score in self._get_sparse_scorer().search(
+                    query_tokens, top_k, min_score, method=self.config.top_k_method
+                )
+            ]
         scores = []
         for doc_idx in range(self._total_docs):
             score = self._score_document(query_tokens, doc_idx)
@@ -355,6 +382,26 @@ class BM25Matcher:
         scores.sort(key=lambda x: x[1], reverse=True)
         return scores[:top_k]
 
+    def search_batch(
+        self, queries: List[str], top_k: int = 10, min_score: float = 0.0
+    ) -> List[List[Tuple[str, float]]]:
+        """Search several queries at once (one sparse mat-mul with backend="sparse")."""
+        if self.config.backend != "sparse" or self.config.top_k_method != "exhaustive":
+            return [self.search(q, top_k=top_k, min_score=min_score) for q in queries]
+        if not self._doc_ids:
+            return [[] for _ in queries]
+        queries_tokens = [self._tokenize(q) for q in queries]
+        scores = self._get_sparse_scorer().score_batch(queries_tokens)
+        return [
+            [
+                (self._doc_ids[doc_idx], score)
+                for doc_idx, score in top_k_scores(scores[i], top_k, min_score)
+            ]
+            if tokens
+            else []
+            for i, tokens in enumerate(queries_tokens)
+        ]
+
 
 def calculate_bm25_similarity(
     query: str, content: str, config: Optional[BM25Config] = None
@@ -531,7 +578,9 @@ class BM25Recall(BaseSearcher):
         threshold_page_title: float = 0.6,
         threshold_headings: float = 0.25,
         threshold_precision: float = 0.7,
-        debug: bool = False
+        debug: bool = False,
+        index_dir: Optional[str] = None,
+        top_k_method: str = "exhaustive",
     ):
         """Initialize BM25 recall module.
 
@@ -543,6 +592,10 @@ class BM25Recall(BaseSearcher):
             threshold_headings: Heading matching threshold (default 0.25)
             threshold_precision: Precision matching threshold (default 0.7)
             debug: Enable debug mode (default False)
+            index_dir: Directory of the persistent page index
+                (default: ``<base_dir>/.doc4llm_index``)
+            top_k_method: Page top-k selection, "exhaustive" or "maxscore"
+                (dynamic pruning for very large doc-sets, same results)
         """
         self.base_dir = base_dir
         self.k1 = k1
@@ -551,6 +604,8 @@ class BM25Recall(BaseSearcher):
         self.threshold_headings = threshold_headings
         self.threshold_precision = threshold_precision
         self.debug = debug
+        self.index_dir = index_dir
+        self.top_k_method = top_k_method
 
     @property
     def name(self) -> str:
@@ -617,6 +672,49 @@ class BM25Recall(BaseSearcher):
                     toc_files.append(str(toc_path))
         return sorted(toc_files)
 
+    def _get_index_store(self):
+        """Get the shared persistent index store for this knowledge base."""
+        from .bm25_index import get_index_store
+
+        return get_index_store(self.base_dir, index_dir=self.index_dir, debug=self.debug)
+
+    def score_heading_texts(
+        self,
+        doc_set: str,
+        queries: Union[str, List[str]],
+        texts: List[str],
+        stemming: bool = False,
+    ) -> List[float]:
+        """Score heading texts against queries with the doc-set's heading index.
+
+        Uses the same corpus statistics and scale as the heading scores of
+        ``recall_pages`` (max over queries), e.g. for re-scoring FALLBACK_1
+        headings.
+
+        Args:
+            doc_set: Document set name
+            queries: Search query string or list of query strings
+            texts: Heading texts (markdown ``#`` markers and anchors are ignored)
+            stemming: Match inflected forms by stemming query and heading
+                tokens (default False, like ``recall_pages``)
+
+        Returns:
+            One score per text
+        """
+        queries = [queries] if isinstance(queries, str) else queries
+        if not texts or not queries:
+            return [0.0] * len(texts)
+        store = self._get_index_store()
+        index = store.get(doc_set)
+        scores = index.score_heading_texts(
+            [store.tokenize(q) for q in queries],
+            [store.tokenize(t) for t in texts],
+            self.k1,
+            self.b,
+            stemming=stemming,
+        )
+        return [float(s) for s in scores.max(axis=0)]
+
     def _read_toc_content(self, toc_path: str) -> str:
         """Read TOC file content."""
         try:
@@ -643,91 +741,90 @@ class BM25Recall(BaseSearcher):
         # Normalize query to list
         queries = [query] if isinstance(query, str) else query
 
-        toc_files = self._find_toc_files(doc_set)
-        matcher = BM25Matcher(BM25Config(k1=self.k1, b=self.b, stemming=False))
-
-        documents = {}
-        for toc_path in toc_files:
-            page_title = extract_page_title_from_path(toc_path)
-            content = self._read_toc_content(toc_path)
-            documents[page_title] = content
-
-        if not documents:
+        # 持久化索引：首次使用时构建，TOC 文件变更时仅重建该 doc-set
+        store = self._get_index_store()
+        index = store.get(doc_set)
+        if index.total_docs == 0:
             return []
 
-        matcher.build_index(documents)
-
         # 独立计算每个 query 的 BM25 分数，取最大值
         # 结构: {page_title: max_score}
         page_scores: Dict[str, float] = {}
-        for q in queries:
-            q_results = matcher.search(q, top_k=100)
-            for page_title, score in q_results:
+        page_ids: Dict[str, int] = {}
+        queries_tokens = [store.tokenize(q) for q in queries]
+        for q_results in index.search_batch(
+            queries_tokens, self.k1, self.b, top_k=100, method=self.top_k_method
+        ):
+            for page_id, score in q_results:
+                page_title = index.page_titles[page_id]
+                page_ids[page_title] = page_id
                 if page_title not in page_scores or score > page_scores[page_title]:
                     page_scores[page_title] = score
 
         # 按分数排序
         sorted_pages = sorted(page_scores.items(), key=lambda x: x[1], reverse=True)
         results = sorted_pages[:100]
+        basic_pages = [
+            (page_title, score)
+            for page_title, score in results
+            if score >= self.threshold_page_title
+        ]
 
-        scored_pages = []
-        for page_title, score in results:
-            is_basic = score >= self.threshold_page_title
-
-            if is_basic:
-                toc_path = str(Path(self.base_dir) / doc_set / page_title / "docTOC.md")
-                toc_content = self._read_toc_content(toc_path)
-                headings = parse_headings(toc_content)
-
-                scored_headings = []
-                for heading in headings:
-                    # 独立计算每个 query 的 BM25 分数，取最大值
-                    max_h_score = 0.0
-                    for q in queries:
-                        q_score = calculate_bm25_similarity(
-                            q,
-                            heading["text"],
-                            BM25Config(k1=self.k1, b=self.b, stemming=False),
-                        )
-                        if q_score > max_h_score:
-                            max_h_score = q_score
-                    h_score = max_h_score
-                    self._debug_print(
-                        f"    Heading: {heading['text'][:50]}, score: {h_score:.2f}"
-                    )
-                    scored_headings.append(
-                        {
-                            **heading,
-                            "bm25_sim": h_score,
-                            "is_basic": h_score >= self.threshold_headings,
-                            "is_precision": h_score >= self.threshold_precision,
-                            "source": "BM25",
-                        }
-                    )
+        # 所有候选页面的全部 heading 一次性对所有 query 打分（heading 级倒排索引）
+        # 每个 heading 取各 query 分数的最大值
+        heading_ids = index.page_heading_ids([page_ids[t] for t, _ in basic_pages])
+        heading_scores = index.score_headings(queries_tokens, heading_ids, self.k1, self.b)
+        heading_scores = (
+            heading_scores.max(axis=0) if len(queries) else np.zeros(len(heading_ids))
+        )
 
+        scored_pages = []
+        offset = 0
+        for page_title, score in basic_pages:
+            toc_path = str(Path(self.base_dir) / doc_set / page_title / "docTOC.md")
+            headings = index.headings[page_ids[page_title]]
+            page_heading_scores = heading_scores[offset:offset + len(headings)]
+            offset += len(headings)
+
+            scored_headings = []
+            for heading, h_score in zip(headings, page_heading_scores):
+                h_score = float(h_score)
                 self._debug_print(
-                    f"    threshold_headings: {self.threshold_headings}, valid count before filter: {len(scored_headings)}"
+                    f"    Heading: {heading['text'][:50]}, score: {h_score:.2f}"
                 )
-                valid_headings = [h for h in scored_headings if h["is_basic"]]
-                self._debug_print(f"    valid_headings count: {len(valid_headings)}")
-
-                precision_count = sum(1 for h in valid_headings if h["is_precision"])
-
-                scored_pages.append(
+                scored_headings.append(
                     {
-                        "doc_set": doc_set,
-                        "page_title": page_title,
-                        "bm25_sim": score,
-                        "is_basic": is_basic,
-                        "is_precision": False,
-                        "toc_path": toc_path,
-                        "headings": valid_headings,
-                        "heading_count": len(valid_headings),
-                        "precision_count": precision_count,
+                        **heading,
+                        "bm25_sim": h_score,
+                        "is_basic": h_score >= self.threshold_headings,
+                        "is_precision": h_score >= self.threshold_precision,
                         "source": "BM25",
                     }
                 )
 
+            self._debug_print(
+                f"    threshold_headings: {self.threshold_headings}, valid count before filter: {len(scored_headings)}"
+            )
+            valid_headings = [h for h in scored_headings if h["is_basic"]]
+            self._debug_print(f"    valid_headings count: {len(valid_headings)}")
+
+            precision_count = sum(1 for h in valid_headings if h["is_precision"])
+
+            scored_pages.append(
+                {
+                    "doc_set": doc_set,
+                    "page_title": page_title,
+                    "bm25_sim": score,
+                    "is_basic": True,
+                    "is_precision": False,
+                    "toc_path": toc_path,
+                    "headings": valid_headings,
+                    "heading_count": len(valid_headings),
+                    "precision_count": precision_count,
+                    "source": "BM25",
+                }
+            )
+
         # BM25 召回的结果全部返回，min_headings 仅用于调用方判断是否需要 fallback
         return scored_pages
 
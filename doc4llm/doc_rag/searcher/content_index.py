@@ -0,0 +1,490 @@
+"""
+Persistent line-level inverted index for ContentSearcher (FALLBACK_2).
+
+FALLBACK_2 以前每次查询都要 rglob 并完整读取 doc-set 下所有 docContent.md，
+逐行跑关键词正则、向上回溯 heading、逐行重算词数。这里为每个 doc-set 预建
+行级索引，查询时只需查 postings、读取命中的文件并切片上下文。
+
+On-disk layout (next to the BM25 page index)::
+
+    <index_dir>/<doc_set>/content/
+        meta.json                          # manifest + files + vocabulary + heading texts
+        <build_id>.line_offsets.npy        # int64[F+1]  file -> global line ids
+        <build_id>.postings_offsets.npy    # int64[V+1]  CSR offsets per term
+        <build_id>.postings_lines.npy      # int64[P]    global line ids containing the term
+        <build_id>.line_heading_row.npy    # int32[L]    nearest heading line at/above (-1: none)
+        <build_id>.line_heading_id.npy     # int32[L]    index into meta["headings"] (-1: none)
+        <build_id>.prev_heading.npy        # int32[L]    heading line strictly above (-1: none)
+        <build_id>.next_heading.npy        # int32[L]    heading line strictly below (n: none)
+        <build_id>.line_words.npy          # int32[L]    cleaned word count per line
+
+Terms are case-folded ``\\w+`` runs (``keyword_matcher.fold_case``; a CJK
+run is one term). A keyword is looked up by its own ``\\w+`` fragments:
+every fragment must be a substring of some term on the line, which yields a
+superset of the lines the keyword matcher accepts; candidates are then
+verified with the matcher, so results equal a full scan.
+
+Example:
+    >>> from doc4llm.doc_rag.searcher.content_index import get_content_index_store
+    >>> store = get_content_index_store("/path/to/md_docs")
+    >>> index = store.get("Claude_Code_Docs@latest")
+    >>> lines = index.candidate_lines(["hook"])
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bm25_index import DEFAULT_INDEX_DIRNAME, scan_doc_set
+from .common_utils import (
+    clean_context_from_urls,
+    count_words,
+    extract_page_title_from_path,
+    remove_url_from_heading,
+)
+from .keyword_matcher import fold_case
+
+# 索引格式版本，格式变化时递增以触发重建
+CONTENT_INDEX_FORMAT_VERSION = 2
+
+CONTENT_FILENAME = "docContent.md"
+
+_ARRAY_NAMES = (
+    "line_offsets",
+    "postings_offsets",
+    "postings_lines",
+    "line_heading_row",
+    "line_heading_id",
+    "prev_heading",
+    "next_heading",
+    "line_words",
+)
+
+_TOKEN_RE = re.compile(r"\w+")
+# 与 ContentSearcher._find_heading_backward / _is_heading_line 保持一致
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$")
+_HEADING_LINE_RE = re.compile(r"^#{1,6}\s+")
+_RULE_RE = re.compile(r"^---+\s*")
+
+
+def clean_context_line(stripped: str) -> str:
+    """Strip a leading ``---`` rule from a stripped context line."""
+    return _RULE_RE.sub("", stripped)
+
+
+@dataclass
+class ContentIndex:
+    """Line-level index of the docContent.md files of one doc-set.
+
+    Global line ids number the lines of all files consecutively: file ``f``
+    owns ``line_offsets[f]:line_offsets[f + 1]``. Per-line tables hold
+    file-local line indices.
+
+    Attributes:
+        doc_set: Document set name
+        files: ``{"page_dir", "page_title"}`` per file id
+        vocab: Term -> term id mapping
+        headings: Formatted heading texts (``"## Title"``, URLs removed)
+        line_offsets: File -> first global line id (length F+1)
+        postings_offsets: CSR offsets into ``postings_lines``
+        postings_lines: Sorted global line ids per term
+        line_heading_row: Nearest heading line at or above each line
+        line_heading_id: Heading text id of ``line_heading_row``
+        prev_heading: Nearest markdown heading line strictly above
+        next_heading: Nearest markdown heading line strictly below
+        line_words: ``count_words(clean_context_from_urls(line))`` of each
+            cleaned non-heading line (0 for headings and blank lines)
+        manifest: ``{page_dir_name: [mtime_ns, size]}`` of the indexed files
+    """
+
+    doc_set: str
+    files: List[Dict[str, str]]
+    vocab: Dict[str, int]
+    headings: List[str]
+    line_offsets: np.ndarray
+    postings_offsets: np.ndarray
+    postings_lines: np.ndarray
+    line_heading_row: np.ndarray
+    line_heading_id: np.ndarray
+    prev_heading: np.ndarray
+    next_heading: np.ndarray
+    line_words: np.ndarray
+    manifest: Dict[str, List[int]] = field(default_factory=dict)
+    _fragment_terms: Dict[str, List[int]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @property
+    def total_lines(self) -> int:
+        """Number of indexed lines."""
+        return int(self.line_offsets[-1]) if len(self.line_offsets) else 0
+
+    def _terms_containing(self, fragment: str) -> List[int]:
+        """Term ids whose text contains ``fragment`` (cached per fragment)."""
+        term_ids = self._fragment_terms.get(fragment)
+        if term_ids is None:
+            term_ids = self._fragment_terms[fragment] = [
+                term_id for term, term_id in self.vocab.items() if fragment in term
+            ]
+        return term_ids
+
+    def candidate_lines(self, keywords: Sequence[str]) -> np.ndarray:
+        """Global line ids that may contain any of the keywords.
+
+        Args:
+            keywords: Keywords (matched case-insensitively as substrings)
+
+        Returns:
+            Sorted unique int64 array, a superset of the matching lines
+        """
+        # 按行号打标记求并集/交集，避免对大 postings 做排序去重
+        matched = np.zeros(self.total_lines, dtype=bool)
+        for keyword in keywords:
+            fragments = _TOKEN_RE.findall(fold_case(keyword))
+            if not fragments:
+                # 纯符号关键词无法走倒排，退化为全部行
+                return np.arange(self.total_lines, dtype=np.int64)
+            keyword_mask: Optional[np.ndarray] = None
+            for fragment in fragments:
+                fragment_mask = np.zeros(self.total_lines, dtype=bool)
+                for t in self._terms_containing(fragment):
+                    fragment_mask[
+                        self.postings_lines[self.postings_offsets[t]:self.postings_offsets[t + 1]]
+                    ] = True
+                keyword_mask = (
+                    fragment_mask if keyword_mask is None else keyword_mask & fragment_mask
+                )
+            matched |= keyword_mask
+        return np.flatnonzero(matched).astype(np.int64)
+
+    def file_of(self, lines: np.ndarray) -> np.ndarray:
+        """File id of each global line id."""
+        return np.searchsorted(self.line_offsets, lines, side="right") - 1
+
+    def heading_for(self, line: int, context_lines: int) -> Optional[str]:
+        """Nearest heading within ``context_lines`` above a line (or the line itself).
+
+        Same result as ``ContentSearcher._find_heading_backward``.
+
+        Args:
+            line: Global line id
+            context_lines: Maximum number of lines to look back
+
+        Returns:
+            Formatted heading text, or None
+        """
+        row = int(self.line_heading_row[line])
+        if row < 0:
+            return None
+        local = line - int(self.line_offsets[self.file_of(line)])
+        if row <= max(0, local - context_lines):
+            return None
+        return self.headings[int(self.line_heading_id[line])]
+
+    def section_bounds(self, line: int) -> Tuple[int, int]:
+        """``ContentSearcher._find_heading_boundaries`` of a global line id."""
+        return int(self.prev_heading[line]) + 1, int(self.next_heading[line])
+
+
+def build_content_index(
+    doc_set_dir: Path, doc_set: str, manifest: Optional[Dict[str, List[int]]] = None
+) -> ContentIndex:
+    """Read every docContent.md of a doc-set once and build its line index.
+
+    Args:
+        doc_set_dir: Doc-set directory
+        doc_set: Document set name
+        manifest: Pre-computed manifest (scanned if None)
+
+    Returns:
+        ContentIndex
+    """
+    if manifest is None:
+        manifest = scan_doc_set(doc_set_dir, CONTENT_FILENAME)
+
+    files: List[Dict[str, str]] = []
+    vocab: Dict[str, int] = {}
+    postings: List[List[int]] = []
+    headings: List[str] = []
+    heading_ids: Dict[str, int] = {}
+    line_offsets = [0]
+    tables: Dict[str, List[int]] = {
+        name: [] for name in ("line_heading_row", "line_heading_id", "prev_heading",
+                              "next_heading", "line_words")
+    }
+
+    for page_dir in sorted(manifest):
+        content_file = doc_set_dir / page_dir / CONTENT_FILENAME
+        try:
+            lines = content_file.read_text(encoding="utf-8").split("\n")
+        except (OSError, UnicodeDecodeError):
+            continue
+
+        first_line = lines[0].strip()
+        page_title = first_line.lstrip("#").strip() if first_line.startswith("#") else ""
+        files.append({
+            "page_dir": page_dir,
+            "page_title": page_title or extract_page_title_from_path(str(content_file)),
+        })
+
+        base = line_offsets[-1]
+        heading_row, heading_id, prev = -1, -1, -1
+        is_heading = []
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            match = _HEADING_RE.match(stripped) if stripped else None
+            if match:
+                text = remove_url_from_heading(match.group(2))
+                if text:
+                    heading = f"{match.group(1)} {text}"
+                    heading_row = i
+                    heading_id = heading_ids.setdefault(heading, len(headings))
+                    if heading_id == len(headings):
+                        headings.append(heading)
+            tables["line_heading_row"].append(heading_row)
+            tables["line_heading_id"].append(heading_id)
+
+            tables["prev_heading"].append(prev)
+            heading_line = bool(_HEADING_LINE_RE.match(stripped))
+            is_heading.append(heading_line)
+            if heading_line:
+                prev = i
+                tables["line_words"].append(0)
+            else:
+                cleaned = clean_context_line(stripped)
+                tables["line_words"].append(
+                    count_words(clean_context_from_urls(cleaned)) if cleaned else 0
+                )
+
+            for term in set(_TOKEN_RE.findall(fold_case(line))):
+                term_id = vocab.get(term)
+                if term_id is None:
+                    term_id = vocab[term] = len(postings)
+                    postings.append([])
+                postings[term_id].append(base + i)
+
+        nxt = len(lines)
+        next_heading = [0] * len(lines)
+        for i in range(len(lines) - 1, -1, -1):
+            next_heading[i] = nxt
+            if is_heading[i]:
+                nxt = i
+        tables["next_heading"].extend(next_heading)
+        line_offsets.append(base + len(lines))
+
+    postings_offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    postings_offsets[1:] = np.cumsum([len(p) for p in postings])
+    return ContentIndex(
+        doc_set=doc_set,
+        files=files,
+        vocab=vocab,
+        headings=headings,
+        line_offsets=np.asarray(line_offsets, dtype=np.int64),
+        postings_offsets=postings_offsets,
+        postings_lines=np.fromiter(
+            (line for p in postings for line in p), dtype=np.int64, count=int(postings_offsets[-1])
+        ),
+        manifest=manifest,
+        **{name: np.asarray(values, dtype=np.int32) for name, values in tables.items()},
+    )
+
+
+class ContentIndexStore:
+    """Load, build and persist per doc-set content indexes.
+
+    Like ``BM25IndexStore``: indexes are cached in memory, every ``get``
+    re-stats the doc-set's docContent.md files and rebuilds only a doc-set
+    whose manifest changed. Without a writable index directory the index is
+    kept in memory only.
+    """
+
+    def __init__(self, base_dir: str, index_dir: Optional[str] = None, debug: bool = False):
+        """Initialize the index store.
+
+        Args:
+            base_dir: Knowledge base root directory
+            index_dir: Where to persist indexes (default: ``<base_dir>/.doc4llm_index``)
+            debug: Enable debug mode (default False)
+        """
+        self.base_dir = Path(base_dir)
+        self.index_dir = Path(index_dir) if index_dir else self.base_dir / DEFAULT_INDEX_DIRNAME
+        self.debug = debug
+        self._indexes: Dict[str, ContentIndex] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _debug_print(self, message: str):
+        """Print debug message."""
+        if self.debug:
+            print(f"[DEBUG] {message}")
+
+    def _lock_for(self, doc_set: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(doc_set)
+            if lock is None:
+                lock = self._locks[doc_set] = threading.Lock()
+            return lock
+
+    def _index_path(self, doc_set: str) -> Path:
+        return self.index_dir / doc_set / "content"
+
+    def get(self, doc_set: str) -> ContentIndex:
+        """Get the up-to-date content index of a doc-set, building it if necessary.
+
+        Args:
+            doc_set: Document set name
+
+        Returns:
+            ContentIndex (possibly with zero files)
+        """
+        doc_set_dir = self.base_dir / doc_set
+        manifest = scan_doc_set(doc_set_dir, CONTENT_FILENAME)
+
+        with self._lock_for(doc_set):
+            index = self._indexes.get(doc_set)
+            if index is not None and index.manifest == manifest:
+                return index
+
+            index = self._load(doc_set, manifest)
+            if index is None:
+                self._debug_print(f"Building content index for doc-set: {doc_set}")
+                index = build_content_index(doc_set_dir, doc_set, manifest=manifest)
+                self._save(index)
+            self._indexes[doc_set] = index
+            return index
+
+    def invalidate(self, doc_set: Optional[str] = None) -> None:
+        """Drop in-memory indexes (the on-disk copy is kept).
+
+        Args:
+            doc_set: Doc-set to drop, or None for all
+        """
+        if doc_set is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(doc_set, None)
+
+    def _load(
+        self, doc_set: str, manifest: Dict[str, List[int]]
+    ) -> Optional[ContentIndex]:
+        """Load a persisted index if it matches the current manifest."""
+        index_path = self._index_path(doc_set)
+        try:
+            with open(index_path / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            meta.get("version") != CONTENT_INDEX_FORMAT_VERSION
+            or meta.get("manifest") != manifest
+        ):
+            self._debug_print(f"Content index for {doc_set} is stale")
+            return None
+
+        build_id = meta["build_id"]
+        try:
+            arrays = {
+                name: np.load(index_path / f"{build_id}.{name}.npy", mmap_mode="r")
+                for name in _ARRAY_NAMES
+            }
+        except (OSError, ValueError):
+            return None
+
+        self._debug_print(f"Loaded content index for doc-set: {doc_set}")
+        return ContentIndex(
+            doc_set=doc_set,
+            files=meta["files"],
+            vocab={term: i for i, term in enumerate(meta["vocab"])},
+            headings=meta["headings"],
+            manifest=meta["manifest"],
+            **arrays,
+        )
+
+    def _save(self, index: ContentIndex) -> None:
+        """Persist an index; arrays first, then meta.json via atomic replace."""
+        index_path = self._index_path(index.doc_set)
+        build_id = uuid.uuid4().hex[:12]
+        vocab = [""] * len(index.vocab)
+        for term, term_id in index.vocab.items():
+            vocab[term_id] = term
+        meta: Dict[str, Any] = {
+            "version": CONTENT_INDEX_FORMAT_VERSION,
+            "build_id": build_id,
+            "doc_set": index.doc_set,
+            "manifest": index.manifest,
+            "files": index.files,
+            "headings": index.headings,
+            "vocab": vocab,
+        }
+        try:
+            index_path.mkdir(parents=True, exist_ok=True)
+            for name in _ARRAY_NAMES:
+                np.save(index_path / f"{build_id}.{name}.npy", getattr(index, name))
+            tmp_meta = index_path / f"meta.json.{build_id}.tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_meta, index_path / "meta.json")
+        except OSError as e:
+            self._debug_print(f"Cannot persist content index for {index.doc_set}: {e}")
+            return
+
+        # 清理旧版本的数组文件
+        for path in index_path.iterdir():
+            if path.suffix in (".npy", ".tmp") and not path.name.startswith(build_id):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def clear(self) -> None:
+        """Remove all persisted content indexes and in-memory caches."""
+        self._indexes.clear()
+        if self.index_dir.exists():
+            for doc_set_dir in self.index_dir.iterdir():
+                shutil.rmtree(doc_set_dir / "content", ignore_errors=True)
+
+
+# 进程级 store 缓存，同一知识库的多个 ContentSearcher 实例共享已加载的索引
+_stores: Dict[Tuple[str, Optional[str]], ContentIndexStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_content_index_store(
+    base_dir: str, index_dir: Optional[str] = None, debug: bool = False
+) -> ContentIndexStore:
+    """Get the process-wide content index store for a knowledge base.
+
+    Args:
+        base_dir: Knowledge base root directory
+        index_dir: Optional custom index directory
+        debug: Enable debug mode on newly created stores
+
+    Returns:
+        Shared ContentIndexStore instance
+    """
+    key = (str(Path(base_dir).resolve()), str(Path(index_dir).resolve()) if index_dir else None)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ContentIndexStore(base_dir, index_dir=index_dir, debug=debug)
+        return store
+
+
+__all__ = [
+    "CONTENT_INDEX_FORMAT_VERSION",
+    "CONTENT_FILENAME",
+    "ContentIndex",
+    "ContentIndexStore",
+    "build_content_index",
+    "clean_context_line",
+    "get_content_index_store",
+]
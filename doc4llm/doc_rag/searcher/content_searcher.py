@@ -5,11 +5,14 @@
 - Heading 级去重（page_title + heading）
 - 全局结果数量限制（无每 doc_set 限制）
 - 足够的上下文回溯 heading
+- 行级倒排索引（content_index），查询时只读取命中的文件
 """
 
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
 
 from .common_utils import (
     remove_url_from_heading,
@@ -17,7 +20,9 @@ from .common_utils import (
     count_words,
     clean_context_from_urls,
 )
+from .content_index import ContentIndex, clean_context_line, get_content_index_store
 from .interfaces import BaseSearcher
+from .keyword_matcher import KeywordMatcher, get_keyword_matcher
 
 
 class ContentSearcher(BaseSearcher):
@@ -29,6 +34,7 @@ class ContentSearcher(BaseSearcher):
     - 全局结果数量限制：默认最多 20 条（无每 doc_set 限制）
     - 关键词策略：仅使用 domain_nouns（与原 FALLBACK_2 一致）
     - 上下文搜索：从匹配行向上回溯查找 heading
+    - 行级倒排索引：关键词 -> (文件, 行)，预计算 heading 表与每行词数
     """
 
     def __init__(
@@ -39,6 +45,7 @@ class ContentSearcher(BaseSearcher):
         context_lines: int = 100,
         max_words: int = 100,
         debug: bool = False,
+        index_dir: Optional[str] = None,
     ):
         """初始化 ContentSearcher。
 
@@ -49,6 +56,7 @@ class ContentSearcher(BaseSearcher):
             context_lines: 回溯 heading 的上下文行数（默认 100）
             max_words: 上下文最大词数（默认 80）
             debug: 是否启用调试输出
+            index_dir: 行级索引目录（默认 ``<base_dir>/.doc4llm_index``）
         """
         self.base_dir = Path(base_dir)
         self.domain_nouns = domain_nouns or []
@@ -56,6 +64,7 @@ class ContentSearcher(BaseSearcher):
         self.context_lines = context_lines
         self.max_words = max_words
         self.debug = debug
+        self.index_dir = index_dir
 
     @property
     def name(self) -> str:
@@ -89,36 +98,29 @@ class ContentSearcher(BaseSearcher):
             self._debug_print("No domain_nouns, skipping ContentSearcher")
             return []
 
-        # Step 2: 构建正则表达式
-        pattern = self._build_pattern(keywords)
-        if not pattern:
+        # Step 2: 构建多关键词匹配器
+        matcher = self._build_pattern(keywords)
+        if not matcher:
             return []
 
         # Step 3: 搜索并收集结果
         results = []
         seen: Set[Tuple[str, str, str]] = set()  # (doc_set, page_title, heading) 去重
 
+        store = get_content_index_store(
+            str(self.base_dir), index_dir=self.index_dir, debug=self.debug
+        )
         for doc_set in doc_sets:
-            doc_set_path = self.base_dir / doc_set
-            if not doc_set_path.exists():
+            if not (self.base_dir / doc_set).exists():
                 continue
 
-            # 遍历所有 docContent.md 文件
-            for content_file in doc_set_path.rglob("docContent.md"):
-                file_results = self._search_single_file(
-                    content_file, doc_set, pattern, seen
-                )
-                # 逐个添加结果并检查限制
-                for result in file_results:
-                    results.append(result)
-                    if len(results) >= self.max_results:
-                        self._debug_print(
-                            f"Reached max_results ({self.max_results}), stopping"
-                        )
-                        break
-
-                # 检查是否达到全局限制
+            index = store.get(doc_set)
+            for result in self._search_index(index, keywords, matcher, seen):
+                results.append(result)
                 if len(results) >= self.max_results:
+                    self._debug_print(
+                        f"Reached max_results ({self.max_results}), stopping"
+                    )
                     break
 
             if len(results) >= self.max_results:
@@ -127,33 +129,104 @@ class ContentSearcher(BaseSearcher):
         self._debug_print(f"ContentSearcher: found {len(results)} results")
         return results
 
-    def _build_pattern(self, keywords: List[str]) -> Optional[re.Pattern]:
-        """构建关键词正则表达式。
+    def _build_pattern(self, keywords: List[str]) -> Optional[KeywordMatcher]:
+        """构建关键词匹配器（Aho-Corasick，忽略大小写的子串匹配，按关键词集合缓存）。
 
         Args:
             keywords: 关键词列表
 
         Returns:
-            编译后的正则表达式
+            编译后的关键词匹配器
         """
         if not keywords:
             return None
+        return get_keyword_matcher(keywords)
 
-        # 转义关键词并构建模式
-        escaped = [re.escape(kw) for kw in keywords]
-        pattern_str = "|".join(escaped)
+    def _search_index(
+        self,
+        index: ContentIndex,
+        keywords: List[str],
+        matcher: KeywordMatcher,
+        seen: Set[Tuple[str, str, str]],
+    ):
+        """通过行级索引搜索一个 doc-set，按文件、行顺序逐个产出结果。
 
-        try:
-            return re.compile(pattern_str, re.IGNORECASE)
-        except re.error as e:
-            self._debug_print(f"Pattern error: {e}")
-            return None
+        只读取包含候选行的文件，候选行再用匹配器校验，结果与逐文件扫描一致。
+
+        Args:
+            index: doc-set 的行级索引
+            keywords: 关键词列表
+            matcher: 关键词匹配器
+            seen: 已去重集合
+
+        Yields:
+            与 ``_search_single_file`` 格式相同的结果
+        """
+        candidates = index.candidate_lines(keywords)
+        if not len(candidates):
+            return
+        file_ids = index.file_of(candidates)
+        boundaries = np.flatnonzero(np.diff(file_ids)) + 1
+        doc_set_path = self.base_dir / index.doc_set
+
+        for group in np.split(candidates, boundaries):
+            file_id = int(index.file_of(group[0]))
+            file_info = index.files[file_id]
+            content_file = doc_set_path / file_info["page_dir"] / "docContent.md"
+            offset = int(index.line_offsets[file_id])
+            try:
+                lines = content_file.read_text(encoding="utf-8").split("\n")
+            except Exception as e:
+                self._debug_print(f"Error reading {content_file}: {e}")
+                continue
+
+            if len(lines) != int(index.line_offsets[file_id + 1]) - offset:
+                # 文件在建索引后被修改，退回逐行扫描
+                yield from self._search_single_file(content_file, index.doc_set, matcher, seen)
+                continue
+
+            page_title = file_info["page_title"]
+            toc_path = str(content_file.parent / "docTOC.md")
+            line_words = index.line_words[offset:int(index.line_offsets[file_id + 1])]
+            for line_id in group.tolist():
+                line_num = line_id - offset + 1
+                if not matcher.contains_any(lines[line_num - 1]):
+                    continue
+
+                heading = index.heading_for(line_id, self.context_lines)
+                if not heading:
+                    continue
+
+                key = (index.doc_set, page_title, heading)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                context = self._extract_context(
+                    lines,
+                    line_num,
+                    bounds=index.section_bounds(line_id),
+                    line_words=line_words,
+                )
+                yield {
+                    "doc_set": index.doc_set,
+                    "page_title": page_title,
+                    "heading": heading,
+                    "toc_path": toc_path,
+                    "bm25_sim": 0.0,
+                    "is_basic": True,
+                    "is_precision": False,
+                    "related_context": context,
+                    "source_file": str(content_file),
+                    "match_line_num": line_num,
+                    "source": "FALLBACK_2",
+                }
 
     def _search_single_file(
         self,
         content_file: Path,
         doc_set: str,
-        pattern: re.Pattern,
+        matcher: KeywordMatcher,
         seen: Set[Tuple[str, str, str]],
     ) -> List[Dict[str, Any]]:
         """搜索单个文件。
@@ -161,7 +234,7 @@ class ContentSearcher(BaseSearcher):
         Args:
             content_file: docContent.md 文件路径
             doc_set: 文档集名称
-            pattern: 关键词正则表达式
+            matcher: 关键词匹配器
             seen: 已去重集合
 
         Returns:
@@ -185,7 +258,7 @@ class ContentSearcher(BaseSearcher):
 
         # 搜索所有匹配行
         for line_num, line in enumerate(lines, start=1):
-            if not pattern.search(line):
+            if not matcher.contains_any(line):
                 continue
 
             # 回溯查找 heading
@@ -252,7 +325,12 @@ class ContentSearcher(BaseSearcher):
         return None
 
     def _extract_context(
-        self, lines: List[str], match_line: int, context_size: int = 2
+        self,
+        lines: List[str],
+        match_line: int,
+        context_size: int = 2,
+        bounds: Optional[Tuple[int, int]] = None,
+        line_words: Optional[Sequence[int]] = None,
     ) -> str:
         """提取匹配行周围的上下文（限制在 heading 边界内）。
 
@@ -265,6 +343,8 @@ class ContentSearcher(BaseSearcher):
             lines: 文件所有行
             match_line: 匹配行号（1-based）
             context_size: 初始上下文行数（前后各多少行）
+            bounds: 预计算的 heading 边界（见 ``_find_heading_boundaries``）
+            line_words: 预计算的每行词数（行级索引的 ``line_words``）
 
         Returns:
             上下文文本（不超过 max_words 词，不包含 heading）
@@ -278,7 +358,9 @@ class ContentSearcher(BaseSearcher):
             return ""
 
         # 获取 heading 边界
-        upper_bound, lower_bound = self._find_heading_boundaries(lines, match_line)
+        upper_bound, lower_bound = bounds or self._find_heading_boundaries(
+            lines, match_line
+        )
         match_idx = match_line - 1
         max_words = self.max_words if hasattr(self, "max_words") else 100
 
@@ -291,13 +373,28 @@ class ContentSearcher(BaseSearcher):
             line = lines[i].strip()
             if self._is_heading_line(line):
                 continue
-            line = re.sub(r"^---+\s*", "", line)
+            line = clean_context_line(line)
             if line:
                 all_context_lines.append((i, line))
 
         if not all_context_lines:
             return ""
 
+        # 有预计算词数时直接查表，否则现算
+        word_cache: Dict[str, int] = (
+            {line: int(line_words[i]) for i, line in all_context_lines}
+            if line_words is not None
+            else {}
+        )
+
+        def line_word_count(text: str) -> int:
+            count = word_cache.get(text)
+            if count is None:
+                count = word_cache[text] = self._count_words(
+                    self._clean_context_from_urls(text)
+                )
+            return count
+
         # 步骤2：找到匹配行在列表中的位置
         match_position = next(
             (
@@ -320,14 +417,14 @@ class ContentSearcher(BaseSearcher):
         left_idx = match_position
         right_idx = match_position
         selected: List[str] = [all_context_lines[match_position][1]]
-        current_words = self._count_words(self._clean_context_from_urls(selected[0]))
+        current_words = line_word_count(selected[0])
 
         # 交替向两边扩展
         while left_idx > 0 or right_idx < len(all_context_lines) - 1:
             # 尝试左边
             if left_idx > 0:
                 left_line = all_context_lines[left_idx - 1][1]
-                left_words = self._count_words(self._clean_context_from_urls(left_line))
+                left_words = line_word_count(left_line)
                 if current_words + left_words <= max_words:
                     selected.insert(0, left_line)
                     current_words += left_words
@@ -337,9 +434,7 @@ class ContentSearcher(BaseSearcher):
             # 尝试右边
             if right_idx < len(all_context_lines) - 1:
                 right_line = all_context_lines[right_idx + 1][1]
-                right_words = self._count_words(
-                    self._clean_context_from_urls(right_line)
-                )
+                right_words = line_word_count(right_line)
                 if current_words + right_words <= max_words:
                     selected.append(right_line)
                     current_words += right_words
@@ -354,9 +449,7 @@ class ContentSearcher(BaseSearcher):
             if len(selected) > 1:
                 # 去掉最远的一行
                 removed = selected.pop(0 if left_idx < match_position else -1)
-                current_words -= self._count_words(
-                    self._clean_context_from_urls(removed)
-                )
+                current_words -= line_word_count(removed)
                 left_idx = max(left_idx, match_position - len(selected))
             else:
                 # 只剩一行，截断到 max_words
@@ -0,0 +1,714 @@
+"""
+Prebuilt dense vector index of page titles and headings per doc-set.
+
+语义匹配原先只作为 BM25 候选的 rerank，BM25 没召回的页面永远不会被语义模型看到。
+这里离线把 doc-set 的所有 page title 与 heading 用本地模型向量化，存成 numpy 矩阵，
+查询时只需编码 query 本身，再做暴力或 IVF 最近邻搜索。
+
+On-disk layout (next to the BM25 page index)::
+
+    <index_dir>/<doc_set>/dense/<model_slug>/
+        meta.json                      # manifest + model + quantization + entry table
+        <build_id>.vectors.npy         # float32[N, D]  L2-normalized embeddings (float16 when quantized)
+        <build_id>.codes.npy           # int8[N, D] / uint8[N, D/8]  quantized vectors (empty: none)
+        <build_id>.scales.npy          # float32[D]     int8 scale per dimension (empty otherwise)
+        <build_id>.entry_pages.npy     # int32[N]       page id of each row
+        <build_id>.entry_headings.npy  # int32[N]       heading index in the page (-1: page title row)
+        <build_id>.centroids.npy       # float32[K, D]  IVF centroids (K = 0: brute force)
+        <build_id>.list_offsets.npy    # int64[K+1]     CSR offsets of the IVF lists
+        <build_id>.list_rows.npy       # int32[N]       rows grouped by IVF list
+
+Page ids, page titles and parsed headings are those of the doc-set's BM25
+index (``bm25_index.DocSetIndex``), so the dense index is rebuilt exactly
+when the BM25 index is.
+
+Quantization (``quantization="int8"`` or ``"binary"``): candidates are
+scored on the compact codes only, then the best ``rescore_factor * top_k``
+are rescored exactly against the float16 originals. The originals are
+memory-mapped, so only the rescored rows are paged in. ``memory_usage()``
+and ``evaluate_recall()`` show what this saves and what it costs.
+
+Offline build::
+
+    $ python -m doc4llm.doc_rag.searcher.dense_index --base-dir /path/to/md_docs --ivf-lists 64
+
+Example:
+    >>> from doc4llm.doc_rag.searcher.dense_index import get_dense_index_store
+    >>> store = get_dense_index_store("/path/to/md_docs")
+    >>> index = store.get("Claude_Code_Docs@latest", model_id, encode)
+    >>> hits = index.search(encode(["hooks configuration"]), top_k=10)
+
+    $ python -m doc4llm.doc_rag.searcher.dense_index --base-dir /path/to/md_docs --quantization int8 --report
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bm25_index import DEFAULT_INDEX_DIRNAME, DocSetIndex, get_index_store
+
+# 索引格式版本，格式变化时递增以触发重建
+DENSE_INDEX_FORMAT_VERSION = 2
+
+QUANTIZATION_TYPES = ("none", "int8", "binary")
+
+# 量化打分时每块的行数，解码后的临时数组保持在 CPU cache 内
+_SCAN_BLOCK_ROWS = 256
+
+# 每个字节解码为 8 个 +-1（高位在前，与 np.packbits 一致）
+_BYTE_SIGNS = (np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1) * 2.0 - 1).astype(
+    np.float32
+)
+
+_ARRAY_NAMES = (
+    "vectors",
+    "codes",
+    "scales",
+    "entry_pages",
+    "entry_headings",
+    "centroids",
+    "list_offsets",
+    "list_rows",
+)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (zero rows are left as they are)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def quantize_vectors(
+    vectors: np.ndarray, quantization: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compact codes of normalized vectors for candidate generation.
+
+    Args:
+        vectors: L2-normalized float32 vectors of shape (N, D)
+        quantization: "none", "int8" (symmetric, one scale per dimension)
+            or "binary" (sign bits packed 8 per byte)
+
+    Returns:
+        Tuple of (originals to keep, codes, scales). Originals are float16
+        when quantized; codes and scales are empty for "none".
+    """
+    if quantization not in QUANTIZATION_TYPES:
+        raise ValueError(
+            f"Invalid quantization: '{quantization}'. Must be one of {QUANTIZATION_TYPES}"
+        )
+    dim = vectors.shape[1] if vectors.ndim == 2 else 0
+    no_scales = np.zeros(0, dtype=np.float32)
+    if quantization == "none":
+        return vectors, np.zeros((len(vectors), 0), dtype=np.int8), no_scales
+
+    originals = vectors.astype(np.float16)
+    if quantization == "binary":
+        return originals, np.packbits(vectors > 0, axis=1), no_scales
+
+    max_abs = np.abs(vectors).max(axis=0) if len(vectors) else np.zeros(dim, dtype=np.float32)
+    scales = (np.where(max_abs == 0, 1, max_abs) / 127).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+    return originals, codes, scales
+
+
+def entry_texts(bm25_index: DocSetIndex) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Texts to embed for a doc-set: every page title, then its headings.
+
+    Args:
+        bm25_index: BM25 index of the doc-set (page titles and parsed headings)
+
+    Returns:
+        Tuple of (texts, page id per text, heading index per text or -1)
+    """
+    texts: List[str] = []
+    pages: List[int] = []
+    headings: List[int] = []
+    for page_id, page_title in enumerate(bm25_index.page_titles):
+        texts.append(page_title)
+        pages.append(page_id)
+        headings.append(-1)
+        for heading_idx, heading in enumerate(bm25_index.headings[page_id]):
+            texts.append(heading["text"])
+            pages.append(page_id)
+            headings.append(heading_idx)
+    return (
+        texts,
+        np.asarray(pages, dtype=np.int32),
+        np.asarray(headings, dtype=np.int32),
+    )
+
+
+def train_ivf(
+    vectors: np.ndarray, num_lists: int, iterations: int = 10, seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Spherical k-means partition of normalized vectors into IVF lists.
+
+    Args:
+        vectors: L2-normalized vectors of shape (N, D)
+        num_lists: Number of IVF lists (clamped to N)
+        iterations: k-means iterations
+        seed: Random seed for centroid initialization
+
+    Returns:
+        Tuple of (centroids [K, D], list_offsets [K+1], list_rows [N])
+    """
+    n = len(vectors)
+    num_lists = min(num_lists, n)
+    if num_lists <= 0:
+        return (
+            np.zeros((0, vectors.shape[1] if vectors.ndim == 2 else 0), dtype=np.float32),
+            np.zeros(1, dtype=np.int64),
+            np.zeros(0, dtype=np.int32),
+        )
+
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(n, size=num_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=num_lists)
+        # 空簇保留原质心
+        filled = counts > 0
+        centroids[filled] = _normalize_rows(sums[filled])
+    assign = np.argmax(vectors @ centroids.T, axis=1)
+
+    list_rows = np.argsort(assign, kind="stable").astype(np.int32)
+    list_offsets = np.zeros(num_lists + 1, dtype=np.int64)
+    list_offsets[1:] = np.cumsum(np.bincount(assign, minlength=num_lists))
+    return centroids.astype(np.float32), list_offsets, list_rows
+
+
+@dataclass
+class DenseIndex:
+    """Embeddings of the page titles and headings of one doc-set.
+
+    Attributes:
+        doc_set: Document set name
+        model_id: Embedding model the vectors were computed with
+        vectors: L2-normalized embeddings, one row per entry (float32, or
+            the float16 originals used for rescoring when quantized)
+        entry_pages: Page id of each row (index into the BM25 page table)
+        entry_headings: Heading index within the page, -1 for the page title row
+        centroids: IVF centroids (empty: brute-force search only)
+        list_offsets: CSR offsets of the IVF lists into ``list_rows``
+        list_rows: Rows grouped by IVF list
+        manifest: ``{page_dir_name: [mtime_ns, size]}`` of the indexed TOCs
+        quantization: "none", "int8" or "binary"
+        codes: Quantized vectors scanned for candidates (empty: none)
+        scales: Per-dimension int8 scales (empty unless int8)
+    """
+
+    doc_set: str
+    model_id: str
+    vectors: np.ndarray
+    entry_pages: np.ndarray
+    entry_headings: np.ndarray
+    centroids: np.ndarray
+    list_offsets: np.ndarray
+    list_rows: np.ndarray
+    manifest: Dict[str, List[int]] = field(default_factory=dict)
+    quantization: str = "none"
+    codes: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.int8))
+    scales: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+
+    @property
+    def size(self) -> int:
+        """Number of indexed entries."""
+        return len(self.entry_pages)
+
+    @property
+    def dim(self) -> int:
+        """Embedding dimension."""
+        return self.vectors.shape[1] if self.vectors.ndim == 2 else 0
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes scanned per query versus bytes only touched for rescoring.
+
+        Returns:
+            Dict with ``scan_bytes`` (codes or float32 vectors plus the IVF and
+            entry tables, what a worker keeps hot), ``rescore_bytes`` (float16
+            originals, memory-mapped, 0 without quantization) and
+            ``float32_bytes`` (the unquantized matrix, for comparison)
+        """
+        tables = sum(
+            getattr(self, name).nbytes
+            for name in (
+                "entry_pages", "entry_headings", "centroids", "list_offsets", "list_rows", "scales"
+            )
+        )
+        quantized = self.quantization != "none"
+        return {
+            "doc_set": self.doc_set,
+            "entries": self.size,
+            "dim": self.dim,
+            "quantization": self.quantization,
+            "scan_bytes": tables + (self.codes.nbytes if quantized else self.vectors.nbytes),
+            "rescore_bytes": self.vectors.nbytes if quantized else 0,
+            "float32_bytes": self.size * self.dim * 4,
+        }
+
+    def candidate_rows(self, query_vectors: np.ndarray, probes: int) -> Optional[np.ndarray]:
+        """Rows in the ``probes`` IVF lists nearest to any query (None: all rows).
+
+        Args:
+            query_vectors: L2-normalized query embeddings of shape (Q, D)
+            probes: Number of IVF lists to visit per query
+
+        Returns:
+            Sorted row ids, or None when the search should be brute force
+        """
+        num_lists = len(self.centroids)
+        if num_lists == 0 or probes >= num_lists:
+            return None
+        nearest = np.argpartition(-(query_vectors @ self.centroids.T), probes - 1, axis=1)
+        lists = np.unique(nearest[:, :probes])
+        return np.sort(np.concatenate([
+            self.list_rows[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists
+        ]))
+
+    def _approximate_scores(self, query_vectors: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Scores of the quantized codes, block by block (best over queries).
+
+        int8 folds the scales into the queries, so each block is one float32
+        BLAS product. Binary keeps the queries in float (asymmetric, which
+        recalls far better than Hamming distance): each query gets a table of
+        its dot product with all 256 sign patterns of every code byte, and a
+        row's score is the sum of its bytes' table entries.
+        """
+        n = self.size if rows is None else len(rows)
+        scores = np.empty(n, dtype=np.float32)
+        if self.quantization == "int8":
+            queries = (query_vectors * self.scales).T.astype(np.float32)
+            block_rows = _SCAN_BLOCK_ROWS
+        else:
+            code_bytes = self.codes.shape[1]
+            padded = np.zeros((len(query_vectors), code_bytes * 8), dtype=np.float32)
+            padded[:, :self.dim] = query_vectors / np.sqrt(self.dim)
+            tables = (padded.reshape(len(padded), code_bytes, 8) @ _BYTE_SIGNS.T).reshape(
+                len(padded), -1
+            )
+            byte_offsets = np.arange(code_bytes, dtype=np.intp) * 256
+            block_rows = _SCAN_BLOCK_ROWS * 16
+        for start in range(0, n, block_rows):
+            stop = min(start + block_rows, n)
+            block = self.codes[start:stop] if rows is None else self.codes[rows[start:stop]]
+            if self.quantization == "int8":
+                scores[start:stop] = (block.astype(np.float32) @ queries).max(axis=1)
+            else:
+                positions = block.astype(np.intp) + byte_offsets
+                scores[start:stop] = np.max([table[positions].sum(axis=1) for table in tables], axis=0)
+        return scores
+
+    def search(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int = 10,
+        probes: int = 8,
+        rescore_factor: int = 10,
+    ) -> List[Tuple[int, float]]:
+        """Nearest entries to a set of queries (score = best cosine over queries).
+
+        Args:
+            query_vectors: Query embeddings of shape (Q, D) (normalized here)
+            top_k: Number of rows to return
+            probes: IVF lists to visit per query (ignored without IVF)
+            rescore_factor: With quantization, ``rescore_factor * top_k``
+                candidates are rescored exactly against the originals
+
+        Returns:
+            List of (row, score) sorted by score descending, ties by row
+        """
+        if self.size == 0 or top_k <= 0 or len(query_vectors) == 0:
+            return []
+        query_vectors = _normalize_rows(query_vectors)
+
+        rows = self.candidate_rows(query_vectors, probes)
+        if rows is None:
+            rows = np.arange(self.size)
+        if self.quantization != "none":
+            approx = self._approximate_scores(query_vectors, None if len(rows) == self.size else rows)
+            rows = np.sort(rows[_top_indices(approx, max(top_k * rescore_factor, top_k))])
+
+        # 行号有序，mmap 的原始向量按顺序读取
+        vectors = self.vectors if len(rows) == self.size else self.vectors[rows]
+        scores = (np.asarray(vectors, dtype=np.float32) @ query_vectors.T).max(axis=1)
+
+        keep = _top_indices(scores, top_k)
+        order = keep[np.lexsort((rows[keep], -scores[keep]))]
+        return [(int(rows[i]), float(scores[i])) for i in order]
+
+
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores (unordered)."""
+    if k < len(scores):
+        return np.argpartition(-scores, k - 1)[:k]
+    return np.arange(len(scores))
+
+
+def evaluate_recall(
+    index: DenseIndex,
+    query_vectors: np.ndarray,
+    top_k: int = 10,
+    probes: int = 8,
+    rescore_factor: int = 10,
+) -> float:
+    """Recall@k of ``index.search`` against exact brute-force search.
+
+    Each query is searched on its own; the exact reference scans every
+    row of ``index.vectors`` without IVF or quantization.
+
+    Args:
+        index: Dense index to evaluate
+        query_vectors: Query embeddings of shape (Q, D)
+        top_k: k of recall@k
+        probes: IVF lists to visit per query
+        rescore_factor: Rescoring depth for quantized indexes
+
+    Returns:
+        Mean fraction of the exact top-k rows that the index returns
+    """
+    if index.size == 0 or len(query_vectors) == 0:
+        return 1.0
+    query_vectors = _normalize_rows(query_vectors)
+    exact_scores = np.asarray(index.vectors, dtype=np.float32) @ query_vectors.T
+    recalls = []
+    for q, query in enumerate(query_vectors):
+        exact = set(_top_indices(exact_scores[:, q], top_k).tolist())
+        found = {row for row, _ in index.search(query[None, :], top_k, probes, rescore_factor)}
+        recalls.append(len(exact & found) / len(exact))
+    return float(np.mean(recalls))
+
+
+def build_dense_index(
+    bm25_index: DocSetIndex,
+    model_id: str,
+    encode: Callable[[List[str]], np.ndarray],
+    ivf_lists: int = 0,
+    quantization: str = "none",
+) -> DenseIndex:
+    """Embed every page title and heading of a doc-set.
+
+    Args:
+        bm25_index: BM25 index of the doc-set (source of titles and headings)
+        model_id: Embedding model identifier (stored for staleness checks)
+        encode: Encodes a list of texts with ``model_id`` to an (N, D) array
+        ivf_lists: Number of IVF lists (0: brute-force search only)
+        quantization: "none", "int8" or "binary" (see ``quantize_vectors``)
+
+    Returns:
+        DenseIndex
+    """
+    texts, entry_pages, entry_headings = entry_texts(bm25_index)
+    if texts:
+        vectors = _normalize_rows(encode(texts))
+    else:
+        vectors = np.zeros((0, 0), dtype=np.float32)
+    centroids, list_offsets, list_rows = train_ivf(vectors, ivf_lists)
+    originals, codes, scales = quantize_vectors(vectors, quantization)
+    return DenseIndex(
+        doc_set=bm25_index.doc_set,
+        model_id=model_id,
+        vectors=originals,
+        entry_pages=entry_pages,
+        entry_headings=entry_headings,
+        centroids=centroids,
+        list_offsets=list_offsets,
+        list_rows=list_rows,
+        manifest=bm25_index.manifest,
+        quantization=quantization,
+        codes=codes,
+        scales=scales,
+    )
+
+
+class DenseIndexStore:
+    """Load, build and persist per doc-set dense indexes.
+
+    Like ``ContentIndexStore``: indexes are cached in memory and rebuilt
+    only when the doc-set's TOC manifest, the model, the IVF setting or
+    the quantization changes. Without a writable index directory the index is kept in
+    memory only.
+    """
+
+    def __init__(self, base_dir: str, index_dir: Optional[str] = None, debug: bool = False):
+        """Initialize the index store.
+
+        Args:
+            base_dir: Knowledge base root directory
+            index_dir: Where to persist indexes (default: ``<base_dir>/.doc4llm_index``)
+            debug: Enable debug mode (default False)
+        """
+        self.base_dir = Path(base_dir)
+        self.index_dir = Path(index_dir) if index_dir else self.base_dir / DEFAULT_INDEX_DIRNAME
+        self.debug = debug
+        self._bm25_store = get_index_store(base_dir, index_dir=index_dir, debug=debug)
+        self._indexes: Dict[Tuple[str, str], DenseIndex] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _debug_print(self, message: str):
+        """Print debug message."""
+        if self.debug:
+            print(f"[DEBUG] {message}")
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _index_path(self, doc_set: str, model_id: str) -> Path:
+        return self.index_dir / doc_set / "dense" / re.sub(r"[^\w.-]+", "_", model_id)
+
+    def bm25_index(self, doc_set: str) -> DocSetIndex:
+        """BM25 index providing the page table the dense rows refer to."""
+        return self._bm25_store.get(doc_set)
+
+    def get(
+        self,
+        doc_set: str,
+        model_id: str,
+        encode: Callable[[List[str]], np.ndarray],
+        ivf_lists: int = 0,
+        quantization: str = "none",
+    ) -> DenseIndex:
+        """Get the up-to-date dense index of a doc-set, building it if necessary.
+
+        Args:
+            doc_set: Document set name
+            model_id: Embedding model identifier
+            encode: Encodes texts with ``model_id`` (only called on rebuild)
+            ivf_lists: Number of IVF lists (0: brute force)
+            quantization: "none", "int8" or "binary"
+
+        Returns:
+            DenseIndex (possibly empty)
+        """
+        bm25_index = self.bm25_index(doc_set)
+        key = (doc_set, model_id)
+
+        with self._lock_for(key):
+            index = self._indexes.get(key)
+            if (
+                index is not None
+                and index.manifest == bm25_index.manifest
+                and len(index.centroids) == min(ivf_lists, index.size)
+                and index.quantization == quantization
+            ):
+                return index
+
+            index = self._load(doc_set, model_id, bm25_index.manifest, ivf_lists, quantization)
+            if index is None:
+                self._debug_print(f"Building dense index for doc-set: {doc_set} ({model_id})")
+                index = build_dense_index(
+                    bm25_index, model_id, encode, ivf_lists=ivf_lists, quantization=quantization
+                )
+                self._save(index, ivf_lists)
+            self._indexes[key] = index
+            return index
+
+    def _load(
+        self,
+        doc_set: str,
+        model_id: str,
+        manifest: Dict[str, List[int]],
+        ivf_lists: int,
+        quantization: str,
+    ) -> Optional[DenseIndex]:
+        """Load a persisted index if it matches manifest, model, IVF and quantization."""
+        index_path = self._index_path(doc_set, model_id)
+        try:
+            with open(index_path / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            meta.get("version") != DENSE_INDEX_FORMAT_VERSION
+            or meta.get("model_id") != model_id
+            or meta.get("ivf_lists") != ivf_lists
+            or meta.get("quantization") != quantization
+            or meta.get("manifest") != manifest
+        ):
+            self._debug_print(f"Dense index for {doc_set} is stale")
+            return None
+
+        build_id = meta["build_id"]
+        try:
+            arrays = {
+                name: np.load(index_path / f"{build_id}.{name}.npy", mmap_mode="r")
+                for name in _ARRAY_NAMES
+            }
+        except (OSError, ValueError):
+            return None
+
+        self._debug_print(f"Loaded dense index for doc-set: {doc_set}")
+        return DenseIndex(
+            doc_set=doc_set,
+            model_id=model_id,
+            manifest=meta["manifest"],
+            quantization=quantization,
+            **arrays,
+        )
+
+    def _save(self, index: DenseIndex, ivf_lists: int) -> None:
+        """Persist an index; arrays first, then meta.json via atomic replace."""
+        index_path = self._index_path(index.doc_set, index.model_id)
+        build_id = uuid.uuid4().hex[:12]
+        meta: Dict[str, Any] = {
+            "version": DENSE_INDEX_FORMAT_VERSION,
+            "build_id": build_id,
+            "doc_set": index.doc_set,
+            "model_id": index.model_id,
+            "ivf_lists": ivf_lists,
+            "quantization": index.quantization,
+            "manifest": index.manifest,
+        }
+        try:
+            index_path.mkdir(parents=True, exist_ok=True)
+            for name in _ARRAY_NAMES:
+                np.save(index_path / f"{build_id}.{name}.npy", getattr(index, name))
+            tmp_meta = index_path / f"meta.json.{build_id}.tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_meta, index_path / "meta.json")
+        except OSError as e:
+            self._debug_print(f"Cannot persist dense index for {index.doc_set}: {e}")
+            return
+
+        # 清理旧版本的数组文件
+        for path in index_path.iterdir():
+            if path.suffix in (".npy", ".tmp") and not path.name.startswith(build_id):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def invalidate(self, doc_set: Optional[str] = None) -> None:
+        """Drop in-memory indexes (the on-disk copy is kept).
+
+        Args:
+            doc_set: Doc-set to drop, or None for all
+        """
+        if doc_set is None:
+            self._indexes.clear()
+        else:
+            for key in [k for k in self._indexes if k[0] == doc_set]:
+                del self._indexes[key]
+
+    def memory_usage(self) -> List[Dict[str, Any]]:
+        """``DenseIndex.memory_usage()`` of every index loaded in this process."""
+        return [index.memory_usage() for index in self._indexes.values()]
+
+
+# 进程级 store 缓存
+_stores: Dict[Tuple[str, Optional[str]], DenseIndexStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_dense_index_store(
+    base_dir: str, index_dir: Optional[str] = None, debug: bool = False
+) -> DenseIndexStore:
+    """Get the process-wide dense index store for a knowledge base.
+
+    Args:
+        base_dir: Knowledge base root directory
+        index_dir: Optional custom index directory
+        debug: Enable debug mode on newly created stores
+
+    Returns:
+        Shared DenseIndexStore instance
+    """
+    key = (str(Path(base_dir).resolve()), str(Path(index_dir).resolve()) if index_dir else None)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = DenseIndexStore(base_dir, index_dir=index_dir, debug=debug)
+        return store
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Offline job: embed the page titles and headings of doc-sets with the local model."""
+    from .dense_searcher import DenseSearcher, DenseSearcherConfig
+
+    parser = argparse.ArgumentParser(
+        description="Build dense page-title/heading indexes for doc-sets"
+    )
+    parser.add_argument("--base-dir", required=True, help="Knowledge base root directory")
+    parser.add_argument("--doc-sets", nargs="*", help="Doc-sets to index (default: all)")
+    parser.add_argument("--index-dir", default=None, help="Custom index directory")
+    parser.add_argument("--ivf-lists", type=int, default=0, help="IVF lists (0: brute force)")
+    parser.add_argument(
+        "--quantization", choices=QUANTIZATION_TYPES, default="none", help="Vector quantization"
+    )
+    parser.add_argument(
+        "--report", action="store_true",
+        help="Print memory per doc-set and recall@10 against exact search",
+    )
+    parser.add_argument("--device", default="cpu", help="Local model device")
+    parser.add_argument("--debug", action="store_true", help="Enable debug output")
+    args = parser.parse_args(argv)
+
+    searcher = DenseSearcher(
+        base_dir=args.base_dir,
+        config=DenseSearcherConfig(
+            index_type="ivf" if args.ivf_lists else "flat",
+            ivf_lists=args.ivf_lists,
+            quantization=args.quantization,
+            device=args.device,
+            index_dir=args.index_dir,
+            debug=args.debug,
+        ),
+    )
+    doc_sets = args.doc_sets or sorted(
+        p.name for p in Path(args.base_dir).iterdir() if p.is_dir() and "@" in p.name
+    )
+    for doc_set in doc_sets:
+        index = searcher.get_index(doc_set)
+        print(f"{doc_set}: {index.size} entries, {len(index.centroids)} IVF lists ({index.model_id})")
+        if args.report and index.size:
+            usage = index.memory_usage()
+            # 用随机抽取的条目向量作为查询
+            sample = np.random.default_rng(0).choice(index.size, size=min(200, index.size), replace=False)
+            recall = evaluate_recall(
+                index,
+                np.asarray(index.vectors[np.sort(sample)], dtype=np.float32),
+                top_k=10,
+                probes=searcher.config.ivf_probes,
+                rescore_factor=searcher.config.rescore_factor,
+            )
+            print(
+                f"  {usage['quantization']}: scan {usage['scan_bytes'] / 2**20:.1f} MiB, "
+                f"rescore {usage['rescore_bytes'] / 2**20:.1f} MiB "
+                f"(float32 {usage['float32_bytes'] / 2**20:.1f} MiB), recall@10 {recall:.3f}"
+            )
+    return 0
+
+
+__all__ = [
+    "DENSE_INDEX_FORMAT_VERSION",
+    "DenseIndex",
+    "DenseIndexStore",
+    "QUANTIZATION_TYPES",
+    "build_dense_index",
+    "entry_texts",
+    "evaluate_recall",
+    "get_dense_index_store",
+    "quantize_vectors",
+    "train_ivf",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
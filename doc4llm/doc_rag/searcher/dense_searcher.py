@@ -0,0 +1,285 @@
+"""
+DENSE: Embedding nearest-neighbour search over page titles and headings.
+
+Recall from a prebuilt dense index (see dense_index.py) instead of reranking
+BM25 candidates, so pages without lexical overlap with the query can still be
+found. At query time only the queries are embedded.
+
+Example:
+    >>> from doc4llm.doc_rag.searcher.dense_searcher import register_dense_searcher
+    >>> register_dense_searcher("/path/to/md_docs")
+    >>> from doc4llm.doc_rag.searcher import get_registry
+    >>> results = get_registry().get("dense").search(["hooks"], ["Claude_Code_Docs@latest"])
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .dense_index import QUANTIZATION_TYPES, DenseIndex, get_dense_index_store
+from .interfaces import BaseSearcher
+from .searcher_registry import SearcherRegistry, get_registry
+
+
+@dataclass
+class DenseSearcherConfig:
+    """Dense (embedding) searcher configuration.
+
+    Attributes:
+        top_k: Maximum number of entries returned per doc-set (default 20)
+        threshold_headings: Minimum cosine similarity of a result (default 0.5)
+        threshold_precision: Cosine similarity for is_precision (default 0.7)
+        index_type: "flat" (brute force) or "ivf" (default "flat")
+        ivf_lists: IVF lists per doc-set, 0 = sqrt(entries) (default 0)
+        ivf_probes: IVF lists visited per query (default 8)
+        quantization: Vector storage, "none", "int8" or "binary" (default "none")
+        rescore_factor: Quantized candidates rescored exactly per result (default 10)
+        device: Local model device (default "cpu")
+        local_model_zh: Chinese local model ID (default "BAAI/bge-base-zh-v1.5")
+        local_model_en: English local model ID (default "BAAI/bge-base-en-v1.5")
+        lang_threshold: Chinese character ratio that selects the Chinese model (default 0.9)
+        index_dir: Custom index directory (default: ``<base_dir>/.doc4llm_index``)
+        debug: Enable debug mode (default False)
+    """
+
+    top_k: int = 20
+    threshold_headings: float = 0.5
+    threshold_precision: float = 0.7
+    index_type: str = "flat"
+    ivf_lists: int = 0
+    ivf_probes: int = 8
+    quantization: str = "none"
+    rescore_factor: int = 10
+    device: str = "cpu"
+    local_model_zh: str = "BAAI/bge-base-zh-v1.5"
+    local_model_en: str = "BAAI/bge-base-en-v1.5"
+    lang_threshold: float = 0.9
+    index_dir: Optional[str] = None
+    debug: bool = False
+
+
+class DenseSearcher(BaseSearcher):
+    """DENSE: nearest-neighbour search over embedded page titles and headings.
+
+    The model is chosen per doc-set from its page titles (Chinese or
+    English local model, like TransformerMatcher), the index is built on
+    first use if the offline job has not run yet, and each query is scored
+    against every entry (flat) or the nearest IVF lists (ivf). With
+    quantization the scan runs on int8 or binary codes and only the best
+    candidates are rescored against the float16 originals.
+
+    Attributes:
+        base_dir: Knowledge base root directory
+        config: Searcher configuration
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        config: Optional[DenseSearcherConfig] = None,
+        matcher: Optional[Any] = None,
+    ):
+        """Initialize DenseSearcher.
+
+        Args:
+            base_dir: Knowledge base root directory
+            config: Searcher configuration (uses defaults if not provided)
+            matcher: Embedding matcher with ``encode(texts, model_id)`` and
+                ``model_id_for(texts)`` (default: local TransformerMatcher)
+        """
+        self.base_dir = base_dir
+        self.config = config or DenseSearcherConfig()
+        if self.config.index_type not in ("flat", "ivf"):
+            raise ValueError(
+                f"Invalid index_type: '{self.config.index_type}'. Must be 'flat' or 'ivf'"
+            )
+        if self.config.quantization not in QUANTIZATION_TYPES:
+            raise ValueError(
+                f"Invalid quantization: '{self.config.quantization}'. "
+                f"Must be one of {QUANTIZATION_TYPES}"
+            )
+        self._matcher = matcher
+        self._store = get_dense_index_store(
+            base_dir, index_dir=self.config.index_dir, debug=self.config.debug
+        )
+
+    @property
+    def name(self) -> str:
+        """Get the searcher name.
+
+        Returns:
+            Human-readable name identifying this searcher
+        """
+        return "DENSE"
+
+    def _debug_print(self, message: str):
+        """Print debug message."""
+        if self.config.debug:
+            print(f"[DEBUG] {message}")
+
+    @property
+    def matcher(self):
+        """Embedding matcher (local TransformerMatcher created on first use)."""
+        if self._matcher is None:
+            from doc4llm.tool.md_doc_retrieval.transformer_matcher import (
+                TransformerConfig,
+                TransformerMatcher,
+            )
+
+            self._matcher = TransformerMatcher(
+                TransformerConfig(
+                    use_local=True,
+                    device=self.config.device,
+                    local_model_zh=self.config.local_model_zh,
+                    local_model_en=self.config.local_model_en,
+                    lang_threshold=self.config.lang_threshold,
+                )
+            )
+        return self._matcher
+
+    def _ivf_lists(self, doc_set: str) -> int:
+        if self.config.index_type != "ivf":
+            return 0
+        if self.config.ivf_lists:
+            return self.config.ivf_lists
+        entries = sum(
+            1 + len(headings) for headings in self._store.bm25_index(doc_set).headings
+        )
+        return max(1, int(np.sqrt(entries)))
+
+    def _encoder(self, model_id: str) -> Callable[[List[str]], np.ndarray]:
+        return lambda texts: self.matcher.encode(texts, model_id=model_id)
+
+    def get_index(self, doc_set: str) -> DenseIndex:
+        """Get (building if necessary) the dense index of a doc-set.
+
+        Args:
+            doc_set: Document set name
+
+        Returns:
+            DenseIndex
+        """
+        page_titles = self._store.bm25_index(doc_set).page_titles
+        model_id = self.matcher.model_id_for(page_titles)
+        return self._store.get(
+            doc_set,
+            model_id,
+            self._encoder(model_id),
+            ivf_lists=self._ivf_lists(doc_set),
+            quantization=self.config.quantization,
+        )
+
+    def search(
+        self, queries: List[str], doc_sets: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Execute DENSE search.
+
+        Args:
+            queries: List of search queries
+            doc_sets: List of doc-set names to search
+
+        Returns:
+            List of heading results; a matching page title row is reported as
+            a page-level result with ``heading`` None. ``rerank_sim`` holds
+            the cosine similarity.
+        """
+        queries = [q for q in queries if q and q.strip()]
+        if not queries:
+            return []
+
+        query_vectors: Dict[str, np.ndarray] = {}
+        results: List[Dict[str, Any]] = []
+        for doc_set in doc_sets:
+            if not (Path(self.base_dir) / doc_set).is_dir():
+                continue
+            index = self.get_index(doc_set)
+            if index.size == 0:
+                continue
+            if index.model_id not in query_vectors:
+                query_vectors[index.model_id] = self.matcher.encode(
+                    queries, model_id=index.model_id
+                )
+
+            hits = index.search(
+                query_vectors[index.model_id],
+                top_k=self.config.top_k,
+                probes=self.config.ivf_probes,
+                rescore_factor=self.config.rescore_factor,
+            )
+            results.extend(self._to_results(doc_set, index, hits))
+            self._debug_print(f"DENSE: {doc_set} -> {len(hits)} hits")
+        return results
+
+    def _to_results(
+        self, doc_set: str, index: DenseIndex, hits: List[Tuple[int, float]]
+    ) -> List[Dict[str, Any]]:
+        """Convert index hits to searcher results (best score per heading or page title)."""
+        bm25_index = self._store.bm25_index(doc_set)
+        best: Dict[Tuple[int, int], float] = {}
+        for row, score in hits:
+            if score < self.config.threshold_headings:
+                continue
+            page_id = int(index.entry_pages[row])
+            # heading_idx 为 -1 表示 page title 行
+            heading_idx = int(index.entry_headings[row])
+            if heading_idx >= len(bm25_index.headings[page_id]):
+                continue
+            key = (page_id, heading_idx)
+            best[key] = max(best.get(key, score), score)
+
+        results = []
+        for (page_id, heading_idx), score in best.items():
+            page_title = bm25_index.page_titles[page_id]
+            heading = (
+                bm25_index.headings[page_id][heading_idx]["full_text"]
+                if heading_idx >= 0
+                else None
+            )
+            results.append(
+                {
+                    "doc_set": doc_set,
+                    "page_title": page_title,
+                    "heading": heading,
+                    "toc_path": str(Path(self.base_dir) / doc_set / page_title / "docTOC.md"),
+                    "bm25_sim": 0.0,
+                    "rerank_sim": score,
+                    "is_basic": True,
+                    "is_precision": score >= self.config.threshold_precision,
+                    "source": "DENSE",
+                }
+            )
+        return results
+
+    def health_check(self) -> Dict[str, Any]:
+        """Check that the knowledge base directory exists."""
+        if not Path(self.base_dir).is_dir():
+            return {"status": "error", "message": f"base_dir not found: {self.base_dir}"}
+        return {"status": "ok"}
+
+
+def register_dense_searcher(
+    base_dir: str,
+    config: Optional[DenseSearcherConfig] = None,
+    registry: Optional[SearcherRegistry] = None,
+    name: str = "dense",
+) -> None:
+    """Register DenseSearcher for lazy instantiation.
+
+    Args:
+        base_dir: Knowledge base root directory
+        config: Searcher configuration
+        registry: Target registry (default: the global registry)
+        name: Registration name (default "dense")
+    """
+    if registry is None:
+        registry = get_registry()
+    registry.register_class(name, DenseSearcher, base_dir=base_dir, config=config)
+
+
+__all__ = [
+    "DenseSearcher",
+    "DenseSearcherConfig",
+    "register_dense_searcher",
+]
@@ -24,11 +24,14 @@ Reranker Parameters:
 
 import json
 import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
 from .content_searcher import ContentSearcher
+from .searcher_registry import get_registry
 from .anchor_searcher import AnchorSearcher, AnchorSearcherConfig
 from .text_preprocessor import TextPreprocessor, LanguageDetector
 from .search_utils import debug_print
@@ -37,11 +40,13 @@ from .common_utils import filter_query_keywords, extract_heading_level, normaliz
 
 import numpy as np
 
+if TYPE_CHECKING:
+    from .dense_searcher import DenseSearcher
+
 # Import local modules
 from .bm25_recall import (
     BM25Recall,
     BM25Config,
-    calculate_bm25_similarity,
 )
 from .output_format import OutputFormatter
 from .reranker import HeadingReranker, RerankerConfig, batch_rerank_pages_and_headings
@@ -63,6 +68,8 @@ from doc4llm.tool.md_doc_retrieval.transformer_matcher import (
 # Sentinel value to detect if a parameter was explicitly passed
 _NOT_SET = object()
 
+# 带超时的任务尚未开始运行时，检查其是否已开始计时的间隔（秒）
+_START_POLL_INTERVAL = 0.01
 
 
 @dataclass
@@ -94,6 +101,16 @@ class DocSearcherAPI:
         reranker_lang_threshold: Language detection threshold (default 0.3)
         hierarchical_filter: Enable hierarchical heading filtering (default True)
         fallback_mode: Fallback strategy execution mode, "serial" or "parallel" (default "parallel")
+        parallel_max_workers: Thread pool size for "parallel" mode (default None = one worker per task)
+        bm25_timeout: Per doc-set BM25 recall timeout in seconds for "parallel" mode (default None = no limit)
+        fallback_1_timeout: FALLBACK_1 timeout in seconds for "parallel" mode (default None = no limit)
+        fallback_2_timeout: FALLBACK_2 timeout in seconds for "parallel" mode (default None = no limit)
+        dense_search_enabled: Run DENSE embedding recall over page titles/headings in "parallel" mode (default False)
+        dense_top_k: Maximum DENSE entries per doc-set (default 20)
+        dense_threshold: Minimum cosine similarity of DENSE results (default 0.5)
+        dense_index_type: DENSE index type, "flat" or "ivf" (default "flat")
+        dense_quantization: DENSE vector storage, "none", "int8" or "binary" (default "none")
+        dense_timeout: DENSE timeout in seconds for "parallel" mode (default None = no limit)
         embedding_provider: Reranker provider - "hf" (HuggingFace TransformerMatcher) or "ms" (ModelScope ModelScopeMatcher) (default "ms")
         embedding_model_id: Custom model ID for ModelScope provider (default: Qwen/Qwen3-Embedding-8B)
         hf_inference_provider: HuggingFace inference provider for HF embedding provider (default: "auto")
@@ -102,6 +119,7 @@ class DocSearcherAPI:
         skiped_keywords: List of keywords to skip during search (default [])
         skiped_keywords_path: Custom path for skiped_keywords.txt file (default None)
         rerank_scopes: Rerank scope list - ["page_title"], ["headings"], or ["page_title", "headings"] (default ["page_title"])
+        fallback_2_local_backend: FALLBACK_2 local embedding runtime, "torch" or "onnx" (int8 ONNX Runtime) (default "torch")
 
     Attributes:
         base_dir: Knowledge base root directory
@@ -129,6 +147,16 @@ class DocSearcherAPI:
     reranker_lang_threshold: float = _NOT_SET
     hierarchical_filter: bool = _NOT_SET
     fallback_mode: str = _NOT_SET
+    parallel_max_workers: Optional[int] = _NOT_SET
+    bm25_timeout: Optional[float] = _NOT_SET
+    fallback_1_timeout: Optional[float] = _NOT_SET
+    fallback_2_timeout: Optional[float] = _NOT_SET
+    dense_search_enabled: bool = _NOT_SET
+    dense_top_k: int = _NOT_SET
+    dense_threshold: float = _NOT_SET
+    dense_index_type: str = _NOT_SET
+    dense_quantization: str = _NOT_SET
+    dense_timeout: Optional[float] = _NOT_SET
     embedding_provider: str = _NOT_SET
     embedding_model_id: Optional[str] = _NOT_SET
     hf_inference_provider: str = _NOT_SET
@@ -139,6 +167,7 @@ class DocSearcherAPI:
     rerank_scopes: List[str] = _NOT_SET
     fallback_2_local_rerank: bool = _NOT_SET
     fallback_2_local_device: str = _NOT_SET
+    fallback_2_local_backend: str = _NOT_SET
     fallback_2_local_rerank_ratio: float = _NOT_SET
 
     def _load_config(self) -> Dict[str, Any]:
@@ -209,6 +238,18 @@ class DocSearcherAPI:
             # Filter parameters
             "hierarchical_filter": True,
             "fallback_mode": "parallel",
+            # Parallel mode: thread pool size and per-strategy timeouts (seconds)
+            "parallel_max_workers": None,
+            "bm25_timeout": None,
+            "fallback_1_timeout": None,
+            "fallback_2_timeout": None,
+            # DENSE recall (prebuilt page title / heading embeddings)
+            "dense_search_enabled": False,
+            "dense_top_k": 20,
+            "dense_threshold": 0.5,
+            "dense_index_type": "flat",
+            "dense_quantization": "none",
+            "dense_timeout": None,
             # Embedding provider
             "embedding_provider": "ms",
             "embedding_model_id": None,
@@ -222,6 +263,7 @@ class DocSearcherAPI:
             # FALLBACK_2 local rerank parameters
             "fallback_2_local_rerank": True,
             "fallback_2_local_device": "cpu",
+            "fallback_2_local_backend": "torch",
             "fallback_2_local_rerank_ratio": 0.8,
         }
 
@@ -305,7 +347,7 @@ class DocSearcherAPI:
             )
             self._reranker = HeadingReranker(reranker_config, matcher)
 
-        # 初始化 FALLBACK_2 本地向量化匹配器
+        # 初始化 FALLBACK_2 本地向量化匹配器（模型权重经 model_registry 进程内共享，只加载一次）
         self._fallback_2_local_matcher: Optional[TransformerMatcher] = None
         if self.reranker_enabled and self.fallback_2_local_rerank:
             from doc4llm.tool.md_doc_retrieval.transformer_matcher import (
@@ -322,6 +364,7 @@ class DocSearcherAPI:
             transformer_config = TransformerConfig(
                 use_local=True,  # 强制使用本地模式
                 device=self.fallback_2_local_device,
+                local_backend=self.fallback_2_local_backend,
                 local_model_zh=local_model_zh,
                 local_model_en=local_model_en,
                 lang_threshold=self.reranker_lang_threshold,
@@ -336,6 +379,31 @@ class DocSearcherAPI:
         )
         self._anchor_searcher = AnchorSearcher(base_dir=self.base_dir, config=anchor_config)
 
+        # DENSE 检索器：通过全局 registry 共享，同一知识库只加载一次模型与索引
+        self._dense_searcher: Optional["DenseSearcher"] = None
+        if self.dense_search_enabled:
+            # 按需导入：未启用 DENSE 时不加载 dense 索引模块
+            from .dense_searcher import DenseSearcher, DenseSearcherConfig
+
+            dense_config = DenseSearcherConfig(
+                top_k=self.dense_top_k,
+                threshold_headings=self.dense_threshold,
+                threshold_precision=self.threshold_precision,
+                index_type=self.dense_index_type,
+                quantization=self.dense_quantization,
+                device=self.fallback_2_local_device,
+                local_model_zh=self.local_reranker_model_zh,
+                local_model_en=self.local_reranker_model_en,
+                lang_threshold=self.reranker_lang_threshold,
+                debug=self.debug,
+            )
+            self._dense_searcher = get_registry().get_or_create(
+                f"dense:{self.base_dir}:{dense_config}",
+                DenseSearcher,
+                base_dir=self.base_dir,
+                config=dense_config,
+            )
+
         # Initialize TextPreprocessor
         self._text_preprocessor = TextPreprocessor(
             domain_nouns=self.domain_nouns,
@@ -407,6 +475,29 @@ class DocSearcherAPI:
             # Use TextPreprocessor's skiped_keywords
             return self._text_preprocessor.filter_query_keywords(query)
 
+    def _filter_queries(self, queries: List[str]) -> List[str]:
+        """Remove skiped keywords (except protected domain nouns) from the queries.
+
+        Returns:
+            The non-empty filtered queries (the queries unchanged when there is
+            nothing to filter)
+        """
+        if not (self.domain_nouns and self.skiped_keywords):
+            return queries
+        # 计算需要过滤的关键词（排除受保护的关键词）
+        protected_keywords = {pk.lower() for pk in self._get_protected_keywords()}
+        skiped_keywords_filter = [
+            kw for kw in self.skiped_keywords if kw.lower() not in protected_keywords
+        ]
+        if not skiped_keywords_filter:
+            return queries
+        filtered_queries = []
+        for q in queries:
+            filtered_q = self._filter_query_keywords(q, skiped_keywords_filter)
+            if filtered_q:
+                filtered_queries.append(filtered_q)
+        return filtered_queries
+
     # ===== Language Detection Methods =====
 
     def _detect_docset_language(self, doc_set: str, sample_size: int = 5) -> str:
@@ -466,8 +557,299 @@ class DocSearcherAPI:
         merger = FallbackMerger()
         return merger.merge(results)
 
+    def _score_anchor_results(
+        self,
+        bm25_recall: BM25Recall,
+        grep_results: List[Dict[str, Any]],
+        queries: List[str],
+    ) -> None:
+        """Re-score FALLBACK_1 headings in place with the doc-set heading index.
+
+        Tokens are stemmed, as FALLBACK_1 scoring always was, so headings
+        AnchorSearcher found through an inflected query form stay basic.
+
+        Args:
+            bm25_recall: BM25Recall instance sharing the persistent index
+            grep_results: AnchorSearcher results (modified in place)
+            queries: Search queries
+        """
+        by_doc_set: Dict[str, List[Dict[str, Any]]] = {}
+        for result in grep_results:
+            by_doc_set.setdefault(result["doc_set"], []).append(result)
+
+        for doc_set, results in by_doc_set.items():
+            scores = bm25_recall.score_heading_texts(
+                doc_set, queries, [r.get("heading", "") for r in results], stemming=True
+            )
+            for result, score in zip(results, scores):
+                result["bm25_sim"] = score
+                result["is_basic"] = score >= self.threshold_headings
+                result["is_precision"] = score >= self.threshold_precision
+
+    def _merge_speculative_pages(
+        self, pages: List[Dict[str, Any]], speculative: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Add speculative BM25 pages missing from this search's recall.
+
+        Pages recalled by both keep this search's scores and headings.
+        """
+        seen = {page["page_title"] for page in pages}
+        extra = [
+            {**page, "headings": list(page.get("headings", []))}
+            for page in speculative
+            if page["page_title"] not in seen
+        ]
+        self._debug_print(f"  Speculative recall added {len(extra)} pages")
+        return pages + extra
+
+    def _run_fallback_1(
+        self,
+        bm25_recall: BM25Recall,
+        queries: List[str],
+        search_doc_sets: List[str],
+    ) -> List[Dict[str, Any]]:
+        """FALLBACK_1: TOC anchor search, grouped into pages (reranker not applied).
+
+        Args:
+            bm25_recall: BM25Recall instance used to score the matched headings
+            queries: Search queries
+            search_doc_sets: Doc-sets to search
+
+        Returns:
+            List of page results with FALLBACK_1 headings
+        """
+        grep_results = self._anchor_searcher.search(queries, search_doc_sets)
+        if not grep_results:
+            return []
+        self._score_anchor_results(bm25_recall, grep_results, queries)
+        return self._group_heading_results(grep_results, "FALLBACK_1")
+
+    def _run_dense(
+        self, queries: List[str], search_doc_sets: List[str]
+    ) -> List[Dict[str, Any]]:
+        """DENSE: embedding recall over page titles and headings, grouped into pages.
+
+        Args:
+            queries: Search queries
+            search_doc_sets: Doc-sets to search
+
+        Returns:
+            List of page results with DENSE headings; pages matched only by
+            their title are page-level results without headings
+        """
+        dense_results = self._dense_searcher.search(queries, search_doc_sets)
+        self._debug_print(f"DENSE: found {len(dense_results)} entries")
+        pages = self._group_heading_results(
+            [r for r in dense_results if r["heading"] is not None], "DENSE"
+        )
+
+        # page title 命中作为 page 级结果（page 分数 + 来源），不挂到任何 heading 上
+        page_map = {(p["doc_set"], p["page_title"]): p for p in pages}
+        for r in dense_results:
+            if r["heading"] is not None:
+                continue
+            key = (r["doc_set"], r["page_title"])
+            if key not in page_map:
+                page_map[key] = {
+                    "doc_set": r["doc_set"],
+                    "page_title": r["page_title"],
+                    "toc_path": r["toc_path"],
+                    "headings": [],
+                    "heading_count": 0,
+                    "precision_count": 0,
+                    "bm25_sim": r["bm25_sim"],
+                    "is_basic": r["is_basic"],
+                    "is_precision": r["is_precision"],
+                }
+                pages.append(page_map[key])
+            page_map[key]["rerank_sim"] = r["rerank_sim"]
+            page_map[key]["source"] = "DENSE"
+        return pages
+
+    def _group_heading_results(
+        self, heading_results: List[Dict[str, Any]], source: str
+    ) -> List[Dict[str, Any]]:
+        """Group per-heading searcher results into page results.
+
+        Args:
+            heading_results: Results with doc_set/page_title/heading fields
+            source: Default heading source
+
+        Returns:
+            List of page results
+        """
+        page_map = {}
+        for r in heading_results:
+            key = (r["doc_set"], r["page_title"])
+            if key not in page_map:
+                page_map[key] = {
+                    "doc_set": r["doc_set"],
+                    "page_title": r["page_title"],
+                    "toc_path": r["toc_path"],
+                    "headings": [],
+                    "heading_count": 0,
+                    "precision_count": 0,
+                    "bm25_sim": r["bm25_sim"],
+                    "is_basic": r["is_basic"],
+                    "is_precision": r["is_precision"],
+                }
+            page_map[key]["headings"].append(
+                {
+                    "text": r["heading"],
+                    "level": extract_heading_level(r["heading"]),
+                    "bm25_sim": r["bm25_sim"],
+                    "is_basic": r["is_basic"],
+                    "is_precision": r["is_precision"],
+                    "source": r.get("source", source),
+                    **({"rerank_sim": r["rerank_sim"]} if "rerank_sim" in r else {}),
+                }
+            )
+            page_map[key]["heading_count"] += 1
+            if r["is_precision"]:
+                page_map[key]["precision_count"] += 1
+        return list(page_map.values())
+
+    def _run_fallback_2(
+        self, queries: List[str], search_doc_sets: List[str]
+    ) -> List[Dict[str, Any]]:
+        """FALLBACK_2: Pythonic context search over the document contents.
+
+        Args:
+            queries: Search queries
+            search_doc_sets: Doc-sets to search
+
+        Returns:
+            List of page results, one FALLBACK_2 heading each
+        """
+        self._debug_print("Using FALLBACK_2: Pythonic context search")
+        searcher = ContentSearcher(
+            base_dir=self.base_dir,
+            domain_nouns=self.domain_nouns,
+            max_results=20,
+            context_lines=100,
+            debug=self.debug,
+        )
+        context_results = searcher.search(queries, search_doc_sets)
+        self._debug_print(f"FALLBACK_2: found {len(context_results)} results")
+
+        # 添加兼容性字段，并将 "heading" 转换为 "headings" 列表
+        for page in context_results:
+            page["bm25_sim"] = 0.0
+            page["is_basic"] = True
+            page["is_precision"] = False
+            page["headings"] = [
+                {
+                    "text": page["heading"],
+                    "level": extract_heading_level(page["heading"]),
+                    "bm25_sim": page["bm25_sim"],
+                    "is_basic": True,
+                    "is_precision": False,
+                    "related_context": page.get("related_context", ""),
+                    "source": page.get("source", "FALLBACK_2"),
+                }
+            ]
+            page["heading_count"] = 1
+            page["precision_count"] = 0
+        return context_results
+
+    def _run_concurrently(
+        self, tasks: Dict[str, Tuple[Callable[[], Any], Optional[float]]]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Run search strategies on a thread pool with per-strategy timeouts.
+
+        Each timeout is measured from the moment its strategy starts running,
+        so time spent queued for a worker does not count. A strategy that
+        misses its deadline is dropped from the results; Python threads cannot
+        be stopped, so it keeps its worker until it finishes in the background,
+        and one strategy still waiting for a worker is moved to a new worker
+        instead. Exceptions raised by a strategy propagate to the caller.
+
+        Args:
+            tasks: Strategy name -> (callable, timeout in seconds or None)
+
+        Returns:
+            Tuple of (strategy name -> result, names of timed out strategies)
+        """
+        results: Dict[str, Any] = {}
+        timed_out: List[str] = []
+        if not tasks:
+            return results, timed_out
+
+        max_workers = self.parallel_max_workers or min(32, len(tasks))
+        executors = [
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="doc-searcher")
+        ]
+        started: Dict[str, float] = {}
+
+        def submit(executor: ThreadPoolExecutor, name: str) -> Future:
+            fn = tasks[name][0]
+
+            def run() -> Any:
+                started[name] = time.monotonic()
+                return fn()
+
+            return executor.submit(run)
+
+        pending: Dict[Future, str] = {}
+        start = time.monotonic()
+        try:
+            pending = {submit(executors[0], name): name for name in tasks}
+            while pending:
+                # 等到最早的截止时间；尚未开始的任务稍后再检查是否已开始计时
+                wait_for: Optional[float] = None
+                now = time.monotonic()
+                for name in pending.values():
+                    timeout = tasks[name][1]
+                    if timeout is None:
+                        continue
+                    remaining = (
+                        max(0.0, started[name] + timeout - now)
+                        if name in started
+                        else _START_POLL_INTERVAL
+                    )
+                    wait_for = remaining if wait_for is None else min(wait_for, remaining)
+
+                done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+
+                now = time.monotonic()
+                for future, name in list(pending.items()):
+                    timeout = tasks[name][1]
+                    if timeout is None or name not in started:
+                        continue
+                    if now < started[name] + timeout:
+                        continue
+                    del pending[future]
+                    timed_out.append(name)
+                    self._debug_print(f"{name} timed out after {timeout}s, skipped")
+                    # 超时任务仍占用 worker：把一个排队中的任务移到新的 worker
+                    for queued, queued_name in list(pending.items()):
+                        if queued_name not in started and queued.cancel():
+                            executor = ThreadPoolExecutor(
+                                max_workers=1, thread_name_prefix="doc-searcher"
+                            )
+                            executors.append(executor)
+                            del pending[queued]
+                            pending[submit(executor, queued_name)] = queued_name
+                            break
+            self._debug_print(
+                f"PARALLEL strategies finished in {time.monotonic() - start:.3f}s "
+                f"({len(tasks)} tasks, {max_workers} workers)"
+            )
+        finally:
+            # 不等待超时任务结束，避免拖慢整体检索；出错时取消尚未开始的任务
+            for future in pending:
+                future.cancel()
+            for executor in executors:
+                executor.shutdown(wait=False)
+        return {name: results[name] for name in tasks if name in results}, timed_out
+
     def search(
-        self, query: Union[str, List[str]], target_doc_sets: Optional[List[str]] = None
+        self,
+        query: Union[str, List[str]],
+        target_doc_sets: Optional[List[str]] = None,
+        speculative_pages: Optional[Dict[str, List[Dict[str, Any]]]] = None,
     ) -> Dict[str, Any]:
         """
         Execute document search.
@@ -488,6 +870,10 @@ class DocSearcherAPI:
             target_doc_sets: Target doc-sets from md-doc-query-optimizer output.
                              If provided, skip internal Jaccard matching and use directly.
                              If None, auto-detect from available doc-sets.
+            speculative_pages: BM25 pages recalled earlier for another query
+                               (e.g. the raw query while Phase 0 ran), keyed by
+                               doc-set; pages this search's BM25 recall missed are
+                               added as extra candidates.
 
         Returns:
             Dictionary with:
@@ -499,37 +885,17 @@ class DocSearcherAPI:
         """
         # Normalize query to list
         queries = [query] if isinstance(query, str) else query
-        # Combine queries for BM25 similarity calculations
-        combined_query = " ".join(queries)
 
         # ===== Query 预处理 - 过滤 skiped_keywords =====
-        if self.domain_nouns and self.skiped_keywords:
-            # 计算需要过滤的关键词（排除受保护的关键词）
-            protected_keywords = self._get_protected_keywords()
-            skiped_keywords_filter = [
-                kw
-                for kw in self.skiped_keywords
-                if kw.lower() not in {pk.lower() for pk in protected_keywords}
-            ]
-
-            if skiped_keywords_filter:
-                filtered_queries = []
-                for q in queries:
-                    filtered_q = self._filter_query_keywords(q, skiped_keywords_filter)
-                    if filtered_q:
-                        filtered_queries.append(filtered_q)
-
-                if not filtered_queries:
-                    return {
-                        "success": False,
-                        "doc_sets_found": [],
-                        "results": [],
-                        "fallback_used": None,
-                        "message": "All queries filtered out by skiped_keywords.txt",
-                    }
-
-                queries = filtered_queries
-                combined_query = " ".join(queries)
+        queries = self._filter_queries(queries)
+        if not queries:
+            return {
+                "success": False,
+                "doc_sets_found": [],
+                "results": [],
+                "fallback_used": None,
+                "message": "All queries filtered out by skiped_keywords.txt",
+            }
         # ===== Query 预处理结束 =====
 
         # Initialize fallback tracking flags
@@ -578,16 +944,61 @@ class DocSearcherAPI:
             debug=self.debug,
         )
 
+        # Always execute fallback strategies when reranker is disabled
+        fallback_used = None
+        toc_fallback = False
+        grep_fallback = False
+        outcomes: Dict[str, Any] = {}
+        timed_out_strategies: List[str] = []
+
+        # PARALLEL 模式：BM25（逐 doc-set）、FALLBACK_1、FALLBACK_2 并发执行，
+        # Phase 1 耗时取决于最慢的策略而不是各策略之和
+        if self.fallback_mode == "parallel":
+            # 提交任务前完成语言一致性校验（不一致时直接抛出异常）
+            for doc_set in search_doc_sets:
+                self._validate_language_consistency(query, doc_set)
+
+            tasks: Dict[str, Tuple[Callable[[], Any], Optional[float]]] = {}
+            for doc_set in search_doc_sets:
+                tasks[f"BM25:{doc_set}"] = (
+                    lambda ds=doc_set: bm25_recall.recall_pages(
+                        ds, query, min_headings=self.min_headings
+                    ),
+                    self.bm25_timeout,
+                )
+            tasks["FALLBACK_1"] = (
+                lambda: self._run_fallback_1(bm25_recall, queries, search_doc_sets),
+                self.fallback_1_timeout,
+            )
+            if self.domain_nouns:
+                tasks["FALLBACK_2"] = (
+                    lambda: self._run_fallback_2(queries, search_doc_sets),
+                    self.fallback_2_timeout,
+                )
+            if self._dense_searcher is not None:
+                tasks["DENSE"] = (
+                    lambda: self._run_dense(queries, search_doc_sets),
+                    self.dense_timeout,
+                )
+            outcomes, timed_out_strategies = self._run_concurrently(tasks)
+
         for doc_set in search_doc_sets:
             self._debug_print(f"Processing doc-set: {doc_set}")
 
-            # Validate language consistency for each doc-set
-            self._validate_language_consistency(query, doc_set)
+            if self.fallback_mode == "parallel":
+                scored_pages = outcomes.get(f"BM25:{doc_set}") or []
+            else:
+                # Validate language consistency for each doc-set
+                self._validate_language_consistency(query, doc_set)
 
-            # BM25 recall for this doc-set
-            scored_pages = bm25_recall.recall_pages(
-                doc_set, query, min_headings=self.min_headings
-            )
+                # BM25 recall for this doc-set
+                scored_pages = bm25_recall.recall_pages(
+                    doc_set, query, min_headings=self.min_headings
+                )
+            if speculative_pages and speculative_pages.get(doc_set):
+                scored_pages = self._merge_speculative_pages(
+                    scored_pages, speculative_pages[doc_set]
+                )
             self._debug_print(f"  Found {len(scored_pages)} scored pages")
 
             # Transformer re-ranking for headings (only if enabled)
@@ -639,11 +1050,6 @@ class DocSearcherAPI:
 
         self._debug_print(f"Total pages in all_results: {len(all_results)}")
 
-        # Always execute fallback strategies when reranker is disabled
-        fallback_used = None
-        toc_fallback = False
-        grep_fallback = False
-
         # ========== PARALLEL MODE (default) ==========
         if self.fallback_mode == "parallel":
             self._debug_print(
@@ -655,97 +1061,27 @@ class DocSearcherAPI:
             all_fallback_results = []
             fallback_strategies = []
 
-            # Execute FALLBACK_1 (without applying reranker yet)
-            grep_results = self._anchor_searcher.search(queries, search_doc_sets)
-            if grep_results:
-                from .bm25_recall import calculate_bm25_similarity, BM25Config
-
-                for result in grep_results:
-                    result["bm25_sim"] = calculate_bm25_similarity(
-                        combined_query,
-                        result.get("heading", ""),
-                        BM25Config(k1=self.bm25_k1, b=self.bm25_b),
-                    )
-                    result["is_basic"] = result["bm25_sim"] >= self.threshold_headings
-                    result["is_precision"] = (
-                        result["bm25_sim"] >= self.threshold_precision
-                    )
-
-                page_map = {}
-                for r in grep_results:
-                    key = (r["doc_set"], r["page_title"])
-                    if key not in page_map:
-                        page_map[key] = {
-                            "doc_set": r["doc_set"],
-                            "page_title": r["page_title"],
-                            "toc_path": r["toc_path"],
-                            "headings": [],
-                            "heading_count": 0,
-                            "precision_count": 0,
-                            "bm25_sim": r["bm25_sim"],
-                            "is_basic": r["is_basic"],
-                            "is_precision": r["is_precision"],
-                        }
-                    page_map[key]["headings"].append(
-                        {
-                            "text": r["heading"],
-                            "level": extract_heading_level(r["heading"]),
-                            "bm25_sim": r["bm25_sim"],
-                            "is_basic": r["is_basic"],
-                            "is_precision": r["is_precision"],
-                            "source": r.get("source", "FALLBACK_1"),
-                        }
-                    )
-                    page_map[key]["heading_count"] += 1
-                    if r["is_precision"]:
-                        page_map[key]["precision_count"] += 1
-
-                all_fallback_results.extend(page_map.values())
+            # FALLBACK_1 results (AnchorSearcher, without applying reranker yet)
+            fallback_1_pages = outcomes.get("FALLBACK_1") or []
+            if fallback_1_pages:
+                all_fallback_results.extend(fallback_1_pages)
                 fallback_strategies.append("FALLBACK_1")
 
             # FALLBACK_2 results (ContentSearcher)
-            context_results = []
-            if self.domain_nouns:
-                self._debug_print("Using FALLBACK_2: Pythonic context search")
-                searcher = ContentSearcher(
-                    base_dir=self.base_dir,
-                    domain_nouns=self.domain_nouns,
-                    max_results=20,
-                    context_lines=100,
-                    debug=self.debug,
-                )
-                context_results = searcher.search(queries, search_doc_sets)
-                # 添加兼容性字段
-                for result in context_results:
-                    result["bm25_sim"] = 0.0
-                    result["is_basic"] = True
-                    result["is_precision"] = False
-                self._debug_print(f"FALLBACK_2: found {len(context_results)} results")
+            context_results = outcomes.get("FALLBACK_2") or []
             self._debug_print(f"DEBUG: context_results count = {len(context_results)}")
             if context_results:
-                # Convert "heading" to "headings" list for consistency
-                for page in context_results:
-                    page["headings"] = [
-                        {
-                            "text": page["heading"],
-                            "level": extract_heading_level(page["heading"]),
-                            "bm25_sim": page["bm25_sim"],
-                            "is_basic": page.get("is_basic", True),
-                            "is_precision": page.get("is_precision", False),
-                            "related_context": page.get("related_context", ""),
-                            "source": page.get("source", "FALLBACK_2"),
-                        }
-                    ]
-                    page["heading_count"] = 1
-                    page["precision_count"] = (
-                        1 if page.get("is_precision", False) else 0
-                    )
-
                 all_fallback_results.extend(context_results)
                 fallback_strategies.append("FALLBACK_2")
                 self._debug_print(f"DEBUG: after extend, all_fallback_results count = {len(all_fallback_results)}")
                 self._debug_print(f"DEBUG: fallback_strategies = {fallback_strategies}")
 
+            # DENSE results (embedding recall, independent of BM25 candidates)
+            dense_pages = outcomes.get("DENSE") or []
+            if dense_pages:
+                all_fallback_results.extend(dense_pages)
+                fallback_strategies.append("DENSE")
+
             # Merge results from both fallback strategies
             if all_fallback_results:
                 merged_fallback = self._merge_fallback_results(all_fallback_results)
@@ -755,7 +1091,7 @@ class DocSearcherAPI:
                 # 策略：FALLBACK 结果增强 BM25 结果（添加 related_context）
                 seen_pages = {}
                 deduped_results = []
-                for page in scored_pages + merged_fallback:
+                for page in all_results + merged_fallback:
                     key = (page["doc_set"], page["page_title"])
                     if key not in seen_pages:
                         seen_pages[key] = page
@@ -890,263 +1226,250 @@ class DocSearcherAPI:
                     )
                     self._debug_print(f"DEBUG: fallback_used set to {fallback_used}")
 
-            # ========== SERIAL MODE (backward compatible) ==========
-            if self.fallback_mode == "serial":
-                self._debug_print(
-                    "Executing SERIAL fallback mode (always when reranker disabled)"
-                )
+        # ========== SERIAL MODE (backward compatible) ==========
+        elif self.fallback_mode == "serial":
+            self._debug_print(
+                "Executing SERIAL fallback mode (always when reranker disabled)"
+            )
 
-                # FALLBACK_1
-                toc_fallback = True
-                grep_results = self._anchor_searcher.search(query, search_doc_sets)
+            # FALLBACK_1
+            toc_fallback = True
+            grep_results = self._anchor_searcher.search(query, search_doc_sets)
 
-                if grep_results:
-                    from .bm25_recall import calculate_bm25_similarity, BM25Config
+            if grep_results:
+                self._score_anchor_results(bm25_recall, grep_results, queries)
 
-                    for result in grep_results:
-                        result["bm25_sim"] = calculate_bm25_similarity(
-                            combined_query,
-                            result.get("heading", ""),
-                            BM25Config(k1=self.bm25_k1, b=self.bm25_b),
-                        )
-                        result["is_basic"] = (
-                            result["bm25_sim"] >= self.threshold_headings
-                        )
-                        result["is_precision"] = (
-                            result["bm25_sim"] >= self.threshold_precision
-                        )
+                page_map = {}
+                for r in grep_results:
+                    key = (r["doc_set"], r["page_title"])
+                    if key not in page_map:
+                        page_map[key] = {
+                            "doc_set": r["doc_set"],
+                            "page_title": r["page_title"],
+                            "toc_path": r["toc_path"],
+                            "headings": [],
+                            "heading_count": 0,
+                            "precision_count": 0,
+                            "bm25_sim": r["bm25_sim"],
+                            "is_basic": r["is_basic"],
+                            "is_precision": r["is_precision"],
+                        }
+                    page_map[key]["headings"].append(
+                        {
+                            "text": r["heading"],
+                            "level": extract_heading_level(r["heading"]),
+                            "bm25_sim": r["bm25_sim"],
+                            "is_basic": r["is_basic"],
+                            "is_precision": r["is_precision"],
+                        }
+                    )
+                    page_map[key]["heading_count"] += 1
+                    if r["is_precision"]:
+                        page_map[key]["precision_count"] += 1
 
-                    page_map = {}
-                    for r in grep_results:
-                        key = (r["doc_set"], r["page_title"])
-                        if key not in page_map:
-                            page_map[key] = {
-                                "doc_set": r["doc_set"],
-                                "page_title": r["page_title"],
-                                "toc_path": r["toc_path"],
-                                "headings": [],
-                                "heading_count": 0,
-                                "precision_count": 0,
-                                "bm25_sim": r["bm25_sim"],
-                                "is_basic": r["is_basic"],
-                                "is_precision": r["is_precision"],
-                            }
-                        page_map[key]["headings"].append(
-                            {
-                                "text": r["heading"],
-                                "level": extract_heading_level(r["heading"]),
-                                "bm25_sim": r["bm25_sim"],
-                                "is_basic": r["is_basic"],
-                                "is_precision": r["is_precision"],
-                            }
-                        )
-                        page_map[key]["heading_count"] += 1
-                        if r["is_precision"]:
-                            page_map[key]["precision_count"] += 1
-
-                    # Apply reranker if enabled for FALLBACK_1 (serial mode)
-                    if self.reranker_enabled and self._reranker:
-                        self._debug_print(
-                            "  Applying transformer re-ranking to FALLBACK_1 results"
-                        )
-                        batch_rerank_pages_and_headings(
-                            pages=list(page_map.values()),
-                            queries=queries,
-                            matcher=self._reranker.matcher,
-                            scopes=self.rerank_scopes,
-                            reranker_threshold=self.reranker_threshold,
-                            threshold_precision=self.threshold_precision,
-                            preprocess_func=self._preprocess_for_rerank if self.domain_nouns else None,
-                            preprocess_headings_func=self._preprocess_headings_for_rerank,
-                        )
+                # Apply reranker if enabled for FALLBACK_1 (serial mode)
+                if self.reranker_enabled and self._reranker:
+                    self._debug_print(
+                        "  Applying transformer re-ranking to FALLBACK_1 results"
+                    )
+                    batch_rerank_pages_and_headings(
+                        pages=list(page_map.values()),
+                        queries=queries,
+                        matcher=self._reranker.matcher,
+                        scopes=self.rerank_scopes,
+                        reranker_threshold=self.reranker_threshold,
+                        threshold_precision=self.threshold_precision,
+                        preprocess_func=self._preprocess_for_rerank if self.domain_nouns else None,
+                        preprocess_headings_func=self._preprocess_headings_for_rerank,
+                    )
 
-                        for page in page_map.values():
-                            # 当 rerank_scopes 不包含 "headings" 时，跳过 heading rerank 处理
-                            if "headings" not in self.rerank_scopes:
-                                continue
-                            if not page.get("headings"):
-                                continue
+                    for page in page_map.values():
+                        # 当 rerank_scopes 不包含 "headings" 时，跳过 heading rerank 处理
+                        if "headings" not in self.rerank_scopes:
+                            continue
+                        if not page.get("headings"):
+                            continue
 
-                            reranked_headings = []
-                            for heading in page["headings"]:
-                                semantic_score = heading.get("rerank_sim") or 0.0
-                                if (
-                                    semantic_score
-                                    < self._reranker.config.min_score_threshold
-                                ):
-                                    continue
-                                original_bm25_score = heading.get("bm25_sim") or 0.0
-                                updated_heading = dict(heading)
-                                updated_heading["bm25_sim"] = original_bm25_score
-                                updated_heading["rerank_sim"] = semantic_score
-                                updated_heading["is_basic"] = True
-                                precision_threshold = (
-                                    self._reranker.config.min_score_threshold + 0.2
-                                )
-                                updated_heading["is_precision"] = (
-                                    semantic_score >= precision_threshold
-                                )
-                                reranked_headings.append(updated_heading)
-                            reranked_headings.sort(
-                                key=lambda h: h.get("rerank_sim") or 0.0, reverse=True
-                            )
+                        reranked_headings = []
+                        for heading in page["headings"]:
+                            semantic_score = heading.get("rerank_sim") or 0.0
                             if (
-                                self._reranker.config.top_k is not None
-                                and self._reranker.config.top_k > 0
+                                semantic_score
+                                < self._reranker.config.min_score_threshold
                             ):
-                                reranked_headings = reranked_headings[
-                                    : self._reranker.config.top_k
-                                ]
-                            page["headings"] = reranked_headings
-                            page["heading_count"] = len(reranked_headings)
-                            page["precision_count"] = sum(
-                                1
-                                for h in reranked_headings
-                                if h.get("is_precision", False)
+                                continue
+                            original_bm25_score = heading.get("bm25_sim") or 0.0
+                            updated_heading = dict(heading)
+                            updated_heading["bm25_sim"] = original_bm25_score
+                            updated_heading["rerank_sim"] = semantic_score
+                            updated_heading["is_basic"] = True
+                            precision_threshold = (
+                                self._reranker.config.min_score_threshold + 0.2
                             )
-
-                    all_results.extend(list(page_map.values()))
-                    fallback_used = "FALLBACK_1"
-
-                # FALLBACK_2 (ContentSearcher)
-                # 在 FALLBACK_1 之后执行，使用 domain_nouns 进行精确匹配
-                grep_fallback = True
-                context_results = []
-                if self.domain_nouns:
-                    self._debug_print("Using FALLBACK_2: Pythonic context search")
-                    searcher = ContentSearcher(
-                        base_dir=self.base_dir,
-                        domain_nouns=self.domain_nouns,
-                        max_results=20,
-                        context_lines=100,
-                        debug=self.debug,
-                    )
-                    context_results = searcher.search(queries, search_doc_sets)
-                    # 添加兼容性字段
-                    for result in context_results:
-                        result["bm25_sim"] = 0.0
-                        result["is_basic"] = True
-                        result["is_precision"] = False
-                    self._debug_print(f"FALLBACK_2: found {len(context_results)} results")
-
-                if context_results:
-                    # Apply reranker if enabled for FALLBACK_2 (serial mode)
-                    if self.reranker_enabled and self._reranker:
-                        self._debug_print(
-                            "  Applying transformer re-ranking to FALLBACK_2 results"
+                            updated_heading["is_precision"] = (
+                                semantic_score >= precision_threshold
+                            )
+                            reranked_headings.append(updated_heading)
+                        reranked_headings.sort(
+                            key=lambda h: h.get("rerank_sim") or 0.0, reverse=True
                         )
-                        # 使用批量 reranking
-                        batch_rerank_pages_and_headings(
-                            pages=context_results,
-                            queries=queries,
-                            matcher=self._reranker.matcher,
-                            scopes=self.rerank_scopes,
-                            reranker_threshold=self.reranker_threshold,
-                            threshold_precision=self.threshold_precision,
-                            preprocess_func=self._preprocess_for_rerank if self.domain_nouns else None,
-                            preprocess_headings_func=self._preprocess_headings_for_rerank,
+                        if (
+                            self._reranker.config.top_k is not None
+                            and self._reranker.config.top_k > 0
+                        ):
+                            reranked_headings = reranked_headings[
+                                : self._reranker.config.top_k
+                            ]
+                        page["headings"] = reranked_headings
+                        page["heading_count"] = len(reranked_headings)
+                        page["precision_count"] = sum(
+                            1
+                            for h in reranked_headings
+                            if h.get("is_precision", False)
                         )
 
-                        for page in context_results:
-                            # 当 rerank_scopes 不包含 "headings" 时，跳过 heading rerank 处理
-                            if "headings" not in self.rerank_scopes:
-                                continue
-                            if not page.get("headings"):
-                                continue
+                all_results.extend(list(page_map.values()))
+                fallback_used = "FALLBACK_1"
 
-                            reranked_headings = []
-                            for heading in page["headings"]:
-                                semantic_score = heading.get("rerank_sim") or 0.0
-                                if (
-                                    semantic_score
-                                    < self._reranker.config.min_score_threshold
-                                ):
-                                    continue
-                                original_bm25_score = heading.get("bm25_sim") or 0.0
-                                updated_heading = dict(heading)
-                                updated_heading["bm25_sim"] = original_bm25_score
-                                updated_heading["rerank_sim"] = semantic_score
-                                updated_heading["is_basic"] = True
-                                precision_threshold = (
-                                    self._reranker.config.min_score_threshold + 0.2
-                                )
-                                updated_heading["is_precision"] = (
-                                    semantic_score >= precision_threshold
-                                )
-                                reranked_headings.append(updated_heading)
-                            reranked_headings.sort(
-                                key=lambda h: h.get("rerank_sim") or 0.0, reverse=True
-                            )
+            # FALLBACK_2 (ContentSearcher)
+            # 在 FALLBACK_1 之后执行，使用 domain_nouns 进行精确匹配
+            grep_fallback = True
+            context_results = []
+            if self.domain_nouns:
+                self._debug_print("Using FALLBACK_2: Pythonic context search")
+                searcher = ContentSearcher(
+                    base_dir=self.base_dir,
+                    domain_nouns=self.domain_nouns,
+                    max_results=20,
+                    context_lines=100,
+                    debug=self.debug,
+                )
+                context_results = searcher.search(queries, search_doc_sets)
+                # 添加兼容性字段
+                for result in context_results:
+                    result["bm25_sim"] = 0.0
+                    result["is_basic"] = True
+                    result["is_precision"] = False
+                self._debug_print(f"FALLBACK_2: found {len(context_results)} results")
+
+            if context_results:
+                # Apply reranker if enabled for FALLBACK_2 (serial mode)
+                if self.reranker_enabled and self._reranker:
+                    self._debug_print(
+                        "  Applying transformer re-ranking to FALLBACK_2 results"
+                    )
+                    # 使用批量 reranking
+                    batch_rerank_pages_and_headings(
+                        pages=context_results,
+                        queries=queries,
+                        matcher=self._reranker.matcher,
+                        scopes=self.rerank_scopes,
+                        reranker_threshold=self.reranker_threshold,
+                        threshold_precision=self.threshold_precision,
+                        preprocess_func=self._preprocess_for_rerank if self.domain_nouns else None,
+                        preprocess_headings_func=self._preprocess_headings_for_rerank,
+                    )
+
+                    for page in context_results:
+                        # 当 rerank_scopes 不包含 "headings" 时，跳过 heading rerank 处理
+                        if "headings" not in self.rerank_scopes:
+                            continue
+                        if not page.get("headings"):
+                            continue
+
+                        reranked_headings = []
+                        for heading in page["headings"]:
+                            semantic_score = heading.get("rerank_sim") or 0.0
                             if (
-                                self._reranker.config.top_k is not None
-                                and self._reranker.config.top_k > 0
+                                semantic_score
+                                < self._reranker.config.min_score_threshold
                             ):
-                                reranked_headings = reranked_headings[
-                                    : self._reranker.config.top_k
-                                ]
-                            if reranked_headings:
-                                page["headings"] = reranked_headings
-                            else:
-                                page["headings"] = [
-                                    {
-                                        "text": page.get("heading", ""),
-                                        "level": extract_heading_level(
-                                            page.get("heading", "")
-                                        ),
-                                        "bm25_sim": page.get("bm25_sim"),
-                                        "is_basic": True,
-                                        "is_precision": page.get("is_precision", False),
-                                        "related_context": page.get(
-                                            "related_context", ""
-                                        ),
-                                    }
-                                ]
-                            page["heading_count"] = len(page.get("headings", []))
-                            page["precision_count"] = sum(
-                                1
-                                for h in page.get("headings", [])
-                                if h.get("is_precision", False)
+                                continue
+                            original_bm25_score = heading.get("bm25_sim") or 0.0
+                            updated_heading = dict(heading)
+                            updated_heading["bm25_sim"] = original_bm25_score
+                            updated_heading["rerank_sim"] = semantic_score
+                            updated_heading["is_basic"] = True
+                            precision_threshold = (
+                                self._reranker.config.min_score_threshold + 0.2
                             )
-                    else:
-                        for page in context_results:
+                            updated_heading["is_precision"] = (
+                                semantic_score >= precision_threshold
+                            )
+                            reranked_headings.append(updated_heading)
+                        reranked_headings.sort(
+                            key=lambda h: h.get("rerank_sim") or 0.0, reverse=True
+                        )
+                        if (
+                            self._reranker.config.top_k is not None
+                            and self._reranker.config.top_k > 0
+                        ):
+                            reranked_headings = reranked_headings[
+                                : self._reranker.config.top_k
+                            ]
+                        if reranked_headings:
+                            page["headings"] = reranked_headings
+                        else:
                             page["headings"] = [
                                 {
-                                    "text": page["heading"],
+                                    "text": page.get("heading", ""),
                                     "level": extract_heading_level(
-                                        page["heading"]
+                                        page.get("heading", "")
                                     ),
                                     "bm25_sim": page.get("bm25_sim"),
-                                    "is_basic": page.get("is_basic", True),
+                                    "is_basic": True,
                                     "is_precision": page.get("is_precision", False),
-                                    "related_context": page.get("related_context", ""),
+                                    "related_context": page.get(
+                                        "related_context", ""
+                                    ),
                                 }
                             ]
-                            page["heading_count"] = 1
-                            page["precision_count"] = (
-                                1 if page.get("is_precision", False) else 0
-                            )
-
-                    # FALLBACK_2 本地向量化匹配（基于 related_context）
-                    if (self.fallback_2_local_rerank and
-                        self._fallback_2_local_matcher and
-                        context_results):
-                        from .reranker import fallback_2_local_rerank_headings
-                        fallback_2_local_rerank_headings(
-                            matcher=self._fallback_2_local_matcher,
-                            pages=context_results,
-                            queries=queries,
-                            preprocess_func=self._preprocess_for_rerank if self.domain_nouns else None,
-                            top_k_ratio=self.fallback_2_local_rerank_ratio,
+                        page["heading_count"] = len(page.get("headings", []))
+                        page["precision_count"] = sum(
+                            1
+                            for h in page.get("headings", [])
+                            if h.get("is_precision", False)
+                        )
+                else:
+                    for page in context_results:
+                        page["headings"] = [
+                            {
+                                "text": page["heading"],
+                                "level": extract_heading_level(
+                                    page["heading"]
+                                ),
+                                "bm25_sim": page.get("bm25_sim"),
+                                "is_basic": page.get("is_basic", True),
+                                "is_precision": page.get("is_precision", False),
+                                "related_context": page.get("related_context", ""),
+                            }
+                        ]
+                        page["heading_count"] = 1
+                        page["precision_count"] = (
+                            1 if page.get("is_precision", False) else 0
                         )
 
-                    # Merge FALLBACK_2 results with existing results
-                    all_results.extend(context_results)
-                    fallback_used = (
-                        "FALLBACK_1+FALLBACK_2"
-                        if fallback_used == "FALLBACK_1"
-                        else "FALLBACK_2"
+                # FALLBACK_2 本地向量化匹配（基于 related_context）
+                if (self.fallback_2_local_rerank and
+                    self._fallback_2_local_matcher and
+                    context_results):
+                    from .reranker import fallback_2_local_rerank_headings
+                    fallback_2_local_rerank_headings(
+                        matcher=self._fallback_2_local_matcher,
+                        pages=context_results,
+                        queries=queries,
+                        preprocess_func=self._preprocess_for_rerank if self.domain_nouns else None,
+                        top_k_ratio=self.fallback_2_local_rerank_ratio,
                     )
 
+                # Merge FALLBACK_2 results with existing results
+                all_results.extend(context_results)
+                fallback_used = (
+                    "FALLBACK_1+FALLBACK_2"
+                    if fallback_used == "FALLBACK_1"
+                    else "FALLBACK_2"
+                )
+
         # Calculate final success
         self._debug_print(f"DEBUG2: all_results count before loop = {len(all_results)}")
         success = len(all_results) >= self.min_page_titles
@@ -1160,6 +1483,10 @@ class DocSearcherAPI:
             is_fallback_2_page = page_source == "FALLBACK_2" or any(
                 h.get("source") == "FALLBACK_2" for h in page.get("headings", [])
             )
+            # DENSE 结果已按余弦相似度过滤，不再检查 BM25 page 阈值
+            is_dense_page = page.get("source") == "DENSE" or any(
+                h.get("source") == "DENSE" for h in page.get("headings", [])
+            )
 
             # FALLBACK_2 的 heading 保留原始结果（不检查 is_basic）
             if is_fallback_2_page:
@@ -1182,7 +1509,11 @@ class DocSearcherAPI:
                 page_bm25_sim = page.get("bm25_sim") or 0
                 # FALLBACK_2 精确匹配结果不经过 BM25 阈值检查
                 self._debug_print(f"DEBUG2: page_bm25_sim={page_bm25_sim}, threshold={self.threshold_page_title}, is_fallback_2={is_fallback_2_page}")
-                if is_fallback_2_page or page_bm25_sim >= self.threshold_page_title:
+                if (
+                    is_fallback_2_page
+                    or is_dense_page
+                    or page_bm25_sim >= self.threshold_page_title
+                ):
                     results.append(
                         {
                             "doc_set": page["doc_set"],
@@ -1208,7 +1539,9 @@ class DocSearcherAPI:
                             "source": page.get("source"),
                         }
                     )
-            elif (page.get("bm25_sim") or 0) >= self.threshold_page_title:
+            elif (
+                is_dense_page or (page.get("bm25_sim") or 0) >= self.threshold_page_title
+            ):
                 rerank_sim = page.get("rerank_sim")
                 if not self.reranker_enabled or (
                     rerank_sim is not None and rerank_sim >= self.reranker_threshold
@@ -1237,6 +1570,7 @@ class DocSearcherAPI:
             "message": "Search completed"
             if success
             else "No results found after all fallbacks",
+            "timed_out_strategies": timed_out_strategies,
             # Threshold configuration fields
             "threshold_page_title": self.threshold_page_title,
             "threshold_headings": self.threshold_headings,
@@ -1291,6 +1625,49 @@ class DocSearcherAPI:
             result, queries=queries, reranker_enabled=reranker_enabled
         )
 
+    @property
+    def reranker_key(self) -> Optional[str]:
+        """Embedding settings of the reranker (None without one).
+
+        Searchers with the same key embed a text identically and share the
+        process-wide embedding cache.
+        """
+        if not self._reranker:
+            return None
+        matcher = self._reranker.matcher
+        return f"{type(matcher).__name__}:{matcher.config!r}"
+
+    def encode_queries(self, query_lists: List[Union[str, List[str]]]) -> None:
+        """Embed the reranker queries of several searches ahead of time.
+
+        Each query list is embedded as ``search()`` (after the skiped_keywords
+        filter) and ``rerank()`` (as given) embed it, with one encode call per
+        model for all lists. The vectors land in the matcher's embedding cache,
+        so those calls do not run the model again. Does nothing without a
+        reranker.
+
+        Args:
+            query_lists: Query strings or lists of query strings
+        """
+        if not self._reranker:
+            return
+        matcher = self._reranker.matcher
+        model_id_for = getattr(matcher, "model_id_for", None)
+        by_model: Dict[Optional[str], List[str]] = {}
+        for query in query_lists:
+            queries = [query] if isinstance(query, str) else list(query)
+            for texts in (queries, self._filter_queries(queries)):
+                if texts:
+                    # rerank_batch 按整个查询列表选择模型
+                    model_id = model_id_for(texts) if model_id_for else None
+                    by_model.setdefault(model_id, []).extend(texts)
+        for model_id, texts in by_model.items():
+            texts = list(dict.fromkeys(texts))
+            if model_id is None:
+                matcher.encode(texts)
+            else:
+                matcher.encode(texts, model_id)
+
     def rerank(
         self, pages: List[Dict[str, Any]], queries: Union[str, List[str]]
     ) -> Dict[str, Any]:
@@ -47,6 +47,14 @@ class FallbackMerger:
                     "is_precision": result.get("is_precision", False),
                 }
 
+            # page 级分数（如 DENSE page title 命中）保留最高值；
+            # 无 heading 的 page 级结果同时保留来源
+            page_sim = result.get("rerank_sim")
+            if page_sim is not None and page_sim > (merged_pages[key].get("rerank_sim") or 0):
+                merged_pages[key]["rerank_sim"] = page_sim
+            if not result.get("headings") and result.get("source"):
+                merged_pages[key].setdefault("source", result["source"])
+
             # Aggregate headings (deduplicate by normalized heading_text)
             # Mapping: normalized_text -> index in headings list
             existing_headings_map = {}  # {normalized_text: index}
@@ -0,0 +1,199 @@
+"""
+Multi-keyword matcher based on an Aho-Corasick automaton.
+
+FALLBACK_1/FALLBACK_2 以前把所有关键词拼成一个 ``re`` 交替式
+（``kw1|kw2|...``，IGNORECASE），在每个位置逐个尝试所有分支，关键词越多越慢。
+这里把关键词集合编译成 Aho-Corasick 自动机（已展开为确定性转移表），
+每个字符只做一次查表，耗时与关键词数量基本无关。
+
+- 大小写折叠：逐字符 ``casefold``（折叠后长度不为 1 的字符保持原样，
+  以保证匹配位置与原文对齐），与 ``re.IGNORECASE`` 的子串语义一致
+- CJK：按 Unicode 字符匹配，中文关键词无需分词、无词边界限制
+- 缓存：相同关键词集合只编译一次（``get_keyword_matcher``）
+
+Example:
+    >>> from doc4llm.doc_rag.searcher.keyword_matcher import get_keyword_matcher
+    >>> matcher = get_keyword_matcher(["hook", "配置"])
+    >>> bool(matcher.search("Configure Hooks"))
+    True
+    >>> [m.keyword for m in matcher.find_all("hook 配置")]
+    ['hook', '配置']
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class KeywordMatch(NamedTuple):
+    """One keyword occurrence: ``text[start:end]`` matches ``keyword``."""
+
+    start: int
+    end: int
+    keyword: str
+
+
+def fold_case(text: str) -> str:
+    """Case-fold text character by character, keeping positions aligned.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Folded text with ``len(result) == len(text)``
+    """
+    folded = text.casefold()
+    if len(folded) == len(text):
+        return folded
+    return "".join(
+        f if len(f := c.casefold()) == 1 else c for c in text
+    )
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed keyword set.
+
+    Matching is case-insensitive substring matching, like searching with
+    ``re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)``.
+    ``search`` mirrors ``re.Pattern.search`` so the matcher can be used in
+    place of such a pattern.
+
+    Attributes:
+        keywords: Deduplicated keywords, in input order
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """Compile the automaton.
+
+        Args:
+            keywords: Keywords to match (an empty keyword matches every text)
+        """
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keywords))
+        self._match_empty = "" in self.keywords
+
+        # Trie
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for kw_idx, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for ch in fold_case(keyword):
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = goto[state][ch] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(kw_idx)
+
+        # BFS 计算 fail 链接，并直接展开为完整转移表（匹配时无需回溯 fail 链）
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._outputs = outputs
+        # 每个状态输出的最长关键词长度（0 表示无输出）
+        self._out_len = [
+            max((len(self.keywords[i]) for i in out), default=0) for out in outputs
+        ]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def __bool__(self) -> bool:
+        return bool(self.keywords)
+
+    def search(self, text: str) -> Optional[KeywordMatch]:
+        """Find the keyword occurrence that ends first in the text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            KeywordMatch (longest keyword ending at that position), or None
+        """
+        if self._match_empty:
+            return KeywordMatch(0, 0, "")
+        delta, out_len = self._delta, self._out_len
+        state = 0
+        for pos, ch in enumerate(fold_case(text)):
+            state = delta[state].get(ch, 0)
+            if out_len[state]:
+                keyword = max(
+                    (self.keywords[i] for i in self._outputs[state]), key=len
+                )
+                return KeywordMatch(pos + 1 - len(keyword), pos + 1, keyword)
+        return None
+
+    def contains_any(self, text: str) -> bool:
+        """Whether any keyword occurs in the text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            True if at least one keyword matches
+        """
+        if self._match_empty:
+            return True
+        delta, out_len = self._delta, self._out_len
+        state = 0
+        for ch in fold_case(text):
+            state = delta[state].get(ch, 0)
+            if out_len[state]:
+                return True
+        return False
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """Find all (possibly overlapping) keyword occurrences.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches ordered by end position, then by keyword order
+        """
+        matches: List[KeywordMatch] = []
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        for pos, ch in enumerate(fold_case(text)):
+            state = delta[state].get(ch, 0)
+            for kw_idx in sorted(outputs[state]):
+                keyword = self.keywords[kw_idx]
+                matches.append(KeywordMatch(pos + 1 - len(keyword), pos + 1, keyword))
+        return matches
+
+
+@lru_cache(maxsize=128)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_keyword_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """Get the compiled matcher for a keyword set (process-wide cache).
+
+    Args:
+        keywords: Keywords to match
+
+    Returns:
+        Shared KeywordMatcher instance
+    """
+    return _cached_matcher(tuple(dict.fromkeys(keywords)))
+
+
+__all__ = [
+    "KeywordMatch",
+    "KeywordMatcher",
+    "fold_case",
+    "get_keyword_matcher",
+]
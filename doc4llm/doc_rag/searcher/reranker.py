@@ -14,7 +14,7 @@ Example:
 """
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
 import numpy as np
 
@@ -30,8 +30,9 @@ for _ in range(4):  # Search up to 4 levels up
         break
     script_dir = script_dir.parent
 
-from doc4llm.tool.md_doc_retrieval.transformer_matcher import TransformerMatcher
-from doc4llm.tool.md_doc_retrieval.modelscope_matcher import ModelScopeMatcher
+if TYPE_CHECKING:
+    from doc4llm.tool.md_doc_retrieval.transformer_matcher import TransformerMatcher
+    from doc4llm.tool.md_doc_retrieval.modelscope_matcher import ModelScopeMatcher
 
 
 @dataclass
@@ -66,7 +67,7 @@ class HeadingReranker:
     def __init__(
         self,
         config: RerankerConfig,
-        matcher: Union[TransformerMatcher, ModelScopeMatcher]
+        matcher: Union["TransformerMatcher", "ModelScopeMatcher"]
     ):
         """Initialize the heading reranker.
 
@@ -140,7 +141,7 @@ class HeadingReranker:
 
 
 def fallback_2_local_rerank_headings(
-    matcher: Union[TransformerMatcher, ModelScopeMatcher],
+    matcher: Union["TransformerMatcher", "ModelScopeMatcher"],
     pages: List[Dict[str, Any]],
     queries: List[str],
     preprocess_func: Optional[callable] = None,
@@ -222,7 +223,7 @@ __all__ = [
 def batch_rerank_pages_and_headings(
     pages: List[Dict[str, Any]],
     queries: List[str],
-    matcher: Union[TransformerMatcher, ModelScopeMatcher],
+    matcher: Union["TransformerMatcher", "ModelScopeMatcher"],
     scopes: List[str],
     reranker_threshold: float,
     threshold_precision: float,
@@ -8,7 +8,9 @@ This module provides:
 
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .keyword_matcher import KeywordMatcher, get_keyword_matcher
 
 
 class TextPreprocessor:
@@ -34,6 +36,7 @@ class TextPreprocessor:
         self.predicate_verbs = predicate_verbs or []
         self.skiped_keywords = skiped_keywords or []
         self.reranker_lang_threshold = reranker_lang_threshold
+        self._noun_matcher: Optional[Tuple[Tuple[str, ...], KeywordMatcher]] = None
 
     def detect_language(self, text: str) -> str:
         """
@@ -72,23 +75,21 @@ class TextPreprocessor:
         if not text or not self.domain_nouns:
             return False
 
-        text_lower = text.lower()
-
-        for noun in self.domain_nouns:
-            noun_lower = noun.lower()
-
-            # 检测是否为中文（包含中文字符）
-            if re.search(r"[\u4e00-\u9fff]", noun_lower):
-                # 中文：直接子串匹配
-                if noun_lower in text_lower:
-                    return True
-            else:
-                # 英文：词干匹配
-                stem = self._get_english_stem(noun_lower)
-                if stem in text_lower or noun_lower in text_lower:
-                    return True
-
-        return False
+        return self._domain_noun_matcher().contains_any(text)
+
+    def _domain_noun_matcher(self) -> KeywordMatcher:
+        """所有 domain_nouns（及英文词干）编译成一个多关键词匹配器，按名词列表缓存。"""
+        key = tuple(self.domain_nouns)
+        if self._noun_matcher is None or self._noun_matcher[0] != key:
+            patterns = []
+            for noun in key:
+                noun_lower = noun.lower()
+                # 中文：直接子串匹配；英文：名词本身或其词干
+                if not re.search(r"[\u4e00-\u9fff]", noun_lower):
+                    patterns.append(self._get_english_stem(noun_lower))
+                patterns.append(noun_lower)
+            self._noun_matcher = (key, get_keyword_matcher(patterns))
+        return self._noun_matcher[1]
 
     def _get_english_stem(self, word: str) -> str:
         """获取英文单词的词干（简单实现，处理常见复数形式）。"""
@@ -0,0 +1,258 @@
+"""
+Semantic cache of Phase 0a / 0b results.
+
+LLM 响应缓存（doc4llm.llm.response_cache）只在 prompt 字节完全相同时命中，
+"how do I configure hooks" 与 "configure hooks how" 仍会各自走一遍 Phase 0a
+（QueryOptimizer）与 Phase 0b（QueryRouter）。这里用本地 embedding 模型编码原始
+查询，在同一 doc-set 列表（scope）下查找相似度超过阈值的历史查询，命中时直接
+复用其 OptimizationResult 与 RoutingResult。
+
+条目保存在 SQLite 中（存储、TTL 与 LRU 淘汰沿用 response_cache.SQLiteCache），
+多进程 / 守护进程共享。规范化后文本完全相同的查询不需要编码。
+
+Example:
+    >>> cache = get_semantic_query_cache(threshold=0.95)
+    >>> hit = cache.lookup(query, scope, encode)
+    >>> if hit is None:
+    ...     cache.store(query, scope, encode, opt_result, router_result)
+    >>> print(cache.hit_rate)
+"""
+
+import dataclasses
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from doc4llm.doc_rag.query_optimizer.query_optimizer import OptimizationResult
+from doc4llm.doc_rag.query_router.query_router import RoutingResult
+from doc4llm.llm.response_cache import SQLiteCache, shared_cache
+from doc4llm.tool.md_doc_retrieval.embedding_cache import normalize_text
+
+# 缓存格式版本，格式变化时递增以丢弃旧缓存
+SEMANTIC_CACHE_FORMAT_VERSION = 1
+
+DEFAULT_SEMANTIC_CACHE_DIR = os.path.join("~", ".cache", "doc4llm", "queries")
+SEMANTIC_CACHE_DIR_ENV = "DOC4LLM_QUERY_CACHE_DIR"
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_TTL_SECONDS = 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 1000
+
+# encode(query) -> (embedding 空间标识（模型 ID）, 归一化向量)
+QueryEncoder = Callable[[str], Tuple[str, np.ndarray]]
+
+
+@dataclass
+class SemanticCacheHit:
+    """A cached Phase 0a / 0b result.
+
+    Attributes:
+        query: The cached query the result was computed for
+        similarity: Cosine similarity to the looked-up query (1.0 for exact matches)
+        optimization: Phase 0a result
+        routing: Phase 0b result
+    """
+
+    query: str
+    similarity: float
+    optimization: OptimizationResult
+    routing: RoutingResult
+
+
+class SemanticQueryCache(SQLiteCache):
+    """SQLite-backed nearest-neighbour cache of Phase 0a / 0b results.
+
+    Attributes:
+        cache_dir: Directory of ``queries.sqlite3`` (None: memory only)
+        threshold: Minimum cosine similarity for a hit
+        ttl_seconds: Entries older than this are ignored and deleted
+        max_entries: Maximum number of entries, least recently used are evicted
+        stats: Counters ``lookups``, ``hits``, ``exact_hits``, ``misses``,
+            ``expired``, ``stores``, ``evictions``
+    """
+
+    database_name = "queries.sqlite3"
+    table = "queries"
+    key_column = "id"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Open (or create) the cache.
+
+        Args:
+            cache_dir: Cache directory, None to keep entries in memory only
+            threshold: Minimum cosine similarity for a hit (default 0.95)
+            ttl_seconds: Time to live of an entry in seconds (default 1 day)
+            max_entries: Maximum number of cached queries (default 1000)
+        """
+        self.threshold = threshold
+        super().__init__(
+            cache_dir, ttl_seconds, max_entries, stats=("lookups", "exact_hits", "stores")
+        )
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            " id INTEGER PRIMARY KEY, version INTEGER, scope TEXT, text TEXT, model TEXT,"
+            " embedding BLOB, created REAL, accessed REAL, optimization TEXT, routing TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS queries_scope ON queries (scope, model)")
+        conn.execute("CREATE INDEX IF NOT EXISTS queries_text ON queries (scope, text)")
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.stats["lookups"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def _hit(self, row: Tuple, similarity: float, now: float) -> SemanticCacheHit:
+        self._touch(row[0], now)
+        self.stats["hits"] += 1
+        return SemanticCacheHit(
+            query=row[1],
+            similarity=similarity,
+            optimization=OptimizationResult(**json.loads(row[2])),
+            routing=RoutingResult(**json.loads(row[3])),
+        )
+
+    def lookup(
+        self, query: str, scope: str, encode: QueryEncoder
+    ) -> Optional[SemanticCacheHit]:
+        """Find the most similar cached query of the scope.
+
+        Args:
+            query: Raw user query
+            scope: Cache scope, e.g. the doc-set list the optimizer sees
+            encode: ``encode(query) -> (model_id, normalized embedding)``, only
+                called when there is no exact match
+
+        Returns:
+            The best hit at or above ``threshold``, or None
+        """
+        text = normalize_text(query)
+        now = time.time()
+        with self._lock:
+            self.stats["lookups"] += 1
+            try:
+                # 旧格式的条目与过期条目一起删除
+                self._expire(now, "version != ?", (SEMANTIC_CACHE_FORMAT_VERSION,))
+                row = self._conn.execute(
+                    "SELECT id, text, optimization, routing FROM queries"
+                    " WHERE scope = ? AND text = ? ORDER BY created DESC LIMIT 1",
+                    (scope, text),
+                ).fetchone()
+                if row is not None:
+                    self.stats["exact_hits"] += 1
+                    return self._hit(row, 1.0, now)
+            except sqlite3.Error:
+                self.stats["misses"] += 1
+                return None
+
+        model_id, embedding = encode(query)
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, text, optimization, routing, embedding FROM queries"
+                    " WHERE scope = ? AND model = ?",
+                    (scope, model_id),
+                ).fetchall()
+                candidates = [r for r in rows if len(r[4]) == embedding.nbytes]
+                if candidates:
+                    matrix = np.frombuffer(
+                        b"".join(r[4] for r in candidates), dtype=np.float32
+                    ).reshape(len(candidates), -1)
+                    similarities = matrix @ embedding
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.threshold:
+                        return self._hit(candidates[best][:4], float(similarities[best]), now)
+            except sqlite3.Error:
+                pass
+            self.stats["misses"] += 1
+            return None
+
+    def store(
+        self,
+        query: str,
+        scope: str,
+        encode: QueryEncoder,
+        optimization: OptimizationResult,
+        routing: RoutingResult,
+    ) -> None:
+        """Cache the Phase 0a / 0b results of a query.
+
+        Args:
+            query: Raw user query
+            scope: Cache scope (see ``lookup``)
+            encode: ``encode(query) -> (model_id, normalized embedding)``
+            optimization: Phase 0a result
+            routing: Phase 0b result
+        """
+        model_id, embedding = encode(query)
+        blob = np.asarray(embedding, dtype=np.float32).ravel().tobytes()
+        now = time.time()
+        stored = self._insert(
+            "INSERT INTO queries (version, scope, text, model, embedding, created,"
+            " accessed, optimization, routing) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                SEMANTIC_CACHE_FORMAT_VERSION,
+                scope,
+                normalize_text(query),
+                model_id,
+                blob,
+                now,
+                now,
+                json.dumps(dataclasses.asdict(optimization), ensure_ascii=False),
+                json.dumps(dataclasses.asdict(routing), ensure_ascii=False),
+            ),
+        )
+        if stored:
+            self.stats["stores"] += 1
+
+
+def get_semantic_query_cache(
+    cache_dir: Optional[str] = None,
+    threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+) -> SemanticQueryCache:
+    """Get the process-wide semantic query cache for a directory.
+
+    Args:
+        cache_dir: Cache directory (default: ``$DOC4LLM_QUERY_CACHE_DIR`` or
+            ``~/.cache/doc4llm/queries``)
+        threshold: Minimum cosine similarity for a hit
+        ttl_seconds: Time to live of an entry in seconds
+        max_entries: Maximum number of cached queries
+
+    Returns:
+        Shared SemanticQueryCache instance
+    """
+    cache_dir = cache_dir or os.environ.get(SEMANTIC_CACHE_DIR_ENV) or DEFAULT_SEMANTIC_CACHE_DIR
+    return shared_cache(
+        SemanticQueryCache,
+        str(Path(cache_dir).expanduser().resolve()),
+        float(threshold),
+        float(ttl_seconds),
+        int(max_entries),
+    )
+
+
+__all__ = [
+    "QueryEncoder",
+    "SEMANTIC_CACHE_FORMAT_VERSION",
+    "SemanticCacheHit",
+    "SemanticQueryCache",
+    "get_semantic_query_cache",
+]
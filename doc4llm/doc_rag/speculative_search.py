@@ -0,0 +1,260 @@
+"""
+Speculative Phase 1 BM25 recall on the raw query.
+
+Phase 0a / 0b（LLM 查询优化与路由）通常需要数秒，期间 CPU 空闲。原始查询本身
+往往就是可用的 BM25 查询，因此在 Phase 0 进行时，用原始查询对默认 doc-set
+（知识库下全部 doc-set）提前执行 BM25 召回与 heading 打分：
+
+* 首次查询时 BM25 索引的加载 / 构建在 Phase 0 期间完成，Phase 1 直接复用；
+* Phase 0 返回后，路由到的 doc-set 上的推测结果作为额外候选合并进 Phase 1
+  的 BM25 召回（只补充 Phase 1 未召回的页面）；
+* 未被路由到的 doc-set 上的推测任务被取消（未开始的不再执行，已完成的丢弃）。
+
+推测结果的使用情况记录在进程级 ``SpeculationStats`` 中（见
+``get_speculation_stats``）。
+
+Example:
+    >>> speculation = SpeculativeSearch.start(base_dir, query, searcher_config)
+    >>> # ... Phase 0a / 0b ...
+    >>> pages = speculation.collect(target_doc_sets, searcher)
+    >>> searcher.search(search_query, target_doc_sets, speculative_pages=pages)
+    >>> print(get_speculation_stats().reuse_rate)
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from doc4llm.doc_rag.searcher.bm25_recall import BM25Recall
+
+# DocSearcherAPI 配置项 -> BM25Recall 参数；推测召回必须与 Phase 1 使用相同参数
+_RECALL_PARAMS = {
+    "bm25_k1": "k1",
+    "bm25_b": "b",
+    "threshold_page_title": "threshold_page_title",
+    "threshold_headings": "threshold_headings",
+    "threshold_precision": "threshold_precision",
+}
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class SpeculationStats:
+    """Process-wide counters of speculative Phase 1 recall.
+
+    Attributes:
+        stats: Counters ``started``, ``used`` (every routed doc-set was
+            speculated), ``partial`` (some were), ``discarded`` (none were, or
+            the BM25 parameters differ), ``cancelled_doc_sets`` (speculated
+            doc-sets outside the routing), ``failed_doc_sets`` and
+            ``pages_offered`` (speculative pages handed to Phase 1)
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+        self.reset()
+
+    def add(self, **counts: int) -> None:
+        """Increment counters."""
+        with self._lock:
+            for name, count in counts.items():
+                self.stats[name] = self.stats.get(name, 0) + count
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        with self._lock:
+            self.stats = dict.fromkeys(
+                (
+                    "started",
+                    "used",
+                    "partial",
+                    "discarded",
+                    "cancelled_doc_sets",
+                    "failed_doc_sets",
+                    "pages_offered",
+                ),
+                0,
+            )
+
+    @property
+    def reuse_rate(self) -> float:
+        """Fraction of finished speculations whose results reached Phase 1."""
+        with self._lock:
+            reused = self.stats["used"] + self.stats["partial"]
+            total = reused + self.stats["discarded"]
+        return reused / total if total else 0.0
+
+
+_stats = SpeculationStats()
+
+
+def get_speculation_stats() -> SpeculationStats:
+    """Get the process-wide speculative recall counters."""
+    return _stats
+
+
+def find_doc_sets(base_dir: str) -> List[str]:
+    """Doc-sets searched by default (same rule as DocSearcherAPI)."""
+    base = Path(base_dir).expanduser()
+    if not base.is_dir():
+        return []
+    return sorted(item.name for item in base.iterdir() if item.is_dir() and "@" in item.name)
+
+
+class SpeculativeSearch:
+    """BM25 recall of the raw query, running while Phase 0 is in flight.
+
+    Attributes:
+        query: Raw user query
+        doc_sets: Speculated doc-sets
+        recall: BM25Recall used for the speculation
+        elapsed_ms: Wall time of the speculative work, set by ``collect``
+    """
+
+    def __init__(
+        self,
+        recall: BM25Recall,
+        query: str,
+        doc_sets: List[str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """
+        Submit one recall task per doc-set.
+
+        Args:
+            recall: BM25Recall configured like Phase 1's
+            query: Raw user query
+            doc_sets: Doc-sets to speculate on
+            max_workers: Thread pool size
+        """
+        self.recall = recall
+        self.query = query
+        self.doc_sets = list(doc_sets)
+        self.elapsed_ms = 0.0
+        self._start = time.perf_counter()
+        self._finished = 0.0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(self.doc_sets))),
+            thread_name_prefix="doc-rag-speculative",
+        )
+        self._futures: Dict[str, Future] = {
+            doc_set: self._executor.submit(self._recall, doc_set) for doc_set in self.doc_sets
+        }
+        _stats.add(started=1)
+
+    @classmethod
+    def start(
+        cls,
+        base_dir: str,
+        query: str,
+        searcher_config: Optional[Dict[str, Any]] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> Optional["SpeculativeSearch"]:
+        """
+        Start speculating on every doc-set of a knowledge base.
+
+        Args:
+            base_dir: Knowledge base root directory
+            query: Raw user query
+            searcher_config: User DocSearcherAPI config (BM25 parameters are read from it)
+            max_workers: Thread pool size
+
+        Returns:
+            SpeculativeSearch, or None when the knowledge base has no doc-sets
+        """
+        doc_sets = find_doc_sets(base_dir)
+        if not doc_sets or not query.strip():
+            return None
+        searcher_config = searcher_config or {}
+        recall = BM25Recall(
+            base_dir=str(Path(base_dir).expanduser().resolve()),
+            **{
+                param: searcher_config[key]
+                for key, param in _RECALL_PARAMS.items()
+                if key in searcher_config
+            },
+        )
+        return cls(recall, query, doc_sets, max_workers=max_workers)
+
+    def _recall(self, doc_set: str) -> List[Dict[str, Any]]:
+        try:
+            return self.recall.recall_pages(doc_set, self.query)
+        finally:
+            self._finished = time.perf_counter()
+
+    def _params(self) -> Tuple[float, ...]:
+        return tuple(getattr(self.recall, param) for param in _RECALL_PARAMS.values())
+
+    def matches(self, searcher: Any) -> bool:
+        """Whether a DocSearcherAPI scores BM25 with the speculated parameters."""
+        return self._params() == tuple(getattr(searcher, key) for key in _RECALL_PARAMS)
+
+    def collect(
+        self, target_doc_sets: Optional[List[str]], searcher: Any = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Take the speculative pages of the routed doc-sets and cancel the rest.
+
+        Waits for the routed doc-sets' tasks, so the merged result does not
+        depend on how long Phase 0 took.
+
+        Args:
+            target_doc_sets: Doc-sets routed by Phase 0 (None or empty: all doc-sets)
+            searcher: Phase 1 DocSearcherAPI; results are discarded if its
+                BM25 parameters differ from the speculation's
+
+        Returns:
+            Doc-set -> speculative scored pages (empty when nothing is reusable)
+        """
+        targets = list(target_doc_sets) if target_doc_sets else list(self.doc_sets)
+        usable = set(targets) & set(self.doc_sets)
+        if searcher is not None and not self.matches(searcher):
+            usable = set()
+
+        cancelled = 0
+        for doc_set, future in self._futures.items():
+            if doc_set not in usable:
+                future.cancel()
+                cancelled += 1
+
+        pages: Dict[str, List[Dict[str, Any]]] = {}
+        failed = 0
+        for doc_set in sorted(usable):
+            try:
+                pages[doc_set] = self._futures[doc_set].result()
+            except Exception:
+                failed += 1
+        self._executor.shutdown(wait=False)
+        self.elapsed_ms = max(0.0, self._finished - self._start) * 1000
+
+        if not pages:
+            outcome = "discarded"
+        elif len(pages) == len(targets):
+            outcome = "used"
+        else:
+            outcome = "partial"
+        _stats.add(
+            **{outcome: 1},
+            cancelled_doc_sets=cancelled,
+            failed_doc_sets=failed,
+            pages_offered=sum(len(p) for p in pages.values()),
+        )
+        return pages
+
+    def cancel(self) -> None:
+        """Abandon the speculation (e.g. when Phase 0 fails)."""
+        for future in self._futures.values():
+            future.cancel()
+        self._executor.shutdown(wait=False)
+        _stats.add(discarded=1, cancelled_doc_sets=len(self._futures))
+
+
+__all__ = [
+    "SpeculationStats",
+    "SpeculativeSearch",
+    "find_doc_sets",
+    "get_speculation_stats",
+]
@@ -0,0 +1,60 @@
+"""
+Test the FALLBACK_1 AnchorSearcher TOC search.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from doc4llm.doc_rag.searcher.anchor_searcher import AnchorSearcher
+from doc4llm.doc_rag.searcher.bm25_recall import BM25Recall
+from doc4llm.doc_rag.searcher.doc_searcher_api import DocSearcherAPI
+
+
+class TestAnchorSearcher:
+    """Test cases for AnchorSearcher."""
+
+    def test_returns_matching_headings(self, tmp_path):
+        """Matching TOC headings are returned with their page, doc-set and TOC path."""
+        page_dir = tmp_path / "Docs@latest" / "Hooks Guide"
+        page_dir.mkdir(parents=True)
+        (page_dir / "docTOC.md").write_text(
+            "# Hooks Guide\n\n"
+            "## 1. Hook Configuration\n"
+            "## 2. Settings\n"
+            "### 2.1 [Hook Events](https://example.com/events)\n",
+            encoding="utf-8",
+        )
+
+        results = AnchorSearcher(base_dir=str(tmp_path)).search(["hook"], ["Docs@latest"])
+
+        headings = [r["heading"] for r in results]
+        assert "## 1. Hook Configuration" in headings
+        assert "### 2.1 Hook Events" in headings
+        assert "## 2. Settings" not in headings
+        assert all(r["doc_set"] == "Docs@latest" for r in results)
+        assert all(r["page_title"] == "Hooks Guide" for r in results)
+        assert all(r["toc_path"] == str(page_dir / "docTOC.md") for r in results)
+        assert all(r["source"] == "FALLBACK_1" for r in results)
+
+    def test_inflected_query_keeps_heading_basic(self, tmp_path):
+        """FALLBACK_1 re-scoring stems tokens, so "hooks" still matches "Hook"."""
+        page_dir = tmp_path / "Docs@latest" / "Hooks Guide"
+        page_dir.mkdir(parents=True)
+        (page_dir / "docTOC.md").write_text(
+            "# Hooks Guide\n\n## 1. Hook configuration\n## 2. Events\n", encoding="utf-8"
+        )
+        searcher = DocSearcherAPI(base_dir=str(tmp_path))
+        results = [{
+            "doc_set": "Docs@latest",
+            "page_title": "Hooks Guide",
+            "heading": "## 1. Hook configuration",
+            "source": "FALLBACK_1",
+        }]
+
+        searcher._score_anchor_results(
+            BM25Recall(base_dir=str(tmp_path)), results, ["configuring hooks"]
+        )
+
+        assert results[0]["bm25_sim"] >= searcher.threshold_headings
+        assert results[0]["is_basic"]
@@ -0,0 +1,171 @@
+"""
+Tests for the native asyncio pipeline (DocRAGOrchestrator.aretrieve).
+
+LLM calls are replaced by canned results, so the tests run offline.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from doc4llm._steps import arun_steps, run_steps
+from doc4llm.doc_rag.orchestrator import DocRAGConfig, DocRAGOrchestrator
+from doc4llm.doc_rag.query_optimizer import query_optimizer
+from doc4llm.doc_rag.query_optimizer.query_optimizer import OptimizationResult, QueryOptimizer
+from doc4llm.doc_rag.query_router.query_router import QueryRouter, RoutingResult
+
+PAGES = {
+    "Docs@latest": {
+        "Hooks Guide": "# Hooks Guide\n\n## 1. Hook Configuration\n## 2. Hook Events\n",
+        "Settings": "# Settings\n\n## 1. Settings files\n## 2. Permission settings\n",
+    },
+}
+
+OPTIMIZATION = OptimizationResult(
+    query_analysis={"doc_set": ["Docs@latest"], "domain_nouns": ["hook"]},
+    optimized_queries=[{"rank": 1, "query": "hook configuration"}],
+    search_recommendation={},
+)
+ROUTING = RoutingResult(
+    scene="how_to", confidence=0.9, ambiguity=0.1, coverage_need=0.5, reranker_threshold=0.6
+)
+LLM_DELAY = 0.2
+
+
+@pytest.fixture
+def kb(tmp_path):
+    """Temporary knowledge base with one doc-set."""
+    for doc_set, pages in PAGES.items():
+        for title, toc in pages.items():
+            page_dir = tmp_path / doc_set / title
+            page_dir.mkdir(parents=True)
+            (page_dir / "docTOC.md").write_text(toc, encoding="utf-8")
+            (page_dir / "docContent.md").write_text(toc, encoding="utf-8")
+    return tmp_path
+
+
+class TestRunSteps:
+    """run_steps / arun_steps drive the same generator."""
+
+    @staticmethod
+    def _steps():
+        first = yield 1
+        try:
+            yield "fail"
+        except ValueError:
+            second = 10
+        return first + second
+
+    @staticmethod
+    def _run(step):
+        if step == "fail":
+            raise ValueError(step)
+        return step
+
+    def test_sync_and_async_results_match(self):
+        async def arun(step):
+            return self._run(step)
+
+        assert run_steps(self._steps(), self._run) == 11
+        assert asyncio.run(arun_steps(self._steps(), arun)) == 11
+
+
+class TestAsyncLLMCalls:
+    """*_async methods await ainvoke instead of wrapping the blocking call."""
+
+    def test_optimize_async_uses_async_client(self, monkeypatch):
+        data = {
+            "query_analysis": {"original": "hooks", "domain_nouns": ["hooks"]},
+            "optimized_queries": [{"rank": 1, "query": "hooks guide"}],
+        }
+        text = "```json\n" + json.dumps(data) + "\n```"
+
+        async def fake_ainvoke(**kwargs):
+            return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+        def blocking_invoke(**kwargs):
+            raise AssertionError("optimize_async must not use the blocking client")
+
+        monkeypatch.setattr(query_optimizer, "ainvoke", fake_ainvoke)
+        monkeypatch.setattr(query_optimizer, "invoke", blocking_invoke)
+
+        result = asyncio.run(QueryOptimizer().optimize_async("hooks"))
+        assert result.optimized_queries == data["optimized_queries"]
+
+
+class TestAretrieve:
+    """DocRAGOrchestrator.aretrieve runs the same pipeline without a thread per call."""
+
+    @pytest.fixture(autouse=True)
+    def fake_llm(self, monkeypatch):
+        async def optimize_async(self, query):
+            await asyncio.sleep(LLM_DELAY)
+            return OPTIMIZATION
+
+        async def route_async(self, query):
+            await asyncio.sleep(LLM_DELAY)
+            return ROUTING
+
+        monkeypatch.setattr(QueryOptimizer, "optimize", lambda self, query: OPTIMIZATION)
+        monkeypatch.setattr(QueryRouter, "route", lambda self, query: ROUTING)
+        monkeypatch.setattr(QueryOptimizer, "optimize_async", optimize_async)
+        monkeypatch.setattr(QueryRouter, "route_async", route_async)
+
+    def _orchestrator(self, kb):
+        return DocRAGOrchestrator(
+            DocRAGConfig(
+                base_dir=str(kb),
+                stop_at_phase="1",
+                searcher_reranker=False,
+                searcher_config={"threshold_page_title": 0.0},
+                async_max_workers=2,
+            )
+        )
+
+    def test_same_result_as_retrieve(self, kb):
+        rag = self._orchestrator(kb)
+
+        expected = rag.retrieve("hook configuration")
+        result = asyncio.run(rag.aretrieve("hook configuration"))
+
+        assert result.success and expected.success
+        assert json.loads(result.output) == json.loads(expected.output)
+        assert result.scene == "how_to"
+
+    def test_phase_0_calls_run_concurrently(self, kb):
+        rag = self._orchestrator(kb)
+
+        result = asyncio.run(rag.aretrieve("hook configuration"))
+
+        assert result.timing["phase_0a"] >= LLM_DELAY * 1000 * 0.9
+        assert result.timing["phase_0a"] + result.timing["phase_0b"] < LLM_DELAY * 1000 * 1.5
+
+    def test_concurrent_queries_share_the_event_loop(self, kb):
+        rag = self._orchestrator(kb)
+
+        async def run_all():
+            return await asyncio.gather(*(rag.aretrieve("hook configuration") for _ in range(8)))
+
+        start = time.perf_counter()
+        results = asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+
+        assert all(r.success for r in results)
+        # 8 个查询的 LLM 等待在同一事件循环中重叠，而不是受 2 个工作线程限制
+        assert elapsed < LLM_DELAY * 4
+        assert rag._blocking_executor._max_workers == 2
+
+    def test_context_manager_shuts_down_the_pool(self, kb):
+        async def run():
+            async with self._orchestrator(kb) as rag:
+                result = await rag.aretrieve("hook configuration")
+                executor = rag._blocking_executor
+            return rag, executor, result
+
+        rag, executor, result = asyncio.run(run())
+
+        assert result.success
+        assert executor._shutdown and rag._blocking_executor is None
@@ -0,0 +1,228 @@
+"""
+Test persistent BM25 page index (bm25_index.py).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from doc4llm.doc_rag.searcher.bm25_index import BM25IndexStore
+from doc4llm.doc_rag.searcher.bm25_recall import BM25Config, BM25Matcher, BM25Recall
+
+
+TOCS = {
+    "Hooks Guide": (
+        "# Hooks Guide\n\n"
+        "## 1. Hook Configuration：https://example.com/hooks#config\n"
+        "## 2. Hook Events：https://example.com/hooks#events\n"
+        "### 2.1 PreToolUse hook input：https://example.com/hooks#pre\n"
+    ),
+    "Settings": (
+        "# Settings\n\n"
+        "## 1. Settings files：https://example.com/settings#files\n"
+        "## 2. Permission settings：https://example.com/settings#permissions\n"
+    ),
+    "Skills": (
+        "# Agent Skills\n\n"
+        "## 1. Create a skill：https://example.com/skills#create\n"
+        "## 2. Skill configuration：https://example.com/skills#config\n"
+    ),
+}
+
+QUERIES = ["hook configuration", "skill settings", "permission", "nothing matches zzz"]
+
+
+def _write_doc_set(base_dir: Path, doc_set: str, tocs: dict) -> None:
+    for title, content in tocs.items():
+        page_dir = base_dir / doc_set / title
+        page_dir.mkdir(parents=True, exist_ok=True)
+        (page_dir / "docTOC.md").write_text(content, encoding="utf-8")
+
+
+class TestBM25IndexStore:
+    """Test cases for the persistent per doc-set BM25 index."""
+
+    @pytest.fixture
+    def kb(self, tmp_path):
+        """Temporary knowledge base with two doc-sets."""
+        _write_doc_set(tmp_path, "Docs@latest", TOCS)
+        _write_doc_set(tmp_path, "Other@latest", {"Intro": "# Intro\n## 1. Overview\n"})
+        return tmp_path
+
+    def test_scores_match_in_memory_matcher(self, kb):
+        """Index scores are identical to BM25Matcher built from the same TOCs."""
+        store = BM25IndexStore(str(kb))
+        index = store.get("Docs@latest")
+
+        matcher = BM25Matcher(BM25Config(stemming=False))
+        matcher.build_index(
+            {t: (kb / "Docs@latest" / t / "docTOC.md").read_text(encoding="utf-8")
+             for t in sorted(TOCS)}
+        )
+
+        for q in QUERIES:
+            expected = matcher.search(q, top_k=100)
+            actual = [
+                (index.page_titles[i], s)
+                for i, s in index.search(store.tokenize(q), k1=1.2, b=0.75, top_k=100)
+            ]
+            assert actual == expected
+
+    def test_persisted_and_reloaded(self, kb):
+        """A second store loads the on-disk index (memory-mapped) instead of rebuilding."""
+        BM25IndexStore(str(kb)).get("Docs@latest")
+        assert (kb / ".doc4llm_index" / "Docs@latest" / "meta.json").exists()
+
+        store = BM25IndexStore(str(kb))
+        index = store.get("Docs@latest")
+        assert isinstance(index.postings_docs, np.memmap)
+        assert index.page_titles == sorted(TOCS)
+        assert index.headings[0][0]["text"] == "Hooks Guide"
+
+    def test_changed_file_rebuilds_only_its_doc_set(self, kb):
+        """Touching one TOC invalidates only the index of its doc-set."""
+        store = BM25IndexStore(str(kb))
+        docs_index = store.get("Docs@latest")
+        other_index = store.get("Other@latest")
+
+        toc = kb / "Docs@latest" / "Settings" / "docTOC.md"
+        toc.write_text(TOCS["Settings"] + "## 3. Sandbox settings\n", encoding="utf-8")
+        stat = toc.stat()
+        os.utime(toc, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert store.get("Other@latest") is other_index
+        rebuilt = store.get("Docs@latest")
+        assert rebuilt is not docs_index
+        assert "sandbox" in rebuilt.vocab
+
+    def test_recall_pages_uses_index(self, kb):
+        """BM25Recall returns pages and headings from the persistent index."""
+        recall = BM25Recall(base_dir=str(kb), index_dir=str(kb / "idx"))
+        pages = recall.recall_pages("Docs@latest", ["hook configuration"])
+
+        assert pages[0]["page_title"] == "Hooks Guide"
+        assert pages[0]["toc_path"].endswith(os.path.join("Hooks Guide", "docTOC.md"))
+        assert any(h["text"] == "1. Hook Configuration" for h in pages[0]["headings"])
+        assert (kb / "idx" / "Docs@latest" / "meta.json").exists()
+
+    def test_missing_doc_set(self, kb):
+        """Unknown doc-sets yield an empty index and no recall results."""
+        recall = BM25Recall(base_dir=str(kb))
+        assert recall.recall_pages("Missing@latest", "hooks") == []
+
+
+class TestHeadingIndex:
+    """Test cases for the heading-level inverted index."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Index store over a temporary knowledge base."""
+        _write_doc_set(tmp_path, "Docs@latest", TOCS)
+        return BM25IndexStore(str(tmp_path))
+
+    def test_heading_table(self, store):
+        """Heading ids follow the per-page heading lists."""
+        index = store.get("Docs@latest")
+        assert len(index.heading_lengths) == sum(len(h) for h in index.headings)
+        ids = index.page_heading_ids([1])
+        assert len(ids) == len(index.headings[1])
+        assert ids[0] == index.heading_offsets[1]
+
+    def test_indexed_and_text_scores_agree(self, store):
+        """Scoring indexed headings equals scoring their texts ad hoc."""
+        index = store.get("Docs@latest")
+        queries = [store.tokenize(q) for q in QUERIES]
+        ids = index.page_heading_ids(list(range(index.total_docs)))
+        texts = [store.tokenize(h["text"]) for page in index.headings for h in page]
+
+        indexed = index.score_headings(queries, ids, k1=1.2, b=0.75)
+        adhoc = index.score_heading_texts(queries, texts, k1=1.2, b=0.75)
+        assert indexed.shape == (len(QUERIES), len(ids))
+        np.testing.assert_allclose(indexed, adhoc)
+
+    def test_heading_scores_are_normalized(self, store):
+        """A heading containing every query term once scores ~1, unrelated ones 0."""
+        index = store.get("Docs@latest")
+        scores = index.score_heading_texts(
+            [store.tokenize("permission settings")],
+            [store.tokenize("Permission settings"), store.tokenize("Create a skill")],
+            k1=1.2,
+            b=0.75,
+        )[0]
+        assert scores[0] == pytest.approx(1.0, abs=0.3)
+        assert scores[1] == 0.0
+
+    def test_rare_terms_weigh_more(self, store):
+        """Corpus IDF makes the rare query term dominate the score."""
+        index = store.get("Docs@latest")
+        scores = index.score_heading_texts(
+            [store.tokenize("hook sandbox permission")],
+            [store.tokenize("hook"), store.tokenize("permission")],
+            k1=1.2,
+            b=0.75,
+        )[0]
+        # "hook" appears in several headings, "permission" in one
+        assert scores[1] > scores[0]
+
+    def test_partial_matches_stay_below_precision(self, store):
+        """Query terms missing from every heading still count towards the ideal score."""
+        index = store.get("Docs@latest")
+        scores = index.score_heading_texts(
+            [store.tokenize("hook sandbox"), store.tokenize("hook")],
+            [store.tokenize("Hook Configuration"), store.tokenize("hook")],
+            k1=1.2,
+            b=0.75,
+        )
+        # 只匹配一个查询词：达到 basic，达不到 precision
+        assert 0.25 <= scores[0, 0] < 0.7
+        # 短 heading 也不超过 1
+        assert scores[1, 1] == pytest.approx(1.0)
+        assert scores.max() <= 1.0
+
+    def test_stemming_matches_inflected_forms(self, store):
+        """With stemming=True an inflected query term matches the heading term."""
+        index = store.get("Docs@latest")
+        queries = [store.tokenize("configuring hooks")]
+        texts = [store.tokenize("Hook Configuration")]
+
+        assert index.score_heading_texts(queries, texts, k1=1.2, b=0.75)[0, 0] == 0.0
+        stemmed = index.score_heading_texts(queries, texts, k1=1.2, b=0.75, stemming=True)
+        assert 0.0 < stemmed[0, 0] <= 1.0
+
+    def test_default_thresholds(self, tmp_path):
+        """With the default thresholds only headings matching the whole query are precise."""
+        _write_doc_set(tmp_path, "Docs@latest", TOCS)
+        recall = BM25Recall(base_dir=str(tmp_path))
+
+        def headings(query):
+            pages = recall.recall_pages("Docs@latest", query)
+            return {h["text"]: h for page in pages for h in page["headings"]}
+
+        matched = headings("hook configuration")
+        assert matched["1. Hook Configuration"]["is_precision"]
+        # 只匹配一个查询词的 heading 保留为 basic，不是 precision
+        assert matched["2. Hook Events"]["is_basic"]
+        assert not matched["2. Hook Events"]["is_precision"]
+
+        # 查询词 "sandbox" 不在任何 heading 中，也不能把部分匹配抬成 precision
+        partial = headings("hook configuration sandbox")
+        assert partial["1. Hook Configuration"]["is_basic"]
+        assert not partial["1. Hook Configuration"]["is_precision"]
+
+    def test_recall_score_heading_texts(self, tmp_path):
+        """BM25Recall.score_heading_texts matches the recall_pages heading scores."""
+        _write_doc_set(tmp_path, "Docs@latest", TOCS)
+        recall = BM25Recall(base_dir=str(tmp_path), threshold_headings=0.0)
+        pages = recall.recall_pages("Docs@latest", ["hook configuration", "hook events"])
+        page = next(p for p in pages if p["page_title"] == "Hooks Guide")
+
+        scores = recall.score_heading_texts(
+            "Docs@latest",
+            ["hook configuration", "hook events"],
+            [h["full_text"] for h in page["headings"]],
+        )
+        assert scores == pytest.approx([h["bm25_sim"] for h in page["headings"]])
@@ -0,0 +1,129 @@
+"""
+Test line-level content index (content_index.py) and indexed ContentSearcher.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from doc4llm.doc_rag.searcher.content_index import ContentIndexStore
+from doc4llm.doc_rag.searcher.content_searcher import ContentSearcher
+
+
+PAGES = {
+    "Hooks Guide": (
+        "# Hooks Guide\n"
+        "\n"
+        "Intro text mentioning PreToolUse.\n"
+        "## 1. Hook Configuration：https://example.com/hooks#config\n"
+        "Configure a PreToolUse hook in settings.json.\n"
+        "---\n"
+        "See [the reference](https://example.com/ref) for details.\n"
+        "## 2. Hook Events\n"
+        "The Stop event fires when Claude Code finishes.\n"
+    ),
+    "技能": (
+        "# 技能\n"
+        "## 创建技能\n"
+        "在 skills 目录下创建技能配置文件。\n"
+    ),
+}
+
+
+def _write_doc_set(base_dir: Path, doc_set: str, pages: dict) -> None:
+    for title, content in pages.items():
+        page_dir = base_dir / doc_set / title
+        page_dir.mkdir(parents=True, exist_ok=True)
+        (page_dir / "docContent.md").write_text(content, encoding="utf-8")
+
+
+class TestContentIndex:
+    """Test cases for the per doc-set line index."""
+
+    @pytest.fixture
+    def kb(self, tmp_path):
+        """Temporary knowledge base with one doc-set."""
+        _write_doc_set(tmp_path, "Docs@latest", PAGES)
+        return tmp_path
+
+    def test_candidate_lines(self, kb):
+        """Keyword fragments are found case-insensitively inside terms."""
+        index = ContentIndexStore(str(kb)).get("Docs@latest")
+        hooks = index.files.index({"page_dir": "Hooks Guide", "page_title": "Hooks Guide"})
+        offset = index.line_offsets[hooks]
+
+        lines = index.candidate_lines(["pretooluse"]) - offset
+        assert lines.tolist() == [2, 4]
+        # multi-word keyword: every fragment must occur on the line
+        assert (index.candidate_lines(["claude code"]) - offset).tolist() == [8]
+        assert len(index.candidate_lines(["技能"])) == 3
+        assert len(index.candidate_lines(["nothing"])) == 0
+
+    def test_heading_table(self, kb):
+        """Heading lookups match the backward search, within context_lines."""
+        index = ContentIndexStore(str(kb)).get("Docs@latest")
+        offset = int(index.line_offsets[0])
+        assert index.heading_for(offset + 4, context_lines=100) == "## 1. Hook Configuration"
+        assert index.heading_for(offset + 6, context_lines=1) is None
+        assert index.section_bounds(offset + 4) == (4, 7)
+
+    def test_persisted_and_rebuilt(self, kb):
+        """The index is reloaded from disk and rebuilt when a file changes."""
+        ContentIndexStore(str(kb)).get("Docs@latest")
+        assert (kb / ".doc4llm_index" / "Docs@latest" / "content" / "meta.json").exists()
+
+        store = ContentIndexStore(str(kb))
+        index = store.get("Docs@latest")
+        assert isinstance(index.postings_lines, np.memmap)
+
+        content = kb / "Docs@latest" / "技能" / "docContent.md"
+        content.write_text(PAGES["技能"] + "Sandbox 沙箱\n", encoding="utf-8")
+        stat = content.stat()
+        os.utime(content, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert "sandbox" in store.get("Docs@latest").vocab
+
+
+class TestIndexedContentSearcher:
+    """Test cases for ContentSearcher on top of the content index."""
+
+    @pytest.fixture
+    def kb(self, tmp_path):
+        """Temporary knowledge base with one doc-set."""
+        _write_doc_set(tmp_path, "Docs@latest", PAGES)
+        return tmp_path
+
+    def test_search_results(self, kb):
+        """Matches are grouped per heading with heading-bounded context."""
+        searcher = ContentSearcher(base_dir=str(kb), domain_nouns=["PreToolUse", "技能"])
+        results = searcher.search(["q"], ["Docs@latest", "Missing@latest"])
+
+        by_heading = {r["heading"]: r for r in results}
+        assert set(by_heading) == {"## 1. Hook Configuration", "## 创建技能"}
+        hook = by_heading["## 1. Hook Configuration"]
+        assert hook["match_line_num"] == 5
+        assert hook["related_context"] == (
+            "Configure a PreToolUse hook in settings.json.\n"
+            "See the reference for details."
+        )
+        assert hook["toc_path"].endswith(os.path.join("Hooks Guide", "docTOC.md"))
+
+    def test_context_matches_full_scan(self, kb):
+        """Precomputed bounds and word counts give the same context as a scan."""
+        searcher = ContentSearcher(base_dir=str(kb), domain_nouns=["Claude"], max_words=5)
+        [result] = searcher.search(["q"], ["Docs@latest"])
+
+        lines = PAGES["Hooks Guide"].split("\n")
+        assert result["related_context"] == searcher._extract_context(
+            lines, result["match_line_num"]
+        )
+
+    def test_max_results(self, kb):
+        """The global result limit still applies."""
+        searcher = ContentSearcher(
+            base_dir=str(kb), domain_nouns=["hook", "技能"], max_results=1
+        )
+        assert len(searcher.search(["q"], ["Docs@latest"])) == 1
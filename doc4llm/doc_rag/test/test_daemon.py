@@ -0,0 +1,184 @@
+"""
+Test the docrag daemon protocol and CLI forwarding.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from doc4llm.doc_rag import cli, daemon as daemon_module
+from doc4llm.doc_rag.daemon import (
+    DocRAGDaemon,
+    UntrustedDaemon,
+    default_socket_path,
+    environment_fingerprint,
+    forward_retrieve,
+    request,
+)
+
+
+def _fake_retrieve(**kwargs):
+    return {"output": f"docs for {kwargs['query']}", "success": True, "query": kwargs["query"]}
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX 路径长度有限，放在 /tmp 下
+    tmp_dir = tempfile.mkdtemp(dir="/tmp")
+    yield os.path.join(tmp_dir, "docrag.sock")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    server = DocRAGDaemon(socket_path, retrieve_fn=_fake_retrieve)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+class TestDocRAGDaemon:
+    def test_forward_retrieve_round_trip(self, daemon):
+        result = forward_retrieve({"query": "hooks"}, daemon.socket_path)
+        assert result == {"output": "docs for hooks", "success": True, "query": "hooks"}
+        assert daemon.requests_served == 1
+
+    def test_no_daemon_returns_none(self, socket_path):
+        assert forward_retrieve({"query": "hooks"}, socket_path) is None
+
+    def test_pipeline_error_is_reported(self, socket_path):
+        def failing(**kwargs):
+            raise ValueError("bad kb")
+
+        server = DocRAGDaemon(socket_path, retrieve_fn=failing)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with pytest.raises(RuntimeError, match="bad kb"):
+                forward_retrieve({"query": "hooks"}, socket_path)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_ping_and_shutdown(self, socket_path):
+        server = DocRAGDaemon(socket_path, retrieve_fn=_fake_retrieve)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        info = request({"op": "ping"}, socket_path)
+        assert info["ok"] and info["pid"] == os.getpid()
+
+        assert request({"op": "shutdown"}, socket_path) == {"ok": True}
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        server.server_close()
+        assert not os.path.exists(socket_path)
+
+    def test_stale_socket_is_replaced(self, socket_path):
+        Path(socket_path).write_text("")
+        server = DocRAGDaemon(socket_path, retrieve_fn=_fake_retrieve)
+        server.server_close()
+
+    def test_second_daemon_is_rejected(self, daemon):
+        with pytest.raises(RuntimeError, match="already running"):
+            DocRAGDaemon(daemon.socket_path, retrieve_fn=_fake_retrieve)
+
+
+class TestDaemonSecurity:
+    def test_default_socket_is_in_a_private_directory(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("DOC4LLM_DAEMON_SOCKET", raising=False)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        assert default_socket_path() == str(tmp_path / "doc4llm" / "docrag.sock")
+
+        monkeypatch.delenv("XDG_RUNTIME_DIR")
+        path = Path(default_socket_path())
+        assert path.name == "docrag.sock" and path.parent.name == f"doc4llm-{os.getuid()}"
+
+    def test_shared_directory_is_refused(self, socket_path):
+        os.chmod(os.path.dirname(socket_path), 0o777)
+        with pytest.raises(RuntimeError, match="not writable by other users"):
+            DocRAGDaemon(socket_path, retrieve_fn=_fake_retrieve)
+
+    def test_socket_directory_is_private(self):
+        socket_dir = Path(tempfile.mkdtemp(dir="/tmp")) / "sub"
+        try:
+            server = DocRAGDaemon(str(socket_dir / "docrag.sock"), retrieve_fn=_fake_retrieve)
+            server.server_close()
+            assert socket_dir.stat().st_mode & 0o777 == 0o700
+        finally:
+            shutil.rmtree(socket_dir.parent, ignore_errors=True)
+
+    def test_socket_of_another_user_is_not_trusted(self, daemon, monkeypatch):
+        monkeypatch.setattr(daemon_module, "_current_uid", lambda: os.getuid() + 1)
+
+        with pytest.raises(UntrustedDaemon):
+            request({"op": "ping"}, daemon.socket_path)
+        assert forward_retrieve({"query": "hooks"}, daemon.socket_path) is None
+        assert daemon.requests_served == 0
+
+    def test_peer_of_another_user_is_not_trusted(self, daemon, monkeypatch):
+        if not hasattr(daemon_module.socket, "SO_PEERCRED"):
+            pytest.skip("SO_PEERCRED is Linux only")
+        # socket 文件检查通过，对端进程 uid 不符
+        monkeypatch.setattr(daemon_module, "_check_socket_owner", lambda path: None)
+        monkeypatch.setattr(daemon_module, "_current_uid", lambda: os.getuid() + 1)
+
+        with pytest.raises(UntrustedDaemon, match="runs as uid"):
+            request({"op": "ping"}, daemon.socket_path)
+
+    def test_different_environment_runs_in_process(self, daemon):
+        # 调用方的 API key / .env 与守护进程不同
+        response = request(
+            {"op": "retrieve", "kwargs": {"query": "hooks"}, "env": "other"}, daemon.socket_path
+        )
+        assert response["ok"] is False and response["in_process"] is True
+        assert daemon.requests_served == 0
+
+    def test_fingerprint_covers_env_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        before = environment_fingerprint()
+
+        (tmp_path / "doc4llm").mkdir()
+        (tmp_path / "doc4llm" / ".env").write_text("ANTHROPIC_API_KEY=sk-other\n")
+        assert environment_fingerprint() != before
+
+
+class TestCliForwarding:
+    def test_cli_uses_daemon(self, daemon, tmp_path, monkeypatch):
+        result_file = tmp_path / "result.txt"
+        monkeypatch.setenv("DOC4LLM_RESULT_FILE", str(result_file))
+
+        code = cli.main(["hooks", "--kb", str(tmp_path), "--socket", daemon.socket_path])
+
+        assert code == 0
+        assert result_file.read_text(encoding="utf-8") == "docs for hooks"
+        assert daemon.requests_served == 1
+
+    def test_no_daemon_flag_stays_in_process(self, daemon, tmp_path, monkeypatch):
+        monkeypatch.setenv("DOC4LLM_RESULT_FILE", str(tmp_path / "result.txt"))
+        monkeypatch.setattr(cli, "_retrieve_in_process", _fake_retrieve_kwargs)
+
+        code = cli.main(["hooks", "--no-daemon", "--socket", daemon.socket_path])
+
+        assert code == 0
+        assert daemon.requests_served == 0
+
+    def test_kwargs_use_absolute_paths(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        args = cli.build_parser().parse_args(["hooks", "--kb", "docs"])
+        kwargs = cli.retrieve_kwargs(args, silent=True)
+        assert kwargs["base_dir"] == str(tmp_path / "docs")
+
+
+def _fake_retrieve_kwargs(kwargs):
+    return _fake_retrieve(**kwargs)
@@ -0,0 +1,235 @@
+"""
+Test the prebuilt dense index and DenseSearcher.
+"""
+
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from doc4llm.doc_rag.searcher.dense_index import (
+    DenseIndex,
+    DenseIndexStore,
+    evaluate_recall,
+    quantize_vectors,
+    train_ivf,
+)
+from doc4llm.doc_rag.searcher.dense_searcher import (
+    DenseSearcher,
+    DenseSearcherConfig,
+    register_dense_searcher,
+)
+from doc4llm.doc_rag.searcher.doc_searcher_api import DocSearcherAPI
+from doc4llm.doc_rag.searcher.searcher_registry import SearcherRegistry
+
+
+class HashingMatcher:
+    """Deterministic bag-of-words embedder with the matcher interface."""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.encoded = []
+
+    def model_id_for(self, texts):
+        return "hashing"
+
+    def encode(self, texts, model_id=None):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[i, zlib.crc32(word.strip("#.").encode()) % self.dim] += 1.0
+        return vectors
+
+
+PAGES = {
+    "Hooks Guide": "# Hooks Guide\n\n## 1. Hook Configuration\n## 2. Hook Events\n",
+    "Settings": "# Settings\n\n## 1. Settings files\n## 2. Permission modes\n",
+    "Plugins": "# Plugins\n\n## 1. Install plugins\n## 2. Plugin marketplace\n",
+}
+
+
+@pytest.fixture
+def kb(tmp_path):
+    """Temporary knowledge base with one doc-set."""
+    for title, toc in PAGES.items():
+        page_dir = tmp_path / "Docs@latest" / title
+        page_dir.mkdir(parents=True)
+        (page_dir / "docTOC.md").write_text(toc, encoding="utf-8")
+        (page_dir / "docContent.md").write_text(toc, encoding="utf-8")
+    return tmp_path
+
+
+class TestDenseSearcher:
+    """Test cases for DenseSearcher."""
+
+    def test_finds_heading(self, kb):
+        """The closest heading is returned with its page and cosine score."""
+        searcher = DenseSearcher(str(kb), DenseSearcherConfig(top_k=3), matcher=HashingMatcher())
+
+        results = searcher.search(["permission modes"], ["Docs@latest"])
+
+        assert results[0]["page_title"] == "Settings"
+        assert results[0]["heading"] == "## 2. Permission modes"
+        assert results[0]["source"] == "DENSE"
+        assert results[0]["rerank_sim"] > 0.5
+        assert results[0]["toc_path"].endswith("Settings/docTOC.md")
+
+    def test_index_is_persisted(self, kb):
+        """A second store loads the vectors from disk instead of re-encoding."""
+        matcher = HashingMatcher()
+        DenseSearcher(str(kb), matcher=matcher).get_index("Docs@latest")
+        assert len(matcher.encoded) == 3 + 9
+
+        matcher.encoded.clear()
+        searcher = DenseSearcher(str(kb), matcher=matcher)
+        searcher._store = DenseIndexStore(str(kb))
+        index = searcher.get_index("Docs@latest")
+        assert matcher.encoded == []
+        assert index.size == 12
+
+        searcher.search(["hook events"], ["Docs@latest"])
+        assert matcher.encoded == ["hook events"]
+
+    def test_ivf_with_all_lists_matches_flat(self, kb):
+        """Probing every IVF list gives the brute-force ranking."""
+        matcher = HashingMatcher()
+        flat = DenseSearcher(str(kb), matcher=matcher)
+        ivf = DenseSearcher(
+            str(kb),
+            DenseSearcherConfig(index_type="ivf", ivf_lists=3, ivf_probes=3),
+            matcher=matcher,
+        )
+        for query in (["hook configuration"], ["install plugins", "settings"]):
+            assert ivf.search(query, ["Docs@latest"]) == flat.search(query, ["Docs@latest"])
+
+    def test_train_ivf_partitions_rows(self):
+        """Every row lands in exactly one IVF list."""
+        vectors = np.random.default_rng(0).standard_normal((200, 16)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        centroids, offsets, rows = train_ivf(vectors, 10)
+        assert centroids.shape == (10, 16)
+        assert offsets[-1] == 200
+        assert sorted(rows.tolist()) == list(range(200))
+
+    @pytest.mark.parametrize("quantization", ["int8", "binary"])
+    def test_quantized_search_matches_flat(self, kb, quantization):
+        """Rescoring against the originals gives the flat ranking and scores."""
+        matcher = HashingMatcher()
+        flat = DenseSearcher(str(kb), matcher=matcher)
+        quantized = DenseSearcher(
+            str(kb), DenseSearcherConfig(quantization=quantization), matcher=matcher
+        )
+        for query in (["hook configuration"], ["install plugins", "settings"]):
+            expected = flat.search(query, ["Docs@latest"])
+            results = quantized.search(query, ["Docs@latest"])
+            assert [(r["page_title"], r["heading"]) for r in results] == [
+                (r["page_title"], r["heading"]) for r in expected
+            ]
+            assert [r["rerank_sim"] for r in results] == pytest.approx(
+                [r["rerank_sim"] for r in expected], abs=1e-3
+            )
+
+    def test_quantized_index_is_persisted(self, kb):
+        """Codes and float16 originals are reloaded; a new setting rebuilds."""
+        matcher = HashingMatcher()
+        DenseSearcher(str(kb), DenseSearcherConfig(quantization="int8"), matcher=matcher).get_index(
+            "Docs@latest"
+        )
+
+        matcher.encoded.clear()
+        searcher = DenseSearcher(str(kb), DenseSearcherConfig(quantization="int8"), matcher=matcher)
+        searcher._store = DenseIndexStore(str(kb))
+        index = searcher.get_index("Docs@latest")
+        assert matcher.encoded == []
+        assert index.codes.dtype == np.int8
+        assert index.vectors.dtype == np.float16
+
+        searcher.config.quantization = "binary"
+        assert searcher.get_index("Docs@latest").codes.dtype == np.uint8
+        assert len(matcher.encoded) == 12
+
+    @pytest.mark.parametrize("quantization, min_recall", [("int8", 0.95), ("binary", 0.8)])
+    def test_quantized_recall_and_memory(self, quantization, min_recall):
+        """Quantized scans keep recall@10 high with a fraction of the memory."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((2000, 128)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        originals, codes, scales = quantize_vectors(vectors, quantization)
+        index = DenseIndex(
+            doc_set="Docs@latest",
+            model_id="random",
+            vectors=originals,
+            entry_pages=np.arange(2000, dtype=np.int32),
+            entry_headings=np.full(2000, -1, dtype=np.int32),
+            centroids=np.zeros((0, 128), dtype=np.float32),
+            list_offsets=np.zeros(1, dtype=np.int64),
+            list_rows=np.zeros(0, dtype=np.int32),
+            quantization=quantization,
+            codes=codes,
+            scales=scales,
+        )
+        queries = vectors[:50] + 0.5 * rng.standard_normal((50, 128)).astype(np.float32) / np.sqrt(128)
+
+        assert evaluate_recall(index, queries, top_k=10) >= min_recall
+        usage = index.memory_usage()
+        assert usage["rescore_bytes"] == usage["float32_bytes"] // 2
+        assert usage["scan_bytes"] < usage["float32_bytes"] // 3
+
+    def test_registered_in_registry(self, kb):
+        """register_dense_searcher registers a lazily created searcher."""
+        registry = SearcherRegistry()
+        register_dense_searcher(str(kb), registry=registry)
+        assert "dense" in registry
+        assert registry.get("dense").name == "DENSE"
+
+    def test_doc_searcher_dense_strategy(self, kb, monkeypatch):
+        """DocSearcherAPI keeps DENSE pages that BM25 and FALLBACK_1 miss."""
+        api = DocSearcherAPI(
+            base_dir=str(kb),
+            threshold_page_title=10.0,
+            min_page_titles=1,
+            min_headings=1,
+            dense_search_enabled=True,
+        )
+        api._dense_searcher._matcher = HashingMatcher()
+        monkeypatch.setattr(api._anchor_searcher, "search", lambda queries, doc_sets: [])
+
+        result = api.search("marketplace", ["Docs@latest"])
+
+        assert "DENSE" in (result["fallback_used"] or "")
+        headings = [
+            h["text"] for page in result["results"] for h in page["headings"]
+        ]
+        assert "## 2. Plugin marketplace" in headings
+
+    def test_page_title_hit_is_page_level(self, kb):
+        """A page title row is a page result, not attributed to a heading."""
+        changelog = kb / "Docs@latest" / "Changelog"
+        changelog.mkdir()
+        (changelog / "docTOC.md").write_text("Release notes.\n", encoding="utf-8")
+        (changelog / "docContent.md").write_text("Release notes.\n", encoding="utf-8")
+        searcher = DenseSearcher(str(kb), matcher=HashingMatcher())
+
+        results = searcher.search(["changelog"], ["Docs@latest"])
+
+        assert [(r["page_title"], r["heading"]) for r in results] == [("Changelog", None)]
+
+        api = DocSearcherAPI(
+            base_dir=str(kb),
+            threshold_page_title=10.0,
+            min_page_titles=1,
+            min_headings=1,
+            dense_search_enabled=True,
+        )
+        api._dense_searcher._matcher = HashingMatcher()
+        result = api.search("changelog", ["Docs@latest"])
+
+        assert [
+            (page["page_title"], page.get("headings"), page["source"])
+            for page in result["results"]
+        ] == [("Changelog", None, "DENSE")]
+        assert result["results"][0]["rerank_sim"] == pytest.approx(1.0)
@@ -0,0 +1,183 @@
+"""
+Test concurrent "parallel" fallback mode of DocSearcherAPI.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from doc4llm.doc_rag.searcher.doc_searcher_api import DocSearcherAPI
+
+
+PAGES = {
+    "Docs@latest": {
+        "Hooks Guide": (
+            "# Hooks Guide\n\n"
+            "## 1. Hook Configuration\n"
+            "## 2. Hook Events\n"
+        ),
+        "Settings": (
+            "# Settings\n\n"
+            "## 1. Settings files\n"
+            "## 2. Permission settings\n"
+        ),
+    },
+    "Other@latest": {
+        "Hook Reference": (
+            "# Hook Reference\n\n"
+            "## 1. Hook input\n"
+            "## 2. Hook output\n"
+        ),
+    },
+}
+
+
+@pytest.fixture
+def kb(tmp_path):
+    """Temporary knowledge base with two doc-sets."""
+    for doc_set, pages in PAGES.items():
+        for title, toc in pages.items():
+            page_dir = tmp_path / doc_set / title
+            page_dir.mkdir(parents=True)
+            (page_dir / "docTOC.md").write_text(toc, encoding="utf-8")
+            (page_dir / "docContent.md").write_text(
+                toc + "\nHooks run shell commands at lifecycle events.\n",
+                encoding="utf-8",
+            )
+    return tmp_path
+
+
+def _searcher(kb, **kwargs) -> DocSearcherAPI:
+    return DocSearcherAPI(
+        base_dir=str(kb),
+        threshold_page_title=0.0,
+        min_page_titles=1,
+        min_headings=1,
+        **kwargs,
+    )
+
+
+class TestParallelSearch:
+    """Test cases for concurrent strategy execution."""
+
+    def test_results_from_all_doc_sets(self, kb):
+        """BM25 pages of every doc-set survive the fallback merge."""
+        result = _searcher(kb).search("hook", ["Docs@latest", "Other@latest"])
+
+        doc_sets = {r["doc_set"] for r in result["results"]}
+        assert doc_sets == {"Docs@latest", "Other@latest"}
+        assert result["timed_out_strategies"] == []
+
+    def test_strategies_run_concurrently(self, kb):
+        """Wall time is bounded by the slowest task, not the sum."""
+        searcher = _searcher(kb)
+
+        def slow(value):
+            time.sleep(0.3)
+            return value
+
+        start = time.monotonic()
+        results, timed_out = searcher._run_concurrently(
+            {name: (lambda n=name: slow(n), None) for name in ("a", "b", "c")}
+        )
+        assert time.monotonic() - start < 0.75
+        assert results == {"a": "a", "b": "b", "c": "c"}
+        assert timed_out == []
+
+    def test_timed_out_strategy_is_skipped(self, kb):
+        """A strategy missing its deadline is dropped, the others are kept."""
+        searcher = _searcher(kb)
+
+        start = time.monotonic()
+        results, timed_out = searcher._run_concurrently(
+            {
+                "fast": (lambda: "ok", 1.0),
+                "slow": (lambda: time.sleep(1.0), 0.1),
+            }
+        )
+        assert time.monotonic() - start < 0.75
+        assert results == {"fast": "ok"}
+        assert timed_out == ["slow"]
+
+    def test_timeout_starts_when_the_strategy_starts(self, kb):
+        """Time spent waiting for a worker does not count against the timeout."""
+        searcher = _searcher(kb, parallel_max_workers=1)
+
+        results, timed_out = searcher._run_concurrently(
+            {
+                "first": (lambda: time.sleep(0.3) or "first", None),
+                "queued": (lambda: time.sleep(0.05) or "queued", 0.2),
+            }
+        )
+        assert results == {"first": "first", "queued": "queued"}
+        assert timed_out == []
+
+    def test_queued_strategy_does_not_wait_for_a_timed_out_one(self, kb):
+        """A timed-out strategy keeps its worker; queued ones move to a new worker."""
+        searcher = _searcher(kb, parallel_max_workers=1)
+
+        start = time.monotonic()
+        results, timed_out = searcher._run_concurrently(
+            {
+                "stuck": (lambda: time.sleep(1.0), 0.1),
+                "queued": (lambda: "ok", 0.5),
+            }
+        )
+        assert time.monotonic() - start < 0.75
+        assert results == {"queued": "ok"}
+        assert timed_out == ["stuck"]
+
+    def test_fallback_timeout_in_search(self, kb, monkeypatch):
+        """search() still returns BM25 results when FALLBACK_1 times out."""
+        searcher = _searcher(kb, fallback_1_timeout=0.1)
+        monkeypatch.setattr(
+            searcher._anchor_searcher,
+            "search",
+            lambda queries, doc_sets: time.sleep(1.0) or [],
+        )
+
+        result = searcher.search("hook configuration", ["Docs@latest"])
+        assert result["timed_out_strategies"] == ["FALLBACK_1"]
+        assert any(r["page_title"] == "Hooks Guide" for r in result["results"])
+
+    def test_strategy_error_propagates(self, kb):
+        """Exceptions raised by a strategy are not swallowed."""
+        searcher = _searcher(kb)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            searcher._run_concurrently({"bad": (fail, None)})
+
+
+class TestSerialSearch:
+    """fallback_mode="serial" runs the fallback strategies one after another."""
+
+    def test_serial_mode_runs_fallbacks(self, kb, monkeypatch):
+        searcher = _searcher(kb, fallback_mode="serial")
+        toc_path = str(kb / "Docs@latest" / "Hooks Guide" / "docTOC.md")
+        monkeypatch.setattr(
+            searcher._anchor_searcher,
+            "search",
+            lambda queries, doc_sets: [
+                {
+                    "doc_set": "Docs@latest",
+                    "page_title": "Hooks Guide",
+                    "heading": "## 1. Hook Configuration",
+                    "toc_path": toc_path,
+                    "bm25_sim": 0.0,
+                    "is_basic": True,
+                    "is_precision": False,
+                    "source": "FALLBACK_1",
+                }
+            ],
+        )
+
+        result = searcher.search("hook configuration", ["Docs@latest"])
+
+        assert result["fallback_used"] == "FALLBACK_1"
+        assert any(r["page_title"] == "Hooks Guide" for r in result["results"])
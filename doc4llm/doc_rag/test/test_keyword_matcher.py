@@ -0,0 +1,86 @@
+"""
+Test the shared Aho-Corasick keyword matcher and its use in the searchers.
+"""
+
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from doc4llm.doc_rag.searcher.keyword_matcher import (
+    KeywordMatcher,
+    fold_case,
+    get_keyword_matcher,
+)
+from doc4llm.doc_rag.searcher.text_preprocessor import TextPreprocessor
+
+
+def _regex(keywords):
+    return re.compile("|".join(re.escape(kw) for kw in keywords), re.IGNORECASE)
+
+
+class TestKeywordMatcher:
+    """Test cases for KeywordMatcher."""
+
+    def test_matches_like_regex_alternation(self):
+        """contains_any agrees with the IGNORECASE alternation on random text."""
+        rng = random.Random(0)
+        alphabet = "abcAB 钩子配置-_."
+        for _ in range(300):
+            keywords = [
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                for _ in range(rng.randint(1, 6))
+            ]
+            matcher = KeywordMatcher(keywords)
+            pattern = _regex(keywords)
+            for _ in range(10):
+                text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+                assert matcher.contains_any(text) == bool(pattern.search(text))
+                match = matcher.search(text)
+                expected = pattern.search(text)
+                if expected:
+                    assert match.end == min(
+                        m.end for m in matcher.find_all(text)
+                    )
+                    assert fold_case(text[match.start:match.end]) == fold_case(match.keyword)
+                else:
+                    assert match is None
+
+    def test_overlapping_matches(self):
+        """find_all reports overlapping and nested keywords."""
+        matcher = KeywordMatcher(["he", "she", "hers"])
+        found = [(m.start, m.end, m.keyword) for m in matcher.find_all("USHERS")]
+        assert found == [(2, 4, "he"), (1, 4, "she"), (2, 6, "hers")]
+
+    def test_cjk_and_case_folding(self):
+        """CJK keywords match without word boundaries; case is folded."""
+        matcher = KeywordMatcher(["配置", "Hook", "straße"])
+        assert matcher.contains_any("如何配置钩子")
+        assert matcher.contains_any("## Pre-HOOKS")
+        assert matcher.contains_any("STRASSE straße")
+        assert not matcher.contains_any("settings")
+
+    def test_empty_keyword_matches_everything(self):
+        """An empty keyword behaves like an empty regex branch."""
+        assert KeywordMatcher(["x", ""]).contains_any("abc")
+        assert not KeywordMatcher([])
+
+    def test_matcher_is_cached(self):
+        """The same keyword set compiles once."""
+        assert get_keyword_matcher(["a", "b"]) is get_keyword_matcher(("a", "b", "a"))
+        assert get_keyword_matcher(["a", "b"]) is not get_keyword_matcher(["b", "a"])
+
+
+class TestSearcherIntegration:
+    """Test cases for searchers using the shared matcher."""
+
+    def test_contains_domain_noun(self):
+        """English nouns match by stem, CJK nouns by substring."""
+        preprocessor = TextPreprocessor(domain_nouns=["hooks", "技能"])
+        assert preprocessor.contains_domain_noun("Configure a HOOK")
+        assert preprocessor.contains_domain_noun("创建技能")
+        assert not preprocessor.contains_domain_noun("settings")
+
+        preprocessor.domain_nouns = ["settings"]
+        assert preprocessor.contains_domain_noun("settings")
@@ -0,0 +1,185 @@
+"""
+Tests for the compact LLMReranker input encoding.
+
+LLM calls are replaced by canned messages, so the tests run offline.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from doc4llm.doc_rag.llm_reranker import llm_reranker
+from doc4llm.doc_rag.llm_reranker.compact_input import (
+    apply_compact_scores,
+    encode_compact_input,
+    parse_compact_scores,
+)
+from doc4llm.doc_rag.llm_reranker.llm_reranker import LLMReranker, LLMRerankerConfig
+
+DATA = {
+    "query": ["how to configure hooks", "hooks settings"],
+    "doc_sets_found": ["Docs@latest", "Other@latest"],
+    "retrieval_scene": "how_to",
+    "reranker_threshold": 0.5,
+    "results": [
+        {
+            "doc_set": "Docs@latest",
+            "page_title": "Hooks Guide",
+            "toc_path": "/kb/Docs@latest/Hooks Guide/docTOC.md",
+            "rerank_sim": None,
+            "headings": [
+                {
+                    "text": "Hook Configuration",
+                    "rerank_sim": None,
+                    "related_context": "hooks are\nconfigured in settings.json",
+                },
+                {"text": "Hook Events", "rerank_sim": None, "related_context": ""},
+            ],
+        },
+        {
+            "doc_set": "Docs@latest",
+            "page_title": "Settings",
+            "toc_path": "/kb/Docs@latest/Settings/docTOC.md",
+            "rerank_sim": None,
+            "headings": [{"text": "Settings files", "rerank_sim": None}],
+        },
+        {
+            "doc_set": "Other@latest",
+            "page_title": "Changelog",
+            "toc_path": "/kb/Other@latest/Changelog/docTOC.md",
+            "rerank_sim": None,
+            "headings": [{"text": "1.0.0", "rerank_sim": None}],
+        },
+    ],
+}
+
+
+def make_message(data) -> SimpleNamespace:
+    text = "```json\n" + json.dumps(data) + "\n```"
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+class TestEncodeCompactInput:
+    """encode_compact_input numbers pages and headings, one line each."""
+
+    def test_numbered_lines_grouped_by_doc_set(self):
+        text, ids = encode_compact_input(DATA)
+
+        assert text.splitlines() == [
+            "queries:",
+            "- how to configure hooks",
+            "- hooks settings",
+            "candidates:",
+            "# Docs@latest",
+            "[1] Hooks Guide",
+            "  [1.1] Hook Configuration | hooks are configured in settings.json",
+            "  [1.2] Hook Events",
+            "[2] Settings",
+            "  [2.1] Settings files",
+            "# Other@latest",
+            "[3] Changelog",
+            "  [3.1] 1.0.0",
+        ]
+        assert ids == {
+            "1": (0, None),
+            "1.1": (0, 0),
+            "1.2": (0, 1),
+            "2": (1, None),
+            "2.1": (1, 0),
+            "3": (2, None),
+            "3.1": (2, 0),
+        }
+
+    def test_much_smaller_than_json(self):
+        text, _ = encode_compact_input(DATA)
+        assert len(text) < len(json.dumps(DATA, ensure_ascii=False, indent=2)) / 3
+
+
+class TestCompactScores:
+    """Scores refer to ids and are mapped back to the original entries."""
+
+    def test_parse_scores(self):
+        assert parse_compact_scores({"scores": {"1": 0.9, "[1.1]": "0.8", "2": 1.5}}) == {
+            "1": 0.9,
+            "1.1": 0.8,
+            "2": 1.0,
+        }
+        assert parse_compact_scores({"scores": {}}) == {}
+        assert parse_compact_scores(None) is None
+        assert parse_compact_scores({"scores": [0.9]}) is None
+
+    def test_apply_scores_filters_like_the_prompt(self):
+        _, ids = encode_compact_input(DATA)
+
+        result = apply_compact_scores(
+            DATA, {"1": 0.4, "1.1": 0.9, "1.2": 0.3, "2": 0.6}, ids, threshold=0.5
+        )
+
+        assert result["query"] == DATA["query"]
+        hooks, settings = result["results"]
+        assert hooks["page_title"] == "Hooks Guide" and hooks["rerank_sim"] == 0.4
+        assert hooks["toc_path"] == DATA["results"][0]["toc_path"]
+        assert hooks["headings"] == [{"text": "Hook Configuration", "rerank_sim": 0.9}]
+        # page 达标但没有 heading 达标时保留 page
+        assert settings["page_title"] == "Settings" and settings["headings"] == []
+        # 原始数据不被修改
+        assert DATA["results"][0]["rerank_sim"] is None
+
+    def test_best_heading_is_kept_when_everything_is_filtered(self):
+        _, ids = encode_compact_input(DATA)
+
+        result = apply_compact_scores(DATA, {"1.2": 0.3, "3.1": 0.35}, ids, threshold=0.5)
+
+        assert [(p["page_title"], p["headings"]) for p in result["results"]] == [
+            ("Changelog", [{"text": "1.0.0", "rerank_sim": 0.35}])
+        ]
+        assert apply_compact_scores(DATA, {}, ids, threshold=0.5)["results"] == []
+
+
+class TestLLMRerankerCompactInput:
+    """LLMReranker(compact_input=True) sends numbered lines and maps ids back."""
+
+    @pytest.fixture
+    def requests(self, monkeypatch):
+        requests = []
+
+        def fake_invoke(**kwargs):
+            requests.append(kwargs)
+            return make_message({"scores": {"1": 0.8, "1.1": 0.9, "2": 0.1}})
+
+        monkeypatch.setattr(llm_reranker, "invoke", fake_invoke)
+        return requests
+
+    def test_compact_request_and_result(self, requests):
+        reranker = LLMReranker(LLMRerankerConfig(silent=True, compact_input=True))
+
+        result = reranker.rerank(DATA)
+
+        (request,) = requests
+        prompt = request["messages"][0]["content"]
+        assert prompt.startswith("scene: how_to\nqueries:")
+        assert "[1.1] Hook Configuration" in prompt and "toc_path" not in prompt
+        # system prompt 不含逐次变化的内容
+        assert request["system"] == reranker._prompt_template
+        assert "{RETRIEVAL_SCENE}" not in request["system"]
+        assert result.success
+        assert [p["page_title"] for p in result.data["results"]] == ["Hooks Guide"]
+        assert result.total_headings_before == 4 and result.total_headings_after == 1
+
+    def test_unparseable_response_fails(self, monkeypatch):
+        monkeypatch.setattr(
+            llm_reranker,
+            "invoke",
+            lambda **kwargs: SimpleNamespace(
+                content=[SimpleNamespace(type="text", text="no scores")]
+            ),
+        )
+        result = LLMReranker(LLMRerankerConfig(silent=True, compact_input=True)).rerank(DATA)
+
+        assert result.success is False and result.data["results"] == []
+
+    def test_json_input_is_the_default(self, requests):
+        LLMReranker(LLMRerankerConfig(silent=True)).rerank(DATA)
+
+        assert '"page_title": "Hooks Guide"' in requests[0]["messages"][0]["content"]
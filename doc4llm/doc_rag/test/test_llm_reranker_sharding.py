@@ -0,0 +1,248 @@
+"""
+Tests for sharded concurrent LLM reranking.
+
+LLM calls are replaced by canned messages, so the tests run offline.
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from doc4llm.doc_rag.llm_reranker import llm_reranker
+from doc4llm.doc_rag.llm_reranker.llm_reranker import LLMReranker, LLMRerankerConfig
+from doc4llm.doc_rag.llm_reranker.sharding import (
+    MAX_ANCHOR_OFFSET,
+    merge_shard_scores,
+    page_tokens,
+    shard_pages,
+)
+
+LINE_RE = re.compile(r"^\s*\[([\d.]+)\] (.*)$")
+
+
+def make_data(num_pages: int = 12) -> dict:
+    results = []
+    for i in range(num_pages):
+        topic = "Hook" if i % 3 == 0 else "Setting"
+        results.append(
+            {
+                "doc_set": "Docs@latest" if i < num_pages // 2 else "Other@latest",
+                "page_title": f"{topic} page {i}",
+                "toc_path": f"/kb/page{i}/docTOC.md",
+                "rerank_sim": None,
+                "headings": [
+                    {"text": f"{topic} section {i}.{j}", "rerank_sim": None}
+                    for j in range(1 + i % 4)
+                ],
+            }
+        )
+    return {
+        "query": ["hook configuration"],
+        "doc_sets_found": ["Docs@latest", "Other@latest"],
+        "retrieval_scene": "how_to",
+        "reranker_threshold": 0.5,
+        "results": results,
+    }
+
+
+def score_prompt(prompt: str) -> dict:
+    """Fake model: hook candidates score high, the rest are omitted."""
+    scores = {}
+    for line in prompt.splitlines():
+        match = LINE_RE.match(line)
+        if match and "Hook" in match.group(2):
+            scores[match.group(1)] = 0.9 if "." in match.group(1) else 0.4
+    return scores
+
+
+def make_message(scores: dict) -> SimpleNamespace:
+    text = "```json\n" + json.dumps({"scores": scores}) + "\n```"
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+def sharded_reranker(**config) -> LLMReranker:
+    return LLMReranker(
+        LLMRerankerConfig(
+            **{"silent": True, "shard_max_tokens": 60, "shard_max_concurrency": 2, **config}
+        )
+    )
+
+
+class TestShardPages:
+    """shard_pages splits candidates into balanced shards within the budget."""
+
+    def test_no_sharding_within_budget(self):
+        pages = make_data(3)["results"]
+        assert shard_pages(pages, max_tokens=10_000) == ([[0, 1, 2]], [])
+        assert shard_pages(pages, max_tokens=0) == ([[0, 1, 2]], [])
+
+    def test_balanced_shards_with_anchor(self):
+        pages = make_data()["results"]
+
+        shards, anchors = shard_pages(pages, max_tokens=60, anchors=1)
+
+        assert anchors == [0] and len(shards) > 1
+        assert all(shard[0] == 0 and shard == sorted(shard) for shard in shards)
+        assert sorted(i for shard in shards for i in shard[1:]) == list(range(1, 12))
+        assert all(sum(page_tokens(pages[i]) for i in shard) <= 60 for shard in shards)
+
+    def test_doc_sets_stay_together_when_they_fit(self):
+        pages = make_data()["results"]
+        budget = page_tokens(pages[0]) + max(
+            sum(page_tokens(p) for p in pages[1:6]), sum(page_tokens(p) for p in pages[6:])
+        )
+
+        shards, _ = shard_pages(pages, max_tokens=budget, by="doc_set")
+
+        assert [{pages[i]["doc_set"] for i in shard[1:]} for shard in shards] in (
+            [{"Docs@latest"}, {"Other@latest"}],
+            [{"Other@latest"}, {"Docs@latest"}],
+        )
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            shard_pages(make_data()["results"], max_tokens=60, by="page")
+
+
+class TestMergeShardScores:
+    """Shard scores are shifted so that the shared anchors agree."""
+
+    def test_anchor_calibration(self):
+        merged = merge_shard_scores(
+            [{(0, None): 0.8, (1, None): 0.7}, {(0, None): 0.4, (2, None): 0.7}],
+            anchor_pages=[0],
+            max_offset=0.5,
+        )
+
+        assert merged[(0, None)] == pytest.approx(0.6)
+        # 第一个分片偏高 0.2，第二个偏低 0.2
+        assert merged[(1, None)] == pytest.approx(0.5)
+        assert merged[(2, None)] == pytest.approx(0.9)
+
+    def test_offset_is_clamped(self):
+        # 单个锚点上的大分歧只能有限地平移整个分片
+        merged = merge_shard_scores(
+            [{(0, None): 0.9, (1, 0): 0.7}, {(0, None): 0.3, (2, 0): 0.7}],
+            anchor_pages=[0],
+        )
+
+        assert merged[(1, 0)] == pytest.approx(0.7 - MAX_ANCHOR_OFFSET)
+        assert merged[(2, 0)] == pytest.approx(0.7 + MAX_ANCHOR_OFFSET)
+
+    def test_single_outlier_anchor_does_not_shift_a_shard(self):
+        anchors = {(0, None): 0.8, (0, 0): 0.6, (0, 1): 0.4}
+        merged = merge_shard_scores(
+            [
+                {**anchors, (1, 0): 0.7},
+                # 只有一个锚点条目的分数不同，其余锚点一致
+                {**anchors, (0, None): 0.2, (2, 0): 0.7},
+            ],
+            anchor_pages=[0],
+        )
+
+        assert merged[(1, 0)] == pytest.approx(0.7)
+        assert merged[(2, 0)] == pytest.approx(0.7)
+
+    def test_without_anchor_scores_are_unchanged(self):
+        assert merge_shard_scores([{(1, 0): 0.7}, {(2, None): 0.3}]) == {
+            (1, 0): 0.7,
+            (2, None): 0.3,
+        }
+
+
+class TestShardedRerank:
+    """LLMReranker reranks shards concurrently and merges them globally."""
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        calls = {"prompts": [], "in_flight": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def fake_invoke(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            with lock:
+                calls["prompts"].append(prompt)
+                calls["in_flight"] += 1
+                calls["peak"] = max(calls["peak"], calls["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                calls["in_flight"] -= 1
+            if "fail" in calls and len(calls["prompts"]) == 2:
+                raise RuntimeError("rate limited")
+            return make_message(score_prompt(prompt))
+
+        async def fake_ainvoke(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            calls["prompts"].append(prompt)
+            calls["in_flight"] += 1
+            calls["peak"] = max(calls["peak"], calls["in_flight"])
+            await asyncio.sleep(0.05)
+            calls["in_flight"] -= 1
+            return make_message(score_prompt(prompt))
+
+        monkeypatch.setattr(llm_reranker, "invoke", fake_invoke)
+        monkeypatch.setattr(llm_reranker, "ainvoke", fake_ainvoke)
+        return calls
+
+    def _hook_pages(self, data):
+        return [p["page_title"] for p in data["results"] if p["page_title"].startswith("Hook")]
+
+    def test_shards_are_reranked_concurrently(self, calls):
+        data = make_data()
+
+        result = sharded_reranker().rerank(data)
+
+        assert len(calls["prompts"]) > 2 and calls["peak"] == 2
+        assert all("[1] Hook page 0" in prompt for prompt in calls["prompts"])
+        assert result.success and result.reason is None
+        assert sorted(p["page_title"] for p in result.data["results"]) == sorted(
+            self._hook_pages(data)
+        )
+        assert result.total_headings_before == sum(len(p["headings"]) for p in data["results"])
+
+    def test_results_are_globally_ordered(self, calls):
+        result = sharded_reranker().rerank(make_data())
+
+        best = [
+            max([p["rerank_sim"]] + [h["rerank_sim"] for h in p["headings"]])
+            for p in result.data["results"]
+        ]
+        assert best == sorted(best, reverse=True)
+
+    def test_async_shards_respect_the_limit(self, calls):
+        result = asyncio.run(sharded_reranker().rerank_async(make_data()))
+
+        assert result.success and len(calls["prompts"]) > 2 and calls["peak"] == 2
+
+    def test_failed_shard_is_passed_through(self, calls, capsys):
+        calls["fail"] = True
+        data = make_data()
+
+        result = sharded_reranker(shard_max_concurrency=1).rerank(data)
+
+        assert result.success
+        assert result.reason == f"1 of {len(calls['prompts'])} shards failed"
+        assert capsys.readouterr().err == ""  # silent 模式不输出
+        # 失败分片的 page 原样返回，不参与过滤
+        unreranked = [p["page_title"] for p in result.unreranked]
+        assert unreranked and all(p["rerank_sim"] is None for p in result.unreranked)
+        reranked = [p["page_title"] for p in result.data["results"]]
+        assert not set(unreranked) & set(reranked)
+        assert set(self._hook_pages(data)) <= set(unreranked) | set(reranked)
+
+    def test_failed_shard_is_reported_when_not_silent(self, calls, capsys):
+        calls["fail"] = True
+
+        sharded_reranker(shard_max_concurrency=1, silent=False).rerank(make_data())
+
+        assert "shard 2/" in capsys.readouterr().err
+
+    def test_small_inputs_use_a_single_request(self, calls):
+        result = sharded_reranker().rerank(make_data(2))
+
+        assert len(calls["prompts"]) == 1 and result.success
@@ -0,0 +1,194 @@
+"""
+Tests for the single-call Phase 0a/0b QueryPlanner and its orchestrator fallback.
+
+LLM calls are replaced by canned messages, so the tests run offline.
+"""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from doc4llm.doc_rag import orchestrator
+from doc4llm.doc_rag.orchestrator import DocRAGConfig, DocRAGOrchestrator
+from doc4llm.doc_rag.query_optimizer.query_optimizer import (
+    OptimizationResult,
+    QueryOptimizer,
+    QueryOptimizerConfig,
+)
+from doc4llm.doc_rag.query_planner import query_planner
+from doc4llm.doc_rag.query_planner.query_planner import (
+    QueryPlanner,
+    QueryPlannerConfig,
+    QueryPlannerValidationError,
+    parse_query_plan,
+)
+from doc4llm.doc_rag.query_router.query_router import QueryRouter, QueryRouterConfig, RoutingResult
+
+PLAN = {
+    "query_analysis": {
+        "original": "opencode 如何创建 skills",
+        "language": "zh",
+        "doc_set": ["OpenCode_Docs@latest"],
+        "domain_nouns": ["skills"],
+        "predicate_verbs": ["create", "creating"],
+    },
+    "optimized_queries": [{"rank": 1, "query": "opencode skills creation guide"}],
+    "search_recommendation": {"online_suggested": False, "reason": ""},
+    "routing": {
+        "scene": "how_to",
+        "confidence": 0.85,
+        "ambiguity": 0.2,
+        "coverage_need": 0.4,
+        "reranker_threshold": 0.65,
+    },
+}
+
+
+def make_message(text: str, thinking: str = "Plan both.") -> SimpleNamespace:
+    return SimpleNamespace(
+        content=[
+            SimpleNamespace(type="thinking", thinking=thinking),
+            SimpleNamespace(type="text", text=text),
+        ]
+    )
+
+
+def as_codeblock(data) -> str:
+    return "```json\n" + json.dumps(data, ensure_ascii=False) + "\n```"
+
+
+class TestParseQueryPlan:
+    """parse_query_plan fills OptimizationResult and RoutingResult."""
+
+    def test_fills_both_results(self):
+        plan = parse_query_plan(as_codeblock(PLAN), thinking="Plan both.")
+
+        assert isinstance(plan.optimization, OptimizationResult)
+        assert plan.optimization.query_analysis["domain_nouns"] == ["skills"]
+        assert plan.optimization.optimized_queries == PLAN["optimized_queries"]
+        assert plan.optimization.search_recommendation == PLAN["search_recommendation"]
+        assert isinstance(plan.routing, RoutingResult)
+        assert plan.routing.scene == "how_to"
+        assert plan.routing.reranker_threshold == 0.65
+        assert plan.routing.thinking == plan.optimization.thinking == "Plan both."
+
+    @pytest.mark.parametrize(
+        "broken",
+        [
+            dict(PLAN, routing=dict(PLAN["routing"], scene="unknown_scene")),
+            dict(PLAN, routing=dict(PLAN["routing"], reranker_threshold=0.95)),
+            {k: v for k, v in PLAN.items() if k != "routing"},
+            dict(PLAN, optimized_queries=[]),
+            dict(PLAN, query_analysis=dict(PLAN["query_analysis"], domain_nouns=[])),
+        ],
+    )
+    def test_invalid_fields_raise(self, broken):
+        with pytest.raises(QueryPlannerValidationError):
+            parse_query_plan(as_codeblock(broken))
+
+    def test_unparseable_output_raises(self):
+        with pytest.raises(QueryPlannerValidationError):
+            parse_query_plan("I cannot answer that.")
+        with pytest.raises(QueryPlannerValidationError):
+            parse_query_plan(None)
+
+
+class TestQueryPlanner:
+    """QueryPlanner sends one request with the combined prompt."""
+
+    def test_single_request_with_doc_sets(self, monkeypatch, tmp_path):
+        (tmp_path / "OpenCode_Docs@latest").mkdir()
+        requests = []
+
+        def fake_invoke(**kwargs):
+            requests.append(kwargs)
+            return make_message(as_codeblock(PLAN))
+
+        monkeypatch.setattr(query_planner, "invoke", fake_invoke)
+        planner = QueryPlanner(QueryPlannerConfig(doc_sets_base_path=str(tmp_path)))
+        plan = planner.plan("opencode 如何创建 skills")
+
+        assert len(requests) == 1
+        assert "OpenCode_Docs@latest" in requests[0]["system"]
+        assert requests[0]["messages"] == [
+            {"role": "user", "content": "opencode 如何创建 skills"}
+        ]
+        assert plan.routing.scene == "how_to"
+        assert planner.last_result is plan
+
+    def test_prompt_is_smaller_than_both_templates(self):
+        combined = Path(QueryPlannerConfig().prompt_template_path).read_text(encoding="utf-8")
+        separate = sum(
+            len(Path(path).read_text(encoding="utf-8"))
+            for path in (
+                QueryOptimizerConfig().prompt_template_path,
+                QueryRouterConfig().prompt_template_path,
+            )
+        )
+        assert len(combined) < separate / 2
+        # 模板中的 JSON 示例必须能被 str.format 正确处理
+        assert "{LOCAL_DOC_SETS_LIST}" not in QueryPlanner()._prompt_template.format(
+            LOCAL_DOC_SETS_LIST=[]
+        )
+
+
+class _StopAfterPhase0(Exception):
+    pass
+
+
+class _StopParamsParser:
+    def parse_multi_phase(self, **kwargs):
+        raise _StopAfterPhase0()
+
+
+class TestOrchestratorQueryPlanner:
+    """DocRAGOrchestrator(query_planner=True) uses one call and falls back to two."""
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        calls = {"plan": 0, "optimize": 0, "route": 0}
+
+        def optimize(self, query):
+            calls["optimize"] += 1
+            return parse_query_plan(as_codeblock(PLAN)).optimization
+
+        def route(self, query):
+            calls["route"] += 1
+            return parse_query_plan(as_codeblock(PLAN)).routing
+
+        monkeypatch.setattr(QueryOptimizer, "optimize", optimize)
+        monkeypatch.setattr(QueryRouter, "route", route)
+        monkeypatch.setattr(orchestrator, "ParamsParserAPI", _StopParamsParser)
+        return calls
+
+    def _retrieve(self, tmp_path, query_planner_enabled=True):
+        rag = DocRAGOrchestrator(
+            DocRAGConfig(base_dir=str(tmp_path), query_planner=query_planner_enabled)
+        )
+        with pytest.raises(_StopAfterPhase0):
+            rag.retrieve("opencode 如何创建 skills")
+
+    def _fake_invoke(self, monkeypatch, calls, text):
+        def fake_invoke(**kwargs):
+            calls["plan"] += 1
+            return make_message(text)
+
+        monkeypatch.setattr(query_planner, "invoke", fake_invoke)
+
+    def test_single_call_replaces_optimizer_and_router(self, calls, monkeypatch, tmp_path):
+        self._fake_invoke(monkeypatch, calls, as_codeblock(PLAN))
+        self._retrieve(tmp_path)
+        assert calls == {"plan": 1, "optimize": 0, "route": 0}
+
+    def test_parse_failure_falls_back_to_two_calls(self, calls, monkeypatch, tmp_path):
+        self._fake_invoke(monkeypatch, calls, "not json")
+        self._retrieve(tmp_path)
+        assert calls == {"plan": 1, "optimize": 1, "route": 1}
+
+    def test_disabled_by_default(self, calls, monkeypatch, tmp_path):
+        self._fake_invoke(monkeypatch, calls, as_codeblock(PLAN))
+        assert DocRAGConfig(base_dir=str(tmp_path)).query_planner is False
+        self._retrieve(tmp_path, query_planner_enabled=False)
+        assert calls == {"plan": 0, "optimize": 1, "route": 1}
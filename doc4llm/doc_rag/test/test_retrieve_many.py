@@ -0,0 +1,233 @@
+"""
+Tests for the batch API (DocRAGOrchestrator.retrieve_many).
+
+LLM calls are replaced by canned results, so the tests run offline.
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from doc4llm.doc_rag.orchestrator import DocRAGConfig, DocRAGOrchestrator, _BatchState
+from doc4llm.doc_rag.query_optimizer.query_optimizer import OptimizationResult, QueryOptimizer
+from doc4llm.doc_rag.query_router.query_router import QueryRouter, RoutingResult
+from doc4llm.doc_rag.searcher.doc_searcher_api import DocSearcherAPI
+
+PAGES = {
+    "Docs@latest": {
+        "Hooks Guide": "# Hooks Guide\n\n## 1. Hook Configuration\n## 2. Hook Events\n",
+        "Settings": "# Settings\n\n## 1. Settings files\n## 2. Permission settings\n",
+    },
+}
+
+ROUTING = RoutingResult(
+    scene="how_to", confidence=0.9, ambiguity=0.1, coverage_need=0.5, reranker_threshold=0.6
+)
+LLM_DELAY = 0.05
+
+
+def _optimization(query: str) -> OptimizationResult:
+    # 不同的原始查询可能被优化为相同的检索查询
+    search_query = "permission settings" if "permission" in query else "hook configuration"
+    return OptimizationResult(
+        query_analysis={"doc_set": ["Docs@latest"], "domain_nouns": ["hook"]},
+        optimized_queries=[{"rank": 1, "query": search_query}],
+        search_recommendation={},
+    )
+
+
+@pytest.fixture
+def kb(tmp_path):
+    """Temporary knowledge base with one doc-set."""
+    for doc_set, pages in PAGES.items():
+        for title, toc in pages.items():
+            page_dir = tmp_path / doc_set / title
+            page_dir.mkdir(parents=True)
+            (page_dir / "docTOC.md").write_text(toc, encoding="utf-8")
+            (page_dir / "docContent.md").write_text(toc, encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Fake Phase 0a/0b calls counting requests and peak concurrency."""
+    calls = {"optimize": [], "route": 0, "in_flight": 0, "peak": 0}
+
+    async def optimize_async(self, query):
+        calls["optimize"].append(query)
+        calls["in_flight"] += 1
+        calls["peak"] = max(calls["peak"], calls["in_flight"])
+        await asyncio.sleep(LLM_DELAY)
+        calls["in_flight"] -= 1
+        return _optimization(query)
+
+    async def route_async(self, query):
+        calls["route"] += 1
+        await asyncio.sleep(LLM_DELAY)
+        return ROUTING
+
+    monkeypatch.setattr(QueryOptimizer, "optimize", lambda self, query: _optimization(query))
+    monkeypatch.setattr(QueryRouter, "route", lambda self, query: ROUTING)
+    monkeypatch.setattr(QueryOptimizer, "optimize_async", optimize_async)
+    monkeypatch.setattr(QueryRouter, "route_async", route_async)
+    return calls
+
+
+def _orchestrator(kb, **config) -> DocRAGOrchestrator:
+    return DocRAGOrchestrator(
+        DocRAGConfig(
+            **{
+                "base_dir": str(kb),
+                "stop_at_phase": "1",
+                "searcher_reranker": False,
+                "searcher_config": {"threshold_page_title": 0.0},
+                "llm_cache": False,
+                **config,
+            }
+        )
+    )
+
+
+class TestRetrieveMany:
+    """retrieve_many dedupes queries, shares work and keeps input order."""
+
+    def test_results_in_input_order(self, kb, llm):
+        rag = _orchestrator(kb)
+        queries = ["hook configuration", "permission settings", "hook configuration "]
+
+        results = rag.retrieve_many(queries)
+
+        assert len(results) == 3 and all(r.success for r in results)
+        for query, result in zip(queries, results):
+            expected = rag.retrieve(query)
+            assert json.loads(result.output) == json.loads(expected.output)
+
+    def test_identical_queries_run_once(self, kb, llm):
+        rag = _orchestrator(kb)
+
+        results = rag.retrieve_many(["hook configuration"] * 3 + [" hook configuration"])
+
+        assert llm["optimize"] == ["hook configuration"] and llm["route"] == 1
+        assert len({id(r) for r in results}) == 4
+        assert len({id(r.timing) for r in results}) == 4
+
+    def test_searchers_and_searches_are_shared(self, kb, llm, monkeypatch):
+        built, searched = [], []
+        init, search = DocSearcherAPI.__init__, DocSearcherAPI.search
+
+        def counting_init(self, *args, **kwargs):
+            built.append(kwargs)
+            init(self, *args, **kwargs)
+
+        def counting_search(self, *args, **kwargs):
+            searched.append(kwargs["query"])
+            return search(self, *args, **kwargs)
+
+        monkeypatch.setattr(DocSearcherAPI, "__init__", counting_init)
+        monkeypatch.setattr(DocSearcherAPI, "search", counting_search)
+
+        results = _orchestrator(kb).retrieve_many(
+            ["how do I configure hooks", "hook configuration", "permission settings"]
+        )
+
+        assert all(r.success for r in results)
+        # 检索配置（含解析出的 query）相同的查询共用一个 DocSearcherAPI
+        assert len(built) == 2
+        assert sorted(searched) == [["hook configuration"], ["permission settings"]]
+        assert json.loads(results[0].output) == json.loads(results[1].output)
+
+    def test_llm_concurrency_is_bounded(self, kb, llm):
+        queries = [f"hook configuration {i}" for i in range(6)]
+
+        results = _orchestrator(kb).retrieve_many(queries, max_concurrency=2)
+
+        assert all(r.success for r in results)
+        assert llm["peak"] == 2
+        assert all({"phase_0a", "phase_1", "llm_wait", "total"} <= set(r.timing) for r in results)
+        assert max(r.timing["llm_wait"] for r in results) > 0
+
+    def test_failed_query_does_not_abort_batch(self, kb, llm, monkeypatch):
+        async def optimize_async(self, query):
+            if query == "broken":
+                raise RuntimeError("rate limited")
+            return _optimization(query)
+
+        monkeypatch.setattr(QueryOptimizer, "optimize_async", optimize_async)
+
+        results = _orchestrator(kb).retrieve_many(["hook configuration", "broken"])
+
+        assert results[0].success
+        assert results[1].success is False and "rate limited" in results[1].output
+
+    def test_search_queries_are_encoded_together(self, kb, llm, monkeypatch):
+        from doc4llm.tool.md_doc_retrieval import modelscope_matcher
+
+        encoded = []
+        cache = {}
+
+        class CachingMatcher:
+            """Embedding matcher with a process-wide cache (like get_embedding_cache);
+            records the texts it actually encodes."""
+
+            def __init__(self, config):
+                self.config = config
+
+            def encode(self, texts):
+                misses = [t for t in dict.fromkeys(texts) if t not in cache]
+                if misses:
+                    encoded.append(misses)
+                    for text in misses:
+                        cache[text] = [float(len(text)), 1.0]
+                return [cache[t] for t in texts]
+
+            def rerank_batch(self, queries, candidates):
+                q, c = self.encode(queries), self.encode(candidates)
+                return np.array(q) @ np.array(c).T / 100.0, candidates
+
+        monkeypatch.setattr(modelscope_matcher, "ModelScopeMatcher", CachingMatcher)
+
+        results = _orchestrator(kb, searcher_reranker=True).retrieve_many(
+            ["how do I configure hooks", "permission settings", "broken"]
+        )
+
+        assert results[0].success and results[1].success
+        # 两个查询的 Phase 1 rerank 查询在一次调用中编码，之后的 rerank 只编码 heading
+        assert sorted(encoded[0]) == ["hook configuration", "permission settings"]
+        assert not any(
+            {"hook configuration", "permission settings"} & set(texts) for texts in encoded[1:]
+        )
+
+    def test_empty_batch(self, kb):
+        assert _orchestrator(kb).retrieve_many([]) == []
+
+
+class TestBatchState:
+    """_BatchState computes each shared result once and copies it per consumer."""
+
+    def test_shared_results_are_copied(self):
+        state = _BatchState()
+        computed = []
+
+        def compute():
+            computed.append(1)
+            return {"results": [1]}
+
+        first = state.shared(["phase_1", "q"], compute)
+        first["results"].append(2)
+        second = state.shared(["phase_1", "q"], compute)
+
+        assert computed == [1]
+        assert second == {"results": [1]}
+        assert state.stats == {"computed": 1, "shared": 1}
+
+    def test_errors_are_shared(self):
+        state = _BatchState()
+
+        def compute():
+            raise ValueError("boom")
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                state.shared("key", compute)
@@ -0,0 +1,184 @@
+"""
+Tests for the Phase 0a/0b semantic query cache.
+
+Uses a bag-of-words encoder instead of a local embedding model, so the tests
+run offline and fast.
+"""
+
+import time
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from doc4llm.doc_rag import orchestrator
+from doc4llm.doc_rag.orchestrator import DocRAGConfig, DocRAGOrchestrator
+from doc4llm.doc_rag.query_optimizer.query_optimizer import OptimizationResult, QueryOptimizer
+from doc4llm.doc_rag.query_router.query_router import QueryRouter, RoutingResult
+from doc4llm.doc_rag.semantic_cache import SemanticQueryCache
+
+VOCABULARY = ["configure", "hooks", "how", "do", "i", "plugins", "install", "settings"]
+
+
+def bag_of_words(query: str) -> Tuple[str, np.ndarray]:
+    words = query.lower().replace("?", "").split()
+    vector = np.array([words.count(w) for w in VOCABULARY], dtype=np.float32)
+    return "bow", vector / max(np.linalg.norm(vector), 1e-6)
+
+
+def make_results(scene: str = "how_to") -> Tuple[OptimizationResult, RoutingResult]:
+    optimization = OptimizationResult(
+        query_analysis={"doc_set": ["Docs@latest"], "domain_nouns": ["hooks"]},
+        optimized_queries=[{"rank": 1, "query": "configure hooks"}],
+        search_recommendation={"online_suggested": False},
+        raw_response="{}",
+    )
+    routing = RoutingResult(
+        scene=scene, confidence=0.9, ambiguity=0.1, coverage_need=0.5, reranker_threshold=0.6
+    )
+    return optimization, routing
+
+
+class TestSemanticQueryCache:
+    """Lookup, scoping, staleness and eviction of SemanticQueryCache."""
+
+    def test_similar_query_hits(self, tmp_path):
+        cache = SemanticQueryCache(str(tmp_path), threshold=0.75)
+        cache.store("how do I configure hooks", "scope", bag_of_words, *make_results())
+
+        hit = cache.lookup("configure hooks how", "scope", bag_of_words)
+
+        assert hit is not None
+        assert hit.query == "how do I configure hooks"
+        assert 0.75 <= hit.similarity < 1.0
+        assert hit.optimization.optimized_queries == [{"rank": 1, "query": "configure hooks"}]
+        assert hit.routing.scene == "how_to"
+
+    def test_dissimilar_query_misses(self, tmp_path):
+        cache = SemanticQueryCache(str(tmp_path), threshold=0.75)
+        cache.store("how do I configure hooks", "scope", bag_of_words, *make_results())
+
+        assert cache.lookup("install plugins", "scope", bag_of_words) is None
+        assert cache.stats["misses"] == 1
+
+    def test_exact_match_skips_encoding(self, tmp_path):
+        cache = SemanticQueryCache(str(tmp_path))
+        cache.store("how do I configure hooks", "scope", bag_of_words, *make_results())
+
+        def fail(query):
+            raise AssertionError("exact matches must not be encoded")
+
+        hit = cache.lookup("how  do I configure hooks", "scope", fail)
+        assert hit is not None and hit.similarity == 1.0
+        assert cache.stats["exact_hits"] == 1
+
+    def test_scope_and_model_separate_entries(self, tmp_path):
+        cache = SemanticQueryCache(str(tmp_path), threshold=0.75)
+        cache.store("how do I configure hooks", "scope-a", bag_of_words, *make_results())
+
+        assert cache.lookup("configure hooks how", "scope-b", bag_of_words) is None
+        other_model = lambda q: ("other", bag_of_words(q)[1])  # noqa: E731
+        assert cache.lookup("configure hooks how", "scope-a", other_model) is None
+
+    def test_stale_entries_are_not_reused(self, tmp_path):
+        cache = SemanticQueryCache(str(tmp_path), ttl_seconds=0.05)
+        cache.store("how do I configure hooks", "scope", bag_of_words, *make_results())
+        time.sleep(0.1)
+
+        assert cache.lookup("how do I configure hooks", "scope", bag_of_words) is None
+        assert cache.stats["expired"] == 1
+        assert len(cache) == 0
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        cache = SemanticQueryCache(str(tmp_path), max_entries=2)
+        for query in ["configure hooks", "install plugins", "settings"]:
+            cache.store(query, "scope", bag_of_words, *make_results())
+            time.sleep(0.01)
+
+        assert len(cache) == 2
+        assert cache.lookup("configure hooks", "scope", bag_of_words) is None
+        assert cache.stats["evictions"] == 1
+
+    def test_hit_rate(self, tmp_path):
+        cache = SemanticQueryCache(str(tmp_path), threshold=0.75)
+        assert cache.hit_rate == 0.0
+        cache.store("how do I configure hooks", "scope", bag_of_words, *make_results())
+        cache.lookup("configure hooks how", "scope", bag_of_words)
+        cache.lookup("install plugins", "scope", bag_of_words)
+
+        assert cache.stats["lookups"] == 2
+        assert cache.hit_rate == 0.5
+
+
+class _StopAfterPhase0(Exception):
+    pass
+
+
+class _StopParamsParser:
+    def parse_multi_phase(self, **kwargs):
+        raise _StopAfterPhase0()
+
+
+class TestOrchestratorSemanticCache:
+    """DocRAGOrchestrator skips Phase 0a/0b LLM calls on a semantic cache hit."""
+
+    @pytest.fixture
+    def calls(self, monkeypatch, tmp_path):
+        calls = {"optimize": 0, "route": 0}
+        optimization, routing = make_results()
+
+        def optimize(self, query):
+            calls["optimize"] += 1
+            return optimization
+
+        def route(self, query):
+            calls["route"] += 1
+            return routing
+
+        monkeypatch.setattr(QueryOptimizer, "optimize", optimize)
+        monkeypatch.setattr(QueryRouter, "route", route)
+        monkeypatch.setattr(orchestrator, "ParamsParserAPI", _StopParamsParser)
+        monkeypatch.setattr(
+            DocRAGOrchestrator, "_encode_query", lambda self, query: bag_of_words(query)
+        )
+        return calls
+
+    def _orchestrator(self, tmp_path, enabled=True):
+        return DocRAGOrchestrator(
+            DocRAGConfig(
+                base_dir=str(tmp_path),
+                semantic_cache=enabled,
+                semantic_cache_threshold=0.75,
+                semantic_cache_dir=str(tmp_path / "queries"),
+            )
+        )
+
+    def test_similar_query_reuses_phase_0_results(self, calls, tmp_path):
+        rag = self._orchestrator(tmp_path)
+        for query in ["how do I configure hooks", "configure hooks how"]:
+            with pytest.raises(_StopAfterPhase0):
+                rag.retrieve(query)
+
+        assert calls == {"optimize": 1, "route": 1}
+
+    def test_disabled_by_default(self, calls, tmp_path):
+        rag = self._orchestrator(tmp_path, enabled=False)
+        assert DocRAGConfig(base_dir=str(tmp_path)).semantic_cache is False
+        for query in ["how do I configure hooks", "how do I configure hooks"]:
+            with pytest.raises(_StopAfterPhase0):
+                rag.retrieve(query)
+
+        assert calls == {"optimize": 2, "route": 2}
+
+    def test_unavailable_encoder_disables_cache(self, calls, monkeypatch, tmp_path):
+        def offline(self, query):
+            raise OSError("model not downloaded")
+
+        monkeypatch.setattr(DocRAGOrchestrator, "_encode_query", offline)
+        rag = self._orchestrator(tmp_path)
+        for query in ["how do I configure hooks", "configure hooks how"]:
+            with pytest.raises(_StopAfterPhase0):
+                rag.retrieve(query)
+
+        assert calls == {"optimize": 2, "route": 2}
+        assert rag._semantic_query_cache() is None
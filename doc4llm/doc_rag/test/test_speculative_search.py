@@ -0,0 +1,192 @@
+"""
+Tests for speculative Phase 1 BM25 recall on the raw query.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from doc4llm.doc_rag import orchestrator
+from doc4llm.doc_rag.orchestrator import DocRAGConfig, DocRAGOrchestrator
+from doc4llm.doc_rag.query_optimizer.query_optimizer import OptimizationResult, QueryOptimizer
+from doc4llm.doc_rag.query_router.query_router import QueryRouter, RoutingResult
+from doc4llm.doc_rag.searcher.doc_searcher_api import DocSearcherAPI
+from doc4llm.doc_rag.speculative_search import SpeculativeSearch, get_speculation_stats
+
+PAGES = {
+    "Docs@latest": {
+        "Hooks Guide": "# Hooks Guide\n\n## 1. Hook Configuration\n## 2. Hook Events\n",
+        "Settings": "# Settings\n\n## 1. Settings files\n## 2. Permission settings\n",
+    },
+    "Other@latest": {
+        "Hook Reference": "# Hook Reference\n\n## 1. Hook input\n## 2. Hook output\n",
+    },
+}
+
+# 推测召回与 Phase 1 使用相同的 BM25 参数
+SEARCHER_CONFIG = {"threshold_page_title": 0.0}
+
+
+@pytest.fixture
+def kb(tmp_path):
+    """Temporary knowledge base with two doc-sets."""
+    for doc_set, pages in PAGES.items():
+        for title, toc in pages.items():
+            page_dir = tmp_path / doc_set / title
+            page_dir.mkdir(parents=True)
+            (page_dir / "docTOC.md").write_text(toc, encoding="utf-8")
+            (page_dir / "docContent.md").write_text(toc, encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def stats():
+    stats = get_speculation_stats()
+    stats.reset()
+    yield stats
+    stats.reset()
+
+
+def _searcher(kb, **config) -> DocSearcherAPI:
+    return DocSearcherAPI(
+        base_dir=str(kb), config={**SEARCHER_CONFIG, **config}, min_page_titles=1, min_headings=1
+    )
+
+
+class TestSpeculativeSearch:
+    """Reuse, cancellation and metrics of SpeculativeSearch."""
+
+    def test_routed_doc_sets_are_reused(self, kb, stats):
+        speculation = SpeculativeSearch.start(str(kb), "hook", SEARCHER_CONFIG)
+        assert speculation.doc_sets == ["Docs@latest", "Other@latest"]
+
+        pages = speculation.collect(["Docs@latest"], _searcher(kb))
+
+        assert list(pages) == ["Docs@latest"]
+        assert "Hooks Guide" in {p["page_title"] for p in pages["Docs@latest"]}
+        assert stats.stats["used"] == 1
+        assert stats.stats["cancelled_doc_sets"] == 1
+        assert stats.stats["pages_offered"] == len(pages["Docs@latest"])
+        assert stats.reuse_rate == 1.0
+
+    def test_no_routing_reuses_all_doc_sets(self, kb, stats):
+        speculation = SpeculativeSearch.start(str(kb), "hook", SEARCHER_CONFIG)
+
+        pages = speculation.collect(None, _searcher(kb))
+
+        assert sorted(pages) == ["Docs@latest", "Other@latest"]
+        assert stats.stats["cancelled_doc_sets"] == 0
+
+    def test_different_doc_sets_are_discarded(self, kb, stats):
+        speculation = SpeculativeSearch.start(str(kb), "hook", SEARCHER_CONFIG)
+
+        assert speculation.collect(["Unknown@latest"], _searcher(kb)) == {}
+        assert stats.stats["discarded"] == 1
+        assert stats.stats["cancelled_doc_sets"] == 2
+        assert stats.reuse_rate == 0.0
+
+    def test_partially_routed_doc_sets(self, kb, stats):
+        speculation = SpeculativeSearch.start(str(kb), "hook", SEARCHER_CONFIG)
+
+        pages = speculation.collect(["Docs@latest", "Unknown@latest"], _searcher(kb))
+
+        assert list(pages) == ["Docs@latest"]
+        assert stats.stats["partial"] == 1
+
+    def test_different_bm25_parameters_are_discarded(self, kb, stats):
+        speculation = SpeculativeSearch.start(str(kb), "hook", SEARCHER_CONFIG)
+
+        assert speculation.collect(None, _searcher(kb, bm25_k1=2.0)) == {}
+        assert stats.stats["discarded"] == 1
+
+    def test_empty_knowledge_base(self, tmp_path, stats):
+        assert SpeculativeSearch.start(str(tmp_path), "hook") is None
+        assert stats.stats["started"] == 0
+
+
+class TestSearchWithSpeculativePages:
+    """DocSearcherAPI.search merges speculative pages into its BM25 recall."""
+
+    def test_missing_pages_are_added(self, kb):
+        searcher = _searcher(kb)
+        speculative = searcher.search("hook", ["Docs@latest"])["results"]
+        hooks_page = next(p for p in speculative if p["page_title"] == "Hooks Guide")
+
+        result = searcher.search(
+            "permission settings",
+            ["Docs@latest"],
+            speculative_pages={"Docs@latest": [hooks_page]},
+        )
+
+        titles = [p["page_title"] for p in result["results"]]
+        assert "Settings" in titles and "Hooks Guide" in titles
+        assert len(titles) == len(set(titles))
+
+
+class _ParamsParser:
+    def parse_multi_phase(self, **kwargs):
+        return SimpleNamespace(
+            status="success",
+            config={"query": ["hook configuration"], "target_doc_sets": ["Docs@latest"]},
+            errors=[],
+        )
+
+
+class TestOrchestratorSpeculativeSearch:
+    """DocRAGOrchestrator(speculative_search=True) hands raw-query pages to Phase 1."""
+
+    @pytest.fixture
+    def searches(self, monkeypatch):
+        searches = []
+
+        def search(self, query, target_doc_sets=None, speculative_pages=None):
+            searches.append(speculative_pages)
+            return {"success": False, "message": "stop after Phase 1"}
+
+        monkeypatch.setattr(
+            QueryOptimizer,
+            "optimize",
+            lambda self, query: OptimizationResult(
+                query_analysis={"doc_set": ["Docs@latest"], "domain_nouns": ["hook"]},
+                optimized_queries=[{"rank": 1, "query": "hook configuration"}],
+                search_recommendation={},
+            ),
+        )
+        monkeypatch.setattr(
+            QueryRouter,
+            "route",
+            lambda self, query: RoutingResult(
+                scene="how_to",
+                confidence=0.9,
+                ambiguity=0.1,
+                coverage_need=0.5,
+                reranker_threshold=0.6,
+            ),
+        )
+        monkeypatch.setattr(orchestrator, "ParamsParserAPI", _ParamsParser)
+        monkeypatch.setattr(DocSearcherAPI, "search", search)
+        return searches
+
+    def _retrieve(self, kb, enabled):
+        rag = DocRAGOrchestrator(
+            DocRAGConfig(
+                base_dir=str(kb),
+                speculative_search=enabled,
+                searcher_reranker=False,
+                searcher_config=SEARCHER_CONFIG,
+            )
+        )
+        assert rag.retrieve("hook").success is False
+
+    def test_routed_pages_reach_phase_1(self, kb, searches, stats):
+        self._retrieve(kb, enabled=True)
+
+        assert len(searches) == 1 and list(searches[0]) == ["Docs@latest"]
+        assert stats.stats == dict(stats.stats, started=1, used=1, cancelled_doc_sets=1)
+
+    def test_disabled_by_default(self, kb, searches, stats):
+        assert DocRAGConfig(base_dir=str(kb)).speculative_search is False
+        self._retrieve(kb, enabled=False)
+
+        assert searches == [None]
+        assert stats.stats["started"] == 0
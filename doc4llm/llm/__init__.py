@@ -4,6 +4,56 @@ LLM 接口模块
 提供兼容 Anthropic API 的 MiniMax 模型调用接口。
 """
 
-from .anthropic import invoke, LLM_Config, AnthropicClient
+from typing import TYPE_CHECKING
 
-__all__ = ["invoke", "LLM_Config", "AnthropicClient"]
+from doc4llm._lazy import lazy_exports
+
+_EXPORTS = {
+    "invoke": ".anthropic",
+    "LLM_Config": ".anthropic",
+    "AnthropicClient": ".anthropic",
+    "AsyncAnthropicClient": ".anthropic",
+    "ainvoke": ".anthropic",
+    "get_anthropic_client": ".anthropic",
+    "get_async_anthropic_client": ".anthropic",
+    "clear_client_cache": ".anthropic",
+    "MessageAccumulator": ".message_stream",
+    "IncompleteStreamError": ".message_stream",
+    "LLMResponseCache": ".response_cache",
+    "get_response_cache": ".response_cache",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .anthropic import (
+        invoke,
+        LLM_Config,
+        AnthropicClient,
+        AsyncAnthropicClient,
+        ainvoke,
+        get_anthropic_client,
+        get_async_anthropic_client,
+        clear_client_cache,
+    )
+    from .message_stream import IncompleteStreamError, MessageAccumulator
+    from .response_cache import LLMResponseCache, get_response_cache
+
+__all__ = [
+    "invoke",
+    "LLM_Config",
+    "AnthropicClient",
+    # Async variant
+    "AsyncAnthropicClient",
+    "ainvoke",
+    # Process-wide SDK clients
+    "get_anthropic_client",
+    "get_async_anthropic_client",
+    "clear_client_cache",
+    # Stream assembly
+    "MessageAccumulator",
+    "IncompleteStreamError",
+    # Response cache
+    "LLMResponseCache",
+    "get_response_cache",
+]
@@ -2,14 +2,43 @@
 Anthropic API 兼容接口
 
 提供兼容 Anthropic API 规范的 MiniMax 模型调用接口。
+
+SDK 客户端按 (api_key, base_url, timeout) 在进程内共享：每次 pipeline 有
+3–6 次 LLM 调用，共享连接池可以复用 keep-alive 连接，省去重复的 TLS 握手；
+安装了 ``h2`` 时启用 HTTP/2。异步客户端（AsyncAnthropicClient / ainvoke）
+按事件循环分别缓存，因为 httpx 的异步连接池只能在创建它的事件循环中使用。
 """
 
+import asyncio
+import importlib.util
 import os
+import sys
+import threading
+import weakref
 import dotenv
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .message_stream import MessageAccumulator
+from .response_cache import LLMResponseCache, response_key
+
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
+
+# 共享连接池的上限；LLM reranker 等可能并发发起请求
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+# 空闲连接保留时间（秒），覆盖一次查询内各 Phase 之间的间隔
+KEEPALIVE_EXPIRY = 120.0
 
-from anthropic import Anthropic
+ClientKey = Tuple[Optional[str], Optional[str], Optional[float]]
+
+_clients: Dict[ClientKey, "Anthropic"] = {}
+# event loop -> {ClientKey: AsyncAnthropic}
+_async_clients: "weakref.WeakKeyDictionary[Any, Dict[ClientKey, AsyncAnthropic]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
 
 
 @dataclass
@@ -20,6 +49,194 @@ class LLM_Config:
     timeout: int = 60
 
 
+def http2_available() -> bool:
+    """Whether httpx can speak HTTP/2 (the optional ``h2`` package is installed)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _client_key(config: LLM_Config) -> ClientKey:
+    """Resolve the (api_key, base_url, timeout) a config refers to."""
+    dotenv.load_dotenv('doc4llm/.env')
+    api_key = config.api_key or os.environ.get("ANTHROPIC_API_KEY")
+    base_url = config.base_url or os.environ.get("ANTHROPIC_BASE_URL")
+    return api_key, base_url, config.timeout or None
+
+
+def _client_kwargs(key: ClientKey) -> Dict[str, Any]:
+    api_key, base_url, timeout = key
+    client_kwargs: Dict[str, Any] = {}
+    if api_key:
+        client_kwargs["api_key"] = api_key
+    if base_url:
+        client_kwargs["base_url"] = base_url
+    if timeout:
+        client_kwargs["timeout"] = timeout
+    return client_kwargs
+
+
+def sdk_httpx() -> Any:
+    """The httpx module the installed anthropic SDK is built on.
+
+    Newer SDK releases use the ``httpx2`` fork and reject objects (limits,
+    transports) from ``httpx``.
+    """
+    from anthropic import DefaultHttpxClient
+
+    return sys.modules[DefaultHttpxClient.__mro__[1].__module__.partition(".")[0]]
+
+
+def _http_client_kwargs() -> Dict[str, Any]:
+    httpx = sdk_httpx()
+    return {
+        "http2": http2_available(),
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def get_anthropic_client(
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> "Anthropic":
+    """Get the process-wide Anthropic SDK client for these settings.
+
+    Args:
+        api_key: API key (None: SDK default, ``$ANTHROPIC_API_KEY``)
+        base_url: API base URL (None: SDK default)
+        timeout: Request timeout in seconds (None: SDK default)
+
+    Returns:
+        Shared Anthropic client with a keep-alive (HTTP/2 if available) pool
+    """
+    key = (api_key, base_url, timeout)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # anthropic SDK 导入较慢，首次创建客户端时才导入
+            from anthropic import Anthropic, DefaultHttpxClient
+
+            client = _clients[key] = Anthropic(
+                **_client_kwargs(key),
+                http_client=DefaultHttpxClient(**_http_client_kwargs()),
+            )
+        return client
+
+
+def get_async_anthropic_client(
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> "AsyncAnthropic":
+    """Get the AsyncAnthropic client shared within the running event loop.
+
+    Args:
+        api_key: API key (None: SDK default, ``$ANTHROPIC_API_KEY``)
+        base_url: API base URL (None: SDK default)
+        timeout: Request timeout in seconds (None: SDK default)
+
+    Returns:
+        AsyncAnthropic client shared by all callers on this event loop
+
+    Raises:
+        RuntimeError: If called outside a running event loop
+    """
+    loop = asyncio.get_running_loop()
+    key = (api_key, base_url, timeout)
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+            client = clients[key] = AsyncAnthropic(
+                **_client_kwargs(key),
+                http_client=DefaultAsyncHttpxClient(**_http_client_kwargs()),
+            )
+        return client
+
+
+def clear_client_cache() -> None:
+    """Close the shared sync clients and forget all cached clients.
+
+    Meant for shutdown and tests; clients still held by callers keep working
+    until they are closed here (sync) or garbage collected (async).
+    """
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _async_clients.clear()
+    for client in clients:
+        client.close()
+
+
+def _build_request(
+    model: str,
+    messages: List[Dict[str, Any]],
+    system: Optional[str],
+    max_tokens: int,
+    temperature: float,
+    stream: bool,
+    tools: Optional[List[Dict]],
+    tool_choice: Optional[Dict],
+    kwargs: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Keyword arguments of ``messages.create`` for one invoke call."""
+    # 自动启用流式模式（用户未显式指定时）
+    if "stream" not in kwargs:
+        stream = True
+
+    request_kwargs = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "messages": messages,
+        "stream": stream,
+        # 注意：不传递 thinking 参数，MiniMax 会自动返回 thinking 内容
+    }
+
+    if system:
+        request_kwargs["system"] = system
+    if tools:
+        request_kwargs["tools"] = tools
+    if tool_choice:
+        request_kwargs["tool_choice"] = tool_choice
+
+    request_kwargs.update(kwargs)
+    return request_kwargs
+
+
+def _print_delta(chunk: Any) -> None:
+    """Print the thinking / text delta of a stream event."""
+    delta = getattr(chunk, "delta", None)
+    if delta:
+        if delta.type == "thinking_delta":
+            thinking = getattr(delta, "thinking", None)
+            if thinking:
+                print(thinking, end="", flush=True)
+        elif delta.type == "text_delta":
+            text = getattr(delta, "text", None)
+            if text:
+                print(text, end="", flush=True)
+
+
+def _cacheable(message: Any, validator: Optional[Callable[[Any], bool]] = None) -> bool:
+    """只缓存完整的响应（非空且未因 max_tokens 截断），且通过调用方的校验"""
+    if not getattr(message, "content", None):
+        return False
+    if getattr(message, "stop_reason", None) == "max_tokens":
+        return False
+    if validator is None:
+        return True
+    try:
+        return bool(validator(message))
+    except Exception:
+        return False
+
+
 class AnthropicClient:
     """Anthropic API 兼容的 MiniMax 模型调用客户端"""
 
@@ -33,21 +250,9 @@ class AnthropicClient:
         self.config = config or LLM_Config()
         self._client = self._init_client()
 
-    def _init_client(self) -> Anthropic:
-        """初始化 Anthropic 客户端"""
-        dotenv.load_dotenv('doc4llm/.env')
-        api_key = self.config.api_key or os.environ.get("ANTHROPIC_API_KEY")
-        base_url = self.config.base_url or os.environ.get("ANTHROPIC_BASE_URL")
-
-        client_kwargs = {}
-        if api_key:
-            client_kwargs["api_key"] = api_key
-        if base_url:
-            client_kwargs["base_url"] = base_url
-        if self.config.timeout:
-            client_kwargs["timeout"] = self.config.timeout
-
-        return Anthropic(**client_kwargs)
+    def _init_client(self) -> "Anthropic":
+        """获取共享的 Anthropic 客户端（同一配置复用连接池）"""
+        return get_anthropic_client(*_client_key(self.config))
 
     def invoke(
         self,
@@ -60,6 +265,8 @@ class AnthropicClient:
         tools: Optional[List[Dict]] = None,
         tool_choice: Optional[Dict] = None,
         silent: bool = False,
+        cache: Optional[LLMResponseCache] = None,
+        cache_validator: Optional[Callable[[Any], bool]] = None,
         **kwargs
     ) -> Any:
         """
@@ -75,77 +282,133 @@ class AnthropicClient:
             tools: 工具定义列表
             tool_choice: 工具选择策略
             silent: 静默模式，不打印流式输出
+            cache: 响应缓存，命中时不调用模型 (default: None，不缓存)
+            cache_validator: 响应写入缓存前的校验（如调用方能否解析），返回 False
+                时不缓存 (default: None，只要求响应完整)
             **kwargs: 其他透传参数
 
         Returns:
-            非 stream 模式: anthropic.types.Message 对象
-            stream 模式: anthropic.types.Stream[Message] 生成器
+            anthropic.types.Message 对象（流式请求时由流事件组装，不会重复请求）
             错误时: 透传模型的错误响应
+
+        Raises:
+            IncompleteStreamError: 流在 message_stop 之前中断
         """
-        # 自动启用流式模式（用户未显式指定时）
-        if "stream" not in kwargs:
-            stream = True
-
-        request_kwargs = {
-            "model": model,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "messages": messages,
-            "stream": stream,
-            # 注意：不传递 thinking 参数，MiniMax 会自动返回 thinking 内容
-        }
-
-        if system:
-            request_kwargs["system"] = system
-        if tools:
-            request_kwargs["tools"] = tools
-        if tool_choice:
-            request_kwargs["tool_choice"] = tool_choice
-
-        request_kwargs.update(kwargs)
+        request_kwargs = _build_request(
+            model, messages, system, max_tokens, temperature, stream, tools, tool_choice, kwargs
+        )
+        cache_key = response_key(request_kwargs) if cache is not None else None
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        message = self._create(request_kwargs, silent)
+        if cache_key is not None and _cacheable(message, cache_validator):
+            cache.put(cache_key, message, model=model)
+        return message
 
+    def _create(self, request_kwargs: Dict[str, Any], silent: bool) -> Any:
+        """发送请求；流式请求由事件组装出最终 Message"""
         response = self._client.messages.create(**request_kwargs)
+        if not request_kwargs["stream"]:
+            return response
 
-        if stream:
-            # 静默模式下不打印任何输出
-            if silent:
-                # 静默模式：收集所有内容但不打印
-                message = None
-                for chunk in response:
-                    if chunk.type == "message_stop":
-                        message = getattr(chunk, "message", None)
-                if message:
-                    return message
-                # 如果没有 message_stop，fallback 到非流式请求
-                request_kwargs["stream"] = False
-                return self._client.messages.create(**request_kwargs)
-
-            # 非静默模式：边接收边打印
-            message = None
-            for chunk in response:
-                if chunk.type == "content_block_delta":
-                    delta = getattr(chunk, "delta", None)
-                    if delta:
-                        if delta.type == "thinking_delta":
-                            thinking = getattr(delta, "thinking", None)
-                            if thinking:
-                                print(thinking, end="", flush=True)
-                        elif delta.type == "text_delta":
-                            text = getattr(delta, "text", None)
-                            if text:
-                                print(text, end="", flush=True)
-                elif chunk.type == "message_stop":
-                    # 流结束时收集完整的 Message
-                    message = getattr(chunk, "message", None)
-
-            if message:
-                return message
-
-            # 如果没有 message_stop，fallback 到非流式请求
+        # 非静默模式边接收边打印；静默模式只累积
+        accumulator = MessageAccumulator(on_delta=None if silent else _print_delta)
+        for event in response:
+            accumulator.add(event)
+
+        if not accumulator.started:
+            # 兼容接口忽略了 stream 参数、没有返回任何事件时，才回退到非流式请求
             request_kwargs["stream"] = False
             return self._client.messages.create(**request_kwargs)
+        return accumulator.message()
+
+
+class AsyncAnthropicClient:
+    """AnthropicClient 的异步版本（AsyncAnthropic，按事件循环共享连接池）"""
+
+    def __init__(self, config: Optional[LLM_Config] = None):
+        """
+        初始化客户端
+
+        Args:
+            config: LLM_Config 配置对象
+        """
+        self.config = config or LLM_Config()
+        self._key = _client_key(self.config)
+
+    @property
+    def _client(self) -> "AsyncAnthropic":
+        """当前事件循环共享的 AsyncAnthropic 客户端"""
+        return get_async_anthropic_client(*self._key)
+
+    async def invoke(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        max_tokens: int = 20000,
+        temperature: float = 0.1,
+        stream: bool = False,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[Dict] = None,
+        silent: bool = False,
+        cache: Optional[LLMResponseCache] = None,
+        cache_validator: Optional[Callable[[Any], bool]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        异步调用 MiniMax 模型，参数与返回值同 AnthropicClient.invoke
+
+        Args:
+            model: 模型名称
+            messages: 消息列表
+            system: 系统提示词
+            max_tokens: 最大生成 token 数
+            temperature: 温度参数
+            stream: 是否使用流式输出
+            tools: 工具定义列表
+            tool_choice: 工具选择策略
+            silent: 静默模式，不打印流式输出
+            cache: 响应缓存，命中时不调用模型 (default: None，不缓存)
+            cache_validator: 响应写入缓存前的校验（如调用方能否解析），返回 False
+                时不缓存 (default: None，只要求响应完整)
+            **kwargs: 其他透传参数
+
+        Returns:
+            anthropic.types.Message 对象
+        """
+        request_kwargs = _build_request(
+            model, messages, system, max_tokens, temperature, stream, tools, tool_choice, kwargs
+        )
+        cache_key = response_key(request_kwargs) if cache is not None else None
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        return response
+        message = await self._create(request_kwargs, silent)
+        if cache_key is not None and _cacheable(message, cache_validator):
+            cache.put(cache_key, message, model=model)
+        return message
+
+    async def _create(self, request_kwargs: Dict[str, Any], silent: bool) -> Any:
+        """发送请求；流式请求由事件组装出最终 Message"""
+        client = self._client
+        response = await client.messages.create(**request_kwargs)
+        if not request_kwargs["stream"]:
+            return response
+
+        accumulator = MessageAccumulator(on_delta=None if silent else _print_delta)
+        async for event in response:
+            accumulator.add(event)
+
+        if not accumulator.started:
+            request_kwargs["stream"] = False
+            return await client.messages.create(**request_kwargs)
+        return accumulator.message()
 
 
 def invoke(
@@ -159,6 +422,8 @@ def invoke(
     tool_choice: Optional[Dict] = None,
     config: Optional[LLM_Config] = None,
     silent: bool = False,
+    cache: Optional[LLMResponseCache] = None,
+    cache_validator: Optional[Callable[[Any], bool]] = None,
     **kwargs
 ) -> Any:
     """
@@ -175,11 +440,12 @@ def invoke(
         tool_choice: 工具选择策略
         config: LLM_Config 配置对象
         silent: 静默模式，不打印流式输出
+        cache: 响应缓存，命中时不调用模型 (default: None，不缓存)
+        cache_validator: 响应写入缓存前的校验，返回 False 时不缓存 (default: None)
         **kwargs: 其他透传参数
 
     Returns:
-        非 stream 模式: anthropic.types.Message 对象
-        stream 模式: anthropic.types.Stream[Message] 生成器
+        anthropic.types.Message 对象（流式请求时由流事件组装，不会重复请求）
         错误时: 透传模型的错误响应
     """
     client = AnthropicClient(config)
@@ -193,5 +459,45 @@ def invoke(
         tools=tools,
         tool_choice=tool_choice,
         silent=silent,
+        cache=cache,
+        cache_validator=cache_validator,
+        **kwargs
+    )
+
+
+async def ainvoke(
+    model: str,
+    messages: List[Dict[str, Any]],
+    system: Optional[str] = None,
+    max_tokens: int = 20000,
+    temperature: float = 0.1,
+    stream: bool = False,
+    tools: Optional[List[Dict]] = None,
+    tool_choice: Optional[Dict] = None,
+    config: Optional[LLM_Config] = None,
+    silent: bool = False,
+    cache: Optional[LLMResponseCache] = None,
+    cache_validator: Optional[Callable[[Any], bool]] = None,
+    **kwargs
+) -> Any:
+    """
+    异步调用 MiniMax 模型，参数与返回值同 invoke
+
+    Returns:
+        anthropic.types.Message 对象
+    """
+    client = AsyncAnthropicClient(config)
+    return await client.invoke(
+        model=model,
+        messages=messages,
+        system=system,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=stream,
+        tools=tools,
+        tool_choice=tool_choice,
+        silent=silent,
+        cache=cache,
+        cache_validator=cache_validator,
         **kwargs
     )
@@ -0,0 +1,166 @@
+"""
+Assemble the final Message from Anthropic streaming events.
+
+``invoke`` 强制使用流式请求，原先在 ``message_stop`` 事件上寻找 ``message``
+属性，但 SDK 的 ``message_stop`` 并不携带完整消息，于是几乎每次都会以非流式
+方式把同一个 prompt 再请求一遍（Phase 0a/0b/1.5/4 的延迟与 token 都翻倍）。
+这里按事件累积出最终的 Message：thinking / text / tool_use 内容块、
+stop_reason 以及 usage。
+
+Example:
+    >>> accumulator = MessageAccumulator()
+    >>> for event in client.messages.create(..., stream=True):
+    ...     accumulator.add(event)
+    >>> message = accumulator.message()
+"""
+
+import json
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from anthropic.types import Message
+
+
+class IncompleteStreamError(RuntimeError):
+    """The stream ended before ``message_stop``."""
+
+
+def _to_dict(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return dict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return dict(vars(value))
+
+
+def _parse_tool_input(partial_json: str) -> Any:
+    """Parse the streamed tool input; truncated JSON (e.g. at max_tokens) is completed."""
+    if not partial_json.strip():
+        return {}
+    try:
+        return json.loads(partial_json)
+    except ValueError:
+        pass
+    try:
+        # anthropic SDK 自带的 jiter 可解析被截断的 JSON
+        import jiter
+
+        return jiter.from_json(partial_json.encode("utf-8"), partial_mode="trailing-strings")
+    except (ImportError, ValueError):
+        return {}
+
+
+class MessageAccumulator:
+    """Build a ``Message`` from ``messages.create(stream=True)`` events.
+
+    Attributes:
+        on_delta: Called with every ``content_block_delta`` event (e.g. to
+            print thinking / text as it arrives)
+        started: Whether ``message_start`` was received
+        done: Whether ``message_stop`` was received
+    """
+
+    def __init__(self, on_delta: Optional[Callable[[Any], None]] = None):
+        """Initialize an empty accumulator.
+
+        Args:
+            on_delta: Callback for ``content_block_delta`` events (default None)
+        """
+        self.on_delta = on_delta
+        self.started = False
+        self.done = False
+        self._snapshot: Dict[str, Any] = {}
+        self._blocks: List[Optional[Dict[str, Any]]] = []
+        self._tool_json: Dict[int, str] = {}
+
+    def _block(self, index: int) -> Dict[str, Any]:
+        while len(self._blocks) <= index:
+            self._blocks.append(None)
+        if self._blocks[index] is None:
+            # content_block_start 丢失时按文本块处理
+            self._blocks[index] = {"type": "text", "text": ""}
+        return self._blocks[index]
+
+    def add(self, event: Any) -> None:
+        """Apply one stream event."""
+        event_type = getattr(event, "type", None)
+
+        if event_type == "message_start":
+            self.started = True
+            self._snapshot = _to_dict(event.message)
+            self._blocks = [_to_dict(block) for block in self._snapshot.pop("content", None) or []]
+
+        elif event_type == "content_block_start":
+            block = _to_dict(event.content_block)
+            if block.get("type") in ("tool_use", "server_tool_use"):
+                self._tool_json[event.index] = ""
+            self._block(event.index)
+            self._blocks[event.index] = block
+
+        elif event_type == "content_block_delta":
+            self._apply_delta(event.index, event.delta)
+            if self.on_delta is not None:
+                self.on_delta(event)
+
+        elif event_type == "content_block_stop":
+            if event.index in self._tool_json:
+                self._block(event.index)["input"] = _parse_tool_input(
+                    self._tool_json.pop(event.index)
+                )
+
+        elif event_type == "message_delta":
+            delta = _to_dict(event.delta)
+            for key in ("stop_reason", "stop_sequence"):
+                if key in delta:
+                    self._snapshot[key] = delta[key]
+            usage = getattr(event, "usage", None)
+            if usage is not None:
+                merged = dict(self._snapshot.get("usage") or {})
+                # message_delta 的 usage 是累计值；未给出的字段保留 message_start 的值
+                merged.update({k: v for k, v in _to_dict(usage).items() if v is not None})
+                self._snapshot["usage"] = merged
+
+        elif event_type == "message_stop":
+            self.done = True
+
+    def _apply_delta(self, index: int, delta: Any) -> None:
+        block = self._block(index)
+        delta_type = getattr(delta, "type", None)
+        if delta_type == "text_delta":
+            block["text"] = (block.get("text") or "") + delta.text
+        elif delta_type == "thinking_delta":
+            block["thinking"] = (block.get("thinking") or "") + delta.thinking
+        elif delta_type == "signature_delta":
+            block["signature"] = delta.signature
+        elif delta_type == "input_json_delta":
+            self._tool_json[index] = self._tool_json.get(index, "") + delta.partial_json
+        elif delta_type == "citations_delta":
+            block["citations"] = (block.get("citations") or []) + [_to_dict(delta.citation)]
+
+    def message(self) -> "Message":
+        """The assembled message.
+
+        Raises:
+            IncompleteStreamError: If the stream did not reach ``message_stop``
+        """
+        if not self.done:
+            raise IncompleteStreamError(
+                "Stream ended before message_stop"
+                + ("" if self.started else " (no message_start received)")
+            )
+        from anthropic.types import Message
+
+        # 未收到 content_block_stop 的工具块也要解析已收到的参数
+        for index, partial_json in self._tool_json.items():
+            self._block(index)["input"] = _parse_tool_input(partial_json)
+        self._tool_json = {}
+
+        snapshot = dict(self._snapshot, content=[b for b in self._blocks if b is not None])
+        # construct() 不做校验，兼容 MiniMax 等兼容接口返回的额外字段
+        return Message.construct(**snapshot)
+
+
+__all__ = [
+    "IncompleteStreamError",
+    "MessageAccumulator",
+]
@@ -0,0 +1,313 @@
+"""
+On-disk cache of LLM responses.
+
+Doc-RAG 的 Phase 0a / 0b / 1.5 / 4 对字节完全相同的 prompt 也每次都调用模型；
+重复或再次提出的问题要付出多次 LLM 往返。这里按请求内容（model、system、
+messages、temperature 等参数的哈希）缓存最终的 Message：SQLite 存储，多进程
+共享，带 TTL，超过条目上限时按最近访问时间（LRU）淘汰。SQLite 存储、TTL 与 LRU
+由 SQLiteCache 实现，语义查询缓存（doc4llm.doc_rag.semantic_cache）同样基于它。
+
+Example:
+    >>> from doc4llm.llm import invoke
+    >>> from doc4llm.llm.response_cache import get_response_cache
+    >>> cache = get_response_cache(ttl_seconds=3600)
+    >>> message = invoke(model="MiniMax-M2.1", messages=[...], cache=cache)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Type, TypeVar
+
+if TYPE_CHECKING:
+    from anthropic.types import Message
+
+# 缓存格式版本，格式变化时递增以丢弃旧缓存
+RESPONSE_CACHE_FORMAT_VERSION = 2
+
+DEFAULT_RESPONSE_CACHE_DIR = os.path.join("~", ".cache", "doc4llm", "llm")
+RESPONSE_CACHE_DIR_ENV = "DOC4LLM_LLM_CACHE_DIR"
+DEFAULT_TTL_SECONDS = 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 2000
+
+_CacheT = TypeVar("_CacheT", bound="SQLiteCache")
+
+
+def response_key(request: Dict[str, Any]) -> str:
+    """Hash of a ``messages.create`` request (``stream`` is ignored).
+
+    Args:
+        request: Request keyword arguments (model, system, messages, temperature, ...)
+
+    Returns:
+        Hex SHA-256 of the canonical JSON of the request
+    """
+    canonical = {k: v for k, v in request.items() if k != "stream"}
+    canonical["__version__"] = RESPONSE_CACHE_FORMAT_VERSION
+    data = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _dump_message(message: Any) -> str:
+    if hasattr(message, "model_dump_json"):
+        return message.model_dump_json()
+    return json.dumps(message, ensure_ascii=False, default=str)
+
+
+def _load_message(data: str) -> "Message":
+    from anthropic.types import Message
+
+    return Message.construct(**json.loads(data))
+
+
+class SQLiteCache:
+    """SQLite store shared by the on-disk caches, with TTL and LRU eviction.
+
+    The database is shared between processes (WAL mode) and falls back to
+    memory when the cache directory is not writable. Subclasses name the
+    database file and table and create the table in ``_create_tables``; the
+    table needs ``created`` and ``accessed`` columns.
+
+    Attributes:
+        cache_dir: Directory of the database file (None: memory only)
+        ttl_seconds: Entries older than this are ignored and deleted
+        max_entries: Maximum number of entries, least recently used are evicted
+        stats: Counters, at least ``hits``, ``misses``, ``expired``, ``evictions``
+    """
+
+    database_name = "cache.sqlite3"
+    table = "entries"
+    key_column = "key"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str],
+        ttl_seconds: float,
+        max_entries: int,
+        stats: Tuple[str, ...] = (),
+    ):
+        """Open (or create) the cache.
+
+        Args:
+            cache_dir: Cache directory, None to keep entries in memory only
+            ttl_seconds: Time to live of an entry in seconds
+            max_entries: Maximum number of entries
+            stats: Additional counters of the subclass
+        """
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = dict.fromkeys(("hits", "misses", "expired", "evictions") + stats, 0)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        database = ":memory:"
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                database = str(self.cache_dir / self.database_name)
+            except OSError:
+                # 不可写的缓存目录：只保留内存缓存
+                self.cache_dir = None
+        conn = sqlite3.connect(database, timeout=5.0, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.DatabaseError:
+            pass
+        self._create_tables(conn)
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed)"
+        )
+        conn.commit()
+        return conn
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        raise NotImplementedError
+
+    def _expire(self, now: float, condition: str = "", params: Tuple[Any, ...] = ()) -> None:
+        """Delete entries past their TTL (or matching ``condition``). Call with the lock held."""
+        where = f"created < ? OR {condition}" if condition else "created < ?"
+        cursor = self._conn.execute(
+            f"DELETE FROM {self.table} WHERE {where}", (now - self.ttl_seconds,) + params
+        )
+        self._conn.commit()
+        self.stats["expired"] += max(cursor.rowcount, 0)
+
+    def _touch(self, key: Any, now: float) -> None:
+        """Record an access for LRU eviction. Call with the lock held."""
+        self._conn.execute(
+            f"UPDATE {self.table} SET accessed = ? WHERE {self.key_column} = ?", (now, key)
+        )
+        self._conn.commit()
+
+    def _insert(self, sql: str, params: Tuple[Any, ...]) -> bool:
+        """Insert an entry and evict least recently used entries over the cap.
+
+        Returns:
+            False if the write was given up
+        """
+        with self._lock:
+            try:
+                self._conn.execute(sql, params)
+                (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+                if count > self.max_entries:
+                    excess = count - self.max_entries
+                    self._conn.execute(
+                        f"DELETE FROM {self.table} WHERE {self.key_column} IN ("
+                        f" SELECT {self.key_column} FROM {self.table} ORDER BY accessed LIMIT ?)",
+                        (excess,),
+                    )
+                    self.stats["evictions"] += excess
+                self._conn.commit()
+            except sqlite3.Error:
+                # 数据库被其他进程长时间锁住等情况：放弃本次写入
+                return False
+        return True
+
+    def clear(self) -> None:
+        """Delete all cached entries."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+# 进程级缓存实例，按类型、目录与参数共享
+_caches: Dict[Tuple[Any, ...], SQLiteCache] = {}
+_caches_lock = threading.Lock()
+
+
+def shared_cache(cache_type: Type[_CacheT], *args: Any) -> _CacheT:
+    """Process-wide instance of ``cache_type(*args)``, created on first use.
+
+    Args:
+        cache_type: SQLiteCache subclass
+        *args: Constructor arguments, which identify the instance
+
+    Returns:
+        Shared cache instance
+    """
+    key = (cache_type,) + args
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = cache_type(*args)
+        return cache
+
+
+class LLMResponseCache(SQLiteCache):
+    """SQLite-backed LLM response cache with TTL and LRU eviction.
+
+    Attributes:
+        cache_dir: Directory of ``responses.sqlite3`` (None: memory only)
+        ttl_seconds: Entries older than this are ignored and deleted
+        max_entries: Maximum number of entries, least recently used are evicted
+        stats: Counters ``hits``, ``misses``, ``expired``, ``evictions``
+    """
+
+    database_name = "responses.sqlite3"
+    table = "responses"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Open (or create) the cache.
+
+        Args:
+            cache_dir: Cache directory, None to keep responses in memory only
+            ttl_seconds: Time to live of an entry in seconds (default 1 day)
+            max_entries: Maximum number of cached responses (default 2000)
+        """
+        super().__init__(cache_dir, ttl_seconds, max_entries)
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, created REAL, accessed REAL, response TEXT)"
+        )
+
+    def get(self, key: str) -> Optional["Message"]:
+        """Look up a response.
+
+        Args:
+            key: ``response_key(request)``
+
+        Returns:
+            Cached Message, or None on a miss or an expired entry
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                self._expire(now)
+                row = self._conn.execute(
+                    "SELECT response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats["misses"] += 1
+                    return None
+                self._touch(key, now)
+            except sqlite3.Error:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+        return _load_message(row[0])
+
+    def put(self, key: str, message: Any, model: str = "") -> None:
+        """Store a response and evict least recently used entries over the cap.
+
+        Args:
+            key: ``response_key(request)``
+            message: Final Message of the request
+            model: Model name (informational)
+        """
+        now = time.time()
+        self._insert(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (key, model, now, now, _dump_message(message)),
+        )
+
+
+def get_response_cache(
+    cache_dir: Optional[str] = None,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+) -> LLMResponseCache:
+    """Get the process-wide response cache for a directory.
+
+    Args:
+        cache_dir: Cache directory (default: ``$DOC4LLM_LLM_CACHE_DIR`` or
+            ``~/.cache/doc4llm/llm``)
+        ttl_seconds: Time to live of an entry in seconds
+        max_entries: Maximum number of cached responses
+
+    Returns:
+        Shared LLMResponseCache instance
+    """
+    cache_dir = cache_dir or os.environ.get(RESPONSE_CACHE_DIR_ENV) or DEFAULT_RESPONSE_CACHE_DIR
+    return shared_cache(
+        LLMResponseCache,
+        str(Path(cache_dir).expanduser().resolve()),
+        float(ttl_seconds),
+        int(max_entries),
+    )
+
+
+__all__ = [
+    "LLMResponseCache",
+    "RESPONSE_CACHE_FORMAT_VERSION",
+    "SQLiteCache",
+    "get_response_cache",
+    "response_key",
+    "shared_cache",
+]
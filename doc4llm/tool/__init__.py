@@ -18,25 +18,52 @@ Or use the sub-package directly:
 """
 
 # Re-export from the md_doc_retrieval sub-package
-from .md_doc_retrieval import (
-    BaseDirectoryNotFoundError,
-    BasicDocMatcher,
-    ConfigurationError,
-    DocExtractorError,
-    DocumentNotFoundError,
-    ExtractionResult,
-    InvalidTitleError,
-    MarkdownDocExtractor,
-    NoDocumentsFoundError,
-    build_doc_path,
-    calculate_similarity,
-    extract_doc_name_and_version,
-    find_best_match,
-    is_valid_doc_directory,
-    normalize_title,
-    parse_doc_structure,
-    sanitize_filename,
-)
+from typing import TYPE_CHECKING
+
+from doc4llm._lazy import lazy_exports
+
+_EXPORTS = {
+    "BaseDirectoryNotFoundError": ".md_doc_retrieval",
+    "BasicDocMatcher": ".md_doc_retrieval",
+    "ConfigurationError": ".md_doc_retrieval",
+    "DocExtractorError": ".md_doc_retrieval",
+    "DocumentNotFoundError": ".md_doc_retrieval",
+    "ExtractionResult": ".md_doc_retrieval",
+    "InvalidTitleError": ".md_doc_retrieval",
+    "MarkdownDocExtractor": ".md_doc_retrieval",
+    "NoDocumentsFoundError": ".md_doc_retrieval",
+    "build_doc_path": ".md_doc_retrieval",
+    "calculate_similarity": ".md_doc_retrieval",
+    "extract_doc_name_and_version": ".md_doc_retrieval",
+    "find_best_match": ".md_doc_retrieval",
+    "is_valid_doc_directory": ".md_doc_retrieval",
+    "normalize_title": ".md_doc_retrieval",
+    "parse_doc_structure": ".md_doc_retrieval",
+    "sanitize_filename": ".md_doc_retrieval",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .md_doc_retrieval import (
+        BaseDirectoryNotFoundError,
+        BasicDocMatcher,
+        ConfigurationError,
+        DocExtractorError,
+        DocumentNotFoundError,
+        ExtractionResult,
+        InvalidTitleError,
+        MarkdownDocExtractor,
+        NoDocumentsFoundError,
+        build_doc_path,
+        calculate_similarity,
+        extract_doc_name_and_version,
+        find_best_match,
+        is_valid_doc_directory,
+        normalize_title,
+        parse_doc_structure,
+        sanitize_filename,
+    )
 
 __all__ = [
     # Main extractor class
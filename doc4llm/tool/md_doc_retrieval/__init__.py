@@ -28,54 +28,110 @@ Transformer-based semantic matching:
     >>> results = matcher.rerank("query text", ["candidate1", "candidate2"])
 """
 
-from .basic_matcher import (
-    BasicDocMatcher,
-    MatchResult as BasicMatchResult,
-)
-from .doc_extractor import MarkdownDocExtractor, ExtractionResult
-from .agentic_matcher import (
-    AgenticDocMatcher,
-    ProgressiveRetriever,
-    ReflectiveReRanker,
-    MatchResult,
-    agentic_search,
-)
-from .exceptions import (
-    BaseDirectoryNotFoundError,
-    ConfigurationError,
-    DocExtractorError,
-    DocumentNotFoundError,
-    InvalidTitleError,
-    NoDocumentsFoundError,
-    SingleFileNotFoundError,
-)
-from .utils import (
-    build_doc_path,
-    calculate_similarity,
-    extract_doc_name_and_version,
-    extract_section_by_title,
-    extract_title_from_md_file,
-    find_best_match,
-    is_valid_doc_directory,
-    normalize_title,
-    parse_doc_structure,
-    sanitize_filename,
-)
-from .bm25_matcher import (
-    BM25Matcher,
-    BM25Config,
-    calculate_bm25_similarity,
-    create_bm25_matcher_from_files,
-    tokenize_text,
-)
-from .transformer_matcher import (
-    TransformerMatcher,
-    TransformerConfig,
-)
-from .modelscope_matcher import (
-    ModelScopeMatcher,
-    ModelScopeConfig,
-)
+from typing import TYPE_CHECKING
+
+from doc4llm._lazy import lazy_exports
+
+# matcher 依赖 numpy / openai / huggingface_hub 等，首次访问时才导入（PEP 562）
+_EXPORTS = {
+    "BasicDocMatcher": ".basic_matcher",
+    "BasicMatchResult": (".basic_matcher", "MatchResult"),
+    "MarkdownDocExtractor": ".doc_extractor",
+    "ExtractionResult": ".doc_extractor",
+    "AgenticDocMatcher": ".agentic_matcher",
+    "ProgressiveRetriever": ".agentic_matcher",
+    "ReflectiveReRanker": ".agentic_matcher",
+    "MatchResult": ".agentic_matcher",
+    "agentic_search": ".agentic_matcher",
+    "BaseDirectoryNotFoundError": ".exceptions",
+    "ConfigurationError": ".exceptions",
+    "DocExtractorError": ".exceptions",
+    "DocumentNotFoundError": ".exceptions",
+    "InvalidTitleError": ".exceptions",
+    "NoDocumentsFoundError": ".exceptions",
+    "SingleFileNotFoundError": ".exceptions",
+    "build_doc_path": ".utils",
+    "calculate_similarity": ".utils",
+    "extract_doc_name_and_version": ".utils",
+    "extract_section_by_title": ".utils",
+    "extract_title_from_md_file": ".utils",
+    "find_best_match": ".utils",
+    "is_valid_doc_directory": ".utils",
+    "normalize_title": ".utils",
+    "parse_doc_structure": ".utils",
+    "sanitize_filename": ".utils",
+    "BM25Matcher": ".bm25_matcher",
+    "BM25Config": ".bm25_matcher",
+    "calculate_bm25_similarity": ".bm25_matcher",
+    "create_bm25_matcher_from_files": ".bm25_matcher",
+    "tokenize_text": ".bm25_matcher",
+    "SparseBM25Scorer": ".bm25_sparse",
+    "EmbeddingCache": ".embedding_cache",
+    "get_embedding_cache": ".embedding_cache",
+    "BatchEncoder": ".batch_encoder",
+    "ModelRegistry": ".model_registry",
+    "get_model_registry": ".model_registry",
+    "TransformerMatcher": ".transformer_matcher",
+    "TransformerConfig": ".transformer_matcher",
+    "ModelScopeMatcher": ".modelscope_matcher",
+    "ModelScopeConfig": ".modelscope_matcher",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .basic_matcher import (
+        BasicDocMatcher,
+        MatchResult as BasicMatchResult,
+    )
+    from .doc_extractor import MarkdownDocExtractor, ExtractionResult
+    from .agentic_matcher import (
+        AgenticDocMatcher,
+        ProgressiveRetriever,
+        ReflectiveReRanker,
+        MatchResult,
+        agentic_search,
+    )
+    from .exceptions import (
+        BaseDirectoryNotFoundError,
+        ConfigurationError,
+        DocExtractorError,
+        DocumentNotFoundError,
+        InvalidTitleError,
+        NoDocumentsFoundError,
+        SingleFileNotFoundError,
+    )
+    from .utils import (
+        build_doc_path,
+        calculate_similarity,
+        extract_doc_name_and_version,
+        extract_section_by_title,
+        extract_title_from_md_file,
+        find_best_match,
+        is_valid_doc_directory,
+        normalize_title,
+        parse_doc_structure,
+        sanitize_filename,
+    )
+    from .bm25_matcher import (
+        BM25Matcher,
+        BM25Config,
+        calculate_bm25_similarity,
+        create_bm25_matcher_from_files,
+        tokenize_text,
+    )
+    from .bm25_sparse import SparseBM25Scorer
+    from .embedding_cache import EmbeddingCache, get_embedding_cache
+    from .batch_encoder import BatchEncoder
+    from .model_registry import ModelRegistry, get_model_registry
+    from .transformer_matcher import (
+        TransformerMatcher,
+        TransformerConfig,
+    )
+    from .modelscope_matcher import (
+        ModelScopeMatcher,
+        ModelScopeConfig,
+    )
 
 __all__ = [
     # Main extractor class
@@ -115,6 +171,15 @@ __all__ = [
     "calculate_bm25_similarity",
     "create_bm25_matcher_from_files",
     "tokenize_text",
+    "SparseBM25Scorer",
+    # Embedding cache
+    "EmbeddingCache",
+    "get_embedding_cache",
+    # Concurrent remote batch encoding
+    "BatchEncoder",
+    # Process-wide local model registry
+    "ModelRegistry",
+    "get_model_registry",
     # Transformer matcher (v3.3.0)
     "TransformerMatcher",
     "TransformerConfig",
@@ -0,0 +1,155 @@
+"""
+Concurrent batched encoding for remote embedding APIs.
+
+远程 encode 原先按 ``batch_size`` 切块后逐块串行请求，rerank 几百个 heading
+就是 N 次串行往返。这里先对文本去重，再把批次交给有界线程池并发发送，
+每个批次独立按指数退避重试，最后按原顺序拼回结果。
+
+Example:
+    >>> from doc4llm.tool.md_doc_retrieval.batch_encoder import BatchEncoder
+    >>> encoder = BatchEncoder(lambda batch: client.embed(batch), batch_size=32, max_concurrency=4)
+    >>> embeddings = encoder.encode(["Hooks", "Settings", "Hooks"])  # 2 texts sent
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 4xx 中仍值得重试的状态码（超时 / 限流）
+_RETRYABLE_CLIENT_STATUS = (408, 409, 429)
+
+# 无状态码的瞬时错误（OpenAI SDK / httpx / requests 的连接与超时异常），
+# 按类名匹配以免导入这些可选依赖
+_TRANSIENT_ERROR_NAMES = frozenset({
+    "APIConnectionError",
+    "APITimeoutError",
+    "TimeoutException",
+    "NetworkError",
+    "RemoteProtocolError",
+    "ConnectionError",
+    "Timeout",
+})
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of an OpenAI / huggingface_hub / httpx error, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed batch request is worth retrying.
+
+    Only transient failures are retried: 5xx, 408 / 409 / 429, timeouts and
+    connection errors. Client errors (bad request, authentication, unknown
+    model) and anything else, such as a malformed response, fail at once.
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status in _RETRYABLE_CLIENT_STATUS
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class BatchEncoder:
+    """Send deduplicated batches to an embedding endpoint concurrently.
+
+    Attributes:
+        send_batch: Encodes one batch of texts, returns an (n, D) array-like
+        batch_size: Texts per request
+        max_concurrency: Maximum requests in flight (1: sequential)
+        max_retries: Retries per batch after the first attempt
+        retry_backoff: Base delay in seconds, doubled on every retry (with jitter)
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[str]], Any],
+        batch_size: int = 32,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        """Initialize the batch encoder.
+
+        Args:
+            send_batch: Encodes one batch of texts, returns an (n, D) array-like
+            batch_size: Texts per request (default 32)
+            max_concurrency: Maximum requests in flight (default 4)
+            max_retries: Retries per batch after the first attempt (default 3)
+            retry_backoff: Base retry delay in seconds (default 0.5)
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        self.send_batch = send_batch
+        self.batch_size = batch_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+
+    def _send_with_retry(self, batch: List[str]) -> np.ndarray:
+        """Send one batch, retrying transient failures with exponential backoff."""
+        attempt = 0
+        while True:
+            try:
+                embeddings = np.asarray(self.send_batch(batch), dtype=np.float32)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                time.sleep(delay * (0.5 + random.random() / 2))
+                attempt += 1
+
+        if embeddings.ndim != 2 or len(embeddings) != len(batch):
+            raise ValueError(
+                f"Expected {len(batch)} embeddings, got array of shape {embeddings.shape}"
+            )
+        return embeddings
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts; identical texts are sent once.
+
+        Args:
+            texts: Texts to encode
+
+        Returns:
+            Embeddings of shape (N, D) in the order of ``texts``
+
+        Raises:
+            Exception: The last error of a batch that still fails after retries
+        """
+        if not texts:
+            return np.array([], dtype=np.float32)
+
+        positions: Dict[str, int] = {}
+        unique: List[str] = []
+        for text in texts:
+            if text not in positions:
+                positions[text] = len(unique)
+                unique.append(text)
+
+        batches = [
+            unique[i:i + self.batch_size] for i in range(0, len(unique), self.batch_size)
+        ]
+        workers = min(self.max_concurrency, len(batches))
+        if workers == 1:
+            results = [self._send_with_retry(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._send_with_retry, batches))
+
+        embeddings = np.concatenate(results, axis=0)
+        return embeddings[[positions[text] for text in texts]]
+
+
+__all__ = [
+    "BatchEncoder",
+    "is_retryable",
+]
@@ -16,6 +16,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from .bm25_sparse import SparseBM25Scorer, top_k_scores
+
 
 @dataclass
 class BM25Config:
@@ -36,6 +38,15 @@ class BM25Config:
         max_token_length: Maximum token length to index (default 30)
         lowercase: Whether to lowercase tokens (default True)
         stop_words: Set of stop words to ignore (optional)
+        backend: Scoring backend (default "python")
+           - "python": per-document loop over dict term vectors
+           - "sparse": CSR term-document matrix with precomputed BM25
+             weights, scores query batches with one sparse mat-mul
+             (same results as "python")
+        top_k_method: Top-k selection with the "sparse" backend (default "exhaustive")
+           - "exhaustive": score every document, then argpartition
+           - "maxscore": MaxScore/block-max dynamic pruning, skips most
+             postings on large collections (same results)
     """
     k1: float = 1.2
     b: float = 0.75
@@ -43,6 +54,8 @@ class BM25Config:
     max_token_length: int = 30
     lowercase: bool = True
     stop_words: Optional[set] = None
+    backend: str = "python"
+    top_k_method: str = "exhaustive"
 
 
 class BM25Matcher:
@@ -92,6 +105,7 @@ class BM25Matcher:
         self._idf_cache: Dict[str, float] = {}
         self._avg_doc_length: float = 0.0
         self._total_docs: int = 0
+        self._sparse_scorer: Optional[SparseBM25Scorer] = None
 
     def _tokenize(self, text: str) -> List[str]:
         """Tokenize text into terms.
@@ -145,6 +159,7 @@ class BM25Matcher:
         self._doc_lengths = []
         self._doc_vectors = []
         self._idf_cache = {}
+        self._sparse_scorer = None
 
         total_length = 0
 
@@ -185,6 +200,19 @@ class BM25Matcher:
                 (self._total_docs - df + 0.5) / (df + 0.5) + 1.0
             )
 
+    def _get_sparse_scorer(self) -> SparseBM25Scorer:
+        """Get the CSR scorer of the current index (built lazily)."""
+        if self._sparse_scorer is None:
+            self._sparse_scorer = SparseBM25Scorer.from_doc_vectors(
+                self._doc_vectors,
+                self._doc_lengths,
+                self._idf_cache,
+                self._avg_doc_length,
+                k1=self.config.k1,
+                b=self.config.b,
+            )
+        return self._sparse_scorer
+
     def _get_idf(self, term: str) -> float:
         """Get IDF value for a term.
 
@@ -263,6 +291,14 @@ class BM25Matcher:
         if not query_tokens:
             return []
 
+        if self.config.backend == "sparse":
+            return [
+                (self._doc_ids[doc_idx], score)
+                for doc_idx, score in self._get_sparse_scorer().search(
+                    query_tokens, top_k, min_score, method=self.config.top_k_method
+                )
+            ]
+
         # Score all documents
         scores = []
         for doc_idx in range(self._total_docs):
@@ -276,6 +312,43 @@ class BM25Matcher:
         # Return top-k results
         return scores[:top_k]
 
+    def search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        min_score: float = 0.0
+    ) -> List[List[Tuple[str, float]]]:
+        """Search several queries at once.
+
+        With the "sparse" backend all queries are scored in a single
+        sparse mat-mul; the "python" backend runs ``search`` per query.
+
+        Args:
+            queries: Search query strings
+            top_k: Maximum number of results per query
+            min_score: Minimum score threshold (default 0.0)
+
+        Returns:
+            One ``search`` result list per query, in input order
+        """
+        if self.config.backend != "sparse" or self.config.top_k_method != "exhaustive":
+            return [self.search(q, top_k=top_k, min_score=min_score) for q in queries]
+
+        if not self._doc_ids:
+            return [[] for _ in queries]
+
+        queries_tokens = [self._tokenize(q) for q in queries]
+        scores = self._get_sparse_scorer().score_batch(queries_tokens)
+        return [
+            [
+                (self._doc_ids[doc_idx], score)
+                for doc_idx, score in top_k_scores(scores[i], top_k, min_score)
+            ]
+            if tokens
+            else []
+            for i, tokens in enumerate(queries_tokens)
+        ]
+
     def search_with_metadata(
         self,
         query: str,
@@ -365,6 +438,8 @@ class BM25Matcher:
                 "b": self.config.b,
                 "min_token_length": self.config.min_token_length,
                 "max_token_length": self.config.max_token_length,
+                "backend": self.config.backend,
+                "top_k_method": self.config.top_k_method,
             }
         }
 
@@ -0,0 +1,449 @@
+"""
+Sparse-matrix BM25 scoring backend.
+
+Stores the collection as a CSR term-document matrix whose values are the
+precomputed BM25 term weights::
+
+    W[t, d] = idf(t) * tf(t, d) * (k1 + 1) / (tf(t, d) + k1 * (1 - b + b * |d| / avgdl))
+
+A batch of queries is a sparse query-term matrix ``Q`` (one entry per query
+token occurrence), so scoring every document for every query is a single
+sparse product ``Q @ W``. It is implemented with plain numpy (gather the
+postings rows, ``np.bincount`` into a dense ``[Q, N]`` score matrix), so no
+scipy dependency is needed.
+
+The weights are computed with exactly the same floating point expression as
+``BM25Matcher._score_document`` and accumulated in query token order, so the
+scores are bit-for-bit identical to the pure Python backend.
+
+For large collections ``top_k_maxscore`` offers dynamic pruning (MaxScore
+with block-max metadata): query terms are processed by decreasing upper
+bound, and once the remaining terms cannot lift an unseen document above
+the current k-th best score, only the surviving candidates are probed in
+the remaining posting lists, block by block, with candidates whose
+block-max bound falls below the threshold dropped. Results are identical to
+the exhaustive scorer.
+
+Example:
+    >>> from doc4llm.tool.md_doc_retrieval.bm25_sparse import SparseBM25Scorer, top_k_scores
+    >>> scorer = SparseBM25Scorer.from_doc_vectors(
+    ...     doc_vectors, doc_lengths, idf_cache, avg_doc_length, k1=1.2, b=0.75
+    ... )
+    >>> scores = scorer.score_batch([["machine", "learning"], ["python"]])  # [2, N]
+    >>> top_k_scores(scores[0], top_k=5)
+    [(0, 1.73), (2, 0.98), ...]
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 默认 block-max 分块大小（每块 postings 数）
+DEFAULT_BLOCK_SIZE = 64
+
+# 剪枝阈值的相对容差，避免不同累加顺序带来的浮点误差误剪等分文档
+_PRUNE_EPS = 1e-9
+
+
+class SparseBM25Scorer:
+    """CSR term-document matrix with precomputed BM25 weights.
+
+    Row ``t`` of the matrix holds the documents containing term ``t``:
+    ``indices[indptr[t]:indptr[t + 1]]`` with weights ``data[...]``.
+
+    Attributes:
+        vocab: Term -> row mapping
+        indptr: int64[V+1] row offsets
+        indices: int32[nnz] document ids
+        data: float64[nnz] BM25 term weights
+        num_docs: Number of documents (columns)
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray,
+        idf: np.ndarray,
+        avg_doc_length: float,
+        k1: float = 1.2,
+        b: float = 0.75,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """Build the weighted matrix from raw term-frequency postings.
+
+        Args:
+            vocab: Term -> row mapping
+            indptr: Row offsets of the postings (length V+1)
+            indices: Document id of each posting
+            tfs: Term frequency of each posting
+            doc_lengths: Length of each document in tokens
+            idf: IDF of each term (row)
+            avg_doc_length: Average document length
+            k1: BM25 k1 parameter
+            b: BM25 b parameter
+            block_size: Postings per block for block-max pruning metadata
+        """
+        self.vocab = vocab
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.num_docs = len(doc_lengths)
+        self.k1 = k1
+        self.b = b
+
+        tf = np.asarray(tfs, dtype=np.float64)
+        lengths = np.asarray(doc_lengths)[self.indices]
+        row_idf = np.repeat(np.asarray(idf, dtype=np.float64), np.diff(self.indptr))
+        if len(tf):
+            numerator = tf * (k1 + 1)
+            denominator = tf + k1 * (1 - b + b * (lengths / avg_doc_length))
+            self.data = row_idf * (numerator / denominator)
+        else:
+            self.data = np.zeros(0, dtype=np.float64)
+
+        # MaxScore / block-max 元数据，首次剪枝查询时构建
+        self.block_size = block_size
+        self._term_max: Optional[np.ndarray] = None
+        self._block_ptr: Optional[np.ndarray] = None
+        self._block_max: Optional[np.ndarray] = None
+        self._block_last: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_doc_vectors(
+        cls,
+        doc_vectors: Sequence[Dict[str, int]],
+        doc_lengths: Sequence[int],
+        idf: Dict[str, float],
+        avg_doc_length: float,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "SparseBM25Scorer":
+        """Build the matrix from ``BM25Matcher`` index structures.
+
+        Args:
+            doc_vectors: Term frequency dict per document
+            doc_lengths: Length of each document in tokens
+            idf: Term -> IDF mapping
+            avg_doc_length: Average document length
+            k1: BM25 k1 parameter
+            b: BM25 b parameter
+
+        Returns:
+            SparseBM25Scorer instance
+        """
+        vocab: Dict[str, int] = {}
+        rows: List[List[Tuple[int, int]]] = []
+        for doc_id, doc_vector in enumerate(doc_vectors):
+            for term, tf in doc_vector.items():
+                row = vocab.get(term)
+                if row is None:
+                    row = vocab[term] = len(rows)
+                    rows.append([])
+                rows[row].append((doc_id, tf))
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(r) for r in rows])
+        flat = [pair for r in rows for pair in r]
+        return cls(
+            vocab=vocab,
+            indptr=indptr,
+            indices=np.array([d for d, _ in flat], dtype=np.int32),
+            tfs=np.array([tf for _, tf in flat], dtype=np.int32),
+            doc_lengths=np.asarray(doc_lengths, dtype=np.int32),
+            idf=np.array([idf.get(term, 0.0) for term in vocab], dtype=np.float64),
+            avg_doc_length=avg_doc_length,
+            k1=k1,
+            b=b,
+        )
+
+    def score_batch(self, queries_tokens: Sequence[Sequence[str]]) -> np.ndarray:
+        """Score all documents for a batch of tokenized queries (``Q @ W``).
+
+        Args:
+            queries_tokens: Tokenized queries; repeated tokens count repeatedly
+
+        Returns:
+            float64 array of shape (len(queries_tokens), num_docs)
+        """
+        num_queries = len(queries_tokens)
+        q_idx: List[int] = []
+        rows: List[int] = []
+        for q, tokens in enumerate(queries_tokens):
+            for token in tokens:
+                row = self.vocab.get(token)
+                if row is not None:
+                    q_idx.append(q)
+                    rows.append(row)
+
+        if not rows or self.num_docs == 0:
+            return np.zeros((num_queries, self.num_docs), dtype=np.float64)
+
+        rows_arr = np.asarray(rows, dtype=np.int64)
+        starts = self.indptr[rows_arr]
+        counts = self.indptr[rows_arr + 1] - starts
+        total = int(counts.sum())
+
+        # 展开每个 (query, term) 对应的 postings 行：positions = start + [0, count)
+        run_offsets = np.cumsum(counts) - counts
+        positions = np.arange(total, dtype=np.int64) + np.repeat(starts - run_offsets, counts)
+
+        flat_bins = (
+            np.repeat(np.asarray(q_idx, dtype=np.int64), counts) * self.num_docs
+            + self.indices[positions]
+        )
+        scores = np.bincount(
+            flat_bins,
+            weights=self.data[positions],
+            minlength=num_queries * self.num_docs,
+        )
+        return scores.reshape(num_queries, self.num_docs)
+
+    def score(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """Score all documents for one tokenized query.
+
+        Args:
+            query_tokens: Query tokens
+
+        Returns:
+            float64 array of shape (num_docs,)
+        """
+        return self.score_batch([query_tokens])[0]
+
+    def _build_pruning_metadata(self) -> None:
+        """Compute per-term max weights and per-block max weights / last doc ids."""
+        lengths = np.diff(self.indptr)
+        nonempty = lengths > 0
+
+        self._term_max = np.zeros(len(lengths), dtype=np.float64)
+        if len(self.data):
+            self._term_max[nonempty] = np.maximum.reduceat(
+                self.data, self.indptr[:-1][nonempty]
+            )
+
+        # 每个 term 的 postings 按 doc id 升序，切成 block_size 大小的块
+        num_blocks = (lengths + self.block_size - 1) // self.block_size
+        self._block_ptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        self._block_ptr[1:] = np.cumsum(num_blocks)
+        total_blocks = int(self._block_ptr[-1])
+        if total_blocks == 0:
+            self._block_max = np.zeros(0, dtype=np.float64)
+            self._block_last = np.zeros(0, dtype=np.int32)
+            return
+
+        block_rank = np.arange(total_blocks, dtype=np.int64) - np.repeat(
+            self._block_ptr[:-1], num_blocks
+        )
+        block_starts = np.repeat(self.indptr[:-1], num_blocks) + block_rank * self.block_size
+        block_ends = np.minimum(
+            block_starts + self.block_size, np.repeat(self.indptr[1:], num_blocks)
+        )
+        self._block_max = np.maximum.reduceat(self.data, block_starts)
+        self._block_last = self.indices[block_ends - 1]
+
+    def _lookup(self, row: int, docs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the postings of ``docs`` in one row.
+
+        Returns:
+            (hit mask over docs, posting positions of the hits)
+        """
+        start, end = self.indptr[row], self.indptr[row + 1]
+        pos = start + np.searchsorted(self.indices[start:end], docs)
+        hit = pos < end
+        hit[hit] = self.indices[pos[hit]] == docs[hit]
+        return hit, pos[hit]
+
+    def top_k_maxscore(
+        self,
+        query_tokens: Sequence[str],
+        top_k: int = 10,
+        min_score: Optional[float] = 0.0,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Top-k retrieval with MaxScore + block-max dynamic pruning.
+
+        Returns exactly what ``top_k_scores(self.score(query_tokens), ...)``
+        returns (same scores, same tie order), while scoring only a fraction
+        of the postings when the query mixes rare and common terms.
+
+        Args:
+            query_tokens: Query tokens
+            top_k: Maximum number of results
+            min_score: Minimum score threshold (None to disable)
+            stats: Optional dict filled with ``postings_total`` (postings of
+                the query terms) and ``postings_scored`` (postings accumulated
+                plus candidate lookups in the non-essential lists)
+
+        Returns:
+            List of (doc_index, score) tuples sorted by score descending
+        """
+        if self._term_max is None:
+            self._build_pruning_metadata()
+
+        term_counts = Counter(
+            self.vocab[token] for token in query_tokens if token in self.vocab
+        )
+        rows = np.array(list(term_counts), dtype=np.int64)
+        counts = np.array([term_counts[r] for r in rows], dtype=np.float64)
+        postings_total = int(np.sum(np.diff(self.indptr)[rows])) if len(rows) else 0
+        postings_scored = 0
+        touched = np.zeros(self.num_docs, dtype=bool)
+
+        if top_k <= 0 or self.num_docs == 0:
+            candidates = np.zeros(0, dtype=np.int64)
+        else:
+            # 按上界（term_max × 查询词频）降序处理
+            bounds = self._term_max[rows] * counts
+            order = np.argsort(-bounds, kind="stable")
+            rows, counts, bounds = rows[order], counts[order], bounds[order]
+
+            acc = np.zeros(self.num_docs, dtype=np.float64)
+            remaining = float(bounds.sum())
+            theta = 0.0
+            j = 0
+            seen = np.zeros(0, dtype=np.int64)
+
+            # Essential 阶段：完整累加高上界的 posting list，直到未见文档不可能进入 top-k
+            while j < len(rows):
+                start, end = self.indptr[rows[j]], self.indptr[rows[j] + 1]
+                docs = self.indices[start:end]
+                acc[docs] += counts[j] * self.data[start:end]
+                seen = np.concatenate((seen, docs[~touched[docs]]))
+                touched[docs] = True
+                postings_scored += int(end - start)
+                remaining -= bounds[j]
+                j += 1
+
+                if len(seen) >= top_k:
+                    theta = float(np.partition(acc[seen], len(seen) - top_k)[len(seen) - top_k])
+                    if remaining < theta * (1 - _PRUNE_EPS):
+                        break
+
+            cutoff = theta * (1 - _PRUNE_EPS)
+            candidates = np.sort(seen[acc[seen] + remaining >= cutoff])
+
+            # Non-essential 阶段：只在剩余 posting list 中探测候选文档
+            while j < len(rows) and len(candidates):
+                row = rows[j]
+                remaining -= bounds[j]
+                block_lo, block_hi = self._block_ptr[row], self._block_ptr[row + 1]
+                block_idx = np.searchsorted(self._block_last[block_lo:block_hi], candidates)
+                in_row = block_idx < (block_hi - block_lo)
+
+                # block-max 上界：候选分数 + 所在块最大权重 + 剩余上界
+                block_bound = np.zeros(len(candidates), dtype=np.float64)
+                block_bound[in_row] = counts[j] * self._block_max[block_lo + block_idx[in_row]]
+                keep = acc[candidates] + block_bound + remaining >= cutoff
+                probe = keep & in_row
+
+                hit, pos = self._lookup(row, candidates[probe])
+                probed = candidates[probe]
+                acc[probed[hit]] += counts[j] * self.data[pos]
+                postings_scored += int(probe.sum())
+
+                candidates = candidates[keep]
+                candidates = candidates[acc[candidates] + remaining >= cutoff]
+                if len(candidates) >= top_k:
+                    theta = max(
+                        theta,
+                        float(np.partition(acc[candidates], len(candidates) - top_k)[len(candidates) - top_k]),
+                    )
+                    cutoff = theta * (1 - _PRUNE_EPS)
+                j += 1
+
+        if stats is not None:
+            stats["postings_total"] = postings_total
+            stats["postings_scored"] = postings_scored
+
+        # 按查询词原始顺序精确重算候选分数，保证与穷举结果逐位一致
+        exact = np.zeros(len(candidates), dtype=np.float64)
+        for token in query_tokens:
+            row = self.vocab.get(token)
+            if row is None:
+                continue
+            hit, pos = self._lookup(row, candidates)
+            exact[hit] += self.data[pos]
+
+        results = [
+            (int(candidates[i]), float(exact[i]))
+            for i in np.lexsort((candidates, -exact))
+            if min_score is None or exact[i] >= min_score
+        ][:top_k]
+
+        # 与穷举一致：匹配文档不足 top_k 时按下标补充 0 分文档
+        # （只可能发生在所有 posting list 都已完整累加、touched 覆盖全部匹配文档时）
+        if len(results) < top_k and (min_score is None or min_score <= 0.0):
+            unmatched = np.flatnonzero(~touched)[: top_k - len(results)]
+            results.extend((int(doc), 0.0) for doc in unmatched)
+        return results
+
+    def search(
+        self,
+        query_tokens: Sequence[str],
+        top_k: int = 10,
+        min_score: Optional[float] = 0.0,
+        method: str = "exhaustive",
+    ) -> List[Tuple[int, float]]:
+        """Top-k search for one tokenized query.
+
+        Args:
+            query_tokens: Query tokens
+            top_k: Maximum number of results
+            min_score: Minimum score threshold (None to disable)
+            method: "exhaustive" (score all documents) or "maxscore"
+                (dynamic pruning, same results)
+
+        Returns:
+            List of (doc_index, score) tuples sorted by score descending
+        """
+        if method == "maxscore":
+            return self.top_k_maxscore(query_tokens, top_k, min_score)
+        if method != "exhaustive":
+            raise ValueError(f"Unknown top-k method: {method}")
+        return top_k_scores(self.score(query_tokens), top_k, min_score)
+
+
+def top_k_scores(
+    scores: np.ndarray, top_k: int = 10, min_score: Optional[float] = 0.0
+) -> List[Tuple[int, float]]:
+    """Select the top-k documents of a score vector with ``argpartition``.
+
+    Ordering matches ``list.sort(key=score, reverse=True)`` on documents in
+    index order: score descending, ties by ascending document index.
+
+    Args:
+        scores: float array of shape (N,)
+        top_k: Maximum number of results
+        min_score: Minimum score threshold (None to disable)
+
+    Returns:
+        List of (doc_index, score) tuples sorted by score descending
+    """
+    if top_k <= 0 or len(scores) == 0:
+        return []
+
+    if min_score is None:
+        candidates = np.arange(len(scores))
+    else:
+        candidates = np.flatnonzero(scores >= min_score)
+    values = scores[candidates]
+
+    if len(candidates) > top_k:
+        # 第 top_k 大的分数；严格大于它的全部保留，等于它的按下标补足
+        kth_value = values[np.argpartition(-values, top_k - 1)[top_k - 1]]
+        above = candidates[values > kth_value]
+        tied = candidates[values == kth_value][: top_k - len(above)]
+        candidates = np.concatenate([above, tied])
+        values = scores[candidates]
+
+    order = np.lexsort((candidates, -values))
+    return [(int(candidates[i]), float(values[i])) for i in order]
+
+
+__all__ = [
+    "DEFAULT_BLOCK_SIZE",
+    "SparseBM25Scorer",
+    "top_k_scores",
+]
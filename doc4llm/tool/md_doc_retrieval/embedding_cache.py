@@ -0,0 +1,426 @@
+"""
+Content-addressed embedding cache for TransformerMatcher and ModelScopeMatcher.
+
+Rerank 阶段每次查询都会对 page title / heading / context 重新调用 ``encode``，
+同一份语料被反复送往远程 API 或本地 CPU 推理。这里按 ``(model_id, 规范化文本)``
+缓存向量：进程内 LRU 在前，磁盘上的内存映射 float32 文件在后，只有未命中的
+文本才交给模型计算。规范化只用于缓存 key，模型收到的始终是调用方的原始文本。
+
+磁盘存储追加写入，每个模型最多保留 ``max_disk_items`` 个向量：超出时压缩为
+最近写入的一半，写入新一代文件后切换 meta.json（其他进程已映射的旧文件仍可
+读取，下次未命中时切换到新一代）。
+
+On-disk layout (one directory per model namespace)::
+
+    <cache_dir>/<namespace_slug>/
+        meta.json           # {"version", "namespace", "dim", "generation"}
+        vectors-<gen>.f32   # float32[N, dim], append-only, memory-mapped for reads
+        keys-<gen>.txt      # "<sha1 hex> <row>" per line, appended after the vector
+
+Example:
+    >>> from doc4llm.tool.md_doc_retrieval.embedding_cache import get_embedding_cache
+    >>> cache = get_embedding_cache()
+    >>> embeddings = cache.encode("BAAI/bge-base-en-v1.5", ["Hooks", "Settings"], model_encode)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# 缓存格式版本，格式变化时递增以丢弃旧缓存
+EMBEDDING_CACHE_FORMAT_VERSION = 2
+
+DEFAULT_EMBEDDING_CACHE_DIR = os.path.join("~", ".cache", "doc4llm", "embeddings")
+EMBEDDING_CACHE_DIR_ENV = "DOC4LLM_EMBEDDING_CACHE_DIR"
+# 每个模型在磁盘上保留的向量数上限（768 维约 150 MB）
+DEFAULT_MAX_DISK_ITEMS = 50000
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys (NFC, collapsed whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class _VectorStore:
+    """Append-only, memory-mapped float32 vectors of one model namespace."""
+
+    def __init__(self, path: Path, namespace: str, max_rows: int = DEFAULT_MAX_DISK_ITEMS):
+        self.path = path
+        self.namespace = namespace
+        self.max_rows = max_rows
+        self.dim: Optional[int] = None
+        self.generation = 0
+        self._rows: Dict[str, int] = {}
+        self._keys_size = 0
+        self._mmap: Optional[np.memmap] = None
+        self._writable = True
+        self._load()
+
+    def _vectors_file(self, generation: Optional[int] = None) -> Path:
+        return self.path / f"vectors-{self.generation if generation is None else generation}.f32"
+
+    def _keys_file(self, generation: Optional[int] = None) -> Path:
+        return self.path / f"keys-{self.generation if generation is None else generation}.txt"
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (
+            meta.get("version") != EMBEDDING_CACHE_FORMAT_VERSION
+            or meta.get("namespace") != self.namespace
+        ):
+            return None
+        return meta
+
+    def _load(self) -> None:
+        """(Re)load meta.json and the keys of its generation from scratch."""
+        self.dim = None
+        self._rows.clear()
+        self._keys_size = 0
+        self._mmap = None
+        meta = self._read_meta()
+        if meta is None:
+            return
+        self.dim = int(meta["dim"])
+        self.generation = int(meta.get("generation", 0))
+        self._refresh()
+
+    def _sync(self) -> None:
+        """Pick up appended rows, or reload after another process compacted the store."""
+        meta = self._read_meta()
+        if meta is None or self.dim is None or int(meta.get("generation", 0)) != self.generation:
+            self._load()
+        else:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        """Pick up rows appended since the last read (possibly by other processes)."""
+        try:
+            with open(self._keys_file(), "r", encoding="utf-8") as f:
+                f.seek(self._keys_size)
+                chunk = f.read()
+        except OSError:
+            return
+        # 只接受完整的行，半行留到下次读取
+        complete = chunk[: chunk.rfind("\n") + 1]
+        for line in complete.splitlines():
+            key, _, row = line.partition(" ")
+            if row.isdigit():
+                self._rows[key] = int(row)
+        self._keys_size += len(complete.encode("utf-8"))
+        self._mmap = None
+
+    def _vectors(self) -> Optional[np.memmap]:
+        if self._mmap is None and self.dim:
+            vectors_file = self._vectors_file()
+            try:
+                rows = vectors_file.stat().st_size // (4 * self.dim)
+            except OSError:
+                return None
+            if rows:
+                self._mmap = np.memmap(
+                    vectors_file, dtype=np.float32, mode="r", shape=(rows, self.dim)
+                )
+        return self._mmap
+
+    def get(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        if any(key not in self._rows for key in keys):
+            self._sync()
+        vectors = self._vectors()
+        found = {}
+        for key in keys:
+            row = self._rows.get(key)
+            if row is not None and vectors is not None and row < len(vectors):
+                found[key] = np.array(vectors[row])
+        return found
+
+    def _write_meta(self) -> None:
+        tmp_meta = self.path / f"meta.json.{os.getpid()}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": EMBEDDING_CACHE_FORMAT_VERSION,
+                "namespace": self.namespace,
+                "dim": self.dim,
+                "generation": self.generation,
+            }, f)
+        os.replace(tmp_meta, self.path / "meta.json")
+
+    def _compact(self) -> None:
+        """Keep the most recently written half of the rows in a new generation."""
+        vectors = self._vectors()
+        if vectors is None:
+            return
+        keep = max(1, self.max_rows // 2)
+        rows = sorted(self._rows.items(), key=lambda item: item[1])[-keep:]
+        generation = self.generation + 1
+        new_vectors = np.ascontiguousarray(vectors[[row for _, row in rows]], dtype=np.float32)
+        with open(self._vectors_file(generation), "wb") as f:
+            f.write(new_vectors.tobytes())
+        with open(self._keys_file(generation), "w", encoding="utf-8") as f:
+            f.write("".join(f"{key} {i}\n" for i, (key, _) in enumerate(rows)))
+
+        # meta.json 切换后新一代生效；已映射旧文件的读者不受影响
+        old_generation = self.generation
+        self.generation = generation
+        self._write_meta()
+        for name in (self._vectors_file(old_generation), self._keys_file(old_generation)):
+            name.unlink(missing_ok=True)
+        self._load()
+
+    def put(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        if not self._writable or not len(keys):
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.path / "vectors.lock", "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                # 其他进程可能已写入 meta / 追加了向量 / 压缩了存储
+                self._sync()
+                if self.dim is None:
+                    # 新目录或旧格式：丢弃残留文件后重新开始
+                    for stale in self.path.glob("vectors*.f32"):
+                        stale.unlink(missing_ok=True)
+                    for stale in self.path.glob("keys*.txt"):
+                        stale.unlink(missing_ok=True)
+                    self._rows.clear()
+                    self._keys_size = 0
+                    self.dim = int(vectors.shape[1])
+                    self.generation = 0
+                    self._write_meta()
+                if vectors.shape[1] != self.dim:
+                    return
+
+                vectors_file = self._vectors_file()
+                row_bytes = 4 * self.dim
+                size = vectors_file.stat().st_size if vectors_file.exists() else 0
+                if size % row_bytes:
+                    # 上次写入中断留下的半行
+                    size -= size % row_bytes
+                    os.truncate(vectors_file, size)
+                start = size // row_bytes
+                with open(vectors_file, "ab") as f:
+                    f.write(vectors.tobytes())
+                # 向量先落盘，再追加 key，读到的 key 一定有对应向量
+                lines = "".join(
+                    f"{key} {start + i}\n" for i, key in enumerate(keys)
+                )
+                with open(self._keys_file(), "a", encoding="utf-8") as f:
+                    f.write(lines)
+                self._refresh()
+                if self.max_rows > 0 and start + len(keys) > self.max_rows:
+                    self._compact()
+        except OSError:
+            # 不可写的缓存目录：只保留内存缓存
+            self._writable = False
+
+
+class EmbeddingCache:
+    """In-memory LRU in front of per-model memory-mapped vector stores.
+
+    Attributes:
+        cache_dir: On-disk cache directory (None: memory only)
+        max_memory_items: Capacity of the in-memory LRU
+        max_disk_items: Per-model capacity of the on-disk store (0: unbounded)
+        stats: Counters ``memory_hits``, ``disk_hits``, ``misses``
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_items: int = 10000,
+        max_disk_items: int = DEFAULT_MAX_DISK_ITEMS,
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: On-disk cache directory, None to keep vectors in memory only
+            max_memory_items: Maximum number of vectors kept in the in-memory LRU
+            max_disk_items: Maximum number of vectors kept on disk per model; the
+                store is compacted to the most recent half when it grows past it
+                (0: unbounded)
+        """
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._stores: Dict[str, _VectorStore] = {}
+        self._lock = threading.Lock()
+
+    def _store(self, namespace: str) -> Optional[_VectorStore]:
+        if self.cache_dir is None:
+            return None
+        store = self._stores.get(namespace)
+        if store is None:
+            slug = re.sub(r"[^\w.-]+", "_", namespace)
+            slug = f"{slug}-{_text_key(namespace)[:8]}"
+            store = self._stores[namespace] = _VectorStore(
+                self.cache_dir / slug, namespace, self.max_disk_items
+            )
+        return store
+
+    def _remember(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, namespace: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up cached vectors.
+
+        Args:
+            namespace: Model namespace (model id)
+            texts: Texts (normalized for the lookup key)
+
+        Returns:
+            Vector or None per text
+        """
+        keys = [_text_key(text) for text in texts]
+        with self._lock:
+            found: Dict[str, np.ndarray] = {}
+            for key in keys:
+                vector = self._memory.get((namespace, key))
+                if vector is not None:
+                    self._memory.move_to_end((namespace, key))
+                    found[key] = vector
+            in_memory = set(found)
+
+            missing = [key for key in keys if key not in found]
+            store = self._store(namespace)
+            if missing and store is not None:
+                for key, vector in store.get(missing).items():
+                    found[key] = vector
+                    self._remember((namespace, key), vector)
+
+            for key in keys:
+                if key in in_memory:
+                    self.stats["memory_hits"] += 1
+                elif key in found:
+                    self.stats["disk_hits"] += 1
+                else:
+                    self.stats["misses"] += 1
+            return [found.get(key) for key in keys]
+
+    def put_many(self, namespace: str, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """Store vectors in memory and on disk.
+
+        Args:
+            namespace: Model namespace (model id)
+            texts: Texts (normalized for the storage key)
+            vectors: Vectors of shape (len(texts), D)
+        """
+        keys = [_text_key(text) for text in texts]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember((namespace, key), vector)
+            store = self._store(namespace)
+            if store is not None:
+                store.put(keys, vectors)
+
+    def encode(
+        self,
+        namespace: str,
+        texts: Sequence[str],
+        encode_fn: Callable[[List[str]], np.ndarray],
+    ) -> np.ndarray:
+        """Encode texts, computing only the cache misses with ``encode_fn``.
+
+        Texts that are equal after normalization share one cache entry and
+        duplicate misses are encoded once; ``encode_fn`` always receives the
+        caller's original text (the first occurrence of each key).
+
+        Args:
+            namespace: Model namespace (model id)
+            texts: Texts to encode
+            encode_fn: Encodes a list of texts to an (N, D) array
+
+        Returns:
+            Embeddings array of shape (len(texts), D)
+        """
+        texts = list(texts)
+        keys = [_text_key(text) for text in texts]
+        vectors = self.get_many(namespace, texts)
+
+        # 规范化只用于去重和缓存 key，模型收到的是原始文本
+        misses: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                misses.setdefault(key, text)
+        if misses:
+            encoded = np.asarray(encode_fn(list(misses.values())), dtype=np.float32)
+            self.put_many(namespace, list(misses.values()), encoded)
+            by_key = dict(zip(misses, encoded))
+            vectors = [
+                by_key[key] if vector is None else vector
+                for key, vector in zip(keys, vectors)
+            ]
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    def clear_memory(self) -> None:
+        """Drop the in-memory LRU (on-disk vectors are kept)."""
+        with self._lock:
+            self._memory.clear()
+
+
+# 进程级缓存实例，按目录共享
+_caches: Dict[Tuple[Optional[str], int, int], EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(
+    cache_dir: Optional[str] = None,
+    max_memory_items: int = 10000,
+    max_disk_items: int = DEFAULT_MAX_DISK_ITEMS,
+) -> EmbeddingCache:
+    """Get the process-wide embedding cache for a directory.
+
+    Args:
+        cache_dir: Cache directory (default: ``$DOC4LLM_EMBEDDING_CACHE_DIR`` or
+            ``~/.cache/doc4llm/embeddings``)
+        max_memory_items: In-memory LRU capacity of a newly created cache
+        max_disk_items: Per-model on-disk capacity of a newly created cache
+
+    Returns:
+        Shared EmbeddingCache instance
+    """
+    cache_dir = cache_dir or os.environ.get(EMBEDDING_CACHE_DIR_ENV) or DEFAULT_EMBEDDING_CACHE_DIR
+    key = (str(Path(cache_dir).expanduser().resolve()), max_memory_items, max_disk_items)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = EmbeddingCache(
+                key[0], max_memory_items=max_memory_items, max_disk_items=max_disk_items
+            )
+        return cache
+
+
+__all__ = [
+    "DEFAULT_MAX_DISK_ITEMS",
+    "EMBEDDING_CACHE_FORMAT_VERSION",
+    "EmbeddingCache",
+    "get_embedding_cache",
+    "normalize_text",
+]
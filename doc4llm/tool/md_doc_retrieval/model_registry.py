@@ -0,0 +1,274 @@
+"""
+Process-wide registry of local embedding models.
+
+每个 TransformerMatcher 原先各自持有 ``_local_models``，而 DocSearcherAPI 与
+orchestrator 会按查询重建 matcher，长驻进程里本地 bge 模型可能每次查询都被
+重新加载。这里按 ``(model_id, device, backend)`` 在进程内共享模型句柄：同一模型只加载
+一次，可按需预热，可设置内存上限并按 LRU 淘汰，并记录每个模型的加载耗时。
+
+Example:
+    >>> from doc4llm.tool.md_doc_retrieval.model_registry import get_model_registry
+    >>> registry = get_model_registry()
+    >>> registry.prewarm(["BAAI/bge-base-en-v1.5"], device="cpu")
+    >>> model = registry.get("BAAI/bge-base-en-v1.5", "cpu")
+    >>> registry.stats()
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+MODEL_MEMORY_CAP_ENV = "DOC4LLM_MODEL_MEMORY_MB"
+
+ModelKey = Tuple[str, str, str]
+
+
+def load_sentence_transformer(model_id: str, device: str) -> Any:
+    """Default loader: a SentenceTransformer downloaded from HuggingFace Hub if needed."""
+    from sentence_transformers import SentenceTransformer
+    from transformers import logging
+
+    # 禁用加载模型时的进度条（如下载权重时的进度条）
+    logging.disable_progress_bar()
+    # 只显示 error，不显示 info / warning
+    logging.set_verbosity_error()
+
+    return SentenceTransformer(model_id, device=device)
+
+
+def estimate_model_bytes(model: Any) -> int:
+    """Size of a model's parameters and buffers (0 if it is not a torch module).
+
+    Models that know their size (e.g. ONNX sessions) expose ``memory_bytes``.
+    """
+    memory_bytes = getattr(model, "memory_bytes", None)
+    if isinstance(memory_bytes, int):
+        return memory_bytes
+    total = 0
+    for attr in ("parameters", "buffers"):
+        tensors = getattr(model, attr, None)
+        if not callable(tensors):
+            continue
+        try:
+            total += sum(t.numel() * t.element_size() for t in tensors())
+        except (TypeError, AttributeError):
+            return 0
+    return total
+
+
+@dataclass
+class _Entry:
+    """A loaded model and its bookkeeping."""
+
+    model: Any
+    memory_bytes: int
+    load_seconds: float
+    hits: int = 0
+
+
+class ModelRegistry:
+    """Load each ``(model_id, device, backend)`` once and share it across matchers.
+
+    Attributes:
+        max_memory_bytes: Memory cap for all loaded models, None for no cap.
+            When a load exceeds it, least recently used models are dropped
+            (the model being returned is never dropped).
+        loader: ``loader(model_id, device)`` that creates a "torch" backend model
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: Optional[int] = None,
+        loader: Callable[[str, str], Any] = load_sentence_transformer,
+    ):
+        """Initialize the registry.
+
+        Args:
+            max_memory_bytes: Memory cap in bytes (default None: no cap)
+            loader: Model loader (default: SentenceTransformer)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.loader = loader
+        self._entries: "OrderedDict[ModelKey, _Entry]" = OrderedDict()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _load_lock(self, key: ModelKey) -> threading.Lock:
+        with self._lock:
+            lock = self._load_locks.get(key)
+            if lock is None:
+                lock = self._load_locks[key] = threading.Lock()
+            return lock
+
+    def _lookup(self, key: ModelKey) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.hits += 1
+            self._entries.move_to_end(key)
+            return entry.model
+
+    def get(
+        self,
+        model_id: str,
+        device: str = "cpu",
+        loader: Optional[Callable[[str, str], Any]] = None,
+        backend: str = "torch",
+    ) -> Any:
+        """Get a shared model handle, loading it on first use.
+
+        Concurrent callers asking for the same model wait for a single load.
+
+        Args:
+            model_id: Model ID (e.g. "BAAI/bge-base-zh-v1.5")
+            device: Device the model runs on ("cpu", "cuda", ...)
+            loader: Loader overriding the registry's default for this load
+                (required for backends other than "torch")
+            backend: Runtime variant of the model, part of the sharing key
+                (e.g. "torch", "onnx-int8")
+
+        Returns:
+            Model instance
+        """
+        key = (model_id, device, backend)
+        model = self._lookup(key)
+        if model is not None:
+            return model
+
+        with self._load_lock(key):
+            model = self._lookup(key)
+            if model is not None:
+                return model
+
+            if loader is None and backend != "torch":
+                raise ValueError(f"A loader is required for backend '{backend}'")
+            start = time.perf_counter()
+            model = (loader or self.loader)(model_id, device)
+            entry = _Entry(
+                model=model,
+                memory_bytes=estimate_model_bytes(model),
+                load_seconds=time.perf_counter() - start,
+            )
+            with self._lock:
+                self._entries[key] = entry
+                self._evict(keep=key)
+            return model
+
+    def _evict(self, keep: ModelKey) -> None:
+        """Drop least recently used models until the memory cap is met."""
+        if self.max_memory_bytes is None:
+            return
+        for key in list(self._entries):
+            if self.memory_bytes() <= self.max_memory_bytes:
+                break
+            if key != keep:
+                del self._entries[key]
+                self.evictions += 1
+
+    def prewarm(
+        self,
+        model_ids: Iterable[str],
+        device: str = "cpu",
+        loader: Optional[Callable[[str, str], Any]] = None,
+        backend: str = "torch",
+    ) -> Dict[str, float]:
+        """Load models ahead of the first query.
+
+        Args:
+            model_ids: Models to load
+            device: Device to load them on
+            loader: Loader for this backend (see ``get``)
+            backend: Runtime variant of the models
+
+        Returns:
+            ``{model_id: load seconds}`` (0 for models that were already loaded)
+        """
+        load_times = {}
+        for model_id in dict.fromkeys(model_ids):
+            already_loaded = (model_id, device, backend) in self
+            start = time.perf_counter()
+            self.get(model_id, device, loader=loader, backend=backend)
+            load_times[model_id] = 0.0 if already_loaded else time.perf_counter() - start
+        return load_times
+
+    def memory_bytes(self) -> int:
+        """Estimated memory of all loaded models."""
+        return sum(entry.memory_bytes for entry in self._entries.values())
+
+    def evict(
+        self,
+        model_id: Optional[str] = None,
+        device: Optional[str] = None,
+        backend: Optional[str] = None,
+    ) -> None:
+        """Drop loaded models (all, or those matching model_id / device / backend)."""
+        with self._lock:
+            wanted = (model_id, device, backend)
+            for key in list(self._entries):
+                if all(want is None or want == have for want, have in zip(wanted, key)):
+                    del self._entries[key]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Loaded models, least recently used first.
+
+        Returns:
+            One dict per model with ``model_id``, ``device``, ``backend``,
+            ``load_seconds``, ``memory_bytes`` and ``hits``
+        """
+        with self._lock:
+            return [
+                {
+                    "model_id": model_id,
+                    "device": device,
+                    "backend": backend,
+                    "load_seconds": entry.load_seconds,
+                    "memory_bytes": entry.memory_bytes,
+                    "hits": entry.hits,
+                }
+                for (model_id, device, backend), entry in self._entries.items()
+            ]
+
+    def __contains__(self, key: Tuple[str, ...]) -> bool:
+        # (model_id, device) refers to the default "torch" backend
+        return (tuple(key) + ("torch",))[:3] in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry.
+
+    The memory cap of the shared registry is read once from
+    ``$DOC4LLM_MODEL_MEMORY_MB``; change it later through
+    ``get_model_registry().max_memory_bytes``.
+
+    Returns:
+        Shared ModelRegistry instance
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            cap_mb = os.environ.get(MODEL_MEMORY_CAP_ENV)
+            _registry = ModelRegistry(
+                max_memory_bytes=int(float(cap_mb) * 2**20) if cap_mb else None
+            )
+        return _registry
+
+
+__all__ = [
+    "MODEL_MEMORY_CAP_ENV",
+    "ModelRegistry",
+    "estimate_model_bytes",
+    "get_model_registry",
+    "load_sentence_transformer",
+]
@@ -3,6 +3,7 @@ ModelScope-based semantic matcher using OpenAI-compatible API.
 
 Provides embedding and reranking capabilities via ModelScope's inference API.
 Uses Qwen/Qwen3-Embedding-8B as the default multilingual embedding model.
+Embeddings are cached per model and text (see embedding_cache).
 
 Example:
     >>> from doc4llm.tool.md_doc_retrieval import ModelScopeMatcher, ModelScopeConfig
@@ -15,11 +16,16 @@ Example:
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 import dotenv
 import numpy as np
-from openai import OpenAI
+
+from .batch_encoder import BatchEncoder
+from .embedding_cache import DEFAULT_MAX_DISK_ITEMS, EmbeddingCache, get_embedding_cache
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 @dataclass
@@ -31,19 +37,35 @@ class ModelScopeConfig:
         api_key_env: Environment variable name for ModelScope API key
         env_path: Path to .env file containing API key
         batch_size: Batch size for embedding computation
+        max_concurrency: Remote embedding requests in flight at once (default: 4)
+        max_retries: Retries per failed remote batch, with exponential backoff (default: 3)
+        retry_backoff: Base retry delay in seconds (default: 0.5)
+        embedding_cache: Cache embeddings in memory and on disk (default: True)
+        embedding_cache_dir: Embedding cache directory (default: ~/.cache/doc4llm/embeddings)
+        embedding_cache_size: Number of embeddings kept in the in-memory LRU
+        embedding_cache_disk_items: Number of embeddings kept on disk per model
+            (oldest are compacted away, 0: unbounded)
     """
     model_id: str = "Qwen/Qwen3-Embedding-8B"
     api_key_env: str = "MODELSCOPE_KEY"
     env_path: str = "doc4llm/.env"
     batch_size: int = 32
+    max_concurrency: int = 4
+    max_retries: int = 3
+    retry_backoff: float = 0.5
+    embedding_cache: bool = True
+    embedding_cache_dir: Optional[str] = None
+    embedding_cache_size: int = 10000
+    embedding_cache_disk_items: int = DEFAULT_MAX_DISK_ITEMS
 
 
 class ModelScopeMatcher:
     """ModelScope-based semantic matcher with OpenAI-compatible API.
 
     Uses ModelScope's inference API for embeddings with support for:
-    - Batch embedding computation
+    - Batch embedding computation (batches sent concurrently, with retries)
     - Cosine similarity via normalized vectors
+    - Persistent embedding cache (only cache misses are encoded)
     - Compatible interface with TransformerMatcher
     """
 
@@ -54,7 +76,14 @@ class ModelScopeMatcher:
             config: Optional configuration. Uses default if not provided.
         """
         self.config = config or ModelScopeConfig()
-        self._client: Optional[OpenAI] = None
+        self._client: Optional["OpenAI"] = None
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        if self.config.embedding_cache:
+            self._embedding_cache = get_embedding_cache(
+                self.config.embedding_cache_dir,
+                self.config.embedding_cache_size,
+                self.config.embedding_cache_disk_items,
+            )
         self._load_env()
 
     def _load_env(self):
@@ -78,6 +107,8 @@ class ModelScopeMatcher:
                 f"Please set {self.config.api_key_env} in {self.config.env_path}"
             )
 
+        from openai import OpenAI
+
         self._client = OpenAI(
             base_url="https://api-inference.modelscope.cn/v1",
             api_key=api_key,
@@ -109,25 +140,50 @@ class ModelScopeMatcher:
         if not texts:
             return np.array([], dtype=np.float32)
 
+        if self._embedding_cache is None:
+            return self._encode_remote(texts)
+        return self._embedding_cache.encode(
+            f"modelscope:{self.config.model_id}", texts, self._encode_remote
+        )
+
+    def _encode_remote(self, texts: List[str]) -> np.ndarray:
+        """Encode texts via the API, bypassing the embedding cache.
+
+        Args:
+            texts: List of text strings to encode
+
+        Returns:
+            Embeddings array of shape (N, D)
+        """
         if self._client is None:
             raise RuntimeError("OpenAI client not initialized. Call _load_env() first.")
 
-        # Process in batches
-        all_embeddings = []
-        for i in range(0, len(texts), self.config.batch_size):
-            batch = texts[i:i + self.config.batch_size]
-            response = self._client.embeddings.create(
-                model=self.config.model_id,
-                input=batch,
-                encoding_format="float"
-            )
-            # Extract embedding vectors from response
-            embeddings = [data.embedding for data in response.data]
-            all_embeddings.append(embeddings)
+        # Batches are sent concurrently and reassembled in input order
+        encoder = BatchEncoder(
+            self._embed_batch,
+            batch_size=self.config.batch_size,
+            max_concurrency=self.config.max_concurrency,
+            max_retries=self.config.max_retries,
+            retry_backoff=self.config.retry_backoff,
+        )
+        return encoder.encode(texts)
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Send one embeddings request.
 
-        # Concatenate all batches
-        embeddings = np.concatenate(all_embeddings, axis=0)
-        return np.array(embeddings, dtype=np.float32)
+        Args:
+            batch: Texts of one request (at most ``batch_size``)
+
+        Returns:
+            Embedding vectors in input order
+        """
+        response = self._client.embeddings.create(
+            model=self.config.model_id,
+            input=batch,
+            encoding_format="float"
+        )
+        # Extract embedding vectors from response
+        return [data.embedding for data in response.data]
 
     def rerank(
         self,
@@ -0,0 +1,414 @@
+"""
+ONNX Runtime backend for local embedding models.
+
+检索机器只有 CPU，FALLBACK_2 的本地 rerank 时间主要花在 PyTorch fp32 编码上。
+这里把 sentence-transformers 模型的 transformer 导出为 ONNX（可选 int8 动态量化），
+缓存到磁盘，再用 onnxruntime 多线程推理；池化方式与归一化沿用原模型配置，
+因此向量与 PyTorch 后端基本一致，原有阈值仍然适用（可用下面的命令核对余弦偏差）。
+
+Requires ``onnxruntime`` (and ``torch`` / ``sentence-transformers`` for the
+one-time export).
+
+On-disk layout (one directory per model)::
+
+    <cache_dir>/<model_slug>/
+        meta.json            # {"version", "model_id", "pooling", "max_seq_length", "inputs", "dim"}
+        model.onnx           # float32 transformer, dynamic batch / sequence axes
+        model.int8.onnx      # dynamically quantized weights (created on first use)
+        tokenizer files      # saved with tokenizer.save_pretrained
+
+Export and compare against PyTorch::
+
+    $ python -m doc4llm.tool.md_doc_retrieval.onnx_backend --model BAAI/bge-base-en-v1.5 --quantization int8
+
+Example:
+    >>> from doc4llm.tool.md_doc_retrieval.onnx_backend import load_onnx_model
+    >>> model = load_onnx_model("BAAI/bge-base-en-v1.5", quantization="int8", intra_op_threads=4)
+    >>> embeddings = model.encode(["hooks configuration"], normalize_embeddings=True)
+"""
+
+import argparse
+import inspect
+import json
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+# 导出格式版本，格式变化时递增以触发重新导出
+ONNX_EXPORT_FORMAT_VERSION = 1
+
+DEFAULT_ONNX_CACHE_DIR = os.path.join("~", ".cache", "doc4llm", "onnx")
+ONNX_CACHE_DIR_ENV = "DOC4LLM_ONNX_CACHE_DIR"
+
+ONNX_QUANTIZATION_TYPES = ("none", "int8")
+
+_MODEL_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+
+def onnx_cache_dir(cache_dir: Optional[str] = None) -> Path:
+    """Resolve the ONNX cache directory (argument, env var, then default)."""
+    cache_dir = cache_dir or os.environ.get(ONNX_CACHE_DIR_ENV) or DEFAULT_ONNX_CACHE_DIR
+    return Path(cache_dir).expanduser()
+
+
+def _pooling_mode(pooling_module: Any) -> str:
+    """Pooling of a sentence-transformers Pooling module ("cls" or "mean")."""
+    config = pooling_module.get_config_dict()
+    mode = config.get("pooling_mode")
+    if isinstance(mode, str):
+        return mode
+    # 旧版本 sentence-transformers 以布尔开关描述池化方式
+    enabled = [
+        name for name, key in (
+            ("cls", "pooling_mode_cls_token"),
+            ("mean", "pooling_mode_mean_tokens"),
+            ("max", "pooling_mode_max_tokens"),
+        )
+        if config.get(key)
+    ]
+    return enabled[0] if len(enabled) == 1 else "+".join(enabled)
+
+
+def export_onnx_model(model_id: str, cache_dir: Optional[str] = None) -> Path:
+    """Export a sentence-transformers model to ONNX, unless already cached.
+
+    The export is written to a temporary directory and renamed into place;
+    a stale export is renamed aside before it is deleted, so concurrent
+    exports of the same model never see a partial copy.
+
+    Args:
+        model_id: Model ID from HuggingFace Hub or a local model directory
+        cache_dir: ONNX cache directory (default: ``$DOC4LLM_ONNX_CACHE_DIR`` or
+            ``~/.cache/doc4llm/onnx``)
+
+    Returns:
+        Directory holding ``model.onnx``, the tokenizer and ``meta.json``
+
+    Raises:
+        ValueError: If the model uses a pooling other than CLS or mean
+    """
+    model_dir = onnx_cache_dir(cache_dir) / re.sub(r"[^\w.-]+", "_", model_id)
+    if _read_meta(model_dir, model_id) is not None:
+        return model_dir
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model_id, device="cpu")
+    pooling = _pooling_mode(st_model[1])
+    if pooling not in ("cls", "mean"):
+        raise ValueError(f"Unsupported pooling for ONNX export of {model_id}: '{pooling}'")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    sample = tokenizer(["doc4llm onnx export"], return_tensors="pt")
+    input_names = [name for name in _MODEL_INPUTS if name in sample]
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    tmp_dir = model_dir.parent / f"{model_dir.name}.tmp-{uuid.uuid4().hex[:8]}"
+    stale_dir = model_dir.parent / f"{model_dir.name}.old-{uuid.uuid4().hex[:8]}"
+    tmp_dir.mkdir(parents=True)
+    try:
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        export_kwargs = {}
+        # torch >= 2.5 才有 dynamo 参数；新版本默认走 dynamo 导出，这里固定用 TorchScript 导出
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs["dynamo"] = False
+        with torch.no_grad():
+            torch.onnx.export(
+                _LastHiddenState(transformer),
+                tuple(sample[name] for name in input_names),
+                str(tmp_dir / "model.onnx"),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+                **export_kwargs,
+            )
+        tokenizer.save_pretrained(str(tmp_dir))
+        meta = {
+            "version": ONNX_EXPORT_FORMAT_VERSION,
+            "model_id": model_id,
+            "pooling": pooling,
+            "max_seq_length": st_model.max_seq_length,
+            "inputs": input_names,
+            "dim": getattr(
+                st_model, "get_embedding_dimension", st_model.get_sentence_embedding_dimension
+            )(),
+        }
+        with open(tmp_dir / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        # 过期的导出先改名移开再删除：rename 是原子的，
+        # 其他进程不会看到删除到一半的目录
+        try:
+            os.rename(model_dir, stale_dir)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # 另一个进程已完成导出（或已移开旧目录）
+            if _read_meta(model_dir, model_id) is not None:
+                return model_dir
+        try:
+            os.rename(tmp_dir, model_dir)
+        except OSError:
+            # 另一个进程已完成导出
+            if _read_meta(model_dir, model_id) is None:
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(stale_dir, ignore_errors=True)
+    return model_dir
+
+
+def _read_meta(model_dir: Path, model_id: str) -> Optional[dict]:
+    """meta.json of a complete export of ``model_id``, or None."""
+    try:
+        with open(model_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        meta.get("version") != ONNX_EXPORT_FORMAT_VERSION
+        or meta.get("model_id") != model_id
+        or not (model_dir / "model.onnx").exists()
+    ):
+        return None
+    return meta
+
+
+def quantize_onnx_model(model_dir: Path) -> Path:
+    """Dynamically quantize the weights of an exported model to int8 (cached).
+
+    Args:
+        model_dir: Directory returned by ``export_onnx_model``
+
+    Returns:
+        Path of ``model.int8.onnx``
+    """
+    quantized = model_dir / "model.int8.onnx"
+    if quantized.exists():
+        return quantized
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp_path = model_dir / f"model.int8.onnx.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        quantize_dynamic(str(model_dir / "model.onnx"), str(tmp_path), weight_type=QuantType.QInt8)
+        os.replace(tmp_path, quantized)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return quantized
+
+
+class OnnxEmbeddingModel:
+    """Exported embedding model run with onnxruntime.
+
+    ``encode`` mirrors ``SentenceTransformer.encode`` (same tokenization,
+    pooling and normalization), so it can stand in for it in
+    TransformerMatcher.
+
+    Attributes:
+        model_id: Source model ID
+        quantization: "none" or "int8"
+        memory_bytes: Size of the ONNX weights (for the model registry)
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        quantization: str = "int8",
+        intra_op_threads: int = 0,
+        device: str = "cpu",
+    ):
+        """Open an exported model.
+
+        Args:
+            model_dir: Directory returned by ``export_onnx_model``
+            quantization: "none" (float32 weights) or "int8" (default "int8")
+            intra_op_threads: onnxruntime intra-op threads, 0 = onnxruntime default
+            device: "cpu", or "cuda" to use the CUDA provider when available
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        if quantization not in ONNX_QUANTIZATION_TYPES:
+            raise ValueError(
+                f"Invalid ONNX quantization: '{quantization}'. "
+                f"Must be one of {ONNX_QUANTIZATION_TYPES}"
+            )
+        meta = json.loads((Path(model_dir) / "meta.json").read_text(encoding="utf-8"))
+        self.model_id = meta["model_id"]
+        self.quantization = quantization
+        self.pooling = meta["pooling"]
+        self.max_seq_length = meta["max_seq_length"]
+        self._input_names = meta["inputs"]
+        self._dim = meta["dim"]
+
+        model_path = (
+            quantize_onnx_model(Path(model_dir)) if quantization == "int8"
+            else Path(model_dir) / "model.onnx"
+        )
+        self.memory_bytes = model_path.stat().st_size
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        providers = ["CPUExecutionProvider"]
+        if device.startswith("cuda") and "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+        self._session = ort.InferenceSession(str(model_path), options, providers=providers)
+        self._tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Embedding dimension."""
+        return self._dim
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **_: Any,
+    ) -> np.ndarray:
+        """Encode texts like ``SentenceTransformer.encode``.
+
+        Args:
+            texts: Texts to encode
+            batch_size: Texts per onnxruntime call (default 32)
+            normalize_embeddings: L2-normalize the embeddings (default False)
+
+        Returns:
+            Embeddings of shape (N, D)
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self._dim), dtype=np.float32)
+
+        # 按长度分批以减少 padding，最后恢复原顺序
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = np.empty((len(texts), self._dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[i] for i in rows])
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.where(norms == 0, 1, norms)
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encoded = self._tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feeds = {name: encoded[name].astype(np.int64) for name in self._input_names}
+        hidden = self._session.run(None, feeds)[0]
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        mask = encoded["attention_mask"][:, :, None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def load_onnx_model(
+    model_id: str,
+    device: str = "cpu",
+    quantization: str = "int8",
+    intra_op_threads: int = 0,
+    cache_dir: Optional[str] = None,
+) -> OnnxEmbeddingModel:
+    """Export (if needed) and open a model with onnxruntime.
+
+    Args:
+        model_id: Model ID from HuggingFace Hub or a local model directory
+        device: "cpu" or "cuda"
+        quantization: "none" or "int8" (default "int8")
+        intra_op_threads: onnxruntime intra-op threads, 0 = onnxruntime default
+        cache_dir: ONNX cache directory
+
+    Returns:
+        OnnxEmbeddingModel
+    """
+    return OnnxEmbeddingModel(
+        export_onnx_model(model_id, cache_dir),
+        quantization=quantization,
+        intra_op_threads=intra_op_threads,
+        device=device,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Export a model and compare its embeddings and speed with PyTorch."""
+    import time
+
+    from sentence_transformers import SentenceTransformer
+
+    parser = argparse.ArgumentParser(description="Export a local embedding model to ONNX")
+    parser.add_argument("--model", required=True, help="Model ID or local model directory")
+    parser.add_argument("--quantization", choices=ONNX_QUANTIZATION_TYPES, default="int8")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0: default)")
+    parser.add_argument("--cache-dir", default=None, help="ONNX cache directory")
+    args = parser.parse_args(argv)
+
+    texts = [
+        "How do I configure hooks?", "Hook events", "Settings files", "Permission modes",
+        "Install plugins from a marketplace", "如何配置 MCP 服务器", "权限模式", "Troubleshooting",
+    ] * 8
+
+    onnx_model = load_onnx_model(
+        args.model,
+        quantization=args.quantization,
+        intra_op_threads=args.threads,
+        cache_dir=args.cache_dir,
+    )
+    torch_model = SentenceTransformer(args.model, device="cpu")
+
+    timings = {}
+    outputs = {}
+    for name, model in (("torch", torch_model), ("onnx", onnx_model)):
+        model.encode(texts[:8], normalize_embeddings=True)
+        start = time.perf_counter()
+        outputs[name] = np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+        timings[name] = time.perf_counter() - start
+
+    agreement = (outputs["torch"] * outputs["onnx"]).sum(axis=1)
+    sims = {name: out @ out.T for name, out in outputs.items()}
+    print(f"{args.model} ({args.quantization}): {onnx_model.memory_bytes / 2**20:.1f} MiB")
+    print(f"  encode {len(texts)} texts: torch {timings['torch'] * 1000:.0f} ms, "
+          f"onnx {timings['onnx'] * 1000:.0f} ms")
+    print(f"  cosine(torch, onnx): min {agreement.min():.4f}, mean {agreement.mean():.4f}")
+    print(f"  max similarity drift: {np.abs(sims['torch'] - sims['onnx']).max():.4f}")
+    return 0
+
+
+__all__ = [
+    "ONNX_EXPORT_FORMAT_VERSION",
+    "ONNX_QUANTIZATION_TYPES",
+    "OnnxEmbeddingModel",
+    "export_onnx_model",
+    "load_onnx_model",
+    "onnx_cache_dir",
+    "quantize_onnx_model",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
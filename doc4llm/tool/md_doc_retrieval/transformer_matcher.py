@@ -6,7 +6,11 @@ Uses BAAI/bge-large-zh-v1.5 for Chinese and BAAI/bge-large-en-v1.5 for English.
 
 Supports two modes:
 - Remote API mode (default): Uses HuggingFace InferenceClient API
-- Local mode: Uses sentence-transformers with models downloaded from HuggingFace Hub
+- Local mode: Uses sentence-transformers with models downloaded from HuggingFace Hub,
+  run with PyTorch or exported to ONNX Runtime (optionally int8, see onnx_backend)
+
+Embeddings are cached per model and text (see embedding_cache), so only texts
+that were never encoded before reach the model.
 
 Example:
     >>> from doc4llm.tool.md_doc_retrieval import TransformerMatcher, TransformerConfig
@@ -28,20 +32,21 @@ import re
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 
 import dotenv
-import httpx
 import numpy as np
-from huggingface_hub import InferenceClient, set_client_factory
-from sentence_transformers import SentenceTransformer
 
-from transformers import logging
+from .batch_encoder import BatchEncoder
+from .embedding_cache import DEFAULT_MAX_DISK_ITEMS, EmbeddingCache, get_embedding_cache
+from .model_registry import ModelRegistry, get_model_registry
 
-# 禁用加载模型时的进度条（如下载权重时的进度条）
-logging.disable_progress_bar()
-# 只显示 error，不显示 info / warning
-logging.set_verbosity_error()
+# huggingface_hub / sentence_transformers / transformers 只在真正创建客户端或
+# 加载本地模型时导入（见 _load_env 与 model_registry.load_sentence_transformer），
+# 仅用 BM25 的检索不必为它们付出数秒的导入开销
+if TYPE_CHECKING:
+    from huggingface_hub import InferenceClient
+    from sentence_transformers import SentenceTransformer
 
 
 @dataclass
@@ -58,8 +63,20 @@ class TransformerConfig:
         api_key_env: Environment variable name for HuggingFace API key
         env_path: Path to .env file containing HF_KEY
         batch_size: Batch size for embedding computation
+        max_concurrency: Remote embedding requests in flight at once (default: 4)
+        max_retries: Retries per failed remote batch, with exponential backoff (default: 3)
+        retry_backoff: Base retry delay in seconds (default: 0.5)
         lang_threshold: Ratio of Chinese characters to trigger Chinese model (0-1)
         hf_inference_provider: HuggingFace inference provider (default: "auto")
+        embedding_cache: Cache embeddings in memory and on disk (default: True)
+        embedding_cache_dir: Embedding cache directory (default: ~/.cache/doc4llm/embeddings)
+        embedding_cache_size: Number of embeddings kept in the in-memory LRU
+        embedding_cache_disk_items: Number of embeddings kept on disk per model
+            (oldest are compacted away, 0: unbounded)
+        local_backend: Local inference runtime, "torch" or "onnx" (default: "torch")
+        onnx_quantization: ONNX weights, "int8" (dynamic quantization) or "none" (default: "int8")
+        onnx_threads: onnxruntime intra-op threads, 0 = onnxruntime default (default: 0)
+        onnx_cache_dir: Exported model cache (default: ~/.cache/doc4llm/onnx)
     """
     use_local: bool = False
     device: str = "cpu"
@@ -70,8 +87,19 @@ class TransformerConfig:
     api_key_env: str = "HF_KEY"
     env_path: str = "doc4llm/.env"
     batch_size: int = 32
+    max_concurrency: int = 4
+    max_retries: int = 3
+    retry_backoff: float = 0.5
     lang_threshold: float = 0.9
     hf_inference_provider: str = "auto"
+    embedding_cache: bool = True
+    embedding_cache_dir: Optional[str] = None
+    embedding_cache_size: int = 10000
+    embedding_cache_disk_items: int = DEFAULT_MAX_DISK_ITEMS
+    local_backend: str = "torch"
+    onnx_quantization: str = "int8"
+    onnx_threads: int = 0
+    onnx_cache_dir: Optional[str] = None
 
 
 class TransformerMatcher:
@@ -86,7 +114,9 @@ class TransformerMatcher:
     - Model selection based on text language
     - Batch embedding computation
     - Cosine similarity via normalized dot product
-    - Lazy loading of local models (downloaded from HuggingFace Hub on first use)
+    - Lazy loading of local models (downloaded from HuggingFace Hub on first use),
+      shared by all matchers of the process
+    - Persistent embedding cache (only cache misses are encoded)
 
     Args:
         config: Optional configuration. Uses default if not provided.
@@ -99,8 +129,20 @@ class TransformerMatcher:
             config: Optional configuration. Uses default if not provided.
         """
         self.config = config or TransformerConfig()
-        self._client: Optional[InferenceClient] = None
-        self._local_models: dict = {}
+        if self.config.local_backend not in ("torch", "onnx"):
+            raise ValueError(
+                f"Invalid local_backend: '{self.config.local_backend}'. Must be 'torch' or 'onnx'"
+            )
+        self._client: Optional["InferenceClient"] = None
+        # 本地模型在进程内共享（见 model_registry），matcher 不持有模型引用
+        self._model_registry: ModelRegistry = get_model_registry()
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        if self.config.embedding_cache:
+            self._embedding_cache = get_embedding_cache(
+                self.config.embedding_cache_dir,
+                self.config.embedding_cache_size,
+                self.config.embedding_cache_disk_items,
+            )
         self._load_env()
 
     def _load_env(self):
@@ -128,9 +170,13 @@ class TransformerMatcher:
                 f"Please set {self.config.api_key_env} in {self.config.env_path}"
             )
 
+        from huggingface_hub import InferenceClient, set_client_factory
+
         # Configure HTTP proxy from environment variable (before creating client)
         proxy = os.environ.get("HF_PROXY")
         if proxy:
+            import httpx
+
             def create_proxy_client() -> httpx.Client:
                 return httpx.Client(proxy=proxy)
             set_client_factory(create_proxy_client)
@@ -186,23 +232,80 @@ class TransformerMatcher:
             # Remote API mode uses model_zh/model_en
             return self.config.model_zh if lang == "zh" else self.config.model_en
 
-    def _load_local_model(self, model_id: str) -> SentenceTransformer:
-        """Load local SentenceTransformer model (lazy loading).
+    def model_id_for(self, texts: List[str]) -> str:
+        """Model ID ``encode`` uses for these texts (embeddings of different
+        models are not comparable).
 
-        Models are automatically downloaded from HuggingFace Hub if not cached.
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            Model ID based on language and mode
+        """
+        return self._get_model_id(texts)
+
+    @property
+    def _local_backend_key(self) -> str:
+        """Embedding cache key of the local runtime."""
+        if self.config.local_backend == "onnx":
+            return f"onnx-{self.config.onnx_quantization}"
+        return "torch"
+
+    @property
+    def _registry_backend_key(self) -> str:
+        """Model registry key of the local runtime (ONNX sessions differ by thread count)."""
+        if self.config.local_backend == "onnx":
+            return f"{self._local_backend_key}-t{self.config.onnx_threads}"
+        return self._local_backend_key
+
+    def _load_onnx_model(self, model_id: str, device: str):
+        from .onnx_backend import load_onnx_model
+
+        return load_onnx_model(
+            model_id,
+            device=device,
+            quantization=self.config.onnx_quantization,
+            intra_op_threads=self.config.onnx_threads,
+            cache_dir=self.config.onnx_cache_dir,
+        )
+
+    def _load_local_model(self, model_id: str) -> "SentenceTransformer":
+        """Get a local model from the process-wide registry.
+
+        Models are automatically downloaded from HuggingFace Hub if not cached
+        (and exported to ONNX once with local_backend="onnx"), then loaded
+        once per (model_id, device, backend) for all matchers.
 
         Args:
             model_id: Model ID from HuggingFace Hub (e.g., "BAAI/bge-large-zh-v1.5")
 
         Returns:
-            SentenceTransformer model instance
+            SentenceTransformer, or OnnxEmbeddingModel with the same ``encode``
         """
-        if model_id not in self._local_models:
-            self._local_models[model_id] = SentenceTransformer(
+        if self.config.local_backend == "onnx":
+            return self._model_registry.get(
                 model_id,
-                device=self.config.device
+                self.config.device,
+                loader=self._load_onnx_model,
+                backend=self._registry_backend_key,
             )
-        return self._local_models[model_id]
+        return self._model_registry.get(model_id, self.config.device)
+
+    def prewarm(self) -> Dict[str, float]:
+        """Load both local models now instead of on the first query.
+
+        Returns:
+            ``{model_id: load seconds}`` (0 for models that were already loaded,
+            empty in remote API mode)
+        """
+        if not self.config.use_local:
+            return {}
+        return self._model_registry.prewarm(
+            [self.config.local_model_zh, self.config.local_model_en],
+            self.config.device,
+            loader=self._load_onnx_model if self.config.local_backend == "onnx" else None,
+            backend=self._registry_backend_key,
+        )
 
     def _normalize(self, v: np.ndarray) -> np.ndarray:
         """Normalize vectors for cosine similarity via dot product.
@@ -218,11 +321,12 @@ class TransformerMatcher:
         norm = np.where(norm == 0, 1, norm)
         return v / norm
 
-    def encode(self, texts: List[str]) -> np.ndarray:
+    def encode(self, texts: List[str], model_id: Optional[str] = None) -> np.ndarray:
         """Encode texts to embeddings.
 
         Args:
             texts: List of text strings to encode
+            model_id: Model to use (default: selected by language detection)
 
         Returns:
             Embeddings array of shape (N, D) where D is embedding dimension
@@ -230,8 +334,32 @@ class TransformerMatcher:
         if not texts:
             return np.array([], dtype=np.float32)
 
-        model_id = self._get_model_id(texts)
+        model_id = model_id or self._get_model_id(texts)
+
+        if self._embedding_cache is None:
+            return self._encode_with_model(model_id, texts)
+
+        if not self.config.use_local:
+            namespace = f"hf:{model_id}"
+        elif self.config.local_backend == "onnx":
+            # ONNX（尤其 int8）向量与 PyTorch 略有差异，分开缓存
+            namespace = f"local-{self._local_backend_key}:{model_id}"
+        else:
+            namespace = f"local:{model_id}"
+        return self._embedding_cache.encode(
+            namespace, texts, lambda misses: self._encode_with_model(model_id, misses)
+        )
+
+    def _encode_with_model(self, model_id: str, texts: List[str]) -> np.ndarray:
+        """Encode texts with the given model, bypassing the embedding cache.
 
+        Args:
+            model_id: Model ID selected by ``_get_model_id``
+            texts: List of text strings to encode
+
+        Returns:
+            Embeddings array of shape (N, D)
+        """
         if self.config.use_local:
             # Local mode using SentenceTransformer
             model = self._load_local_model(model_id)
@@ -242,17 +370,16 @@ class TransformerMatcher:
             if self._client is None:
                 raise RuntimeError("InferenceClient not initialized. Call _load_env() first.")
 
-            # Process in batches
-            all_embeddings = []
-            for i in range(0, len(texts), self.config.batch_size):
-                batch = texts[i:i + self.config.batch_size]
-                # The InferenceClient.feature_extraction accepts a list of strings
-                outputs = self._client.feature_extraction(batch, model=model_id)
-                all_embeddings.append(outputs)
-
-            # Concatenate all batches
-            embeddings = np.concatenate(all_embeddings, axis=0)
-            return np.array(embeddings, dtype=np.float32)
+            # Batches are sent concurrently; the InferenceClient.feature_extraction
+            # accepts a list of strings
+            encoder = BatchEncoder(
+                lambda batch: self._client.feature_extraction(batch, model=model_id),
+                batch_size=self.config.batch_size,
+                max_concurrency=self.config.max_concurrency,
+                max_retries=self.config.max_retries,
+                retry_backoff=self.config.retry_backoff,
+            )
+            return encoder.encode(texts)
 
     def rerank(
         self,
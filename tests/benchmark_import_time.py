@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: import time of the docrag entry points
+
+Runs each scenario in a fresh interpreter under ``python -X importtime``,
+reports the total import time and the slowest top-level imports, and
+exits non-zero when a scenario exceeds its budget or imports a heavy
+dependency it should not need:
+
+    help: ``docrag --help``
+    bm25: a BM25-only DocSearcherAPI search on a small synthetic knowledge base
+
+Usage:
+    python tests/benchmark_import_time.py [--help-budget-ms 150] [--bm25-budget-ms 600]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Project root, put on the PYTHONPATH of every scenario
+project_root = Path(__file__).parent.parent
+
+# Neither scenario may import these (anthropic is only needed for LLM phases,
+# the rest only for embedding re-ranking / dense search)
+HEAVY_MODULES = (
+    "anthropic",
+    "huggingface_hub",
+    "openai",
+    "sentence_transformers",
+    "torch",
+    "transformers",
+)
+
+HELP_SCRIPT = """
+from doc4llm.doc_rag.cli import main
+try:
+    main(["--help"])
+except SystemExit:
+    pass
+"""
+
+BM25_SCRIPT = """
+import sys
+from doc4llm.doc_rag.searcher.doc_searcher_api import DocSearcherAPI
+api = DocSearcherAPI(
+    base_dir=sys.argv[1], reranker_enabled=False, threshold_page_title=0.0,
+    min_page_titles=1, min_headings=1,
+)
+result = api.search("hook configuration", ["Docs@latest"])
+assert result["results"], "BM25 search returned no results"
+"""
+
+
+def make_knowledge_base(base_dir: Path) -> None:
+    """Write a doc-set of a few pages for the BM25 scenario."""
+    for i, title in enumerate(["Hooks Guide", "Settings", "Hook Reference", "Plugins"]):
+        page_dir = base_dir / "Docs@latest" / title
+        page_dir.mkdir(parents=True)
+        toc = f"# {title}\n\n## 1. Hook configuration {i}\n## 2. Hook events {i}\n"
+        (page_dir / "docTOC.md").write_text(toc, encoding="utf-8")
+        (page_dir / "docContent.md").write_text(
+            toc + "\nHooks run shell commands at lifecycle events.\n", encoding="utf-8"
+        )
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """Parse ``-X importtime`` output.
+
+    Returns:
+        (total ms, [(cumulative ms, module)] of top-level imports, all imported modules)
+    """
+    total_us = 0
+    top_level = []
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        modules.append(name.strip())
+        # 顶层导入没有缩进
+        if not name[1:].startswith(" "):
+            top_level.append((int(cumulative_us) / 1000, name.strip()))
+    top_level.sort(reverse=True)
+    return total_us / 1000, top_level, modules
+
+
+def run_scenario(
+    script: str, args: List[str]
+) -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """Run a script in a fresh interpreter with ``-X importtime``."""
+    env = dict(os.environ, PYTHONPATH=str(project_root))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script, *args],
+        cwd=str(project_root),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Scenario failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def run(budgets: Dict[str, float], repeat: int, top: int) -> bool:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        make_knowledge_base(Path(tmp_dir))
+        scenarios = {
+            "help": (HELP_SCRIPT, []),
+            "bm25": (BM25_SCRIPT, [tmp_dir]),
+        }
+
+        ok = True
+        for name, (script, args) in scenarios.items():
+            # 取最快的一次，减少磁盘缓存与调度抖动的影响
+            runs = [run_scenario(script, args) for _ in range(repeat)]
+            total_ms, top_level, modules = min(runs, key=lambda r: r[0])
+            heavy = sorted(m for m in set(modules) if m.split(".")[0] in HEAVY_MODULES)
+            heavy_roots = sorted({m.split(".")[0] for m in heavy})
+
+            status = "OK" if total_ms <= budgets[name] and not heavy else "FAIL"
+            print(
+                f"\n[{status}] {name}: {total_ms:.1f} ms import time "
+                f"(budget {budgets[name]:.0f} ms), {len(modules)} modules"
+            )
+            for cumulative_ms, module in top_level[:top]:
+                print(f"    {cumulative_ms:>9.1f} ms  {module}")
+            if heavy:
+                print(f"    heavy dependencies imported: {', '.join(heavy_roots)}")
+            ok = ok and status == "OK"
+        return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--help-budget-ms", type=float, default=150.0)
+    parser.add_argument("--bm25-budget-ms", type=float, default=600.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to show")
+    args = parser.parse_args()
+    budgets = {"help": args.help_budget_ms, "bm25": args.bm25_budget_ms}
+    sys.exit(0 if run(budgets, args.repeat, args.top) else 1)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON vs compact LLMReranker input encoding
+
+Builds both Phase 1.5 prompts for recorded reranker inputs (the
+``phase1_5_input.json`` files written by ``DocRAGConfig(debug=True)``) or, when
+none are given, for synthetic search results of growing size, and reports:
+
+* estimated prompt tokens (system + user) and estimated response tokens;
+* ranking parity: a deterministic lexical scorer stands in for the model, its
+  scores go through both response formats (full JSON vs id -> score) and the
+  final Phase 1.5 results after ``filter_reranker_output`` must be identical.
+
+Token counts are estimated offline (words, numbers and single punctuation /
+CJK characters each count as one token), which tracks BPE tokenizers closely
+for JSON and Markdown. ``--live`` additionally sends each input to the
+configured LLM in both modes and reports the overlap of the kept sections.
+
+Usage:
+    python tests/benchmark_reranker_encoding.py [phase1_5_input.json ...] [--live]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from doc4llm.doc_rag.llm_reranker import LLMReranker, LLMRerankerConfig
+from doc4llm.doc_rag.llm_reranker.sharding import estimate_tokens
+from doc4llm.doc_rag.utils.reranker_utils import filter_reranker_output
+
+TOPICS = [
+    "hooks", "settings", "permissions", "skills", "agents", "plugins", "memory",
+    "sessions", "models", "tools", "commands", "sandbox", "network", "proxy",
+]
+ACTIONS = [
+    "Configuration", "Overview", "Quickstart", "Reference", "Troubleshooting",
+    "Examples", "Best practices", "Environment variables", "Limits", "Migration",
+]
+
+
+def synthetic_input(num_pages: int, seed: int = 0) -> Dict[str, Any]:
+    """Search result shaped like a recorded Phase 1.5 input."""
+    rng = random.Random(seed)
+    doc_sets = ["OpenCode_Docs@latest", "Claude_Code_Docs@latest"]
+    results = []
+    for i in range(num_pages):
+        topic = rng.choice(TOPICS)
+        doc_set = doc_sets[i * len(doc_sets) // num_pages]
+        page_title = f"{topic.title()} {rng.choice(ACTIONS)}"
+        headings = [
+            {
+                "text": f"{j + 1}. {rng.choice(ACTIONS)} of {rng.choice(TOPICS)}",
+                "rerank_sim": None,
+                "related_context": (
+                    f"Use {topic} together with {rng.choice(TOPICS)} to control the agent."
+                    if rng.random() < 0.3
+                    else ""
+                ),
+            }
+            for j in range(rng.randint(1, 9))
+        ]
+        results.append(
+            {
+                "doc_set": doc_set,
+                "page_title": page_title,
+                "toc_path": f"/home/user/md_docs_base/{doc_set}/{page_title}/docTOC.md",
+                "headings": headings,
+                "rerank_sim": None,
+            }
+        )
+    return {
+        "query": ["how to configure hooks settings", "hooks configuration reference"],
+        "doc_sets_found": doc_sets,
+        "results": results,
+        "retrieval_scene": "how_to",
+        "reranker_threshold": 0.5,
+    }
+
+
+def lexical_scores(data: Dict[str, Any]) -> Tuple[List[float], List[List[float]]]:
+    """Deterministic stand-in for the model: query term overlap."""
+    terms = {t.lower() for q in data["query"] for t in re.findall(r"\w+", q) if len(t) > 2}
+
+    def score(text: str) -> float:
+        words = {w.lower() for w in re.findall(r"\w+", text)}
+        return round(len(words & terms) / max(1, len(terms)) * 2, 2) if terms else 0.0
+
+    page_scores = [min(1.0, score(p["page_title"])) for p in data["results"]]
+    heading_scores = [
+        [min(1.0, score(f"{p['page_title']} {h['text']} {h.get('related_context', '')}"))
+         for h in p.get("headings", [])]
+        for p in data["results"]
+    ]
+    return page_scores, heading_scores
+
+
+def json_response(data: Dict[str, Any], page_scores, heading_scores) -> str:
+    """What the JSON-mode prompt asks the model to return for these scores."""
+    threshold = data["reranker_threshold"]
+    results = []
+    for page, page_score, scores in zip(data["results"], page_scores, heading_scores):
+        headings = [
+            {"text": h["text"], "rerank_sim": s}
+            for h, s in zip(page.get("headings", []), scores)
+            if s >= threshold
+        ]
+        if headings or page_score >= threshold:
+            results.append(
+                {
+                    "doc_set": page["doc_set"],
+                    "page_title": page["page_title"],
+                    "headings": headings,
+                    "rerank_sim": page_score,
+                }
+            )
+    if not results:
+        best = max(
+            (s, i, j) for i, row in enumerate(heading_scores) for j, s in enumerate(row)
+        )
+        page = data["results"][best[1]]
+        results.append(
+            {
+                "doc_set": page["doc_set"],
+                "page_title": page["page_title"],
+                "headings": [{"text": page["headings"][best[2]]["text"], "rerank_sim": best[0]}],
+                "rerank_sim": page_scores[best[1]],
+            }
+        )
+    body = {"query": data["query"], "doc_sets_found": data["doc_sets_found"], "results": results}
+    return "```json\n" + json.dumps(body, ensure_ascii=False, indent=2) + "\n```"
+
+
+def compact_response(data: Dict[str, Any], page_scores, heading_scores) -> str:
+    """What the compact prompt asks the model to return for these scores."""
+    scores = {}
+    for i, (page_score, row) in enumerate(zip(page_scores, heading_scores), 1):
+        scores[str(i)] = page_score
+        scores.update({f"{i}.{j}": s for j, s in enumerate(row, 1)})
+    listed = {key: s for key, s in scores.items() if s >= 0.3}
+    if not listed:
+        best = max((s, key) for key, s in scores.items() if "." in key)
+        listed = {best[1]: best[0]}
+    return "```json\n" + json.dumps({"scores": listed}) + "\n```"
+
+
+def _message(text: str) -> SimpleNamespace:
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+def _final(result, threshold: float) -> List[Tuple[str, str, Tuple[str, ...]]]:
+    """Phase 1.5 results as the orchestrator hands them to Phase 2."""
+    filtered = filter_reranker_output(result.data, threshold)
+    return [
+        (p["doc_set"], p["page_title"], tuple(h["text"] for h in p.get("headings", [])))
+        for p in filtered.get("results", [])
+    ]
+
+
+def run_case(name: str, data: Dict[str, Any], live: bool) -> Dict[str, Any]:
+    json_reranker = LLMReranker(LLMRerankerConfig(silent=True))
+    compact_reranker = LLMReranker(LLMRerankerConfig(silent=True, compact_input=True))
+
+    json_prompt = json_reranker._prompt_template + json_reranker._build_prompt(data)
+    compact_user, ids = compact_reranker._build_compact_prompt(data)
+    compact_prompt = compact_reranker._prompt_template + compact_user
+
+    page_scores, heading_scores = lexical_scores(data)
+    json_out = json_response(data, page_scores, heading_scores)
+    compact_out = compact_response(data, page_scores, heading_scores)
+
+    threshold = data.get("reranker_threshold", 0.5)
+    json_final = _final(json_reranker._parse_response(_message(json_out), data), threshold)
+    compact_final = _final(
+        compact_reranker._parse_compact_response(_message(compact_out), data, ids), threshold
+    )
+
+    row = {
+        "name": name,
+        "pages": len(data["results"]),
+        "headings": sum(len(p.get("headings", [])) for p in data["results"]),
+        "json_in": estimate_tokens(json_prompt),
+        "compact_in": estimate_tokens(compact_prompt),
+        "json_out": estimate_tokens(json_out),
+        "compact_out": estimate_tokens(compact_out),
+        "parity": json_final == compact_final,
+    }
+    if live:
+        json_live = _final(json_reranker.rerank(data), threshold)
+        compact_live = _final(compact_reranker.rerank(data), threshold)
+        a, b = set(json_live), set(compact_live)
+        row["live_overlap"] = len(a & b) / max(1, len(a | b))
+    return row
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("inputs", nargs="*", help="Recorded phase1_5_input.json files")
+    parser.add_argument("--pages", default="5,10,20,40", help="Synthetic result sizes")
+    parser.add_argument("--live", action="store_true", help="Also call the LLM in both modes")
+    args = parser.parse_args()
+
+    cases = [(Path(p).name, json.loads(Path(p).read_text(encoding="utf-8"))) for p in args.inputs]
+    if not cases:
+        cases = [
+            (f"synthetic-{n}", synthetic_input(n, seed=n))
+            for n in (int(x) for x in args.pages.split(","))
+        ]
+
+    print(
+        f"{'input':<22}{'pages':>6}{'heads':>6}{'json in':>9}{'compact':>9}{'saved':>7}"
+        f"{'json out':>10}{'compact':>9}  parity"
+    )
+    ok = True
+    for name, data in cases:
+        row = run_case(name, data, args.live)
+        ok &= row["parity"]
+        saved = 1 - row["compact_in"] / row["json_in"]
+        line = (
+            f"{row['name']:<22}{row['pages']:>6}{row['headings']:>6}{row['json_in']:>9}"
+            f"{row['compact_in']:>9}{saved:>7.0%}{row['json_out']:>10}{row['compact_out']:>9}"
+            f"  {'OK' if row['parity'] else 'MISMATCH'}"
+        )
+        if "live_overlap" in row:
+            line += f"  live overlap={row['live_overlap']:.0%}"
+        print(line)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the concurrent batch encoder
+
+Checks that batches run concurrently and come back in input order, that
+identical texts are sent once, and that transient batch failures are
+retried while client errors are not.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from doc4llm.tool.md_doc_retrieval.batch_encoder import BatchEncoder, is_retryable
+
+
+class FakeEndpoint:
+    """Embedding endpoint that encodes a text as [len(text), first char code]."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0, error=None):
+        self.delay = delay
+        self.failures = failures
+        self.error = error or ConnectionError("connection reset")
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self._lock:
+            self.batches.append(list(batch))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self.failures > 0
+            self.failures -= 1
+        try:
+            time.sleep(self.delay)
+            if fail:
+                raise self.error
+            return [[float(len(text)), float(ord(text[0]))] for text in batch]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_batches_are_concurrent_and_ordered():
+    endpoint = FakeEndpoint(delay=0.05)
+    texts = [f"{chr(97 + i % 26)}{'x' * i}" for i in range(40)]
+    encoder = BatchEncoder(endpoint, batch_size=5, max_concurrency=4)
+
+    start = time.perf_counter()
+    embeddings = encoder.encode(texts)
+    elapsed = time.perf_counter() - start
+
+    expected = np.array([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+    assert np.array_equal(embeddings, expected)
+    assert len(endpoint.batches) == 8
+    assert endpoint.max_in_flight == 4
+    assert elapsed < 8 * 0.05
+
+
+def test_identical_texts_are_sent_once():
+    endpoint = FakeEndpoint()
+    encoder = BatchEncoder(endpoint, batch_size=2, max_concurrency=1)
+
+    embeddings = encoder.encode(["Hooks", "Settings", "Hooks", "Hooks", "Plugins"])
+
+    assert endpoint.batches == [["Hooks", "Settings"], ["Plugins"]]
+    assert embeddings.shape == (5, 2)
+    assert np.array_equal(embeddings[0], embeddings[3])
+
+
+def test_transient_failures_are_retried():
+    endpoint = FakeEndpoint(failures=2, error=HTTPError(503))
+    encoder = BatchEncoder(endpoint, batch_size=8, max_retries=3, retry_backoff=0.001)
+
+    embeddings = encoder.encode(["Hooks", "Settings"])
+
+    assert len(endpoint.batches) == 3
+    assert embeddings.shape == (2, 2)
+
+
+def test_client_errors_and_exhausted_retries_raise():
+    endpoint = FakeEndpoint(failures=5, error=HTTPError(401))
+    with pytest.raises(HTTPError):
+        BatchEncoder(endpoint, max_retries=3, retry_backoff=0.001).encode(["Hooks"])
+    assert len(endpoint.batches) == 1
+
+    endpoint = FakeEndpoint(failures=5)
+    with pytest.raises(ConnectionError):
+        BatchEncoder(endpoint, max_retries=2, retry_backoff=0.001).encode(["Hooks"])
+    assert len(endpoint.batches) == 3
+
+
+def test_is_retryable():
+    assert is_retryable(ConnectionError())
+    assert is_retryable(HTTPError(429))
+    assert is_retryable(HTTPError(502))
+    assert not is_retryable(HTTPError(400))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(ValueError("malformed embedding response"))
+    assert not is_retryable(KeyError("data"))
+
+
+def test_transient_sdk_errors_are_retryable():
+    httpx = pytest.importorskip("httpx")
+    assert is_retryable(httpx.ConnectError("connection refused"))
+    assert is_retryable(httpx.ReadTimeout("timed out"))
+    assert not is_retryable(httpx.UnsupportedProtocol("ftp://"))
+
+
+if __name__ == "__main__":
+    test_batches_are_concurrent_and_ordered()
+    test_identical_texts_are_sent_once()
+    test_transient_failures_are_retried()
+    test_client_errors_and_exhausted_retries_raise()
+    test_is_retryable()
+    test_transient_sdk_errors_are_retryable()
+    print("All batch encoder tests passed")
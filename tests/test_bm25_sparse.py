@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for the sparse-matrix BM25 backend
+
+Cross-checks backend="sparse" against the pure Python backend for both
+BM25Matcher implementations.
+"""
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from doc4llm.tool.md_doc_retrieval import BM25Matcher, BM25Config
+from doc4llm.tool.md_doc_retrieval.bm25_sparse import top_k_scores
+from doc4llm.doc_rag.searcher import bm25_recall
+
+
+WORDS = (
+    "hook hooks config configuration skill skills agent agents mcp server "
+    "permission settings sandbox memory plugin tool tools model cost slash "
+    "command commands output style ide terminal"
+).split()
+
+
+def _random_corpus(seed: int, num_docs: int = 60):
+    rng = random.Random(seed)
+    documents = {
+        f"doc{i}": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 25)))
+        for i in range(num_docs)
+    }
+    queries = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5)))
+        for _ in range(20)
+    ]
+    # repeated tokens, unknown tokens and an empty query
+    queries += ["hook hook hook config", "unknownterm", "", "the a an"]
+    return documents, queries
+
+
+def test_tool_matcher_backends_agree():
+    """tool/md_doc_retrieval BM25Matcher: sparse == python."""
+    for seed in range(5):
+        documents, queries = _random_corpus(seed)
+        python = BM25Matcher(BM25Config())
+        sparse = BM25Matcher(BM25Config(backend="sparse"))
+        python.build_index(documents)
+        sparse.build_index(documents)
+
+        for top_k in (1, 5, 100):
+            for min_score in (0.0, 1.0):
+                for q in queries:
+                    assert sparse.search(q, top_k, min_score) == python.search(q, top_k, min_score)
+
+        assert sparse.search_batch(queries, top_k=10) == [
+            python.search(q, top_k=10) for q in queries
+        ]
+    print("tool BM25Matcher: sparse backend matches python backend")
+
+
+def test_doc_rag_matcher_backends_agree():
+    """doc_rag/searcher BM25Matcher (with stemming): sparse == python."""
+    for seed in range(5):
+        documents, queries = _random_corpus(seed)
+        python = bm25_recall.BM25Matcher(bm25_recall.BM25Config(k1=1.5, b=0.6))
+        sparse = bm25_recall.BM25Matcher(
+            bm25_recall.BM25Config(k1=1.5, b=0.6, backend="sparse")
+        )
+        python.build_index(documents)
+        sparse.build_index(documents)
+
+        for q in queries:
+            assert sparse.search(q, top_k=100) == python.search(q, top_k=100)
+        assert sparse.search_batch(queries, top_k=3) == python.search_batch(queries, top_k=3)
+    print("doc_rag BM25Matcher: sparse backend matches python backend")
+
+
+def test_empty_index():
+    """Searching an empty index returns nothing on both backends."""
+    matcher = BM25Matcher(BM25Config(backend="sparse"))
+    matcher.build_index({})
+    assert matcher.search("hook") == []
+    assert matcher.search_batch(["hook", "config"]) == [[], []]
+
+
+def test_maxscore_matches_exhaustive():
+    """MaxScore/block-max pruning returns exactly the exhaustive top-k."""
+    rng = np.random.default_rng(7)
+    vocab_size = 300
+    # Zipf-like term distribution: a few very common terms, a long tail
+    probs = 1.0 / np.arange(1, vocab_size + 1)
+    probs /= probs.sum()
+
+    def sample(n):
+        return " ".join(f"w{t}" for t in rng.choice(vocab_size, size=n, p=probs))
+
+    matcher = BM25Matcher(BM25Config(backend="sparse"))
+    matcher.build_index({f"doc{i}": sample(rng.integers(0, 40)) for i in range(2000)})
+    scorer = matcher._get_sparse_scorer()
+
+    for _ in range(50):
+        query = sample(rng.integers(1, 6)).split()
+        for top_k in (1, 10, 3000):
+            for min_score in (0.0, 2.0):
+                stats = {}
+                pruned = scorer.top_k_maxscore(query, top_k, min_score, stats=stats)
+                assert pruned == scorer.search(query, top_k, min_score)
+                assert set(stats) == {"postings_total", "postings_scored"}
+    assert scorer.search(["unknown"], 5, method="maxscore") == scorer.search(["unknown"], 5)
+
+    bm25 = BM25Matcher(BM25Config(backend="sparse", top_k_method="maxscore"))
+    documents, queries = _random_corpus(0)
+    bm25.build_index(documents)
+    python = BM25Matcher(BM25Config())
+    python.build_index(documents)
+    assert bm25.search_batch(queries, top_k=5) == [python.search(q, top_k=5) for q in queries]
+    print("maxscore top-k matches exhaustive top-k")
+
+
+def test_top_k_scores_tie_order():
+    """Ties are broken by document index, like a stable descending sort."""
+    scores = np.array([1.0, 3.0, 2.0, 3.0, 2.0, 2.0, 0.0])
+    assert top_k_scores(scores, top_k=4) == [(1, 3.0), (3, 3.0), (2, 2.0), (4, 2.0)]
+    assert top_k_scores(scores, top_k=10, min_score=2.0) == [
+        (1, 3.0), (3, 3.0), (2, 2.0), (4, 2.0), (5, 2.0)
+    ]
+    assert top_k_scores(scores, top_k=0) == []
+
+
+if __name__ == "__main__":
+    test_tool_matcher_backends_agree()
+    test_doc_rag_matcher_backends_agree()
+    test_empty_index()
+    test_maxscore_matches_exhaustive()
+    test_top_k_scores_tie_order()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent embedding cache
+
+Checks that cached embeddings survive a new cache instance (on-disk store),
+that only cache misses are encoded, and that TransformerMatcher routes
+encode() through the cache.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from doc4llm.tool.md_doc_retrieval.embedding_cache import EmbeddingCache, normalize_text
+
+
+class CountingEncoder:
+    """Deterministic fake model that records which texts it encoded."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        return np.stack([
+            np.random.default_rng(sum(map(ord, text))).standard_normal(self.dim)
+            for text in texts
+        ]).astype(np.float32)
+
+
+def test_only_misses_are_encoded():
+    encoder = CountingEncoder()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = EmbeddingCache(cache_dir)
+        first = cache.encode("m", ["Hooks", "Settings", "Hooks"], encoder)
+        assert encoder.encoded == ["Hooks", "Settings"]
+        assert first.shape == (3, 8)
+        assert np.array_equal(first[0], first[2])
+
+        second = cache.encode("m", ["Settings", "  Hooks ", "Plugins"], encoder)
+        assert encoder.encoded == ["Hooks", "Settings", "Plugins"]
+        assert np.array_equal(second[0], first[1])
+        assert np.array_equal(second[1], first[0])
+        assert cache.stats["misses"] == 4
+
+        # 不同模型的向量互不共享
+        cache.encode("other", ["Hooks"], encoder)
+        assert encoder.encoded[-1] == "Hooks"
+    print("only cache misses reach the encoder")
+
+
+def test_vectors_persist_on_disk():
+    encoder = CountingEncoder()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        texts = [f"heading {i}" for i in range(50)]
+        expected = EmbeddingCache(cache_dir).encode("m", texts, encoder)
+
+        reopened = EmbeddingCache(cache_dir, max_memory_items=10)
+        encoder.encoded.clear()
+        assert np.array_equal(reopened.encode("m", texts, encoder), expected)
+        assert encoder.encoded == []
+        assert reopened.stats["disk_hits"] == 50
+        assert len(reopened._memory) == 10
+    print("embeddings are reloaded from the memory-mapped store")
+
+
+def test_memory_only_cache():
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(None)
+    cache.encode("m", ["a", "b"], encoder)
+    cache.encode("m", ["b", "a"], encoder)
+    assert encoder.encoded == ["a", "b"]
+    assert normalize_text(" a\n\tb ") == "a b"
+    print("memory-only cache works")
+
+
+def test_original_text_reaches_the_encoder():
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(None)
+    first = cache.encode("m", ["  Hooks\n\nSettings ", "Hooks Settings"], encoder)
+    # 规范化只影响缓存 key，模型收到调用方的原始文本
+    assert encoder.encoded == ["  Hooks\n\nSettings "]
+    assert np.array_equal(first[0], first[1])
+    print("the model encodes the original text")
+
+
+def test_disk_store_is_capped():
+    encoder = CountingEncoder()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = EmbeddingCache(cache_dir, max_disk_items=20)
+        for start in range(0, 60, 10):
+            cache.encode("m", [f"heading {i}" for i in range(start, start + 10)], encoder)
+
+        store = cache._store("m")
+        assert len(store._rows) <= 20
+        assert len(list(store.path.glob("vectors-*.f32"))) == 1
+
+        # 压缩保留最近写入的向量，新实例同样能读到
+        reopened = EmbeddingCache(cache_dir, max_disk_items=20)
+        encoder.encoded.clear()
+        expected = cache.encode("m", ["heading 59"], encoder)
+        assert np.array_equal(reopened.encode("m", ["heading 59"], encoder), expected)
+        assert encoder.encoded == [] and reopened.stats["disk_hits"] == 1
+        reopened.encode("m", ["heading 0"], encoder)
+        assert encoder.encoded == ["heading 0"]
+    print("the on-disk store stays within max_disk_items")
+
+
+def test_transformer_matcher_uses_cache():
+    from doc4llm.tool.md_doc_retrieval.transformer_matcher import (
+        TransformerConfig,
+        TransformerMatcher,
+    )
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        matcher = TransformerMatcher(
+            TransformerConfig(use_local=True, embedding_cache_dir=cache_dir)
+        )
+        encoder = CountingEncoder()
+        matcher._encode_with_model = lambda model_id, texts: encoder(texts)
+
+        matcher.rerank_batch(["hooks"], ["Hook events", "Settings"])
+        matcher.rerank_batch(["hooks"], ["Hook events", "Settings"])
+        assert encoder.encoded == ["hooks", "Hook events", "Settings"]
+    print("TransformerMatcher encodes each text once")
+
+
+if __name__ == "__main__":
+    test_only_misses_are_encoded()
+    test_vectors_persist_on_disk()
+    test_memory_only_cache()
+    test_original_text_reaches_the_encoder()
+    test_disk_store_is_capped()
+    test_transformer_matcher_uses_cache()
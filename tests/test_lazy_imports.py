@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy package imports
+
+Checks that the docrag CLI and the BM25 searcher import without loading
+anthropic / sentence-transformers / torch, and that the names re-exported
+by the package ``__init__`` modules still resolve on first access.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+HEAVY_MODULES = ["anthropic", "openai", "sentence_transformers", "torch", "transformers"]
+
+
+def _imported_heavy_modules(statement: str):
+    """Heavy modules loaded by running ``statement`` in a fresh interpreter."""
+    script = (
+        f"import sys\n{statement}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=str(project_root),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [m for m in completed.stdout.strip().split(",") if m]
+
+
+def test_cli_import_is_light():
+    assert _imported_heavy_modules("import doc4llm.doc_rag.cli") == []
+
+
+def test_bm25_searcher_import_is_light():
+    statement = "from doc4llm.doc_rag.searcher.doc_searcher_api import DocSearcherAPI"
+    assert _imported_heavy_modules(statement) == []
+
+
+def test_package_exports_resolve():
+    import doc4llm
+    from doc4llm.doc_rag import searcher
+    from doc4llm.tool import md_doc_retrieval
+
+    for package in (doc4llm, searcher, md_doc_retrieval):
+        for name in package.__all__:
+            assert getattr(package, name) is not None, f"{package.__name__}.{name}"
+            assert name in dir(package)
+
+    from doc4llm.tool.md_doc_retrieval import BasicMatchResult
+    from doc4llm.tool.md_doc_retrieval.basic_matcher import MatchResult
+    assert BasicMatchResult is MatchResult
+
+
+def test_unknown_attribute_raises():
+    import doc4llm.doc_rag
+
+    try:
+        doc4llm.doc_rag.does_not_exist
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("expected AttributeError")
+
+
+if __name__ == "__main__":
+    test_cli_import_is_light()
+    test_bm25_searcher_import_is_light()
+    test_package_exports_resolve()
+    test_unknown_attribute_raises()
+    print("All lazy import tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared Anthropic clients
+
+Checks that SDK clients (and their connection pools) are shared per
+(api_key, base_url, timeout) across AnthropicClient instances, and that
+async clients are shared within, but not across, event loops.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from doc4llm.llm.anthropic import (
+    AnthropicClient,
+    AsyncAnthropicClient,
+    LLM_Config,
+    clear_client_cache,
+    get_anthropic_client,
+    get_async_anthropic_client,
+    http2_available,
+)
+
+
+def test_clients_are_shared_per_settings():
+    clear_client_cache()
+    a = get_anthropic_client("key-a", "http://localhost:1", 30)
+    assert get_anthropic_client("key-a", "http://localhost:1", 30) is a
+    assert get_anthropic_client("key-a", "http://localhost:1", 60) is not a
+    assert get_anthropic_client("key-b", "http://localhost:1", 30) is not a
+    clear_client_cache()
+    assert get_anthropic_client("key-a", "http://localhost:1", 30) is not a
+
+
+def test_anthropic_client_instances_share_pool():
+    clear_client_cache()
+    config = LLM_Config(api_key="key-a", base_url="http://localhost:1", timeout=30)
+    first = AnthropicClient(config)
+    second = AnthropicClient(LLM_Config(**vars(config)))
+    assert first._client is second._client
+    other = AnthropicClient(LLM_Config(api_key="key-c", base_url="http://localhost:1"))
+    assert other._client is not first._client
+
+
+def test_http2_follows_h2_availability():
+    clear_client_cache()
+    client = get_anthropic_client("key-a", "http://localhost:1", 30)
+    pool = client._client._transport._pool
+    assert pool._http2 == http2_available()
+
+
+def test_async_clients_are_shared_per_event_loop():
+    clear_client_cache()
+
+    async def fetch():
+        client = AsyncAnthropicClient(LLM_Config(api_key="key-a", base_url="http://localhost:1"))
+        shared = get_async_anthropic_client("key-a", "http://localhost:1", 60)
+        assert client._client is shared
+        return shared
+
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+    assert first is not second
+
+
+def test_async_client_requires_running_loop():
+    try:
+        get_async_anthropic_client("key-a")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("expected RuntimeError outside an event loop")
+
+
+if __name__ == "__main__":
+    test_clients_are_shared_per_settings()
+    test_anthropic_client_instances_share_pool()
+    test_http2_follows_h2_availability()
+    test_async_clients_are_shared_per_event_loop()
+    test_async_client_requires_running_loop()
+    print("All LLM client tests passed")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for stream assembly in AnthropicClient.invoke
+
+Serves a recorded-style SSE stream from an httpx mock transport and checks
+that invoke() builds the final Message (thinking, text and tool_use blocks,
+stop_reason, usage) from the events with a single HTTP request.
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from doc4llm.llm import anthropic as llm
+from doc4llm.llm.message_stream import IncompleteStreamError
+
+EVENTS = [
+    ("message_start", {"type": "message_start", "message": {
+        "id": "msg_1", "type": "message", "role": "assistant", "model": "MiniMax-M2.1",
+        "content": [], "stop_reason": None, "stop_sequence": None,
+        "usage": {"input_tokens": 42, "output_tokens": 1},
+    }}),
+    ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {
+        "type": "thinking", "thinking": "", "signature": ""}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                             "delta": {"type": "thinking_delta", "thinking": "The user "}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                             "delta": {"type": "thinking_delta", "thinking": "asks about hooks."}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                             "delta": {"type": "signature_delta", "signature": "sig"}}),
+    ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+    ("content_block_start", {"type": "content_block_start", "index": 1,
+                             "content_block": {"type": "text", "text": ""}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 1,
+                             "delta": {"type": "text_delta", "text": "```json\n{\"scene\": "}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 1,
+                             "delta": {"type": "text_delta", "text": "\"how_to\"}\n```"}}),
+    ("content_block_stop", {"type": "content_block_stop", "index": 1}),
+    ("content_block_start", {"type": "content_block_start", "index": 2, "content_block": {
+        "type": "tool_use", "id": "toolu_1", "name": "search", "input": {}}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 2,
+                             "delta": {"type": "input_json_delta",
+                                       "partial_json": "{\"query\": "}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 2,
+                             "delta": {"type": "input_json_delta", "partial_json": "\"hooks\"}"}}),
+    ("content_block_stop", {"type": "content_block_stop", "index": 2}),
+    ("message_delta", {"type": "message_delta",
+                       "delta": {"stop_reason": "tool_use", "stop_sequence": None},
+                       "usage": {"output_tokens": 57}}),
+    ("message_stop", {"type": "message_stop"}),
+]
+
+
+httpx = llm.sdk_httpx()
+
+
+def _sse(events):
+    return "".join(
+        f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events
+    ).encode("utf-8")
+
+
+class MockAPI:
+    """Records requests and answers with a fixed SSE stream."""
+
+    def __init__(self, events):
+        self.events = events
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(json.loads(request.content))
+        return httpx.Response(
+            200, content=_sse(self.events), headers={"content-type": "text/event-stream"}
+        )
+
+
+def _install(monkeypatch, api):
+    llm.clear_client_cache()
+    base = llm._http_client_kwargs
+    monkeypatch.setattr(
+        llm, "_http_client_kwargs", lambda: dict(base(), transport=httpx.MockTransport(api))
+    )
+
+
+def _config():
+    return llm.LLM_Config(api_key="test-key", base_url="http://llm.test", timeout=5)
+
+
+def _check_message(message):
+    assert [block.type for block in message.content] == ["thinking", "text", "tool_use"]
+    assert message.content[0].thinking == "The user asks about hooks."
+    assert message.content[0].signature == "sig"
+    assert message.content[1].text == '```json\n{"scene": "how_to"}\n```'
+    assert message.content[2].input == {"query": "hooks"}
+    assert message.stop_reason == "tool_use"
+    assert message.usage.input_tokens == 42
+    assert message.usage.output_tokens == 57
+
+
+def test_silent_stream_is_assembled_without_second_request(monkeypatch):
+    api = MockAPI(EVENTS)
+    _install(monkeypatch, api)
+
+    message = llm.invoke(
+        model="MiniMax-M2.1", messages=[{"role": "user", "content": "hooks?"}],
+        config=_config(), silent=True,
+    )
+
+    _check_message(message)
+    assert len(api.requests) == 1
+    assert api.requests[0]["stream"] is True
+    llm.clear_client_cache()
+
+
+def test_verbose_stream_prints_deltas(monkeypatch, capsys):
+    api = MockAPI(EVENTS)
+    _install(monkeypatch, api)
+
+    message = llm.invoke(
+        model="MiniMax-M2.1", messages=[{"role": "user", "content": "hooks?"}],
+        config=_config(), silent=False,
+    )
+
+    _check_message(message)
+    assert len(api.requests) == 1
+    assert "The user asks about hooks." in capsys.readouterr().out
+    llm.clear_client_cache()
+
+
+def test_truncated_stream_raises(monkeypatch):
+    api = MockAPI(EVENTS[:8])
+    _install(monkeypatch, api)
+
+    try:
+        llm.invoke(
+            model="MiniMax-M2.1", messages=[{"role": "user", "content": "hooks?"}],
+            config=_config(), silent=True,
+        )
+    except IncompleteStreamError:
+        pass
+    else:
+        raise AssertionError("expected IncompleteStreamError")
+    assert len(api.requests) == 1
+    llm.clear_client_cache()
+
+
+def test_async_stream_is_assembled(monkeypatch):
+    api = MockAPI(EVENTS)
+    _install(monkeypatch, api)
+
+    message = asyncio.run(llm.ainvoke(
+        model="MiniMax-M2.1", messages=[{"role": "user", "content": "hooks?"}],
+        config=_config(), silent=True,
+    ))
+
+    _check_message(message)
+    assert len(api.requests) == 1
+    llm.clear_client_cache()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the process-wide local model registry
+
+Checks that a (model_id, device) is loaded once across matchers and
+threads, that the memory cap evicts least recently used models, and that
+load times are reported.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from doc4llm.tool.md_doc_retrieval.model_registry import ModelRegistry, get_model_registry
+
+
+class FakeModel:
+    """Stands in for a SentenceTransformer of a given size."""
+
+    def __init__(self, model_id, device, memory_bytes):
+        self.model_id = model_id
+        self.device = device
+        self.memory_bytes = memory_bytes
+
+    def parameters(self):
+        return [FakeTensor(self.memory_bytes)]
+
+
+class FakeTensor:
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+    def numel(self):
+        return self.nbytes // 4
+
+    def element_size(self):
+        return 4
+
+
+class CountingLoader:
+    def __init__(self, memory_bytes=400, delay=0.0):
+        self.memory_bytes = memory_bytes
+        self.delay = delay
+        self.loads = []
+
+    def __call__(self, model_id, device):
+        self.loads.append((model_id, device))
+        time.sleep(self.delay)
+        return FakeModel(model_id, device, self.memory_bytes)
+
+
+def test_model_loaded_once_per_device():
+    loader = CountingLoader(delay=0.05)
+    registry = ModelRegistry(loader=loader)
+
+    threads = [threading.Thread(target=registry.get, args=("bge-en", "cpu")) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.get("bge-en", "cuda")
+
+    assert loader.loads == [("bge-en", "cpu"), ("bge-en", "cuda")]
+    assert registry.get("bge-en", "cpu") is registry.get("bge-en", "cpu")
+    stats = {(s["model_id"], s["device"]): s for s in registry.stats()}
+    assert stats[("bge-en", "cpu")]["hits"] == 9
+    assert stats[("bge-en", "cpu")]["load_seconds"] >= 0.05
+    assert stats[("bge-en", "cpu")]["memory_bytes"] == 400
+
+
+def test_memory_cap_evicts_least_recently_used():
+    loader = CountingLoader(memory_bytes=400)
+    registry = ModelRegistry(max_memory_bytes=1000, loader=loader)
+
+    registry.get("zh", "cpu")
+    registry.get("en", "cpu")
+    registry.get("zh", "cpu")
+    registry.get("multilingual", "cpu")
+
+    assert ("en", "cpu") not in registry
+    assert ("zh", "cpu") in registry and ("multilingual", "cpu") in registry
+    assert registry.memory_bytes() == 800
+    assert registry.evictions == 1
+
+    # A single model above the cap is still returned
+    small = ModelRegistry(max_memory_bytes=100, loader=loader)
+    assert small.get("zh", "cpu").model_id == "zh"
+    assert len(small) == 1
+
+
+def test_prewarm_reports_load_times():
+    registry = ModelRegistry(loader=CountingLoader(delay=0.01))
+    first = registry.prewarm(["zh", "en", "zh"])
+    again = registry.prewarm(["zh"])
+    assert set(first) == {"zh", "en"}
+    assert first["zh"] >= 0.01
+    assert again == {"zh": 0.0}
+
+
+def test_transformer_matchers_share_models(monkeypatch):
+    from doc4llm.tool.md_doc_retrieval.transformer_matcher import (
+        TransformerConfig,
+        TransformerMatcher,
+    )
+
+    loader = CountingLoader()
+    monkeypatch.setattr(get_model_registry(), "loader", loader)
+    get_model_registry().evict(device="test-device")
+
+    config = TransformerConfig(use_local=True, device="test-device", embedding_cache=False)
+    first = TransformerMatcher(config)._load_local_model(config.local_model_en)
+    second = TransformerMatcher(config)._load_local_model(config.local_model_en)
+
+    assert first is second
+    assert loader.loads == [(config.local_model_en, "test-device")]
+    get_model_registry().evict(device="test-device")
+
+
+if __name__ == "__main__":
+    test_model_loaded_once_per_device()
+    test_memory_cap_evicts_least_recently_used()
+    test_prewarm_reports_load_times()
+    print("All model registry tests passed")
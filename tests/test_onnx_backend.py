@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the ONNX Runtime embedding backend
+
+Builds a tiny random BERT sentence-transformers model on disk, exports it
+to ONNX and checks that float32 and int8 embeddings agree with PyTorch,
+and that TransformerMatcher(local_backend="onnx") uses the export.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("onnxruntime")
+torch = pytest.importorskip("torch")
+
+from doc4llm.tool.md_doc_retrieval.model_registry import get_model_registry
+from doc4llm.tool.md_doc_retrieval.onnx_backend import export_onnx_model, load_onnx_model
+
+TEXTS = ["hook events", "install the plugin marketplace", "settings", "permission modes"]
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """Random 2-layer BERT with CLS pooling saved as a sentence-transformers model."""
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    root = tmp_path_factory.mktemp("tiny_bert")
+    words = "hook hooks events install the plugin marketplace settings permission modes".split()
+    (root / "vocab.txt").write_text(
+        "\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words), encoding="utf-8"
+    )
+    torch.manual_seed(0)
+    BertModel(BertConfig(
+        vocab_size=5 + len(words), hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64,
+    )).save_pretrained(str(root))
+    BertTokenizerFast(vocab_file=str(root / "vocab.txt")).save_pretrained(str(root))
+
+    model_dir = root / "st"
+    SentenceTransformer(modules=[
+        models.Transformer(str(root)),
+        models.Pooling(32, pooling_mode="cls"),
+        models.Normalize(),
+    ]).save(str(model_dir))
+    return str(model_dir)
+
+
+@pytest.mark.parametrize("quantization, min_cosine", [("none", 0.9999), ("int8", 0.99)])
+def test_onnx_embeddings_match_torch(tiny_model, tmp_path, quantization, min_cosine):
+    from sentence_transformers import SentenceTransformer
+
+    expected = SentenceTransformer(tiny_model, device="cpu").encode(TEXTS, normalize_embeddings=True)
+    model = load_onnx_model(tiny_model, quantization=quantization, cache_dir=str(tmp_path))
+    embeddings = model.encode(TEXTS, batch_size=3, normalize_embeddings=True)
+
+    assert embeddings.shape == expected.shape
+    assert (embeddings * expected).sum(axis=1).min() >= min_cosine
+
+
+def test_export_is_cached(tiny_model, tmp_path):
+    model_dir = export_onnx_model(tiny_model, cache_dir=str(tmp_path))
+    mtime = (model_dir / "model.onnx").stat().st_mtime_ns
+    assert export_onnx_model(tiny_model, cache_dir=str(tmp_path)) == model_dir
+    assert (model_dir / "model.onnx").stat().st_mtime_ns == mtime
+
+
+def test_export_without_dynamo_argument(tiny_model, tmp_path, monkeypatch):
+    export = torch.onnx.export
+
+    # torch < 2.5 的 export 没有 dynamo 参数
+    def legacy_export(model, args, f, input_names=None, output_names=None,
+                      dynamic_axes=None, opset_version=None):
+        return export(model, args, f, input_names=input_names, output_names=output_names,
+                      dynamic_axes=dynamic_axes, opset_version=opset_version, dynamo=False)
+
+    monkeypatch.setattr(torch.onnx, "export", legacy_export)
+    model_dir = export_onnx_model(tiny_model, cache_dir=str(tmp_path))
+    assert (model_dir / "model.onnx").exists()
+
+
+def test_stale_export_is_replaced(tiny_model, tmp_path):
+    model_dir = export_onnx_model(tiny_model, cache_dir=str(tmp_path))
+    (model_dir / "meta.json").write_text('{"version": 0}', encoding="utf-8")
+    (model_dir / "leftover.bin").write_bytes(b"stale")
+
+    assert export_onnx_model(tiny_model, cache_dir=str(tmp_path)) == model_dir
+    assert not (model_dir / "leftover.bin").exists()
+    assert [p.name for p in tmp_path.iterdir()] == [model_dir.name]
+
+
+def test_transformer_matcher_onnx_backend(tiny_model, tmp_path):
+    from doc4llm.tool.md_doc_retrieval.transformer_matcher import (
+        TransformerConfig,
+        TransformerMatcher,
+    )
+
+    config = TransformerConfig(
+        use_local=True,
+        local_model_en=tiny_model,
+        local_model_zh=tiny_model,
+        embedding_cache=False,
+        local_backend="onnx",
+        onnx_cache_dir=str(tmp_path),
+        onnx_threads=1,
+    )
+    matcher = TransformerMatcher(config)
+    embeddings = matcher.encode(TEXTS)
+
+    assert embeddings.shape == (4, 32)
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-4)
+    assert (tiny_model, "cpu", "onnx-int8-t1") in get_model_registry()
+    get_model_registry().evict(model_id=tiny_model)
+
+    with pytest.raises(ValueError):
+        TransformerMatcher(TransformerConfig(use_local=True, local_backend="tensorrt"))
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk LLM response cache
+
+Checks hits / misses, TTL expiry and LRU eviction of LLMResponseCache, and
+that invoke() answers a repeated prompt from the cache without a second
+HTTP request.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from doc4llm.llm import anthropic as llm
+from doc4llm.llm.response_cache import LLMResponseCache, get_response_cache, response_key
+
+httpx = llm.sdk_httpx()
+
+
+def _events(text, stop_reason="end_turn"):
+    return [
+        ("message_start", {"type": "message_start", "message": {
+            "id": "msg_1", "type": "message", "role": "assistant", "model": "MiniMax-M2.1",
+            "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": 10, "output_tokens": 1},
+        }}),
+        ("content_block_start", {"type": "content_block_start", "index": 0,
+                                 "content_block": {"type": "text", "text": ""}}),
+        ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                 "delta": {"type": "text_delta", "text": text}}),
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        ("message_delta", {"type": "message_delta",
+                           "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                           "usage": {"output_tokens": 5}}),
+        ("message_stop", {"type": "message_stop"}),
+    ]
+
+
+class MockAPI:
+    """Records requests and answers with a fixed SSE stream."""
+
+    def __init__(self, events):
+        self.events = events
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(json.loads(request.content))
+        body = "".join(
+            f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in self.events
+        )
+        return httpx.Response(
+            200, content=body.encode("utf-8"), headers={"content-type": "text/event-stream"}
+        )
+
+
+def _install(monkeypatch, api):
+    llm.clear_client_cache()
+    base = llm._http_client_kwargs
+    monkeypatch.setattr(
+        llm, "_http_client_kwargs", lambda: dict(base(), transport=httpx.MockTransport(api))
+    )
+
+
+def _invoke(cache, content="hooks?", temperature=0.1):
+    return llm.invoke(
+        model="MiniMax-M2.1",
+        messages=[{"role": "user", "content": content}],
+        config=llm.LLM_Config(api_key="test-key", base_url="http://llm.test", timeout=5),
+        temperature=temperature,
+        silent=True,
+        cache=cache,
+    )
+
+
+def _message(text):
+    from anthropic.types import Message
+
+    return Message.construct(
+        id="msg_1", type="message", role="assistant", model="m", stop_reason="end_turn",
+        content=[{"type": "text", "text": text}], usage={"input_tokens": 1, "output_tokens": 1},
+    )
+
+
+def test_key_ignores_stream_but_not_prompt():
+    request = {"model": "m", "system": "s", "messages": [{"role": "user", "content": "a"}]}
+    assert response_key(dict(request, stream=True)) == response_key(request)
+    assert response_key(dict(request, temperature=0.5)) != response_key(request)
+    assert response_key(dict(request, system="t")) != response_key(request)
+
+
+def test_hit_and_miss(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    assert cache.get("k") is None
+    cache.put("k", _message("answer"), model="m")
+
+    # 新实例读取同一个数据库（跨进程共享）
+    reopened = LLMResponseCache(str(tmp_path))
+    assert reopened.get("k").content[0].text == "answer"
+    assert cache.stats["misses"] == 1
+    assert reopened.stats["hits"] == 1
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), ttl_seconds=0.05)
+    cache.put("k", _message("answer"))
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats["expired"] == 1
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), max_entries=2)
+    cache.put("a", _message("a"))
+    time.sleep(0.01)
+    cache.put("b", _message("b"))
+    time.sleep(0.01)
+    assert cache.get("a") is not None  # a 比 b 更近被访问
+    time.sleep(0.01)
+    cache.put("c", _message("c"))
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats["evictions"] == 1
+
+
+def test_get_response_cache_is_shared(tmp_path):
+    assert get_response_cache(str(tmp_path)) is get_response_cache(str(tmp_path))
+    assert get_response_cache(str(tmp_path)) is not get_response_cache(str(tmp_path), 60.0)
+
+
+def test_invoke_reuses_cached_response(monkeypatch, tmp_path):
+    api = MockAPI(_events("how_to"))
+    _install(monkeypatch, api)
+    cache = LLMResponseCache(str(tmp_path))
+
+    first = _invoke(cache)
+    second = _invoke(cache)
+    assert len(api.requests) == 1
+    assert second.content[0].text == first.content[0].text == "how_to"
+
+    # 不同的 prompt / temperature 不命中
+    _invoke(cache, content="plugins?")
+    _invoke(cache, temperature=0.7)
+    assert len(api.requests) == 3
+    llm.clear_client_cache()
+
+
+def test_truncated_responses_are_not_cached(monkeypatch, tmp_path):
+    api = MockAPI(_events("partial", stop_reason="max_tokens"))
+    _install(monkeypatch, api)
+    cache = LLMResponseCache(str(tmp_path))
+
+    _invoke(cache)
+    _invoke(cache)
+    assert len(api.requests) == 2
+    assert len(cache) == 0
+    llm.clear_client_cache()
+
+
+def test_rejected_responses_are_not_cached(monkeypatch, tmp_path):
+    api = MockAPI(_events("not json"))
+    _install(monkeypatch, api)
+    cache = LLMResponseCache(str(tmp_path))
+
+    for _ in range(2):
+        llm.invoke(
+            model="MiniMax-M2.1",
+            messages=[{"role": "user", "content": "hooks?"}],
+            config=llm.LLM_Config(api_key="test-key", base_url="http://llm.test", timeout=5),
+            silent=True,
+            cache=cache,
+            cache_validator=lambda message: message.content[0].text.startswith("{"),
+        )
+    assert len(api.requests) == 2
+    assert len(cache) == 0
+    llm.clear_client_cache()
+
+
+def test_unparseable_router_responses_are_not_replayed(monkeypatch, tmp_path):
+    from doc4llm.doc_rag.query_router import query_router
+    from doc4llm.doc_rag.query_router.query_router import (
+        QueryRouter,
+        QueryRouterConfig,
+        QueryRouterValidationError,
+    )
+
+    api = MockAPI(_events("not json"))
+    _install(monkeypatch, api)
+    config = llm.LLM_Config(api_key="test-key", base_url="http://llm.test", timeout=5)
+    monkeypatch.setattr(
+        query_router, "invoke", lambda **request: llm.invoke(config=config, **request)
+    )
+    cache = LLMResponseCache(str(tmp_path))
+    router = QueryRouter(QueryRouterConfig(silent=True, max_retries=1, response_cache=cache))
+
+    for run in range(1, 3):
+        with pytest.raises(QueryRouterValidationError):
+            router.route("how to configure hooks")
+        # 每次运行都真正调用模型（首次 + 1 次重试），无效响应不会被缓存重放
+        assert len(api.requests) == 2 * run
+    assert len(cache) == 0 and cache.stats["hits"] == 0
+
+    api.events = _events(
+        '```json\n{"scene": "how_to", "confidence": 0.9, "ambiguity": 0.1,'
+        ' "coverage_need": 0.5, "reranker_threshold": 0.5}\n```'
+    )
+    assert router.route("how to configure hooks").scene == "how_to"
+    assert router.route("how to configure hooks").scene == "how_to"
+    assert len(api.requests) == 5 and len(cache) == 1
+    llm.clear_client_cache()